@@ -2,31 +2,46 @@
 MVola API Python Library
 
 A secure, robust Python library for MVola payment integration.
+
+Public names are imported lazily (PEP 562): `import mvola_api` and
+imports of lightweight submodules (constants, exceptions, ...) do not
+pull in requests, urllib3 or python-dotenv; the first access to e.g.
+mvola_api.MVolaClient does.
 """
 
-try:
-    from importlib.metadata import version, PackageNotFoundError
+from typing import TYPE_CHECKING, Any, List
 
-    try:
-        __version__ = version("mvola-api-lib")
-    except PackageNotFoundError:
-        __version__ = "2.0.0"
-except ImportError:
-    __version__ = "2.0.0"
-
-from .auth import MVolaAuth
-from .client import MVolaClient
-from .constants import PRODUCTION_URL, SANDBOX_URL
-from .exceptions import (
-    MVolaAuthError,
-    MVolaConnectionError,
-    MVolaError,
-    MVolaTransactionError,
-    MVolaValidationError,
-)
-from .http_client import SecureHTTPClient
-from .rate_limiter import RateLimitError, TokenBucketRateLimiter
-from .transaction import MVolaTransaction
+if TYPE_CHECKING:
+    from .auth import MVolaAuth
+    from .client import MVolaClient
+    from .constants import PRODUCTION_URL, SANDBOX_URL
+    from .exceptions import (
+        MVolaAuthError,
+        MVolaConnectionError,
+        MVolaError,
+        MVolaTransactionError,
+        MVolaValidationError,
+    )
+    from .http_client import SecureHTTPClient
+    from .rate_limiter import RateLimitError, TokenBucketRateLimiter
+    from .transaction import MVolaTransaction
+
+# Public name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "MVolaClient": "client",
+    "MVolaAuth": "auth",
+    "MVolaTransaction": "transaction",
+    "SecureHTTPClient": "http_client",
+    "TokenBucketRateLimiter": "rate_limiter",
+    "RateLimitError": "rate_limiter",
+    "SANDBOX_URL": "constants",
+    "PRODUCTION_URL": "constants",
+    "MVolaError": "exceptions",
+    "MVolaAuthError": "exceptions",
+    "MVolaTransactionError": "exceptions",
+    "MVolaValidationError": "exceptions",
+    "MVolaConnectionError": "exceptions",
+}
 
 __all__ = [
     # Client
@@ -50,3 +65,34 @@ __all__ = [
     "MVolaValidationError",
     "MVolaConnectionError",
 ]
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+
+        try:
+            return version("mvola-api-lib")
+        except PackageNotFoundError:
+            return "2.0.0"
+    except ImportError:
+        return "2.0.0"
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value = _package_version()
+    elif name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        module = import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache it: later accesses are plain module attribute lookups
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | {"__version__"})
@@ -0,0 +1,7 @@
+"""python -m mvola_api: the `mvola` command line (see cli.py)."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
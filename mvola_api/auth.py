@@ -8,21 +8,27 @@ import base64
 import gc
 import time
 from threading import Lock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urljoin
 
+from . import forking
+from .bulkhead import AUTH, BulkheadFullError, Bulkheads
+from .circuit_breaker import CircuitBreakers, CircuitOpenError
+from .concurrency import AdaptiveConcurrencyLimiter, LoadShedError
 from .constants import (
     ALLOWED_BASE_URLS,
-    DEFAULT_TIMEOUT,
     GRANT_TYPE,
     RATE_LIMIT_MAX_REQUESTS,
     RATE_LIMIT_REFILL_RATE,
     TOKEN_ENDPOINT,
     TOKEN_SCOPE,
 )
-from .exceptions import MVolaAuthError, MVolaValidationError
+from .deadline import Deadline, DeadlineExceededError
+from .exceptions import MVolaAuthError, MVolaValidationError, detach_response
 from .http_client import SecureHTTPClient
+from .instrumentation import instrumented, timed
 from .rate_limiter import TokenBucketRateLimiter
+from .tracing import set_attribute, traced
 
 
 class MVolaAuth:
@@ -34,7 +40,19 @@ class MVolaAuth:
     through properties, repr, or str.
     """
 
-    def __init__(self, consumer_key: str, consumer_secret: str, base_url: str) -> None:
+    def __init__(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        base_url: str,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        bulkheads: Optional[Bulkheads] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        keep_token_after_fork: bool = True,
+        http_client: Optional[SecureHTTPClient] = None,
+        keep_error_responses: bool = False,
+    ) -> None:
         """
         Initialize the auth module.
 
@@ -42,6 +60,23 @@ class MVolaAuth:
             consumer_key: Consumer key from MVola Developer Portal
             consumer_secret: Consumer secret from MVola Developer Portal
             base_url: Base URL for the API (sandbox or production)
+            rate_limiter: Rate limiter for token requests (default: 30 burst, 2/s)
+            circuit_breakers: Circuit breakers for the token endpoint
+                (default: none)
+            bulkheads: Bulkheads whose auth compartment limits concurrent
+                token requests (default: none)
+            concurrency_limiter: Adaptive limit on outbound calls in flight
+                (default: none)
+            keep_token_after_fork: Let forked worker processes reuse a still
+                valid token cached by the parent (False: every worker
+                requests its own)
+            http_client: HTTP client shared with other modules or tenants
+                (see MVolaClientManager); circuit_breakers, bulkheads and
+                concurrency_limiter must then be set on it instead. It is
+                not closed by this module (default: a client of its own)
+            keep_error_responses: Keep the raw response on MVolaAuthError
+                (e.response) in addition to its snapshot (default: only
+                the snapshot, see exceptions.py)
 
         Raises:
             MVolaValidationError: If credentials are empty or base_url is invalid
@@ -71,14 +106,29 @@ class MVolaAuth:
         self._token: Optional[Dict[str, Any]] = None
         self._token_expiry: float = 0
         self._token_lock = Lock()
+        self._keep_token_after_fork = keep_token_after_fork
+        self._keep_error_responses = keep_error_responses
 
         # Secure HTTP client and rate limiter
-        self._http_client = SecureHTTPClient()
-        self._rate_limiter = TokenBucketRateLimiter(
+        self._owns_http_client = http_client is None
+        self._http_client = http_client or SecureHTTPClient(
+            circuit_breakers=circuit_breakers,
+            bulkhead=bulkheads.get(AUTH) if bulkheads is not None else None,
+            concurrency_limiter=concurrency_limiter,
+        )
+        self._rate_limiter = rate_limiter or TokenBucketRateLimiter(
             max_tokens=RATE_LIMIT_MAX_REQUESTS,
             refill_rate=RATE_LIMIT_REFILL_RATE,
             name="auth",
         )
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Replace the token lock in a forked child (see forking.py)."""
+        self._token_lock = Lock()
+        if not (self._keep_token_after_fork and self.is_token_valid()):
+            self._token = None
+            self._token_expiry = 0
 
     def __repr__(self) -> str:
         """Secure repr — NEVER leaks any credential information."""
@@ -91,17 +141,24 @@ class MVolaAuth:
         """Secure str representation."""
         return f"MVolaAuth(base_url='{self._base_url}')"
 
-    def __del__(self) -> None:
-        """Securely clear credentials from memory on deletion."""
-        try:
-            self._consumer_key = None
-            self._consumer_secret = None
-            self._token = None
-            self._token_expiry = 0
-            if hasattr(self, "_http_client") and self._http_client:
-                self._http_client.close()
-        except Exception:
-            pass
+    def close(self) -> None:
+        """
+        Clear the credentials and token from memory and release the HTTP
+        client (unless it was passed in). The instance cannot be used
+        afterwards.
+        """
+        self._consumer_key = None
+        self._consumer_secret = None
+        self._token = None
+        self._token_expiry = 0
+        if self._owns_http_client:
+            self._http_client.close()
+
+    def __enter__(self) -> "MVolaAuth":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     @property
     def base_url(self) -> str:
@@ -142,12 +199,45 @@ class MVolaAuth:
             return False
         return time.time() < self._token_expiry - 60
 
-    def generate_token(self, force_refresh: bool = False) -> Dict[str, Any]:
+    def export_token(self) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Export the current token, e.g. to keep it while no client is alive.
+
+        Returns:
+            (token response, expiry timestamp), or None without a valid token
+        """
+        with self._token_lock:
+            if not self.is_token_valid():
+                return None
+            return self._token, self._token_expiry
+
+    def import_token(self, token: Dict[str, Any], expiry: float) -> None:
+        """
+        Use a token exported by export_token() for the same credentials.
+
+        Args:
+            token: Token response, with access_token
+            expiry: Expiry timestamp returned with it
+
+        Raises:
+            MVolaValidationError: If the token has no access_token
+        """
+        if "access_token" not in token:
+            raise MVolaValidationError(message="Invalid token: missing access_token")
+        with self._token_lock:
+            self._token = token
+            self._token_expiry = expiry
+
+    def generate_token(
+        self, force_refresh: bool = False, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Generate an access token for MVola API (thread-safe, rate-limited).
 
         Args:
             force_refresh: Force token refresh even if current token is valid
+            deadline: Deadline bounding the rate limiter wait, the wait for a
+                concurrent refresh and the token request
 
         Returns:
             Token response with access_token, token_type, expires_in, scope
@@ -155,81 +245,107 @@ class MVolaAuth:
         Raises:
             MVolaAuthError: If token generation fails
             RateLimitError: If rate limit is exceeded
+            DeadlineExceededError: If the deadline passes
         """
+        # Lock-free fast path: cache hits must not consume rate limit tokens
+        token = self._token
+        if not force_refresh and token and time.time() < self._token_expiry - 60:
+            set_attribute("mvola.token.cache_hit", True)
+            return token
+
+        set_attribute("mvola.token.cache_hit", False)
+        return self._refresh_token(force_refresh, deadline)
+
+    @instrumented("token")
+    def _refresh_token(self, force_refresh: bool, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Request a new token (slow path of generate_token)."""
         # Rate limit check before acquiring lock
-        self._rate_limiter.acquire()
+        timed("rate_limit_wait", self._rate_limiter.acquire, deadline=deadline)
 
-        with self._token_lock:
-            # Check if token is still valid (with 60 seconds buffer)
-            current_time = time.time()
-            if not force_refresh and self._token and current_time < self._token_expiry - 60:
-                return self._token
-
-            # Clear any expired token
-            self._clear_expired_token()
-
-            # Set up the request
-            url = urljoin(self._base_url, TOKEN_ENDPOINT)
-            headers = {
-                "Authorization": f"Basic {self._encode_credentials()}",
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Cache-Control": "no-store",
-            }
-            data = {"grant_type": GRANT_TYPE, "scope": TOKEN_SCOPE}
-
-            try:
-                response = self._http_client.post(
-                    url, headers=headers, data=data, timeout=DEFAULT_TIMEOUT
-                )
-                response.raise_for_status()
-
-                token_data = response.json()
-
-                # Validate the token response has required fields
-                if "access_token" not in token_data:
-                    raise MVolaAuthError(
-                        message="Invalid token response: missing access_token"
-                    )
-
-                # Calculate token expiry time
-                self._token = token_data
-                self._token_expiry = current_time + token_data.get("expires_in", 3600)
-
-                return token_data
-
-            except MVolaAuthError:
-                raise
-            except Exception as e:
-                error_message = "Failed to generate token"
-
-                # Try to extract error details if available
-                if hasattr(e, "response") and e.response is not None:
-                    try:
-                        error_data = e.response.json()
-                        if "error" in error_data:
-                            error_message = (
-                                f"{error_message}: "
-                                f"{error_data.get('error_description', error_data['error'])}"
-                            )
-                    except (ValueError, KeyError):
-                        pass
+        # Another thread may be refreshing the token: wait for it within the deadline
+        if not self._token_lock.acquire(timeout=deadline.remaining() if deadline else -1):
+            raise DeadlineExceededError(
+                message=f"Deadline of {deadline.timeout:g}s exceeded waiting for a token refresh"
+            )
+        try:
+            return self._fetch_token(force_refresh, deadline)
+        finally:
+            self._token_lock.release()
+
+    def _fetch_token(self, force_refresh: bool, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """POST to the token endpoint (called with the token lock held)."""
+        # Check if token is still valid (with 60 seconds buffer)
+        current_time = time.time()
+        if not force_refresh and self._token and current_time < self._token_expiry - 60:
+            return self._token
+
+        # Clear any expired token
+        self._clear_expired_token()
+
+        # Set up the request
+        url = urljoin(self._base_url, TOKEN_ENDPOINT)
+        headers = {
+            "Authorization": f"Basic {self._encode_credentials()}",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Cache-Control": "no-store",
+        }
+        data = {"grant_type": GRANT_TYPE, "scope": TOKEN_SCOPE}
+
+        try:
+            response = self._http_client.post(
+                url, headers=headers, data=data, deadline=deadline
+            )
+            response.raise_for_status()
 
+            token_data = response.json()
+
+            # Validate the token response has required fields
+            if "access_token" not in token_data:
                 raise MVolaAuthError(
-                    message=error_message,
-                    code=(
-                        e.response.status_code
-                        if hasattr(e, "response") and e.response
-                        else None
-                    ),
-                    response=e.response if hasattr(e, "response") else None,
-                ) from e
+                    message="Invalid token response: missing access_token"
+                )
 
-    def get_access_token(self, force_refresh: bool = False) -> str:
+            # Calculate token expiry time
+            self._token = token_data
+            self._token_expiry = current_time + token_data.get("expires_in", 3600)
+
+            return token_data
+
+        except (
+            MVolaAuthError,
+            CircuitOpenError,
+            BulkheadFullError,
+            LoadShedError,
+            DeadlineExceededError,
+        ):
+            raise
+        except Exception as e:
+            error_message = "Failed to generate token"
+
+            # Extract error details from a compact snapshot of the response
+            snapshot, response = detach_response(e, self._keep_error_responses)
+            if snapshot is not None:
+                detail = snapshot.error_description or snapshot.error_code
+                if detail:
+                    error_message = f"{error_message}: {detail}"
+
+            raise MVolaAuthError(
+                message=error_message,
+                code=snapshot.status_code if snapshot is not None else None,
+                response=response,
+                snapshot=snapshot,
+            ) from e
+
+    @traced("MVolaAuth.get_access_token")
+    def get_access_token(
+        self, force_refresh: bool = False, deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Get current access token or generate a new one.
 
         Args:
             force_refresh: Force token refresh
+            deadline: Deadline bounding the rate limiter wait and token request
 
         Returns:
             Access token string
@@ -237,5 +353,5 @@ class MVolaAuth:
         Raises:
             MVolaAuthError: If token generation fails
         """
-        token_data = self.generate_token(force_refresh)
+        token_data = self.generate_token(force_refresh, deadline)
         return token_data["access_token"]
@@ -0,0 +1,201 @@
+"""
+Bulkheads isolating payment traffic from auth and query traffic.
+
+By default every MVolaTransaction call shares one HTTP client and its
+connection pool, so a flood of slow status/details lookups (reporting,
+reconciliation) can hold every pooled connection while checkout
+payments queue behind them.
+
+A Bulkheads group gives each operation class its own compartment:
+- auth: token requests
+- payment: merchant payments (POST)
+- query: transaction status and details lookups (GET)
+
+Each compartment gets a dedicated SecureHTTPClient whose connection pool
+is sized to the compartment, plus a concurrency limit. A call waits at
+most `max_wait` seconds (or what is left of its deadline) for a free
+slot and is then rejected with BulkheadFullError (an
+MVolaConnectionError): a saturated query compartment never delays a
+payment.
+
+Usage:
+    bulkheads = Bulkheads(auth=2, payment=8, query=4, max_wait=0.5)
+    client = MVolaClient(..., bulkheads=bulkheads)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from . import forking
+from .deadline import Deadline, DeadlineExceededError
+from .exceptions import MVolaConnectionError
+
+AUTH = "auth"
+PAYMENT = "payment"
+QUERY = "query"
+
+
+class BulkheadFullError(MVolaConnectionError):
+    """Raised when a call finds no free slot in its bulkhead."""
+
+    def __init__(self, message, bulkhead: Optional[str] = None):
+        super().__init__(message=message)
+        self.bulkhead = bulkhead
+
+
+class Bulkhead:
+    """
+    Concurrency limit for one class of operations.
+
+    Args:
+        name: Name of the compartment (auth, payment, query)
+        max_concurrent: Calls allowed in flight at once; also the size
+            of the compartment's connection pool
+        max_wait: Seconds a call may wait for a free slot (0: reject at once)
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_wait: float = 0.5):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+        self._name = name
+        self._max_concurrent = max_concurrent
+        self._max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._active = 0
+
+        # Cumulative statistics (for metrics)
+        self._rejections = 0
+        self._total_wait = 0.0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # Slots held by parent threads would never be released in the child
+        self._slots = threading.BoundedSemaphore(self._max_concurrent)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._rejections = 0
+        self._total_wait = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+
+    @property
+    def active(self) -> int:
+        """Calls currently holding a slot."""
+        return self._active
+
+    @property
+    def rejections(self) -> int:
+        """Calls rejected because no slot became free in time."""
+        return self._rejections
+
+    @property
+    def total_wait_time(self) -> float:
+        """Cumulative seconds calls spent waiting for a slot."""
+        return self._total_wait
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Take a slot, waiting at most max_wait (bounded by the deadline).
+
+        Raises:
+            BulkheadFullError: If no slot became free within max_wait
+            DeadlineExceededError: If the deadline ran out while waiting
+        """
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self._active += 1
+            return
+
+        wait = self._max_wait
+        bounded_by_deadline = deadline is not None and deadline.remaining() < wait
+        if bounded_by_deadline:
+            wait = deadline.remaining()
+        start = time.monotonic()
+        acquired = wait > 0 and self._slots.acquire(timeout=wait)
+        with self._lock:
+            self._total_wait += time.monotonic() - start
+            if acquired:
+                self._active += 1
+                return
+            self._rejections += 1
+        if bounded_by_deadline:
+            raise DeadlineExceededError(
+                message=f"Deadline exceeded waiting for the {self._name} bulkhead"
+            )
+        raise BulkheadFullError(
+            message=(
+                f"Bulkhead '{self._name}' is full "
+                f"({self._max_concurrent} concurrent calls)"
+            ),
+            bulkhead=self._name,
+        )
+
+    def release(self) -> None:
+        """Give back a slot taken with acquire()."""
+        with self._lock:
+            self._active -= 1
+        self._slots.release()
+
+    @contextmanager
+    def slot(self, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """Hold a slot for the duration of a with block."""
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def __repr__(self) -> str:
+        return (
+            f"Bulkhead(name='{self._name}', max_concurrent={self._max_concurrent}, "
+            f"active={self._active})"
+        )
+
+
+class Bulkheads:
+    """
+    Auth, payment and query compartments, sized independently.
+
+    Args:
+        auth: Concurrent token requests
+        payment: Concurrent merchant payments
+        query: Concurrent status and details lookups
+        max_wait: Seconds a call may wait for a slot in any compartment
+    """
+
+    def __init__(self, auth: int = 2, payment: int = 8, query: int = 4, max_wait: float = 0.5):
+        self._bulkheads: Dict[str, Bulkhead] = {
+            AUTH: Bulkhead(AUTH, auth, max_wait),
+            PAYMENT: Bulkhead(PAYMENT, payment, max_wait),
+            QUERY: Bulkhead(QUERY, query, max_wait),
+        }
+
+    def get(self, name: str) -> Bulkhead:
+        """
+        Return the compartment for an operation class.
+
+        Raises:
+            KeyError: If name is not auth, payment or query
+        """
+        return self._bulkheads[name]
+
+    def __iter__(self) -> Iterator[Tuple[str, Bulkhead]]:
+        return iter(list(self._bulkheads.items()))
+
+    def __repr__(self) -> str:
+        sizes = ", ".join(f"{name}={b.max_concurrent}" for name, b in self._bulkheads.items())
+        return f"Bulkheads({sizes})"
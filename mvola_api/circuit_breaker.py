@@ -0,0 +1,350 @@
+"""
+Circuit breakers for MVola API endpoints.
+
+When api.mvola.mg is degraded, every call would otherwise wait for the
+full timeout before failing. A circuit breaker watches the outcome of
+recent calls and, once too many fail or are slow, rejects new calls
+immediately with CircuitOpenError (an MVolaConnectionError):
+
+    closed --(failure or slow-call rate over threshold)--> open
+    open --(open_duration elapsed)--> half_open
+    half_open --(half_open_max_calls probes succeed)--> closed
+    half_open --(a probe fails or is slow)--> open
+
+SecureHTTPClient keeps one breaker per endpoint family (token,
+merchantpay, status, details) when given a CircuitBreakers group.
+
+The breaker state (closed/open/half-open, probes in flight) lives in a
+mapping that can be shared between processes, e.g. with
+multiprocessing.Manager().dict() and Manager().Lock(): once one worker
+trips a breaker, all of them fail fast and share the probe quota.
+Outcome windows stay per process.
+
+Usage:
+    breakers = CircuitBreakers(failure_rate_threshold=0.5, open_duration=30.0)
+    client = MVolaClient(..., circuit_breakers=breakers)
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, MutableMapping, Optional, Tuple
+
+from . import forking
+from .exceptions import MVolaConnectionError
+from .logs import log_event
+
+logger = logging.getLogger("mvola_api")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric encoding of states for metrics
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_CLOSED_ENTRY = (CLOSED, 0.0, 0, 0)
+
+
+class CircuitOpenError(MVolaConnectionError):
+    """Raised when a call is rejected because its circuit breaker is open."""
+
+    def __init__(self, message, endpoint: Optional[str] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message=message)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker driven by error rate and latency.
+
+    Args:
+        name: Name of the breaker (endpoint family)
+        failure_rate_threshold: Fraction of failed calls in the window
+            that opens the breaker
+        slow_call_duration: Calls taking longer (seconds) count as slow
+            (None: latency is ignored)
+        slow_call_rate_threshold: Fraction of slow calls that opens the breaker
+        minimum_calls: Calls needed in the window before rates are evaluated
+        window: Sliding window length in seconds
+        open_duration: Seconds the breaker stays open before probing
+        half_open_max_calls: Probe calls allowed while half-open; that many
+            successes close the breaker
+        state: Mapping holding the breaker state (default: a private dict;
+            pass a multiprocessing.Manager().dict() to share it)
+        lock: Lock guarding the state (pass a Manager().Lock() with a
+            shared state)
+    """
+
+    # Responses counted as failures (the server is struggling, not the caller)
+    FAILURE_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+    def __init__(
+        self,
+        name: str = "api",
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        minimum_calls: int = 10,
+        window: float = 30.0,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 1,
+        state: Optional[MutableMapping[str, Tuple]] = None,
+        lock: Any = None,
+    ):
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError("failure_rate_threshold must be in (0, 1]")
+        if not 0 < slow_call_rate_threshold <= 1:
+            raise ValueError("slow_call_rate_threshold must be in (0, 1]")
+        if minimum_calls <= 0 or half_open_max_calls <= 0:
+            raise ValueError("minimum_calls and half_open_max_calls must be positive")
+        if window <= 0 or open_duration <= 0:
+            raise ValueError("window and open_duration must be positive")
+
+        self._name = name
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_duration = slow_call_duration
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._minimum_calls = minimum_calls
+        self._window = window
+        self._open_duration = open_duration
+        self._half_open_max_calls = half_open_max_calls
+        self._state = state if state is not None else {}
+        self._shared_lock = lock is not None
+        self._lock = lock or threading.Lock()
+
+        # Per-process sliding window of (time, failed, slow) outcomes
+        self._outcomes: deque = deque()
+        self._failures = 0
+        self._slow = 0
+        self._window_lock = threading.Lock()
+
+        # Cumulative statistics (for metrics)
+        self._rejections = 0
+        self._opened = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # A lock passed in is left alone: either a Manager().Lock() proxy,
+        # valid in every process, or the lock of a CircuitBreakers group,
+        # which replaces it itself
+        if not self._shared_lock:
+            self._lock = threading.Lock()
+        self._window_lock = threading.Lock()
+
+    # State entries are (state, since, probes in flight, probe successes);
+    # "since" is wall-clock time so that it is meaningful across processes.
+    def _entry(self) -> Tuple[str, float, int, int]:
+        return self._state.get(self._name, _CLOSED_ENTRY)
+
+    def _set_entry(self, entry: Tuple[str, float, int, int]) -> None:
+        self._state[self._name] = entry
+
+    @property
+    def name(self) -> str:
+        """Name of this breaker."""
+        return self._name
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        state, since, _, _ = self._entry()
+        if state == OPEN and time.time() - since >= self._open_duration:
+            return HALF_OPEN
+        return state
+
+    @property
+    def rejections(self) -> int:
+        """Calls rejected by this breaker in this process."""
+        return self._rejections
+
+    @property
+    def opened(self) -> int:
+        """Times this process opened the breaker."""
+        return self._opened
+
+    def acquire(self) -> bool:
+        """
+        Ask permission for a call.
+
+        Returns:
+            True if the call is a half-open probe, False for a normal call;
+            pass it back to record()
+
+        Raises:
+            CircuitOpenError: If the breaker is open or the probe quota is used
+        """
+        state, since, _, _ = self._entry()
+        if state == CLOSED:
+            return False
+
+        with self._lock:
+            state, since, in_flight, successes = self._entry()
+            now = time.time()
+            if state == CLOSED:
+                return False
+            elapsed = now - since
+            if state == OPEN and elapsed >= self._open_duration:
+                state, since, in_flight, successes = HALF_OPEN, now, 0, 0
+                elapsed = 0.0
+            elif state == HALF_OPEN and elapsed >= self._open_duration:
+                # Probes lost (e.g. their worker died): start a new round
+                since, in_flight, successes, elapsed = now, 0, 0, 0.0
+            if state == HALF_OPEN and in_flight < self._half_open_max_calls:
+                self._set_entry((HALF_OPEN, since, in_flight + 1, successes))
+                return True
+
+        self._rejections += 1
+        retry_after = max(0.0, self._open_duration - elapsed)
+        raise CircuitOpenError(
+            message=(
+                f"Circuit breaker '{self._name}' is {state}: MVola API calls are "
+                f"failing, retry in {retry_after:.1f}s"
+            ),
+            endpoint=self._name,
+            retry_after=retry_after,
+        )
+
+    def record(self, failed: bool, duration: float, probe: bool = False) -> None:
+        """
+        Record the outcome of a call allowed by acquire().
+
+        Args:
+            failed: Whether the call failed
+            duration: Call duration in seconds
+            probe: Value returned by acquire()
+        """
+        slow = self._slow_call_duration is not None and duration > self._slow_call_duration
+        if probe:
+            self._record_probe(failed or slow)
+            return
+
+        now = time.monotonic()
+        with self._window_lock:
+            outcomes = self._outcomes
+            outcomes.append((now, failed, slow))
+            self._failures += failed
+            self._slow += slow
+            cutoff = now - self._window
+            while outcomes[0][0] < cutoff:
+                _, old_failed, old_slow = outcomes.popleft()
+                self._failures -= old_failed
+                self._slow -= old_slow
+            calls = len(outcomes)
+            if calls < self._minimum_calls or not (failed or slow):
+                return
+            trip = (
+                self._failures >= self._failure_rate_threshold * calls
+                or self._slow >= self._slow_call_rate_threshold * calls
+            )
+            if not trip:
+                return
+            failures, slow_calls = self._failures, self._slow
+            self._reset_window()
+
+        with self._lock:
+            if self._entry()[0] != CLOSED:
+                return
+            self._set_entry((OPEN, time.time(), 0, 0))
+        self._opened += 1
+        log_event(
+            logger, logging.WARNING, "circuit.opened",
+            endpoint=self._name, calls=calls, failures=failures, slow=slow_calls,
+        )
+
+    def _record_probe(self, failed: bool) -> None:
+        with self._lock:
+            state, since, in_flight, successes = self._entry()
+            if state != HALF_OPEN:
+                return
+            if failed:
+                self._set_entry((OPEN, time.time(), 0, 0))
+            elif successes + 1 >= self._half_open_max_calls:
+                self._set_entry(_CLOSED_ENTRY)
+            else:
+                self._set_entry((HALF_OPEN, since, max(0, in_flight - 1), successes + 1))
+                return
+        if failed:
+            self._opened += 1
+            log_event(logger, logging.WARNING, "circuit.reopened", endpoint=self._name)
+        else:
+            with self._window_lock:
+                self._reset_window()
+            log_event(logger, logging.INFO, "circuit.closed", endpoint=self._name)
+
+    def _reset_window(self) -> None:
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def reset(self) -> None:
+        """Force the breaker closed and forget recorded outcomes."""
+        with self._lock:
+            self._set_entry(_CLOSED_ENTRY)
+        with self._window_lock:
+            self._reset_window()
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(name='{self._name}', state='{self.state}')"
+
+
+class CircuitBreakers:
+    """
+    Circuit breakers keyed by endpoint family, created on first use.
+
+    Args:
+        state: Mapping shared by all breakers of the group (see CircuitBreaker)
+        lock: Lock guarding the state
+        settings: CircuitBreaker arguments applied to every breaker
+    """
+
+    def __init__(self, state: Optional[MutableMapping[str, Tuple]] = None,
+                 lock: Any = None, **settings: Any):
+        self._state = state if state is not None else {}
+        self._shared_lock = lock is not None
+        self._lock = lock or threading.Lock()
+        self._settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        # Fail early on invalid settings
+        CircuitBreaker(**settings)
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # Breakers of the group use its lock (see CircuitBreaker._after_fork_in_child)
+        self._breakers_lock = threading.Lock()
+        if not self._shared_lock:
+            self._lock = threading.Lock()
+            for breaker in self._breakers.values():
+                breaker._lock = self._lock
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Breaker for an endpoint family (e.g. "merchantpay")."""
+        try:
+            return self._breakers[endpoint]
+        except KeyError:
+            pass
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    endpoint, state=self._state, lock=self._lock, **self._settings
+                )
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Current state of each breaker."""
+        return {name: breaker.state for name, breaker in self}
+
+    def reset(self) -> None:
+        """Force all breakers closed."""
+        for _, breaker in self:
+            breaker.reset()
+
+    def __iter__(self) -> Iterator[Tuple[str, CircuitBreaker]]:
+        with self._breakers_lock:
+            return iter(list(self._breakers.items()))
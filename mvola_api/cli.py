@@ -0,0 +1,180 @@
+"""
+The `mvola` command line.
+
+Commands:
+    mvola payout FILE   Submit a CSV/JSONL payout file (see payouts.py)
+
+Credentials are read from the environment or .env as with MVolaClient
+(MVOLA_CONSUMER_KEY, MVOLA_CONSUMER_SECRET, MVOLA_PARTNER_NAME,
+MVOLA_PARTNER_MSISDN, MVOLA_SANDBOX).
+
+Examples:
+    mvola payout payouts.csv --rate 2 --burst 30 --concurrency 4
+    # spread the CPU work over 4 processes sharing the rate limit
+    mvola payout payouts.csv --processes 4
+    # after a crash or Ctrl-C, the same command resumes from the journal
+    mvola payout payouts.csv
+    # rehearse against an in-process emulator
+    mvola payout payouts.csv --emulator --journal /tmp/rehearsal.journal
+
+Exit status: 0 when every payout was submitted (or already was), 1 when
+some were invalid, rejected, not sent or of unknown outcome, 130 when
+interrupted.
+"""
+
+import argparse
+import functools
+import signal
+import sys
+import threading
+from typing import Any, List, Optional
+
+from .constants import RATE_LIMIT_MAX_REQUESTS, RATE_LIMIT_REFILL_RATE
+
+EXIT_INTERRUPTED = 130
+
+
+def _payout_client(sandbox: Optional[bool], emulator_url: Optional[str], rate_limiter: Any):
+    """Client of a payout run, also built in each worker process."""
+    from .circuit_breaker import CircuitBreakers
+    from .client import MVolaClient
+
+    client = MVolaClient(
+        sandbox=sandbox,
+        rate_limiter=rate_limiter,
+        # Stop the run instead of piling failures onto a failing gateway
+        circuit_breakers=CircuitBreakers(),
+    )
+    if emulator_url:
+        from .emulator import attach_emulator
+
+        attach_emulator(client, emulator_url)
+    return client
+
+
+def _payout(args: argparse.Namespace) -> int:
+    from .payouts import (
+        INVALID,
+        NOT_SENT,
+        REJECTED,
+        UNKNOWN,
+        BulkPayout,
+        PayoutJournal,
+        read_payouts,
+    )
+    from .rate_limiter import TokenBucketRateLimiter
+
+    emulator = None
+    if args.emulator:
+        from .emulator import MVolaEmulator
+
+        emulator = MVolaEmulator(completion_delay=0).start()
+
+    sandbox = None if args.production is None else not args.production
+    client_factory = functools.partial(
+        _payout_client, True if emulator else sandbox, emulator.base_url if emulator else None
+    )
+    client = client_factory(
+        rate_limiter=TokenBucketRateLimiter(
+            max_tokens=args.burst, refill_rate=args.rate, name="payout"
+        )
+    )
+
+    journal = PayoutJournal(args.journal or f"{args.file}.journal", fsync=not args.no_fsync)
+    payout = BulkPayout(
+        client,
+        journal,
+        results_path=args.results or f"{args.file}.results.jsonl",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        debit_msisdn=args.debit_msisdn,
+        description=args.description,
+        retry_unknown=args.retry_unknown,
+        processes=args.processes,
+        client_factory=client_factory,
+        shard_by=args.shard_by,
+    )
+    # Signal handlers can only be installed from the main thread
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    if in_main_thread:
+        previous = signal.signal(signal.SIGTERM, lambda *_: payout.stop("terminated"))
+    try:
+        summary = payout.run(read_payouts(args.file, args.format))
+    finally:
+        if in_main_thread:
+            signal.signal(signal.SIGTERM, previous)
+        journal.close()
+        client.close()
+        if emulator:
+            emulator.stop()
+
+    for state, count in sorted(summary.items()):
+        print(f"{state:<20}{count:>10}")
+    if payout.stop_reason:
+        print(f"Stopped early: {payout.stop_reason}; run the same command to resume",
+              file=sys.stderr)
+    if payout.stop_reason == "interrupted":
+        return EXIT_INTERRUPTED
+    if any(summary.get(state) for state in (INVALID, NOT_SENT, REJECTED, UNKNOWN)):
+        return 1
+    return 1 if payout.stop_reason else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mvola", description="MVola API command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    payout = commands.add_parser(
+        "payout",
+        help="Submit a bulk payout file",
+        description="Submit a CSV/JSONL payout file; resumable through its journal.",
+    )
+    payout.add_argument("file", help="Payout file (fields: id, amount, credit_msisdn, "
+                                     "and optionally debit_msisdn, description)")
+    payout.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                        help="Input format (default: from the file extension)")
+    payout.add_argument("--journal", default=None,
+                        help="Journal file (default: FILE.journal)")
+    payout.add_argument("--results", default=None,
+                        help="Results file, appended to (default: FILE.results.jsonl)")
+    payout.add_argument("--rate", type=float, default=RATE_LIMIT_REFILL_RATE,
+                        help="Payments per second (default: %(default)s)")
+    payout.add_argument("--burst", type=int, default=RATE_LIMIT_MAX_REQUESTS,
+                        help="Rate limiter burst size (default: %(default)s)")
+    payout.add_argument("--concurrency", type=int, default=4,
+                        help="Payments in flight (default: %(default)s)")
+    payout.add_argument("--processes", type=int, default=1,
+                        help="Worker processes sharing the rate limit, each with "
+                             "--concurrency payments in flight (default: %(default)s)")
+    payout.add_argument("--shard-by", choices=("debit_msisdn", "id"), default="debit_msisdn",
+                        help="Spread rows over the processes by payer, sending each "
+                             "payer's payouts in file order, or by id (default: %(default)s)")
+    payout.add_argument("--batch-size", type=int, default=500,
+                        help="Rows read and validated together (default: %(default)s)")
+    payout.add_argument("--debit-msisdn", default=None,
+                        help="Paying MSISDN of rows without one (default: partner MSISDN)")
+    payout.add_argument("--description", default="Payout",
+                        help="Description of rows without one (default: %(default)s)")
+    payout.add_argument("--retry-unknown", action="store_true",
+                        help="Resubmit payouts of unknown outcome (check them first!)")
+    payout.add_argument("--no-fsync", action="store_true",
+                        help="Do not fsync each journal entry (faster, less durable)")
+    environment = payout.add_mutually_exclusive_group()
+    environment.add_argument("--production", dest="production", action="store_true",
+                             default=None, help="Use the production API")
+    environment.add_argument("--sandbox", dest="production", action="store_false",
+                             help="Use the sandbox API")
+    environment.add_argument("--emulator", action="store_true",
+                             help="Rehearse against an in-process emulator")
+    payout.set_defaults(handler=_payout)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: mvola (or python -m mvola_api)."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,12 @@ All credentials are stored privately and never exposed publicly.
 
 import logging
 import os
-from typing import Any, Dict, Optional, Union
-
-from dotenv import load_dotenv
+from typing import Any, Dict, Optional, Tuple, Union
 
 from .auth import MVolaAuth
+from .bulkhead import Bulkheads
+from .circuit_breaker import CircuitBreakers
+from .concurrency import AdaptiveConcurrencyLimiter
 from .constants import (
     ALLOWED_BASE_URLS,
     DEFAULT_CURRENCY,
@@ -19,15 +20,50 @@ from .constants import (
     SANDBOX_URL,
     TEST_MSISDN_2,
 )
+from .deadline import Deadline
 from .exceptions import MVolaError, MVolaValidationError
+from .hedging import RequestHedger
+from .http_client import SecureHTTPClient
+from .logs import Lazy, log_event
+from .rate_limiter import TokenBucketRateLimiter
+from .results import PaymentInitiated, TransactionDetails, TransactionStatus
+from .retry import RetryPolicy
+from .tracing import traced
 from .transaction import MVolaTransaction
 from .utils import mask_msisdn
 
 # Configure logging
 logger = logging.getLogger("mvola_api")
 
-# Note: load_dotenv() is called in the constructor, not at module level,
+# Note: .env is loaded by the first constructor call, not at module level,
 # to avoid unintended side effects when importing the module.
+_dotenv_loaded = False
+
+
+def _load_dotenv_once() -> None:
+    """
+    Load .env into os.environ, once per process.
+
+    Locating .env walks up the directory tree; doing it on every client
+    construction was the dominant cost of building a client. A .env
+    created after the first construction is therefore not picked up.
+    """
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    from dotenv import load_dotenv
+
+    # override=False ensures existing env vars are not overwritten
+    load_dotenv(override=False)
+    _dotenv_loaded = True
+
+
+def _logged_status(result: TransactionStatus) -> Any:
+    # Run by log handlers, maybe on the listener thread: must not raise
+    try:
+        return result.status
+    except MVolaError:
+        return "<undecodable>"
 
 
 class MVolaClient:
@@ -47,6 +83,10 @@ class MVolaClient:
             consumer_secret="...",
             partner_name="My App",
         )
+
+        # Releasing connections and credentials when done
+        with MVolaClient.from_env() as client:
+            client.initiate_payment(...)
     """
 
     def __init__(
@@ -57,6 +97,17 @@ class MVolaClient:
         partner_msisdn: Optional[str] = None,
         sandbox: Optional[bool] = None,
         logger: Optional[logging.Logger] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        collect_timings: bool = False,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        hedging: Optional[RequestHedger] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        bulkheads: Optional[Bulkheads] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        session_pool: Optional[int] = None,
+        keep_token_after_fork: bool = True,
+        http_client: Optional[SecureHTTPClient] = None,
+        keep_error_responses: bool = False,
     ) -> None:
         """
         Initialize the MVola client.
@@ -73,13 +124,53 @@ class MVolaClient:
             sandbox: Use sandbox environment.
                 If None, loads from env var MVOLA_SANDBOX
             logger: Custom logger instance
+            rate_limiter: Rate limiter shared by all transaction calls
+                (default: 30 burst, 2 requests/s)
+            collect_timings: Attach per-phase timings (rate limiter wait,
+                token fetch, DNS, connect, TLS, TTFB, download) to transaction
+                results under "timings"
+            circuit_breakers: Circuit breakers per endpoint family, shared
+                by the auth and transaction modules. Calls to an endpoint
+                failing or slow past the thresholds then fail fast with
+                CircuitOpenError (default: none)
+            hedging: Hedger sending a second status/details GET when the
+                first is slower than a latency percentile (default: none)
+            retry_policy: Backoff and retry budget for status/details GETs
+                (default: full-jitter backoff, 3 retries, budget of 20%
+                of requests)
+            bulkheads: Separate connection pools and concurrency limits
+                for auth, payment and query calls, so status/details
+                floods cannot starve payments; calls finding their
+                compartment full fail with BulkheadFullError (default: none)
+            concurrency_limiter: Adaptive limit on calls in flight to the
+                gateway, shared by auth and transaction calls and driven by
+                the observed RTT; calls that cannot be admitted before
+                their deadline fail fast with LoadShedError (default: none)
+            session_pool: Spread transaction calls over this many pooled
+                sessions instead of one shared session; for callers with
+                many threads (default: one shared session)
+            keep_token_after_fork: When the client is created before the
+                process forks (gunicorn --preload, uWSGI), let the worker
+                processes reuse a still valid token instead of each
+                requesting one. Connections, locks and limiter state are
+                always reset in the workers (see forking.py)
+            http_client: One HTTP client for the auth and transaction
+                modules, e.g. shared by many tenants (see
+                MVolaClientManager); circuit_breakers, hedging,
+                retry_policy, bulkheads, concurrency_limiter and
+                session_pool must then be set on it instead. The client
+                does not close it (default: clients of its own)
+            keep_error_responses: Keep the raw requests.Response on
+                raised errors (e.response). By default errors carry only
+                a compact snapshot (e.snapshot: status, selected headers,
+                error code and description), so errors kept in logs or
+                retry queues do not pin response bodies and connections
 
         Raises:
             MVolaValidationError: If required credentials are missing
         """
         # Load environment variables from .env (only in constructor, not at import time)
-        # override=False ensures existing env vars are not overwritten
-        load_dotenv(override=False)
+        _load_dotenv_once()
 
         # Load credentials — store as PRIVATE attributes
         self._consumer_key = consumer_key or os.environ.get("MVOLA_CONSUMER_KEY")
@@ -114,11 +205,34 @@ class MVolaClient:
             self._partner_msisdn = TEST_MSISDN_2  # Sandbox default: 0343500004
 
         # Initialize auth module
-        self._auth = MVolaAuth(self._consumer_key, self._consumer_secret, self._base_url)
+        self._auth = MVolaAuth(
+            self._consumer_key,
+            self._consumer_secret,
+            self._base_url,
+            circuit_breakers=circuit_breakers,
+            bulkheads=bulkheads,
+            concurrency_limiter=concurrency_limiter,
+            keep_token_after_fork=keep_token_after_fork,
+            http_client=http_client,
+            keep_error_responses=keep_error_responses,
+        )
 
         # Initialize transaction module
         self._transaction = MVolaTransaction(
-            self._auth, self._base_url, self._partner_name, self._partner_msisdn
+            self._auth,
+            self._base_url,
+            self._partner_name,
+            self._partner_msisdn,
+            rate_limiter=rate_limiter,
+            collect_timings=collect_timings,
+            circuit_breakers=circuit_breakers,
+            hedging=hedging,
+            retry_policy=retry_policy,
+            bulkheads=bulkheads,
+            concurrency_limiter=concurrency_limiter,
+            session_pool=session_pool,
+            http_client=http_client,
+            keep_error_responses=keep_error_responses,
         )
 
     def __repr__(self) -> str:
@@ -133,13 +247,24 @@ class MVolaClient:
         """Secure str representation."""
         return f"MVolaClient(sandbox={self._sandbox})"
 
-    def __del__(self) -> None:
-        """Securely clear credentials from memory on deletion."""
-        try:
-            self._consumer_key = None
-            self._consumer_secret = None
-        except Exception:
-            pass
+    def close(self) -> None:
+        """
+        Clear the credentials and token from memory and release the HTTP
+        clients. The client cannot be used afterwards.
+
+        Clients that are not closed release their connections once they
+        become unreachable, without relying on __del__ (see http_client.py).
+        """
+        self._consumer_key = None
+        self._consumer_secret = None
+        self._auth.close()
+        self._transaction.close()
+
+    def __enter__(self) -> "MVolaClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     # --- Read-only properties (only non-sensitive data) ---
 
@@ -163,6 +288,11 @@ class MVolaClient:
         """Base URL being used."""
         return self._base_url
 
+    @property
+    def rate_limiter(self) -> TokenBucketRateLimiter:
+        """Rate limiter of the transaction calls (given or default)."""
+        return self._transaction.rate_limiter
+
     @classmethod
     def from_env(cls):
         """
@@ -173,12 +303,16 @@ class MVolaClient:
         """
         return cls()
 
-    def generate_token(self, force_refresh: bool = False) -> Dict[str, Any]:
+    @traced("MVolaClient.generate_token")
+    def generate_token(
+        self, force_refresh: bool = False, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Generate an access token.
 
         Args:
             force_refresh: Force token refresh
+            deadline: Deadline for the whole call (see deadline.py)
 
         Returns:
             Token response data
@@ -187,22 +321,64 @@ class MVolaClient:
             MVolaAuthError: If token generation fails
         """
         try:
-            self._logger.info("Generating MVola API token")
-            token_data = self._auth.generate_token(force_refresh)
-            self._logger.info("Token generated successfully")
+            log_event(self._logger, logging.DEBUG, "token.requested", force_refresh=force_refresh)
+            token_data = self._auth.generate_token(force_refresh, deadline)
+            log_event(self._logger, logging.INFO, "token.generated")
             return token_data
         except MVolaError as e:
-            self._logger.error("Token generation failed: %s", str(e))
+            log_event(self._logger, logging.ERROR, "token.failed", error=e)
             raise
 
-    def get_access_token(self) -> str:
+    def get_access_token(self, deadline: Optional[Deadline] = None) -> str:
         """
         Get the current access token, generating a new one if needed.
 
+        Args:
+            deadline: Deadline for the whole call (see deadline.py)
+
         Returns:
             Access token
         """
-        return self._auth.get_access_token()
+        return self._auth.get_access_token(deadline=deadline)
+
+    def export_token(self) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Export the current token (see MVolaAuth.export_token).
+
+        Returns:
+            (token response, expiry timestamp), or None without a valid token
+        """
+        return self._auth.export_token()
+
+    def import_token(self, token: Dict[str, Any], expiry: float) -> None:
+        """
+        Use a token exported by a client with the same credentials.
+
+        Raises:
+            MVolaValidationError: If the token has no access_token
+        """
+        self._auth.import_token(token, expiry)
+
+    def validate_payment(
+        self,
+        amount: Union[str, int, float],
+        debit_msisdn: str,
+        credit_msisdn: str,
+        description: str,
+    ) -> None:
+        """
+        Check payment parameters as initiate_payment does, without sending.
+
+        Args:
+            amount: Payment amount (must be a positive integer)
+            debit_msisdn: MSISDN of the payer
+            credit_msisdn: MSISDN of the merchant
+            description: Payment description (max 50 chars)
+
+        Raises:
+            MVolaValidationError: If a parameter is invalid
+        """
+        self._transaction.validate_payment(str(amount), debit_msisdn, credit_msisdn, description)
 
     def initiate_merchant_payment(
         self,
@@ -222,7 +398,8 @@ class MVolaClient:
         geo_location_a: Optional[str] = None,
         cell_id_b: Optional[str] = None,
         geo_location_b: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        deadline: Optional[Deadline] = None,
+    ) -> PaymentInitiated:
         """
         Initiate a merchant payment (alias for initiate_payment).
 
@@ -243,9 +420,11 @@ class MVolaClient:
             geo_location_a: Geo Location A
             cell_id_b: Cell ID B
             geo_location_b: Geo Location B
+            deadline: Deadline for the whole call: rate limiter wait, token
+                fetch, connect and read all draw from it (see deadline.py)
 
         Returns:
-            Transaction response dict
+            PaymentInitiated result (see results.py)
         """
         return self.initiate_payment(
             amount=amount,
@@ -264,8 +443,10 @@ class MVolaClient:
             geo_location_a=geo_location_a,
             cell_id_b=cell_id_b,
             geo_location_b=geo_location_b,
+            deadline=deadline,
         )
 
+    @traced("MVolaClient.initiate_payment")
     def initiate_payment(
         self,
         amount: Union[str, int, float],
@@ -284,7 +465,8 @@ class MVolaClient:
         geo_location_a: Optional[str] = None,
         cell_id_b: Optional[str] = None,
         geo_location_b: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        deadline: Optional[Deadline] = None,
+    ) -> PaymentInitiated:
         """
         Initiate a merchant payment.
 
@@ -305,19 +487,24 @@ class MVolaClient:
             geo_location_a: Geo Location A
             cell_id_b: Cell ID B
             geo_location_b: Geo Location B
+            deadline: Deadline for the whole call: rate limiter wait, token
+                fetch, connect and read all draw from it (see deadline.py)
 
         Returns:
-            Transaction response dict
+            PaymentInitiated result (see results.py), also readable as the
+            former dict: result["response"]["serverCorrelationId"]
 
         Raises:
             MVolaTransactionError: If transaction fails
             MVolaValidationError: If parameters are invalid
         """
         try:
-            self._logger.info(
-                "Initiating MVola payment from %s to %s",
-                mask_msisdn(debit_msisdn),
-                mask_msisdn(credit_msisdn),
+            log_event(
+                self._logger,
+                logging.DEBUG,
+                "payment.initiating",
+                debit=Lazy(mask_msisdn, debit_msisdn),
+                credit=Lazy(mask_msisdn, credit_msisdn),
             )
 
             # Convert amount to string if needed
@@ -343,23 +530,31 @@ class MVolaClient:
                 geo_location_a=geo_location_a,
                 cell_id_b=cell_id_b,
                 geo_location_b=geo_location_b,
+                deadline=deadline,
             )
 
-            self._logger.info(
-                "Payment initiated: %s", result.get("correlation_id", "")
+            log_event(
+                self._logger,
+                logging.INFO,
+                "payment.initiated",
+                correlation_id=result.get("correlation_id", ""),
+                debit=Lazy(mask_msisdn, debit_msisdn),
+                credit=Lazy(mask_msisdn, credit_msisdn),
             )
             return result
 
         except MVolaError as e:
-            self._logger.error("Payment initiation failed: %s", str(e))
+            log_event(self._logger, logging.ERROR, "payment.failed", error=e)
             raise
 
+    @traced("MVolaClient.get_transaction_status")
     def get_transaction_status(
         self,
         server_correlation_id: str,
         correlation_id: Optional[str] = None,
         user_language: str = "MG",
-    ) -> Dict[str, Any]:
+        deadline: Optional[Deadline] = None,
+    ) -> TransactionStatus:
         """
         Get transaction status.
 
@@ -367,37 +562,48 @@ class MVolaClient:
             server_correlation_id: Server correlation ID from payment initiation
             correlation_id: Custom correlation ID for request
             user_language: User language, default "MG"
+            deadline: Deadline for the whole call, retries included
 
         Returns:
-            Transaction status response
+            TransactionStatus result (see results.py)
 
         Raises:
             MVolaTransactionError: If status request fails
         """
         try:
-            self._logger.info(
-                "Getting status for transaction: %s", server_correlation_id
+            log_event(
+                self._logger,
+                logging.DEBUG,
+                "status.requesting",
+                server_correlation_id=server_correlation_id,
             )
             result = self._transaction.get_transaction_status(
                 server_correlation_id=server_correlation_id,
                 correlation_id=correlation_id,
                 user_language=user_language,
+                deadline=deadline,
             )
-            self._logger.info(
-                "Got transaction status: %s",
-                result.get("response", {}).get("status", "unknown"),
+            log_event(
+                self._logger,
+                logging.INFO,
+                "status.received",
+                server_correlation_id=server_correlation_id,
+                # Decodes the body only if the event is emitted
+                status=Lazy(_logged_status, result),
             )
             return result
         except MVolaError as e:
-            self._logger.error("Failed to get transaction status: %s", str(e))
+            log_event(self._logger, logging.ERROR, "status.failed", error=e)
             raise
 
+    @traced("MVolaClient.get_transaction_details")
     def get_transaction_details(
         self,
         transaction_id: str,
         correlation_id: Optional[str] = None,
         user_language: str = "MG",
-    ) -> Dict[str, Any]:
+        deadline: Optional[Deadline] = None,
+    ) -> TransactionDetails:
         """
         Get transaction details.
 
@@ -405,24 +611,28 @@ class MVolaClient:
             transaction_id: Transaction ID
             correlation_id: Custom correlation ID for request
             user_language: User language, default "MG"
+            deadline: Deadline for the whole call, retries included
 
         Returns:
-            Transaction details response
+            TransactionDetails result (see results.py)
 
         Raises:
             MVolaTransactionError: If details request fails
         """
         try:
-            self._logger.info(
-                "Getting details for transaction: %s", transaction_id
+            log_event(
+                self._logger, logging.DEBUG, "details.requesting", transaction_id=transaction_id
             )
             result = self._transaction.get_transaction_details(
                 transaction_id=transaction_id,
                 correlation_id=correlation_id,
                 user_language=user_language,
+                deadline=deadline,
+            )
+            log_event(
+                self._logger, logging.INFO, "details.received", transaction_id=transaction_id
             )
-            self._logger.info("Got transaction details")
             return result
         except MVolaError as e:
-            self._logger.error("Failed to get transaction details: %s", str(e))
+            log_event(self._logger, logging.ERROR, "details.failed", error=e)
             raise
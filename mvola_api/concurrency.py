@@ -0,0 +1,294 @@
+"""
+Adaptive concurrency limit with load shedding for outbound MVola calls.
+
+A fixed pool size or token bucket cannot react when the gateway slows
+down: requests keep being sent at the same rate, queues build up and
+every call ends up timing out together. AdaptiveConcurrencyLimiter
+instead discovers how many calls may be in flight from the round-trip
+times SecureHTTPClient observes (gradient algorithm, as in Vegas and
+Netflix's gradient2):
+
+- the no-load RTT is the smallest RTT seen over the last one or two
+  probe intervals, so it follows lasting latency changes
+- each attempt's RTT is compared with it: gradient = tolerance *
+  no-load / sample, clamped to [0.5, 1]; the limit moves towards
+  limit * gradient plus a small headroom (sqrt(limit)), so it grows
+  while latency is stable and shrinks as soon as requests start
+  queueing upstream
+- connection errors, timeouts and 429/5xx responses shrink the limit
+  multiplicatively
+
+Calls over the limit wait in a short queue. A call is shed right away
+with LoadShedError (an MVolaConnectionError) when its expected queueing
+time, estimated from the limit and the RTT, would exceed its deadline or
+max_wait. Throughput stays near what the gateway can absorb while the
+latency of admitted calls stays bounded.
+
+Usage:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, max_limit=100)
+    client = MVolaClient(..., concurrency_limiter=limiter)
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from . import forking
+from .deadline import Deadline, DeadlineExceededError
+from .exceptions import MVolaConnectionError
+from .logs import log_event
+
+logger = logging.getLogger("mvola_api")
+
+
+class LoadShedError(MVolaConnectionError):
+    """Raised when a call is shed because it could not be admitted in time."""
+
+    def __init__(self, message, limit: Optional[int] = None, queued: Optional[int] = None):
+        super().__init__(message=message)
+        self.limit = limit
+        self.queued = queued
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit adjusted from observed round-trip times.
+
+    Args:
+        initial_limit: Calls allowed in flight before any RTT is known
+        min_limit: Lowest limit
+        max_limit: Highest limit
+        smoothing: Weight of each new limit estimate (0-1]
+        tolerance: Ratio of sample to no-load RTT tolerated before the
+            limit shrinks (1.5: up to 50% slower is still "normal")
+        probe_interval: Seconds after which the no-load RTT is measured
+            afresh
+        backoff_ratio: Factor applied to the limit on a dropped attempt
+        max_wait: Longest time a call may queue for admission (seconds)
+        name: Name of the limiter (logs and metrics)
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    # Weight of each sample in the average RTT
+    RTT_SMOOTHING = 0.1
+
+    # Responses signalling an overloaded gateway (counted as drops)
+    OVERLOAD_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        probe_interval: float = 60.0,
+        backoff_ratio: float = 0.9,
+        max_wait: float = 1.0,
+        name: str = "gateway",
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < smoothing <= 1 or not 0 < backoff_ratio < 1:
+            raise ValueError("smoothing must be in (0, 1] and backoff_ratio in (0, 1)")
+        if tolerance < 1 or probe_interval <= 0 or max_wait < 0:
+            raise ValueError("tolerance must be >= 1, probe_interval > 0, max_wait >= 0")
+
+        self._name = name
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._smoothing = smoothing
+        self._tolerance = tolerance
+        self._probe_interval = probe_interval
+        self._backoff_ratio = backoff_ratio
+        self._max_wait = max_wait
+
+        self._rtt: Optional[float] = None
+        self._previous_min = math.inf
+        self._window_min = math.inf
+        self._window_start = time.monotonic()
+        self._in_flight = 0
+        self._queued = 0
+        self._condition = threading.Condition()
+
+        # Cumulative statistics (for metrics)
+        self._shed = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The learned limit and RTTs carry over; calls in flight or queued
+        # on parent threads do not exist in the child
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._shed = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def limit(self) -> int:
+        """Calls currently allowed in flight."""
+        return max(self._min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for admission."""
+        return self._queued
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """Average round-trip time (None before the first sample)."""
+        return self._rtt
+
+    @property
+    def rtt_noload(self) -> Optional[float]:
+        """Smallest recent round-trip time (None before the first sample)."""
+        noload = min(self._previous_min, self._window_min)
+        return noload if noload != math.inf else None
+
+    @property
+    def shed(self) -> int:
+        """Calls shed since creation."""
+        return self._shed
+
+    def _expected_wait(self) -> Optional[float]:
+        """Queueing time of a new call: queue length / (limit / RTT)."""
+        if self._rtt is None:
+            return None
+        return (self._queued + 1) * self._rtt / self.limit
+
+    def _reject(self, reason: str) -> LoadShedError:
+        self._shed += 1
+        log_event(
+            logger, logging.DEBUG, "concurrency.shed",
+            limiter=self._name, limit=self.limit, queued=self._queued, reason=reason,
+        )
+        return LoadShedError(
+            message=(
+                f"Request shed by the {self._name} concurrency limiter: {reason} "
+                f"(limit {self.limit}, {self._queued} queued)"
+            ),
+            limit=self.limit,
+            queued=self._queued,
+        )
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Admit a call, queueing it while the limit is reached.
+
+        Raises:
+            LoadShedError: If the expected or actual queueing time exceeds
+                max_wait or what is left of the deadline
+            DeadlineExceededError: If the deadline ran out while queued
+        """
+        with self._condition:
+            if self._in_flight < self.limit and self._queued == 0:
+                self._in_flight += 1
+                return
+
+            budget = self._max_wait
+            bounded_by_deadline = deadline is not None and deadline.remaining() < budget
+            if bounded_by_deadline:
+                budget = deadline.remaining()
+            expected = self._expected_wait()
+            if expected is not None:
+                # Fail now rather than after waiting when the call would
+                # still be queued, or still in flight at its deadline
+                if expected > self._max_wait:
+                    raise self._reject(f"expected wait {expected:.3f}s exceeds {self._max_wait:g}s")
+                if deadline is not None and expected + self._rtt > deadline.remaining():
+                    raise self._reject(
+                        f"expected wait {expected:.3f}s and RTT {self._rtt:.3f}s "
+                        f"exceed the {deadline.remaining():.3f}s left before the deadline"
+                    )
+
+            wait_until = time.monotonic() + budget
+            self._queued += 1
+            try:
+                while self._in_flight >= self.limit:
+                    remaining = wait_until - time.monotonic()
+                    if remaining <= 0:
+                        if bounded_by_deadline:
+                            self._shed += 1
+                            raise DeadlineExceededError(
+                                message=(
+                                    f"Deadline exceeded waiting for the {self._name} "
+                                    "concurrency limiter"
+                                )
+                            )
+                        raise self._reject(f"no slot within {budget:.3f}s")
+                    self._condition.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._queued -= 1
+
+    def release(self) -> None:
+        """Return the slot of an admitted call."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """Hold a slot for the duration of a with block."""
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def sample(self, rtt: float, dropped: bool = False) -> None:
+        """
+        Update the limit from one attempt.
+
+        Args:
+            rtt: Round-trip time of the attempt in seconds
+            dropped: The attempt failed in a way that signals overload
+                (connection error, timeout, 429 or 5xx)
+        """
+        with self._condition:
+            if dropped:
+                self._limit = max(self._min_limit, self._limit * self._backoff_ratio)
+                return
+            if rtt <= 0:
+                return
+
+            if self._rtt is None:
+                self._rtt = rtt
+            else:
+                self._rtt += (rtt - self._rtt) * self.RTT_SMOOTHING
+
+            now = time.monotonic()
+            if now - self._window_start >= self._probe_interval:
+                self._previous_min, self._window_min = self._window_min, math.inf
+                self._window_start = now
+            self._window_min = min(self._window_min, rtt)
+            noload = min(self._previous_min, self._window_min)
+
+            gradient = max(0.5, min(1.0, self._tolerance * noload / rtt))
+            # Only grow when the limit is actually being used
+            if gradient == 1.0 and self._in_flight * 2 < self._limit:
+                return
+
+            estimate = self._limit * gradient + math.sqrt(self._limit)
+            limit = self._limit * (1 - self._smoothing) + estimate * self._smoothing
+            self._limit = min(self._max_limit, max(self._min_limit, limit))
+            self._condition.notify_all()
+
+    def __repr__(self) -> str:
+        return (
+            f"AdaptiveConcurrencyLimiter(name='{self._name}', limit={self.limit}, "
+            f"in_flight={self._in_flight})"
+        )
@@ -23,7 +23,8 @@ DEFAULT_LANGUAGE = "FR"
 DEFAULT_CURRENCY = "Ar"
 
 # HTTP Settings
-DEFAULT_TIMEOUT = 30  # seconds
+DEFAULT_TIMEOUT = 30  # seconds (read timeout)
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds (TCP + TLS handshake)
 MAX_RESPONSE_SIZE = 1 * 1024 * 1024  # 1 MB — prevent OOM from oversized responses
 
 # Transaction limits
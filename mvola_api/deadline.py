@@ -0,0 +1,99 @@
+"""
+End-to-end deadlines for MVola API calls.
+
+A Deadline is a latency budget for one client call. Every step the call
+takes draws from the same budget:
+- waiting on the client-side rate limiter
+- obtaining the access token (token lock and token POST)
+- each HTTP attempt: connect and read timeouts are capped by what is left
+- backoff between retries: a retry that cannot fit is not attempted
+
+When the budget runs out, DeadlineExceededError (an MVolaConnectionError)
+is raised instead of waiting further.
+
+Usage:
+    client.get_transaction_status(server_correlation_id, deadline=Deadline(5.0))
+"""
+
+import time
+from typing import Optional, Tuple
+
+from .exceptions import MVolaConnectionError
+
+
+class DeadlineExceededError(MVolaConnectionError):
+    """Raised when a call's latency budget is exhausted."""
+    pass
+
+
+class Deadline:
+    """
+    Point in time by which a call must complete.
+
+    Args:
+        timeout: Budget in seconds, starting now
+
+    Raises:
+        ValueError: If timeout is negative
+    """
+
+    __slots__ = ("_timeout", "_expires_at")
+
+    def __init__(self, timeout: float):
+        if timeout < 0:
+            raise ValueError("timeout must not be negative")
+        self._timeout = timeout
+        self._expires_at = time.monotonic() + timeout
+
+    @property
+    def timeout(self) -> float:
+        """Initial budget in seconds."""
+        return self._timeout
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (0 once expired)."""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def check(self, step: str) -> float:
+        """
+        Ensure time is left before starting a step.
+
+        Args:
+            step: Description of the step, used in the error message
+
+        Returns:
+            Seconds remaining
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(
+                message=f"Deadline of {self._timeout:g}s exceeded before {step}"
+            )
+        return remaining
+
+    def cap(self, connect: float, read: float) -> Tuple[float, float]:
+        """
+        Cap connect and read timeouts to the remaining budget.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed
+        """
+        remaining = self.check("sending the request")
+        return min(connect, remaining), min(read, remaining)
+
+    def __repr__(self) -> str:
+        return f"Deadline(timeout={self._timeout:g}, remaining={self.remaining():.3f})"
+
+
+def remaining_or(deadline: Optional[Deadline], default: float) -> float:
+    """Wait budget for a step: the remaining time, at most default."""
+    if deadline is None:
+        return default
+    return min(default, deadline.remaining())
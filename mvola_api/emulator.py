@@ -0,0 +1,582 @@
+"""
+Local MVola API emulator.
+
+A self-contained, in-process emulator of the MVola merchant payment API
+for integration and load testing without network access:
+- /token (client_credentials)
+- merchantpay initiation, status/ and details endpoints
+- Configurable latency distributions per endpoint
+- Error (500) and rate limit (429) injection
+- Transaction state transitions pending -> completed/failed
+- Callback delivery when a transaction reaches its final state
+
+The emulator never weakens the ALLOWED_BASE_URLS whitelist: clients keep
+using SANDBOX_URL and only their sandbox traffic is routed to the emulator
+through a transport adapter mounted with attach_emulator().
+"""
+
+import argparse
+import base64
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+import requests
+
+from .constants import (
+    MERCHANT_PAY_ENDPOINT,
+    SANDBOX_URL,
+    TOKEN_SCOPE,
+    TRANSACTION_STATUS_ENDPOINT,
+)
+from .instrumentation import TimingHTTPAdapter
+from .transport import http_clients_of
+from .utils import endpoint_family
+
+logger = logging.getLogger("mvola_api")
+
+# Latency models take the emulator RNG and return a delay in seconds
+LatencyModel = Callable[[random.Random], float]
+
+ENDPOINT_FAMILIES = ("token", "merchantpay", "status", "details")
+
+_LOOPBACK_HOSTS = frozenset(["127.0.0.1", "localhost", "::1"])
+
+
+def fixed_latency(seconds: float) -> LatencyModel:
+    """Latency model that always returns the same delay."""
+    if seconds < 0:
+        raise ValueError("seconds must not be negative")
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyModel:
+    """Latency model drawing delays uniformly from [low, high]."""
+    if low < 0 or high < low:
+        raise ValueError("Expected 0 <= low <= high")
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> LatencyModel:
+    """
+    Latency model with a log-normal distribution (long right tail).
+
+    Args:
+        median: Median delay in seconds
+        sigma: Shape parameter; larger values give heavier tails
+    """
+    if median <= 0 or sigma < 0:
+        raise ValueError("median must be positive and sigma non-negative")
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def _per_endpoint(value: Any, default: Any) -> Dict[str, Any]:
+    """Expand a scalar or partial dict setting to all endpoint families."""
+    if isinstance(value, dict):
+        unknown = set(value) - set(ENDPOINT_FAMILIES)
+        if unknown:
+            raise ValueError(f"Unknown endpoint families: {', '.join(sorted(unknown))}")
+        return {family: value.get(family, default) for family in ENDPOINT_FAMILIES}
+    return {family: value if value is not None else default for family in ENDPOINT_FAMILIES}
+
+
+class _EmulatedTransaction:
+    """Server-side state of one emulated merchant payment."""
+
+    __slots__ = (
+        "server_correlation_id",
+        "object_reference",
+        "payload",
+        "created_at",
+        "complete_at",
+        "final_status",
+        "callback_url",
+        "callback_sent",
+    )
+
+    def __init__(self, payload, complete_at, final_status, callback_url):
+        self.server_correlation_id = str(uuid.uuid4())
+        self.object_reference = str(uuid.uuid4().int % 10**12).zfill(12)
+        self.payload = payload
+        self.created_at = time.time()
+        self.complete_at = complete_at
+        self.final_status = final_status
+        self.callback_url = callback_url
+        self.callback_sent = False
+
+    def status_at(self, now: float) -> str:
+        return self.final_status if now >= self.complete_at else "pending"
+
+
+class MVolaEmulator:
+    """
+    Local HTTP emulator of the MVola merchant payment API.
+
+    Usage:
+        with MVolaEmulator(latency=lognormal_latency(0.05)) as emulator:
+            client = MVolaClient(..., sandbox=True)
+            emulator.attach(client)
+            client.initiate_payment(...)
+
+    Args:
+        host: Interface to bind (loopback only)
+        port: Port to bind, 0 picks a free port
+        latency: Latency model, or dict of models per endpoint family
+        error_rate: Probability of a 500 response (scalar or per endpoint)
+        throttle_rate: Probability of a 429 response (scalar or per endpoint)
+        retry_after: Retry-After value (seconds) sent with 429 responses
+        completion_delay: Seconds before a pending transaction reaches its final state
+        failure_rate: Probability that a transaction ends as "failed"
+        token_ttl: Lifetime of issued access tokens in seconds
+        credentials: Optional (consumer_key, consumer_secret) the emulator accepts
+        callback_handler: Called in-process with each callback payload
+        callback_url: Override for the X-Callback-URL callbacks are PUT to
+        seed: Seed for the emulator RNG (deterministic runs)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[LatencyModel, Dict[str, LatencyModel], None] = None,
+        error_rate: Union[float, Dict[str, float]] = 0.0,
+        throttle_rate: Union[float, Dict[str, float]] = 0.0,
+        retry_after: int = 1,
+        completion_delay: float = 1.0,
+        failure_rate: float = 0.0,
+        token_ttl: int = 3600,
+        credentials: Optional[tuple] = None,
+        callback_handler: Optional[Callable[[Dict[str, Any]], None]] = None,
+        callback_url: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        if host not in _LOOPBACK_HOSTS:
+            raise ValueError("The emulator only binds to loopback interfaces")
+        if not 0 <= failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+
+        self._host = host
+        self._port = port
+        self._latency = _per_endpoint(latency, fixed_latency(0.0))
+        self._error_rate = _per_endpoint(error_rate, 0.0)
+        self._throttle_rate = _per_endpoint(throttle_rate, 0.0)
+        self._retry_after = retry_after
+        self._completion_delay = completion_delay
+        self._failure_rate = failure_rate
+        self._token_ttl = token_ttl
+        self._credentials = credentials
+        self._callback_handler = callback_handler
+        self._callback_url = callback_url
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._transactions: Dict[str, _EmulatedTransaction] = {}
+        self._by_reference: Dict[str, _EmulatedTransaction] = {}
+        # Pending callback timers, by server correlation ID (removed when fired)
+        self._timers: Dict[str, threading.Timer] = {}
+        self.request_counts: Dict[str, int] = {family: 0 for family in ENDPOINT_FAMILIES}
+        self.callbacks: List[Dict[str, Any]] = []
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Lifecycle ---
+
+    @property
+    def base_url(self) -> str:
+        """URL the emulator listens on (available once started)."""
+        if not self._server:
+            raise RuntimeError("Emulator is not running")
+        host = f"[{self._host}]" if ":" in self._host else self._host
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def start(self) -> "MVolaEmulator":
+        """Start serving in a background daemon thread."""
+        if self._server:
+            return self
+        handler = type("_BoundHandler", (_EmulatorRequestHandler,), {"emulator": self})
+        self._server = ThreadingHTTPServer((self._host, self._port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="mvola-emulator",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.debug("MVola emulator listening on %s", self.base_url)
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and cancel pending callbacks."""
+        with self._lock:
+            timers, self._timers = self._timers, {}
+        for timer in timers.values():
+            timer.cancel()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def attach(self, target: Any) -> None:
+        """Route the sandbox traffic of a client (or its HTTP clients) to this emulator."""
+        attach_emulator(target, self.base_url)
+
+    # --- Request handling (called from server threads) ---
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _sample_latency(self, family: str) -> float:
+        with self._lock:
+            return max(0.0, self._latency[family](self._rng))
+
+    def _injected_fault(self, family: str):
+        """Return an injected (status, body, headers) response, or None."""
+        roll = self._draw()
+        throttle = self._throttle_rate[family]
+        if roll < throttle:
+            return (
+                429,
+                {"fault": {"code": 429, "message": "Too Many Requests"}},
+                {"Retry-After": str(self._retry_after)},
+            )
+        if roll < throttle + self._error_rate[family]:
+            return (
+                500,
+                {"fault": {"code": 500, "message": "Internal Server Error"}},
+                {},
+            )
+        return None
+
+    def _check_bearer(self, headers) -> bool:
+        auth = headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return False
+        with self._lock:
+            expiry = self._tokens.get(auth[7:])
+        return expiry is not None and time.time() < expiry
+
+    def handle(self, method: str, path: str, headers, body: bytes):
+        """Dispatch one request and return (status, body_dict, extra_headers)."""
+        family = _route(method, path)
+        if family is None:
+            return 404, {"fault": {"code": 404, "message": "Resource not found"}}, {}
+
+        with self._lock:
+            self.request_counts[family] += 1
+
+        delay = self._sample_latency(family)
+        if delay:
+            time.sleep(delay)
+
+        fault = self._injected_fault(family)
+        if fault:
+            return fault
+
+        if family == "token":
+            return self._handle_token(headers, body)
+        if not self._check_bearer(headers):
+            return (
+                401,
+                {"fault": {"code": 900901, "message": "Invalid Credentials"}},
+                {},
+            )
+        if family == "merchantpay":
+            return self._handle_initiate(headers, body)
+        if family == "status":
+            return self._handle_status(path[len(TRANSACTION_STATUS_ENDPOINT):])
+        return self._handle_details(path[len(MERCHANT_PAY_ENDPOINT):])
+
+    def _handle_token(self, headers, body: bytes):
+        auth = headers.get("Authorization", "")
+        if not auth.startswith("Basic "):
+            return 401, {"error": "invalid_client", "error_description": "Missing credentials"}, {}
+        if self._credentials:
+            try:
+                decoded = base64.b64decode(auth[6:]).decode()
+            except (ValueError, UnicodeDecodeError):
+                decoded = ""
+            if decoded != "%s:%s" % tuple(self._credentials):
+                return (
+                    401,
+                    {
+                        "error": "invalid_client",
+                        "error_description": "Client Authentication failed.",
+                    },
+                    {},
+                )
+
+        token = uuid.uuid4().hex + uuid.uuid4().hex
+        with self._lock:
+            self._tokens[token] = time.time() + self._token_ttl
+        return (
+            200,
+            {
+                "access_token": token,
+                "scope": TOKEN_SCOPE,
+                "token_type": "Bearer",
+                "expires_in": self._token_ttl,
+            },
+            {},
+        )
+
+    def _handle_initiate(self, headers, body: bytes):
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            payload = None
+        required = ("amount", "currency", "descriptionText", "debitParty", "creditParty")
+        if not isinstance(payload, dict) or any(not payload.get(k) for k in required):
+            return (
+                400,
+                {
+                    "errorCategory": "validation",
+                    "errorCode": "formatError",
+                    "errorDescription": "Missing or invalid request fields",
+                },
+                {},
+            )
+
+        final_status = "failed" if self._draw() < self._failure_rate else "completed"
+        txn = _EmulatedTransaction(
+            payload=payload,
+            complete_at=time.time() + self._completion_delay,
+            final_status=final_status,
+            callback_url=self._callback_url or headers.get("X-Callback-URL"),
+        )
+        with self._lock:
+            self._transactions[txn.server_correlation_id] = txn
+            self._by_reference[txn.object_reference] = txn
+            if self._callback_handler or txn.callback_url:
+                timer = threading.Timer(self._completion_delay, self._fire_callback, (txn,))
+                timer.daemon = True
+                self._timers[txn.server_correlation_id] = timer
+                timer.start()
+
+        return (
+            202,
+            {
+                "status": "pending",
+                "serverCorrelationId": txn.server_correlation_id,
+                "notificationMethod": "callback" if txn.callback_url else "polling",
+            },
+            {},
+        )
+
+    def _handle_status(self, server_correlation_id: str):
+        with self._lock:
+            txn = self._transactions.get(server_correlation_id)
+        if txn is None:
+            return (
+                404,
+                {"errorCategory": "identification", "errorCode": "requestNotFound",
+                 "errorDescription": "Transaction not found"},
+                {},
+            )
+        status = txn.status_at(time.time())
+        body = {
+            "status": status,
+            "serverCorrelationId": txn.server_correlation_id,
+            "notificationMethod": "polling",
+        }
+        if status == "completed":
+            body["objectReference"] = txn.object_reference
+        return 200, body, {}
+
+    def _handle_details(self, object_reference: str):
+        with self._lock:
+            txn = self._by_reference.get(object_reference)
+        if txn is None or txn.status_at(time.time()) == "pending":
+            return (
+                404,
+                {"errorCategory": "identification", "errorCode": "transactionNotFound",
+                 "errorDescription": "Transaction not found"},
+                {},
+            )
+        return 200, self._details_body(txn), {}
+
+    def _details_body(self, txn: _EmulatedTransaction) -> Dict[str, Any]:
+        payload = txn.payload
+        return {
+            "amount": payload.get("amount"),
+            "currency": payload.get("currency"),
+            "transactionReference": txn.object_reference,
+            "transactionStatus": txn.final_status,
+            "createDate": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(txn.created_at)),
+            "debitParty": payload.get("debitParty", []),
+            "creditParty": payload.get("creditParty", []),
+            "fees": [{"feeAmount": "0"}],
+            "metadata": payload.get("metadata", []),
+        }
+
+    def _fire_callback(self, txn: _EmulatedTransaction) -> None:
+        with self._lock:
+            self._timers.pop(txn.server_correlation_id, None)
+        self._deliver_callback(txn)
+
+    def _deliver_callback(self, txn: _EmulatedTransaction) -> None:
+        body = {
+            "transactionStatus": txn.final_status,
+            "serverCorrelationId": txn.server_correlation_id,
+            "transactionReference": txn.object_reference,
+            "requestDate": txn.payload.get("requestDate"),
+            "debitParty": txn.payload.get("debitParty", []),
+            "creditParty": txn.payload.get("creditParty", []),
+            "fees": [{"feeAmount": "0"}],
+            "metadata": txn.payload.get("metadata", []),
+        }
+        with self._lock:
+            txn.callback_sent = True
+            self.callbacks.append(body)
+        try:
+            if self._callback_handler:
+                self._callback_handler(body)
+            elif txn.callback_url:
+                requests.put(txn.callback_url, json=body, timeout=5)
+        except Exception:
+            logger.warning("Emulator callback delivery failed", exc_info=True)
+
+
+def _route(method: str, path: str) -> Optional[str]:
+    """Map a request to its endpoint family (None if not emulated)."""
+    family = endpoint_family(path)
+    if family in ("token", "merchantpay") and method == "POST":
+        return family
+    if family in ("status", "details") and method == "GET":
+        return family
+    return None
+
+
+class _EmulatorRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler delegating to the bound MVolaEmulator instance."""
+
+    emulator: MVolaEmulator = None
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = urlparse(self.path).path
+        status, payload, extra_headers = self.emulator.handle(
+            self.command, path, self.headers, body
+        )
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in extra_headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler API
+        logger.debug("emulator: " + format, *args)
+
+
+class _EmulatorAdapter(TimingHTTPAdapter):
+    """Transport adapter rewriting SANDBOX_URL requests to a local emulator."""
+
+    def __init__(self, target_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self._target_url = target_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        request.url = self._target_url + request.url[len(SANDBOX_URL):]
+        return super().send(request, **kwargs)
+
+
+def attach_emulator(target: Any, emulator_url: str) -> None:
+    """
+    Route the sandbox traffic of a client to a local emulator.
+
+    Only requests to SANDBOX_URL are rerouted; production clients are
+    refused and the ALLOWED_BASE_URLS whitelist is left untouched.
+
+    Args:
+        target: MVolaClient, MVolaAuth, MVolaTransaction or SecureHTTPClient
+        emulator_url: URL of the running emulator (loopback only)
+
+    Raises:
+        ValueError: If the target is not in sandbox mode or the URL is not loopback
+    """
+    parsed = urlparse(emulator_url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in _LOOPBACK_HOSTS:
+        raise ValueError("Emulator URL must point to a loopback address")
+
+    base_url = getattr(target, "base_url", SANDBOX_URL)
+    if base_url != SANDBOX_URL:
+        raise ValueError("The emulator can only be attached to sandbox clients")
+
+    http_clients = http_clients_of(target)
+    if not http_clients:
+        raise ValueError(f"No HTTP client found on {type(target).__name__}")
+    for http_client in http_clients:
+        http_client.mount(SANDBOX_URL, lambda: _EmulatorAdapter(emulator_url))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a standalone emulator: python -m mvola_api.emulator --port 8000"""
+    parser = argparse.ArgumentParser(description="Local MVola API emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-median", type=float, default=0.0,
+                        help="Median log-normal latency in seconds (0 disables)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--completion-delay", type=float, default=1.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    latency = (
+        lognormal_latency(args.latency_median, args.latency_sigma)
+        if args.latency_median > 0
+        else None
+    )
+    emulator = MVolaEmulator(
+        host=args.host,
+        port=args.port,
+        latency=latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        completion_delay=args.completion_delay,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    with emulator:
+        print(f"MVola emulator listening on {emulator.base_url} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
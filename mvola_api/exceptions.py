@@ -3,22 +3,150 @@ MVola API exceptions
 
 Hierarchical exception classes for granular error handling.
 All exceptions sanitize error messages to prevent information leakage.
+
+Errors raised for an HTTP response carry an ErrorSnapshot (status,
+selected headers, truncated error fields) instead of the response
+itself: a requests.Response pins its body, headers and connection
+objects for as long as the exception is kept in logs, retry queues or
+error trackers. The raw response is kept only on request
+(keep_error_responses=True on the client).
 """
 
+import traceback
+from typing import Any, NamedTuple, Optional, Tuple
+
+# Response headers copied into snapshots
+SNAPSHOT_HEADERS = ("Content-Type", "Retry-After", "WWW-Authenticate", "X-CorrelationID")
+
+# Longest error field kept in a snapshot
+MAX_SNAPSHOT_FIELD = 200
+
+
+def _truncated(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    return str(value)[:MAX_SNAPSHOT_FIELD]
+
+
+class ErrorSnapshot(NamedTuple):
+    """
+    Compact, immutable summary of an error response.
+
+    Attributes:
+        status_code: HTTP status code
+        reason: HTTP reason phrase
+        url: Request URL without its query string
+        headers: Selected response headers as (name, value) pairs
+        error_code: Error code parsed from the body (fault code,
+            errorCode or OAuth error)
+        error_description: Error description parsed from the body,
+            truncated to MAX_SNAPSHOT_FIELD characters
+    """
+
+    status_code: Optional[int] = None
+    reason: Optional[str] = None
+    url: Optional[str] = None
+    headers: Tuple[Tuple[str, str], ...] = ()
+    error_code: Optional[str] = None
+    error_description: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: Any) -> "ErrorSnapshot":
+        """Build a snapshot of a requests.Response (read once, not retained)."""
+        headers = getattr(response, "headers", None) or {}
+        kept = tuple(
+            (name, _truncated(headers[name])) for name in SNAPSHOT_HEADERS if name in headers
+        )
+
+        error_code = error_description = None
+        try:
+            body = response.json()
+        except Exception:
+            body = None
+        if isinstance(body, dict):
+            fault = body.get("fault")
+            if isinstance(fault, dict):
+                error_code, error_description = fault.get("code"), fault.get("message")
+            else:
+                error_code = body.get("errorCode", body.get("ErrorCode", body.get("error")))
+                error_description = body.get(
+                    "errorDescription",
+                    body.get("ErrorDescription", body.get("error_description")),
+                )
+
+        url = getattr(response, "url", None)
+        reason = getattr(response, "reason", None)
+        status_code = getattr(response, "status_code", None)
+        return cls(
+            status_code=status_code if isinstance(status_code, int) else None,
+            reason=_truncated(reason) if isinstance(reason, str) else None,
+            url=_truncated(url.split("?", 1)[0]) if isinstance(url, str) else None,
+            headers=kept,
+            error_code=_truncated(error_code),
+            error_description=_truncated(error_description),
+        )
+
+    def header(self, name: str) -> Optional[str]:
+        """Value of a kept header (case-insensitive), or None."""
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+
+def detach_response(exc: BaseException, keep_response: bool = False):
+    """
+    Snapshot the response attached to a requests exception.
+
+    Unless keep_response is set, the response and request are removed
+    from the exception, which usually becomes the __cause__ of an
+    MVolaError and would otherwise keep them alive, and the locals of
+    its finished traceback frames (e.g. Response.raise_for_status) are
+    cleared for the same reason. Frames still executing are left alone:
+    a caller holding the response in a local must clear it itself, as
+    the error raised from its except block keeps its frame alive.
+
+    Args:
+        exc: Caught exception (requests.RequestException or any other)
+        keep_response: Leave the response on the exception and return it
+
+    Returns:
+        (snapshot, response): snapshot is None without a response;
+        response is None unless kept
+    """
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None, None
+    snapshot = ErrorSnapshot.from_response(response)
+    if keep_response:
+        return snapshot, response
+    try:
+        exc.response = None
+        exc.request = None
+    except AttributeError:
+        pass
+    # Frames still executing (the caller's) are skipped
+    traceback.clear_frames(exc.__traceback__)
+    return snapshot, None
+
 
 class MVolaError(Exception):
     """Base exception for all MVola-related errors."""
 
-    def __init__(self, message, code=None, response=None):
+    def __init__(self, message, code=None, response=None, snapshot=None):
         self.message = str(message)[:500] if message else "Unknown error"
         self.code = code
+        if snapshot is None and response is not None:
+            snapshot = ErrorSnapshot.from_response(response)
+        self.snapshot: Optional[ErrorSnapshot] = snapshot
         # Store response reference but don't expose raw body in str/repr
         self._response = response
         super().__init__(self.message)
 
     @property
     def response(self):
-        """Access the raw response (if available)."""
+        """Access the raw response (only if it was kept, see ErrorSnapshot)."""
         return self._response
 
     def __str__(self):
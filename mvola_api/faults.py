@@ -0,0 +1,269 @@
+"""
+Fault injection for SecureHTTPClient.
+
+FaultInjectionTransport wraps another transport and injects network
+faults per endpoint family and HTTP method, either on scripted call
+numbers or with a seeded probability:
+- SlowConnect: slow TCP/TLS handshake (ConnectTimeout past the timeout)
+- Latency: slow server response (ReadTimeout past the timeout)
+- HalfOpen: connection that never answers (ReadTimeout)
+- ConnectionReset: connection reset before or after the request reached the server
+- PartialBody: response body cut off mid-transfer
+- HTTPStatus: synthetic error responses such as 429 bursts or 503s
+
+Usage:
+    faults = FaultInjectionTransport(http_client.transport, [
+        FaultRule(HTTPStatus(429, retry_after=1), endpoint="status", calls=range(1, 4)),
+        FaultRule(ConnectionReset(after_send=True), method="POST", probability=0.01),
+    ], seed=42)
+    http_client.transport = faults
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .transport import Transport
+from .utils import endpoint_family
+
+
+def _split_timeout(timeout) -> tuple:
+    """Return (connect, read) timeouts from a scalar or tuple timeout."""
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+class Fault(ABC):
+    """Base class: a fault wraps one call to the inner transport."""
+
+    @abstractmethod
+    def inject(
+        self, inner: Transport, method: str, url: str, timeout, **kwargs
+    ) -> requests.Response:
+        """Perform (or fail) one call through inner."""
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+
+class SlowConnect(Fault):
+    """
+    Delay before the request is sent (slow DNS, TCP or TLS handshake).
+
+    Raises ConnectTimeout after the connect timeout if the delay exceeds it.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        connect_timeout, _ = _split_timeout(timeout)
+        if connect_timeout is not None and self.seconds >= connect_timeout:
+            time.sleep(connect_timeout)
+            raise requests.exceptions.ConnectTimeout(
+                f"Injected slow handshake: connect timed out after {connect_timeout}s"
+            )
+        time.sleep(self.seconds)
+        return inner.send(method, url, timeout=timeout, **kwargs)
+
+
+class Latency(Fault):
+    """
+    Delay after the server received the request (slow server).
+
+    Raises ReadTimeout after the read timeout if the delay exceeds it;
+    the request has then reached the server.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        _, read_timeout = _split_timeout(timeout)
+        response = inner.send(method, url, timeout=timeout, **kwargs)
+        if read_timeout is not None and self.seconds >= read_timeout:
+            time.sleep(read_timeout)
+            response.close()
+            raise requests.exceptions.ReadTimeout(
+                f"Injected latency: read timed out after {read_timeout}s"
+            )
+        time.sleep(self.seconds)
+        return response
+
+
+class HalfOpen(Fault):
+    """Half-open socket: the request is sent but no byte ever comes back."""
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        _, read_timeout = _split_timeout(timeout)
+        time.sleep(read_timeout or 0)
+        raise requests.exceptions.ReadTimeout(
+            f"Injected half-open connection: read timed out after {read_timeout}s"
+        )
+
+
+class ConnectionReset(Fault):
+    """
+    Connection reset by peer.
+
+    Args:
+        after_send: Reset after the server processed the request
+            (mid-response), which matters for non-idempotent POSTs
+    """
+
+    def __init__(self, after_send: bool = False):
+        self.after_send = after_send
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        if self.after_send:
+            inner.send(method, url, timeout=timeout, **kwargs).close()
+        raise requests.exceptions.ConnectionError(
+            "Injected fault: ('Connection aborted.', ConnectionResetError(104, "
+            "'Connection reset by peer'))"
+        )
+
+
+class PartialBody(Fault):
+    """Response body cut off mid-transfer (server processed the request)."""
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        response = inner.send(method, url, timeout=timeout, **kwargs)
+        received = len(response.content) // 2
+        response.close()
+        raise requests.exceptions.ChunkedEncodingError(
+            f"Injected partial body: connection broken after {received} bytes"
+        )
+
+
+class HTTPStatus(Fault):
+    """
+    Synthetic error response; the inner transport is not called.
+
+    Args:
+        status: HTTP status code (e.g. 429, 503)
+        retry_after: Optional Retry-After header value in seconds
+        body: Optional JSON body
+    """
+
+    def __init__(self, status: int = 503, retry_after: Optional[float] = None,
+                 body: Optional[Dict[str, Any]] = None):
+        self.status = status
+        self.retry_after = retry_after
+        self.body = body if body is not None else {
+            "fault": {"code": status, "message": http.client.responses.get(status, "")}
+        }
+
+    @property
+    def name(self) -> str:
+        return f"HTTP{self.status}"
+
+    def inject(self, inner, method, url, timeout, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = http.client.responses.get(self.status, "")
+        headers = {"Content-Type": "application/json"}
+        if self.retry_after is not None:
+            headers["Retry-After"] = str(self.retry_after)
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = json.dumps(self.body).encode()
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+
+class FaultRule:
+    """
+    When to inject a fault.
+
+    Args:
+        fault: Fault to inject
+        endpoint: Endpoint family ("token", "merchantpay", "status", "details") or None for all
+        method: HTTP method or None for all
+        calls: Scripted 1-based numbers of matching calls to fault (e.g. range(1, 4))
+        probability: Chance of faulting each matching call (used when calls is None)
+    """
+
+    def __init__(
+        self,
+        fault: Fault,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None,
+        calls: Optional[Iterable[int]] = None,
+        probability: float = 1.0,
+    ):
+        if not 0 <= probability <= 1:
+            raise ValueError("probability must be between 0 and 1")
+        self.fault = fault
+        self.endpoint = endpoint
+        self.method = method.upper() if method else None
+        self.calls = frozenset(calls) if calls is not None else None
+        self.probability = probability
+        self.matched = 0
+
+    def matches(self, method: str, family: str) -> bool:
+        return (self.method is None or self.method == method) and (
+            self.endpoint is None or self.endpoint == family
+        )
+
+
+class FaultInjectionTransport(Transport):
+    """
+    Transport injecting faults into the calls of an inner transport.
+
+    The first matching rule that fires wins. Injected faults are counted
+    per fault name in `injected`.
+
+    Args:
+        inner: Transport performing the real requests
+        rules: Fault rules, evaluated in order
+        seed: Seed for probabilistic rules (deterministic runs)
+    """
+
+    def __init__(self, inner: Transport, rules: List[FaultRule], seed: Optional[int] = None):
+        self.inner = inner
+        self.rules = list(rules)
+        self.injected: Dict[str, int] = {}
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _select(self, method: str, url: str) -> Optional[Fault]:
+        family = endpoint_family(url)
+        with self._lock:
+            self.calls += 1
+            for rule in self.rules:
+                if not rule.matches(method, family):
+                    continue
+                rule.matched += 1
+                if rule.calls is not None:
+                    fire = rule.matched in rule.calls
+                else:
+                    fire = self._rng.random() < rule.probability
+                if fire:
+                    name = rule.fault.name
+                    self.injected[name] = self.injected.get(name, 0) + 1
+                    return rule.fault
+        return None
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        fault = self._select(method.upper(), url)
+        if fault is None:
+            return self.inner.send(
+                method, url, headers=headers, data=data, json=json, timeout=timeout
+            )
+        return fault.inject(
+            self.inner, method, url, timeout, headers=headers, data=data, json=json
+        )
+
+    def close(self) -> None:
+        self.inner.close()
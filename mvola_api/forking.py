@@ -0,0 +1,60 @@
+"""
+Fork safety for preloaded application servers.
+
+gunicorn --preload, uWSGI without lazy-apps and multiprocessing's fork
+start method build the client in a master process and fork workers from
+it. A forked worker inherits a copy of everything the client holds:
+
+- the pooled keep-alive connections, whose sockets stay shared with the
+  master and every sibling, so that two processes read and write the
+  same TLS stream and corrupt it
+- locks, conditions and semaphores that some master thread may have held
+  at the moment of the fork; nothing releases them in the child, whose
+  first call then deadlocks
+- limiter state counting calls in flight on threads that do not exist
+  in the child
+
+Objects holding such state register here and get their
+_after_fork_in_child() method called in every forked child (through
+os.register_at_fork), where they replace their locks and connection
+pools with fresh ones. Inherited connections are dropped, not closed:
+closing them would shut down the master's connections. Settings and
+learned state (cached token, concurrency limit, latency windows) are
+kept, so a worker starts warm.
+
+The hook is a no-op on platforms without fork (Windows).
+"""
+
+import logging
+import os
+import weakref
+
+logger = logging.getLogger("mvola_api")
+
+_registry: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def register(obj: object) -> None:
+    """
+    Reset an object in forked children.
+
+    The object must define _after_fork_in_child(); it is only weakly
+    referenced, so registering does not keep it alive.
+
+    Args:
+        obj: Object holding locks, threads or connections
+    """
+    _registry.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    for obj in list(_registry):
+        try:
+            obj._after_fork_in_child()
+        except Exception:
+            # A broken object must not prevent the others from being reset
+            logger.exception("Failed to reset %r after fork", obj)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,272 @@
+"""
+Hedged GET requests for SecureHTTPClient.
+
+Status and details lookups are idempotent, so a slow attempt can be
+raced against a second one: when the first attempt has not answered
+within a percentile of recently observed latency (p95 by default), a
+hedge is sent on another pooled connection and whichever succeeds first
+is returned. The loser is left to finish in the background and its
+response is discarded.
+
+A hedge budget caps the extra load: each request earns `budget` hedge
+credits (0.05 = at most ~5% more requests) and each hedge spends one.
+Latency is tracked per endpoint family; no hedge is sent until
+`min_samples` latencies have been observed. POST is never hedged.
+
+Once an endpoint has a hedge delay, its attempts run on worker threads:
+the original attempt on a thread of its own (idle threads are reused),
+so that it never queues behind other callers, and the hedge delay only
+starts once it is actually sent; hedges on a small pool of
+`max_workers` threads, and no hedge is sent while all of them are busy.
+Tracing context is carried over, but per-phase timings (DNS, connect,
+TTFB...) are not recorded for these attempts.
+
+Usage:
+    client = MVolaClient(..., hedging=RequestHedger(percentile=95, budget=0.05))
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from . import forking
+from .utils import endpoint_family
+
+# Cap on threads running original attempts: one per concurrent caller,
+# so it is only reached with that many callers in flight
+_MAX_PRIMARY_THREADS = 1024
+
+
+def _discard(future: Future) -> None:
+    """Release the connection of a losing attempt."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class _LatencyWindow:
+    """Most recent latencies of an endpoint family, with a cached percentile."""
+
+    __slots__ = ("samples", "pending", "threshold")
+
+    def __init__(self, size: int):
+        self.samples: deque = deque(maxlen=size)
+        self.pending = 0
+        self.threshold: Optional[float] = None
+
+
+class RequestHedger:
+    """
+    Sends a second attempt when the first is slower than usual.
+
+    Args:
+        percentile: Latency percentile after which a hedge is sent
+        budget: Hedge credits earned per request (fraction of extra load)
+        max_credits: Cap on accumulated credits (largest hedge burst)
+        min_delay: Lower bound on the hedge delay in seconds
+        min_samples: Latencies needed per endpoint before hedging
+        window: Number of recent latencies kept per endpoint
+        max_workers: Threads running hedges (hedges in flight at most)
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    # Recompute the percentile after this many new samples
+    RECOMPUTE_EVERY = 16
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        max_credits: float = 10.0,
+        min_delay: float = 0.005,
+        min_samples: int = 20,
+        window: int = 512,
+        max_workers: int = 8,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 < budget <= 1:
+            raise ValueError("budget must be in (0, 1]")
+        if min_samples <= 0 or window < min_samples:
+            raise ValueError("window must be at least min_samples, both positive")
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+
+        self._percentile = percentile
+        self._budget = budget
+        self._max_credits = max_credits
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._window_size = window
+        self._max_workers = max_workers
+
+        self._windows: Dict[str, _LatencyWindow] = {}
+        self._credits = 0.0
+        self._lock = threading.Lock()
+        self._primary_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_slots = threading.BoundedSemaphore(max_workers)
+
+        # Cumulative statistics (for metrics)
+        self._hedged = 0
+        self._hedge_wins = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The executors' threads are not copied into the child; new
+        # executors are created on the next hedged request
+        self._lock = threading.Lock()
+        self._primary_executor = None
+        self._hedge_executor = None
+        self._hedge_slots = threading.BoundedSemaphore(self._max_workers)
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    @property
+    def hedged(self) -> int:
+        """Hedges sent."""
+        return self._hedged
+
+    @property
+    def hedge_wins(self) -> int:
+        """Hedges that answered before the original attempt."""
+        return self._hedge_wins
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Hedge delay for an endpoint family (None until enough samples)."""
+        with self._lock:
+            window = self._windows.get(endpoint)
+            if window is None or len(window.samples) < self._min_samples:
+                return None
+            if window.threshold is None or window.pending >= self.RECOMPUTE_EVERY:
+                ordered = sorted(window.samples)
+                index = min(len(ordered) - 1, int(len(ordered) * self._percentile / 100))
+                window.threshold = max(self._min_delay, ordered[index])
+                window.pending = 0
+            return window.threshold
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """Record the latency of a successful attempt."""
+        with self._lock:
+            window = self._windows.get(endpoint)
+            if window is None:
+                window = self._windows[endpoint] = _LatencyWindow(self._window_size)
+            window.samples.append(seconds)
+            window.pending += 1
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._credits = min(self._max_credits, self._credits + self._budget)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._credits < 1:
+                return False
+            self._credits -= 1
+            self._hedged += 1
+            return True
+
+    def _get_executor(self, hedge: bool) -> ThreadPoolExecutor:
+        executor = self._hedge_executor if hedge else self._primary_executor
+        if executor is None:
+            with self._lock:
+                if hedge:
+                    if self._hedge_executor is None:
+                        self._hedge_executor = ThreadPoolExecutor(
+                            max_workers=self._max_workers, thread_name_prefix="mvola-hedge"
+                        )
+                    executor = self._hedge_executor
+                else:
+                    if self._primary_executor is None:
+                        self._primary_executor = ThreadPoolExecutor(
+                            max_workers=_MAX_PRIMARY_THREADS, thread_name_prefix="mvola-attempt"
+                        )
+                    executor = self._primary_executor
+        return executor
+
+    def _submit(self, hedge: bool, endpoint: str, send,
+                *args, **kwargs) -> Tuple[Future, threading.Event]:
+        """Run an attempt on a worker thread; the event is set once it is sent."""
+        started = threading.Event()
+        context = contextvars.copy_context()
+
+        def attempt() -> requests.Response:
+            started.set()
+            start = time.perf_counter()
+            response = context.run(send, *args, **kwargs)
+            self.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        return self._get_executor(hedge).submit(attempt), started
+
+    def send(self, transport, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send one attempt through transport, hedging it if it is slow.
+
+        Returns:
+            The first successful response
+
+        Raises:
+            requests.exceptions.RequestException: If every attempt failed
+                (the error of the original attempt)
+        """
+        endpoint = endpoint_family(url)
+        self._earn()
+        delay = self.delay(endpoint)
+        if delay is None:
+            start = time.perf_counter()
+            response = transport.send(method, url, **kwargs)
+            self.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        primary, started = self._submit(False, endpoint, transport.send, method, url, **kwargs)
+        # The delay counts from the send, not from the submission
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        # Hedge only on an idle hedge thread: a queued hedge adds no speed
+        if not self._hedge_slots.acquire(blocking=False):
+            return primary.result()
+        if not self._spend():
+            self._hedge_slots.release()
+            return primary.result()
+
+        hedge, _ = self._submit(True, endpoint, transport.send, method, url, **kwargs)
+        hedge.add_done_callback(lambda _: self._hedge_slots.release())
+        attempts = (primary, hedge)
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the original attempt when both finished together
+            for future in attempts:
+                if future in done and future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    for other in attempts:
+                        if other is not future:
+                            other.add_done_callback(_discard)
+                    return future.result()
+        return primary.result()
+
+    def shutdown(self) -> None:
+        """Stop the hedging threads (in-flight attempts complete first)."""
+        with self._lock:
+            executors = (self._primary_executor, self._hedge_executor)
+            self._primary_executor = self._hedge_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestHedger(percentile={self._percentile:g}, budget={self._budget:g}, "
+            f"hedged={self._hedged})"
+        )
@@ -3,25 +3,173 @@ Secure HTTP client for MVola API.
 
 Provides a hardened requests.Session with:
 - TLS certificate verification enforced
-- Strict timeouts
+- Strict timeouts (separate connect and read timeouts, optional
+  end-to-end deadline, see deadline.py)
 - Response size limits
-- Automatic retry with exponential backoff
+- Automatic retry of idempotent requests with full-jitter backoff and
+  a retry budget (see retry.py)
 - Secure logging (secrets masked)
+- Per-phase timing instrumentation (see instrumentation.py)
+- Optional tracing spans (see tracing.py)
+- Optional circuit breakers per endpoint family (see circuit_breaker.py)
+- Optional hedging of slow GET attempts (see hedging.py)
+- Optional bulkhead limiting concurrent calls (see bulkhead.py)
+- Optional adaptive concurrency limit with load shedding (see concurrency.py)
+- Fresh connection pools and locks in forked worker processes (see forking.py)
+- Explicit lifecycle: close() or a with block releases the sessions,
+  otherwise a weakref.finalize callback does once the client is
+  unreachable; the default session of a closed client is kept warm for
+  the next client instead of being torn down (see _IdleSessions)
 """
 
+import functools
 import logging
-from typing import Any, Dict, Optional
+import threading
+import time
+import weakref
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-from .constants import DEFAULT_TIMEOUT, MAX_RESPONSE_SIZE
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from . import forking, instrumentation, tracing
+from .bulkhead import Bulkhead
+from .circuit_breaker import CircuitBreakers
+from .concurrency import AdaptiveConcurrencyLimiter
+from .constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_TIMEOUT, MAX_RESPONSE_SIZE
+from .deadline import Deadline, DeadlineExceededError
 from .exceptions import MVolaConnectionError, MVolaError
-from .utils import mask_token
+from .hedging import RequestHedger
+from .logs import log_event
+from .retry import RetryBudget, RetryPolicy
+from .transport import RequestsTransport, SessionPoolTransport, Transport
+from .utils import endpoint_family, mask_headers
 
 logger = logging.getLogger("mvola_api")
 
+# A timeout is either a read timeout in seconds or a (connect, read) pair
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _create_hardened_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """
+    Create a hardened requests.Session.
+
+    Retries are handled by SecureHTTPClient above the transport (so
+    every attempt goes through it), never by urllib3.
+
+    Args:
+        pool_connections: Hosts whose connection pools are kept
+        pool_maxsize: Connections kept per host
+    """
+    session = requests.Session()
+
+    adapter = instrumentation.TimingHTTPAdapter(
+        max_retries=0, pool_connections=pool_connections, pool_maxsize=pool_maxsize
+    )
+    session.mount("https://", adapter)
+    # Do NOT mount http:// — force HTTPS only
+    # session.mount("http://", adapter)  # Intentionally disabled
+
+    # Security headers applied to all requests
+    session.headers.update({
+        "Accept-Charset": "utf-8",
+        "Cache-Control": "no-store",
+    })
+
+    return session
+
+
+class _IdleSessions:
+    """
+    Default sessions of closed clients, kept warm for the next client.
+
+    With one SecureHTTPClient per request (or per MVolaClient), every
+    client would otherwise open and TLS-handshake its own connections
+    and tear them down when closed. A released session goes back here
+    with its keep-alive connections (cookies cleared) and is handed to
+    the next client with the same pool size. At most max_idle sessions
+    are kept, each for at most max_age seconds; the rest are closed.
+    """
+
+    def __init__(self, max_idle: int = 8, max_age: float = 30.0):
+        self._max_idle = max_idle
+        self._max_age = max_age
+        self._sessions: List[Tuple[float, int, requests.Session]] = []
+        self._lock = threading.Lock()
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The connections of idle sessions are shared with the parent
+        self._lock = threading.Lock()
+        self._sessions = []
+
+    def take(self, pool_maxsize: int) -> Optional[requests.Session]:
+        """Most recently released session with this pool size, if any."""
+        expired = []
+        session = None
+        with self._lock:
+            oldest = time.monotonic() - self._max_age
+            expired = [s for released, _, s in self._sessions if released < oldest]
+            self._sessions = [entry for entry in self._sessions if entry[0] >= oldest]
+            for i in range(len(self._sessions) - 1, -1, -1):
+                if self._sessions[i][1] == pool_maxsize:
+                    session = self._sessions.pop(i)[2]
+                    break
+        for stale in expired:
+            stale.close()
+        return session
+
+    def give(self, pool_maxsize: int, session: requests.Session) -> None:
+        """Keep a released session for reuse, or close it when enough are kept."""
+        session.cookies.clear()
+        with self._lock:
+            if len(self._sessions) < self._max_idle:
+                self._sessions.append((time.monotonic(), pool_maxsize, session))
+                return
+        session.close()
+
+    def clear(self) -> None:
+        """Close all idle sessions."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for _, _, session in sessions:
+            session.close()
+
+
+_idle_sessions = _IdleSessions()
+
+
+class _OwnedResources:
+    """
+    Sessions owned by one SecureHTTPClient.
+
+    Kept apart from the client so that its weakref.finalize callback
+    (release) does not reference the client itself.
+    """
+
+    __slots__ = ("session", "session_pool", "recyclable", "pool_maxsize")
+
+    def __init__(self, session_pool: Optional[SessionPoolTransport], pool_maxsize: int):
+        self.session: Optional[requests.Session] = None
+        self.session_pool = session_pool
+        # Sessions with custom adapters mounted or under a replaced
+        # transport are closed rather than handed to another client
+        self.recyclable = True
+        self.pool_maxsize = pool_maxsize
+
+    def release(self) -> None:
+        session, self.session = self.session, None
+        if session is not None:
+            if self.recyclable:
+                _idle_sessions.give(self.pool_maxsize, session)
+            else:
+                session.close()
+        session_pool, self.session_pool = self.session_pool, None
+        if session_pool is not None:
+            session_pool.close()
+
 
 class SecureHTTPClient:
     """
@@ -30,59 +178,209 @@ class SecureHTTPClient:
     Features:
     - Forces TLS certificate verification (verify=True always)
     - Enforces response size limits to prevent OOM attacks
-    - Automatic retry with exponential backoff for transient failures
-    - Thread-safe (uses requests.Session internals)
+    - Automatic retry with jittered exponential backoff for transient failures
+    - Thread-safe: by default all threads share one session (and its
+      connection pool); with session_pool, each request checks out a
+      session of its own from a bounded pool
+    - Sessions are created on first use, so constructing a client is cheap
     - Secure logging that masks tokens and credentials
 
     Args:
-        timeout: Default request timeout in seconds
+        timeout: Default read timeout in seconds (or a (connect, read) pair)
         max_retries: Maximum number of retries for transient failures
         max_response_size: Maximum response body size in bytes
         backoff_factor: Multiplier for exponential backoff between retries
+        transport: Transport performing the HTTP exchange
+            (default: RequestsTransport over the hardened session)
+        circuit_breakers: Circuit breakers applied per endpoint family;
+            open breakers fail calls fast with CircuitOpenError
+            (default: no circuit breaking)
+        connect_timeout: Default connect timeout in seconds (capped by timeout)
+        hedging: Hedger racing slow GET attempts against a second one
+            (default: no hedging; POST is never hedged)
+        retry_policy: Backoff and retry budget for idempotent requests
+            (default: full jitter from max_retries and backoff_factor,
+            with a RetryBudget)
+        bulkhead: Concurrency limit for calls through this client; calls
+            finding it full fail with BulkheadFullError (default: none)
+        pool_maxsize: Connections kept per host (default: the bulkhead
+            size, else requests' default of 10)
+        concurrency_limiter: Adaptive limit on calls in flight, fed with
+            the RTT of every attempt; calls that cannot be admitted in time
+            fail with LoadShedError (default: none)
+        session_pool: Number of sessions concurrent requests are spread
+            over, each used by one thread at a time with a single
+            connection per host; bounds the connections to session_pool
+            per host (default: one session shared by all threads)
     """
 
-    # Only retry on these status codes (server errors, rate limiting)
-    RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
-
     # Only retry on these HTTP methods (idempotent only - NEVER retry POST for payments)
     RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
 
     def __init__(
         self,
-        timeout: int = DEFAULT_TIMEOUT,
+        timeout: Timeout = DEFAULT_TIMEOUT,
         max_retries: int = 3,
         max_response_size: int = MAX_RESPONSE_SIZE,
         backoff_factor: float = 0.5,
+        transport: Optional[Transport] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        hedging: Optional[RequestHedger] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        bulkhead: Optional[Bulkhead] = None,
+        pool_maxsize: Optional[int] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        session_pool: Optional[int] = None,
     ):
         self._timeout = timeout
+        self._connect_timeout = connect_timeout
         self._max_response_size = max_response_size
-        self._session = self._create_session(max_retries, backoff_factor)
-
-    def _create_session(self, max_retries: int, backoff_factor: float) -> requests.Session:
-        """Create a hardened requests.Session with retry logic."""
-        session = requests.Session()
-
-        # Configure retry strategy — ONLY for GET requests (never retry POST/payments)
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=self.RETRY_STATUS_CODES,
-            allowed_methods=self.RETRY_METHODS,
-            raise_on_status=False,
+        if pool_maxsize is None:
+            pool_maxsize = bulkhead.max_concurrent if bulkhead is not None else DEFAULT_POOLSIZE
+        self._pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_retries=max_retries, backoff_factor=backoff_factor, budget=RetryBudget()
         )
+        # The default session is created by the first request (see transport)
+        self._session: Optional[requests.Session] = None
+        self._mounts: List[Tuple[str, Union[HTTPAdapter, Callable[[], HTTPAdapter]]]] = []
+        self._transport_lock = threading.Lock()
+        if session_pool:
+            # The factory must not reference self (see _OwnedResources)
+            self._session_pool = SessionPoolTransport(
+                functools.partial(_create_hardened_session, pool_maxsize, 1), size=session_pool
+            )
+        else:
+            self._session_pool = None
+        self._default_transport: Optional[Transport] = self._session_pool
+        self._transport = transport or self._session_pool
+        self._resources = _OwnedResources(self._session_pool, pool_maxsize)
+        self._finalizer = weakref.finalize(self, self._resources.release)
+        self.circuit_breakers = circuit_breakers
+        self.hedging = hedging
+        self.bulkhead = bulkhead
+        self.concurrency_limiter = concurrency_limiter
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        self._transport_lock = threading.Lock()
+
+    def _create_session(self, pool_maxsize: Optional[int] = None) -> requests.Session:
+        """
+        Create a hardened requests.Session (see _create_hardened_session).
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        # Do NOT mount http:// — force HTTPS only
-        # session.mount("http://", adapter)  # Intentionally disabled
+        Args:
+            pool_maxsize: Connections kept per host (default: the client's)
+        """
+        return _create_hardened_session(self._pool_maxsize, pool_maxsize or self._pool_maxsize)
+
+    @property
+    def transport(self) -> Transport:
+        """Transport requests are sent through (created on first access)."""
+        transport = self._transport
+        if transport is None:
+            with self._transport_lock:
+                if self._transport is None:
+                    session = None if self._mounts else _idle_sessions.take(self._pool_maxsize)
+                    if session is None:
+                        session = self._create_session()
+                    for prefix, adapter in self._mounts:
+                        session.mount(prefix, adapter() if callable(adapter) else adapter)
+                    self._session = self._resources.session = session
+                    self._transport = self._default_transport = RequestsTransport(session)
+                transport = self._transport
+        return transport
+
+    @transport.setter
+    def transport(self, transport: Transport) -> None:
+        # The new transport may wrap the session and close it with itself
+        self._resources.recyclable = False
+        self._transport = transport
+
+    @property
+    def max_retries(self) -> int:
+        """Maximum number of retries for idempotent requests."""
+        return self.retry_policy.max_retries
+
+    @max_retries.setter
+    def max_retries(self, max_retries: int) -> None:
+        self.retry_policy.max_retries = max_retries
+
+    @property
+    def backoff_factor(self) -> float:
+        """Base of the exponential backoff between retries."""
+        return self.retry_policy.backoff_factor
+
+    @backoff_factor.setter
+    def backoff_factor(self, backoff_factor: float) -> None:
+        self.retry_policy.backoff_factor = backoff_factor
+
+    def _sessions(self) -> List[requests.Session]:
+        """Sessions behind this client (several with a session pool)."""
+        if self._session_pool is not None:
+            return self._session_pool.sessions
+        return [self._session] if self._session is not None else []
+
+    def mount(
+        self, prefix: str, adapter: Union[HTTPAdapter, Callable[[], HTTPAdapter]]
+    ) -> None:
+        """
+        Mount a transport adapter for URLs starting with prefix.
 
-        # Security headers applied to all requests
-        session.headers.update({
-            "Accept-Charset": "utf-8",
-            "Cache-Control": "no-store",
-        })
+        Used to route traffic through test transports (e.g. the local
+        emulator). Only https:// prefixes are accepted.
 
-        return session
+        Args:
+            prefix: URL prefix
+            adapter: Adapter, or a callable creating one; with a session
+                pool the callable is invoked once per session so that
+                sessions do not share a connection pool
+
+        Raises:
+            ValueError: If the prefix is not an HTTPS URL
+        """
+        if not prefix.startswith("https://"):
+            raise ValueError("Only https:// prefixes can be mounted")
+        if self._session_pool is not None:
+            self._session_pool.mount(prefix, adapter)
+            return
+        with self._transport_lock:
+            self._mounts.append((prefix, adapter))
+            self._resources.recyclable = False
+            if self._session is not None:
+                self._session.mount(prefix, adapter() if callable(adapter) else adapter)
+
+    def pool_stats(self) -> List[Tuple[str, int, int]]:
+        """
+        Usage of the connection pools behind this client.
+
+        Returns:
+            List of (host:port, idle connections, connections opened) per pool
+        """
+        stats = []
+        adapters = {
+            id(adapter): adapter
+            for session in self._sessions() for adapter in list(session.adapters.values())
+        }
+        for adapter in adapters.values():
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                stats.append((f"{pool.host}:{pool.port}", idle, pool.num_connections))
+        return stats
+
+    def _timeouts(self, timeout: Optional[Timeout]) -> Tuple[float, float]:
+        """Resolve a timeout override into a (connect, read) pair."""
+        timeout = timeout or self._timeout
+        if isinstance(timeout, tuple):
+            return timeout
+        return min(self._connect_timeout, timeout), timeout
 
     def _check_response_size(self, response: requests.Response) -> None:
         """
@@ -111,65 +409,234 @@ class SecureHTTPClient:
 
     def _safe_log_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
         """Create a copy of headers with sensitive values masked for logging."""
-        masked = {}
-        sensitive_keys = {"authorization", "x-api-key", "cookie", "set-cookie"}
-        for key, value in headers.items():
-            if key.lower() in sensitive_keys:
-                if value.lower().startswith("bearer "):
-                    masked[key] = f"Bearer {mask_token(value[7:])}"
-                elif value.lower().startswith("basic "):
-                    masked[key] = "Basic ****"
-                else:
-                    masked[key] = "****"
-            else:
-                masked[key] = value
-        return masked
+        return mask_headers(headers)
 
-    def post(
+    def _send(
         self,
+        method: str,
         url: str,
+        timeout,
         headers: Optional[Dict[str, str]] = None,
         data: Optional[Dict[str, Any]] = None,
         json: Optional[Dict[str, Any]] = None,
-        timeout: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
     ) -> requests.Response:
         """
-        Send a POST request with security hardening.
+        Send a request through the transport, retrying idempotent methods.
 
-        Note: POST requests are NEVER retried automatically to prevent
-        duplicate transactions/payments.
+        Idempotent requests are retried on connection errors, timeouts and
+        the policy's RETRY_STATUS_CODES, honoring Retry-After, as long as the
+        retry budget allows. POST is sent exactly once. With a deadline,
+        each attempt's timeouts are capped by the remaining budget and
+        retries whose backoff would not fit are given up.
+        """
+        policy = self.retry_policy
+        retries = policy.max_retries if method in self.RETRY_METHODS else 0
+        if retries:
+            policy.on_request()
+        # Only idempotent methods may be hedged
+        hedging = self.hedging if method in self.RETRY_METHODS else None
+        timing = instrumentation.active_request()
+        transport = self.transport
+        attempt = 0
+        while True:
+            if timing is not None:
+                timing.attempts += 1
+            attempt_timeout = deadline.cap(*timeout) if deadline is not None else timeout
+            sent = time.monotonic()
+            try:
+                if hedging is not None:
+                    response = hedging.send(
+                        transport, method, url, headers=headers, timeout=attempt_timeout
+                    )
+                else:
+                    response = transport.send(
+                        method, url, headers=headers, data=data, json=json, timeout=attempt_timeout
+                    )
+            except requests.exceptions.SSLError:
+                raise
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ):
+                self._sample(sent, dropped=True)
+                if attempt >= retries:
+                    raise
+                delay = policy.backoff(attempt + 1)
+                if not self._fits(delay, deadline) or not policy.allow_retry():
+                    raise
+                attempt += 1
+                tracing.set_attribute("http.request.resend_count", attempt)
+                log_event(
+                    logger, logging.DEBUG, "http.retry", method=method, url=url, attempt=attempt
+                )
+                self._sleep(delay, timing)
+                continue
+
+            self._sample(sent, dropped=self._overloaded(response))
+            if response.status_code not in policy.RETRY_STATUS_CODES or attempt >= retries:
+                return response
+
+            delay = policy.retry_after(response)
+            if delay is None:
+                delay = policy.backoff(attempt + 1)
+            if not self._fits(delay, deadline) or not policy.allow_retry():
+                return response
+
+            attempt += 1
+            tracing.set_attribute("http.request.resend_count", attempt)
+            log_event(
+                logger, logging.DEBUG, "http.retry",
+                method=method, url=url, status=response.status_code, attempt=attempt,
+            )
+            response.close()
+            self._sleep(delay, timing)
+
+    def _sample(self, sent: float, dropped: bool) -> None:
+        """Feed the RTT of an attempt to the concurrency limiter."""
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            limiter.sample(time.monotonic() - sent, dropped)
+
+    def _overloaded(self, response: requests.Response) -> bool:
+        limiter = self.concurrency_limiter
+        return limiter is not None and response.status_code in limiter.OVERLOAD_STATUS_CODES
+
+    @staticmethod
+    def _fits(delay: float, deadline: Optional[Deadline]) -> bool:
+        """Whether a retry after delay seconds still leaves time before the deadline."""
+        return deadline is None or delay < deadline.remaining()
+
+    @staticmethod
+    def _sleep(delay: float, timing) -> None:
+        """Sleep between retries, accounting it as backoff in the active timing."""
+        if delay <= 0:
+            return
+        time.sleep(delay)
+        if timing is not None:
+            timing.backoff += delay
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
+        """Send a request inside a tracing span when a tracer is installed."""
+        if tracing.get_tracer() is None:
+            return self._timed_request(
+                method, url, timeout, headers=headers, data=data, json=json,
+                deadline=deadline,
+            )
 
-        Args:
-            url: Request URL
-            headers: Request headers
-            data: Form data
-            json: JSON body
-            timeout: Request timeout override
+        attributes = {"http.request.method": method, "url.full": url}
+        correlation_id = (headers or {}).get("X-CorrelationID")
+        if correlation_id:
+            attributes["mvola.correlation_id"] = correlation_id
+        with tracing.span(f"HTTP {method}", attributes):
+            response = self._timed_request(
+                method, url, timeout, headers=headers, data=data, json=json,
+                deadline=deadline,
+            )
+            tracing.set_attribute("http.response.status_code", response.status_code)
+            return response
 
-        Returns:
-            requests.Response
+    def _timed_request(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
+        """Send a request, timing it when instrumentation is enabled."""
+        timing = instrumentation.begin_request(method, url)
+        if timing is None:
+            return self._exchange(
+                method, url, timeout, headers=headers, data=data, json=json,
+                deadline=deadline,
+            )
+        try:
+            response = self._exchange(
+                method, url, timeout, headers=headers, data=data, json=json,
+                deadline=deadline,
+            )
+        except BaseException as e:
+            instrumentation.end_request(timing, error=e)
+            raise
+        instrumentation.end_request(timing, response.status_code)
+        return response
 
-        Raises:
-            MVolaConnectionError: On connection failures
+    def _exchange(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
         """
-        effective_timeout = timeout or self._timeout
+        Send a request inside the bulkhead and the concurrency limit,
+        through the circuit breaker of its endpoint family.
 
-        logger.debug(
-            "POST %s (timeout=%ds, headers=%s)",
-            url,
-            effective_timeout,
-            self._safe_log_headers(headers or {}),
-        )
+        Raises:
+            BulkheadFullError: If no bulkhead slot became free in time
+            LoadShedError: If the concurrency limiter shed the call
+            CircuitOpenError: If the breaker is open (nothing is sent)
+        """
+        bulkhead = self.bulkhead
+        limiter = self.concurrency_limiter
+        with bulkhead.slot(deadline) if bulkhead is not None else nullcontext(), \
+                limiter.slot(deadline) if limiter is not None else nullcontext():
+            breakers = self.circuit_breakers
+            if breakers is None:
+                return self._deliver(
+                    method, url, timeout, headers=headers, data=data, json=json,
+                    deadline=deadline,
+                )
 
+            breaker = breakers.get(endpoint_family(url))
+            probe = breaker.acquire()
+            start = time.monotonic()
+            failed = True
+            try:
+                response = self._deliver(
+                    method, url, timeout, headers=headers, data=data, json=json,
+                    deadline=deadline,
+                )
+                failed = response.status_code in breaker.FAILURE_STATUS_CODES
+                return response
+            except DeadlineExceededError:
+                # The caller's budget ran out: not a sign of an unhealthy endpoint
+                failed = False
+                raise
+            finally:
+                breaker.record(failed, time.monotonic() - start, probe)
+
+    def _deliver(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
+        """Send a request and map transport failures to MVolaConnectionError."""
         try:
-            response = self._session.post(
-                url,
-                headers=headers,
-                data=data,
-                json=json,
-                timeout=effective_timeout,
-                verify=True,  # ALWAYS verify TLS certificates
-                allow_redirects=False,  # Don't follow redirects for security
+            response = self._send(
+                method, url, timeout, headers=headers, data=data, json=json,
+                deadline=deadline,
             )
             self._check_response_size(response)
             return response
@@ -178,20 +645,82 @@ class SecureHTTPClient:
             raise MVolaConnectionError(
                 message="TLS certificate verification failed. Do not disable TLS verification."
             ) from e
+        # Timeout before ConnectionError: ConnectTimeout subclasses both
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(
+                    message=f"Deadline of {deadline.timeout:g}s exceeded waiting for {url}"
+                ) from e
+            connect, read = timeout
+            raise MVolaConnectionError(
+                message=f"Request timed out (connect {connect:g}s, read {read:g}s)"
+            ) from e
         except requests.exceptions.ConnectionError as e:
             raise MVolaConnectionError(
                 message=f"Connection failed to {url}"
             ) from e
-        except requests.exceptions.Timeout as e:
+        except (
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ContentDecodingError,
+        ) as e:
             raise MVolaConnectionError(
-                message=f"Request timed out after {effective_timeout}s"
+                message=f"Incomplete or corrupted response from {url}"
             ) from e
 
+    def post(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> requests.Response:
+        """
+        Send a POST request with security hardening.
+
+        Note: POST requests are NEVER retried automatically to prevent
+        duplicate transactions/payments.
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            data: Form data
+            json: JSON body
+            timeout: Read timeout or (connect, read) override
+            deadline: End-to-end deadline capping the timeouts
+
+        Returns:
+            requests.Response
+
+        Raises:
+            MVolaConnectionError: On connection failures
+            DeadlineExceededError: If the deadline passes
+        """
+        effective_timeout = self._timeouts(timeout)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            log_event(
+                logger,
+                logging.DEBUG,
+                "http.request",
+                method="POST",
+                url=url,
+                timeout=effective_timeout,
+                headers=self._safe_log_headers(headers or {}),
+            )
+
+        return self._request(
+            "POST", url, effective_timeout, headers=headers, data=data, json=json,
+            deadline=deadline,
+        )
+
     def get(
         self,
         url: str,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[int] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[Deadline] = None,
     ) -> requests.Response:
         """
         Send a GET request with security hardening.
@@ -201,59 +730,45 @@ class SecureHTTPClient:
         Args:
             url: Request URL
             headers: Request headers
-            timeout: Request timeout override
+            timeout: Read timeout or (connect, read) override
+            deadline: End-to-end deadline capping the timeouts and retries
 
         Returns:
             requests.Response
 
         Raises:
             MVolaConnectionError: On connection failures
+            DeadlineExceededError: If the deadline passes
         """
-        effective_timeout = timeout or self._timeout
+        effective_timeout = self._timeouts(timeout)
 
-        logger.debug(
-            "GET %s (timeout=%ds)",
-            url,
-            effective_timeout,
+        log_event(
+            logger, logging.DEBUG, "http.request", method="GET", url=url, timeout=effective_timeout
         )
 
-        try:
-            response = self._session.get(
-                url,
-                headers=headers,
-                timeout=effective_timeout,
-                verify=True,  # ALWAYS verify TLS certificates
-                allow_redirects=False,  # Don't follow redirects for security
-            )
-            self._check_response_size(response)
-            return response
-
-        except requests.exceptions.SSLError as e:
-            raise MVolaConnectionError(
-                message="TLS certificate verification failed. Do not disable TLS verification."
-            ) from e
-        except requests.exceptions.ConnectionError as e:
-            raise MVolaConnectionError(
-                message=f"Connection failed to {url}"
-            ) from e
-        except requests.exceptions.Timeout as e:
-            raise MVolaConnectionError(
-                message=f"Request timed out after {effective_timeout}s"
-            ) from e
+        return self._request("GET", url, effective_timeout, headers=headers, deadline=deadline)
 
     def close(self) -> None:
-        """Close the underlying session and release resources."""
-        if self._session:
-            self._session.close()
+        """
+        Release the client's resources.
+
+        A transport passed in (or set) is closed; the default session is
+        handed on to the next client (see _IdleSessions) unless custom
+        adapters were mounted on it. Unclosed clients are released the
+        same way once they become unreachable.
+        """
+        with self._transport_lock:
+            transport = self._transport
+            default = transport is self._default_transport
+            if default and self._session is not None:
+                # The session is no longer ours: a later call takes another
+                self._transport = self._default_transport = self._session = None
+        if transport is not None and not default:
+            transport.close()
+        self._resources.release()
 
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
         self.close()
-
-    def __del__(self):
-        try:
-            self.close()
-        except Exception:
-            pass
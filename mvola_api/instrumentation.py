@@ -0,0 +1,361 @@
+"""
+Per-phase timing instrumentation for MVola API calls.
+
+Breaks the latency of each call down into:
+- rate_limit_wait: time spent waiting on the client-side rate limiter
+- token_fetch: time spent obtaining the access token (cache hit or POST)
+- dns, connect, tls: connection setup, only when a new connection is opened
+- ttfb: time from sending the request to the response headers
+- download: time reading the response body
+- backoff: time slept between retries
+
+Two kinds of timings are emitted to listeners:
+- RequestTiming (kind "request"): one SecureHTTPClient call, retries included
+- OperationTiming (kind "operation"): one MVolaTransaction call or token
+  refresh, named after its endpoint family ("token", "merchantpay",
+  "status", "details"), with the RequestTimings of the HTTP calls it made
+  (token POST included)
+
+Nothing is measured unless a listener is registered or the caller asked
+for timings (MVolaClient(collect_timings=True)): the disabled path is a
+tuple check and a thread-local lookup.
+
+Usage:
+    def on_timing(timing):
+        if timing.kind == "operation":
+            print(timing.to_dict())
+
+    add_listener(on_timing)
+"""
+
+import functools
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+from .utils import endpoint_family
+
+logger = logging.getLogger("mvola_api")
+
+_listeners: tuple = ()
+_listeners_lock = threading.Lock()
+_local = threading.local()
+
+
+class RequestTiming:
+    """
+    Timing of one HTTP call made by SecureHTTPClient (all attempts).
+
+    Phase durations are in seconds and summed over attempts; dns, connect
+    and tls stay at 0 when a pooled connection was reused.
+    """
+
+    __slots__ = (
+        "method", "url", "endpoint", "status_code", "error", "attempts",
+        "new_connections", "dns", "connect", "tls", "ttfb", "download",
+        "backoff", "total", "_start",
+    )
+
+    kind = "request"
+
+    def __init__(self, method: str, url: str):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_family(url)
+        self.status_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.new_connections = 0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.ttfb = 0.0
+        self.download = 0.0
+        self.backoff = 0.0
+        self.total = 0.0
+        self._start = time.perf_counter()
+
+    @property
+    def setup(self) -> float:
+        """Connection setup time (dns + connect + tls)."""
+        return self.dns + self.connect + self.tls
+
+    def record_exchange(self, wall: float, headers_elapsed: float, setup: float) -> None:
+        """
+        Split one exchange into time to first byte and body download.
+
+        Args:
+            wall: Duration of the whole exchange
+            headers_elapsed: Time until the response headers were parsed
+                (requests' Response.elapsed), connection setup included
+            setup: Connection setup time spent during this exchange
+        """
+        self.ttfb += max(0.0, headers_elapsed - setup)
+        self.download += max(0.0, wall - headers_elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "endpoint": self.endpoint,
+            "status_code": self.status_code,
+            "error": self.error,
+            "attempts": self.attempts,
+            "new_connections": self.new_connections,
+            "dns": self.dns,
+            "connect": self.connect,
+            "tls": self.tls,
+            "ttfb": self.ttfb,
+            "download": self.download,
+            "backoff": self.backoff,
+            "total": self.total,
+        }
+
+
+class OperationTiming:
+    """Timing of one MVolaTransaction call or token refresh and the HTTP calls it made."""
+
+    __slots__ = (
+        "operation", "error", "rate_limit_wait", "token_fetch", "total",
+        "requests", "_start",
+    )
+
+    kind = "operation"
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.error: Optional[str] = None
+        self.rate_limit_wait = 0.0
+        self.token_fetch = 0.0
+        self.total = 0.0
+        self.requests: List[RequestTiming] = []
+        self._start = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "error": self.error,
+            "rate_limit_wait": self.rate_limit_wait,
+            "token_fetch": self.token_fetch,
+            "total": self.total,
+            "requests": [timing.to_dict() for timing in self.requests],
+        }
+
+
+def add_listener(callback: Callable[[Any], None]) -> None:
+    """
+    Register a callback receiving every RequestTiming and OperationTiming.
+
+    Callbacks run synchronously on the calling thread once the call
+    finished; exceptions they raise are logged and ignored.
+    """
+    global _listeners
+    with _listeners_lock:
+        if callback not in _listeners:
+            _listeners = _listeners + (callback,)
+
+
+def remove_listener(callback: Callable[[Any], None]) -> None:
+    """Unregister a callback added with add_listener (no-op if absent)."""
+    global _listeners
+    with _listeners_lock:
+        _listeners = tuple(c for c in _listeners if c != callback)
+
+
+def has_listeners() -> bool:
+    """Whether any timing listener is registered."""
+    return bool(_listeners)
+
+
+def _emit(timing) -> None:
+    for callback in _listeners:
+        try:
+            callback(timing)
+        except Exception:
+            logger.exception("Timing listener %r failed", callback)
+
+
+def active_request() -> Optional[RequestTiming]:
+    """RequestTiming being measured on this thread, if any."""
+    return getattr(_local, "request", None)
+
+
+def active_operation() -> Optional[OperationTiming]:
+    """OperationTiming being measured on this thread, if any."""
+    return getattr(_local, "operation", None)
+
+
+def begin_request(method: str, url: str) -> Optional[RequestTiming]:
+    """
+    Start timing an HTTP call on this thread.
+
+    Returns:
+        The RequestTiming, or None when instrumentation is disabled
+    """
+    if not _listeners and getattr(_local, "operation", None) is None:
+        return None
+    timing = RequestTiming(method, url)
+    _local.request = timing
+    return timing
+
+
+def end_request(timing: RequestTiming, status_code: Optional[int] = None,
+                error: Optional[BaseException] = None) -> None:
+    """Finish an HTTP call timing, attach it to the operation and emit it."""
+    timing.total = time.perf_counter() - timing._start
+    timing.status_code = status_code
+    if error is not None:
+        timing.error = type(error).__name__
+    _local.request = None
+    operation = getattr(_local, "operation", None)
+    if operation is not None:
+        operation.requests.append(timing)
+    if _listeners:
+        _emit(timing)
+
+
+def timed(phase: str, func: Callable, *args, **kwargs):
+    """
+    Call func, adding its duration to a phase of the active operation.
+
+    Args:
+        phase: OperationTiming attribute ("rate_limit_wait" or "token_fetch")
+        func: Callable to time
+    """
+    operation = getattr(_local, "operation", None)
+    if operation is None:
+        return func(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        setattr(operation, phase, getattr(operation, phase) + time.perf_counter() - start)
+
+
+def instrumented(operation_name: str) -> Callable:
+    """
+    Decorator timing an MVolaTransaction or MVolaAuth method as an operation.
+
+    When the instance's `_collect_timings` is true, the timing is also
+    attached to the returned result under "timings" (a dict key, or the
+    timings attribute of a TransactionResult).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            collect = getattr(self, "_collect_timings", False)
+            if not collect and not _listeners:
+                return func(self, *args, **kwargs)
+
+            timing = OperationTiming(operation_name)
+            previous = getattr(_local, "operation", None)
+            _local.operation = timing
+            try:
+                result = func(self, *args, **kwargs)
+            except BaseException as e:
+                timing.error = type(e).__name__
+                raise
+            finally:
+                _local.operation = previous
+                timing.total = time.perf_counter() - timing._start
+                if previous is not None:
+                    # Nested operation (token refresh): the outer call made these requests too
+                    previous.requests.extend(timing.requests)
+                if _listeners:
+                    _emit(timing)
+
+            if collect:
+                if isinstance(result, dict):
+                    result["timings"] = timing.to_dict()
+                elif hasattr(result, "timings"):
+                    result.timings = timing.to_dict()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect and TLS handshake durations of new connections."""
+
+    def _new_conn(self):
+        timing = getattr(_local, "request", None)
+        if timing is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(
+                self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            timing.dns += time.perf_counter() - start
+            # Let urllib3 resolve again and raise its own error type
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        timing.dns += resolved - start
+
+        # Connect to the resolved addresses in order, as create_connection would
+        host = self._dns_host
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except Exception as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+            timing.connect += time.perf_counter() - resolved
+
+    def connect(self):
+        timing = getattr(_local, "request", None)
+        if timing is None:
+            return super().connect()
+        start = time.perf_counter()
+        setup = timing.dns + timing.connect
+        try:
+            return super().connect()
+        finally:
+            timing.new_connections += 1
+            if isinstance(self, HTTPSConnection):
+                handshake = time.perf_counter() - start - (timing.dns + timing.connect - setup)
+                timing.tls += max(0.0, handshake)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report DNS/connect/TLS timings."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
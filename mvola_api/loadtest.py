@@ -0,0 +1,375 @@
+"""
+Load-test harness for MVolaClient.
+
+Drives a configurable end-to-end workload (N concurrent payers, each
+initiating payments and polling their status) through a real MVolaClient,
+with its rate limiters and connection pools in the loop, and reports:
+- Throughput (overall and per operation)
+- p50/p95/p99/p999 latency per operation
+- Rate limiter wait time and rejections
+- Error rates by exception class
+
+Results can be exported as JSON for comparison between runs.
+
+Command line (runs against an in-process emulator by default):
+    python -m mvola_api.loadtest --payers 32 --duration 30 --output results.json
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import TEST_MSISDN_1, TEST_MSISDN_2
+from .exceptions import MVolaError
+
+OPERATIONS = ("initiate", "status", "details")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile in [0, 100]
+
+    Returns:
+        The percentile value (0.0 for an empty list)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Workload:
+    """
+    Description of a load-test workload.
+
+    Args:
+        payers: Number of concurrent payer threads
+        duration: Run time in seconds (ignored when payments_per_payer is set)
+        payments_per_payer: Fixed number of payments per payer
+        polls_per_payment: Maximum status polls after each initiation
+        poll_interval: Pause between status polls in seconds
+        fetch_details: Fetch details once a transaction is completed
+        amount: Amount of each payment
+        debit_msisdn: Payer MSISDN
+        credit_msisdn: Merchant MSISDN
+    """
+
+    def __init__(
+        self,
+        payers: int = 8,
+        duration: float = 10.0,
+        payments_per_payer: Optional[int] = None,
+        polls_per_payment: int = 3,
+        poll_interval: float = 0.1,
+        fetch_details: bool = True,
+        amount: int = 1000,
+        debit_msisdn: str = TEST_MSISDN_1,
+        credit_msisdn: str = TEST_MSISDN_2,
+    ):
+        if payers <= 0:
+            raise ValueError("payers must be positive")
+        if payments_per_payer is None and duration <= 0:
+            raise ValueError("duration must be positive")
+
+        self.payers = payers
+        self.duration = duration
+        self.payments_per_payer = payments_per_payer
+        self.polls_per_payment = polls_per_payment
+        self.poll_interval = poll_interval
+        self.fetch_details = fetch_details
+        self.amount = amount
+        self.debit_msisdn = debit_msisdn
+        self.credit_msisdn = credit_msisdn
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class _OperationStats:
+    """Latency samples and error counts for one operation (per payer thread)."""
+
+    __slots__ = ("latencies", "errors")
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+
+class LoadTestReport:
+    """Aggregated results of a load-test run."""
+
+    PERCENTILES = (50, 95, 99, 99.9)
+
+    def __init__(self, workload: Workload, elapsed: float, stats: Dict[str, _OperationStats],
+                 limiters: Dict[str, Dict[str, float]]):
+        self.workload = workload
+        self.elapsed = elapsed
+        self._stats = stats
+        self.limiters = limiters
+
+    def operation(self, name: str) -> Dict[str, Any]:
+        """Summary of one operation: counts, throughput and latency percentiles (ms)."""
+        stats = self._stats[name]
+        samples = sorted(stats.latencies)
+        errors = sum(stats.errors.values())
+        count = len(samples)
+        latency = {
+            ("p%g" % pct).replace(".", ""): percentile(samples, pct) * 1000
+            for pct in self.PERCENTILES
+        }
+        latency["mean"] = (sum(samples) / count * 1000) if count else 0.0
+        latency["max"] = samples[-1] * 1000 if samples else 0.0
+        return {
+            "count": count,
+            "errors": errors,
+            "error_rate": errors / count if count else 0.0,
+            "errors_by_type": dict(stats.errors),
+            "throughput": count / self.elapsed if self.elapsed else 0.0,
+            "latency_ms": latency,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        operations = {name: self.operation(name) for name in OPERATIONS}
+        total = sum(op["count"] for op in operations.values())
+        errors = sum(op["errors"] for op in operations.values())
+        return {
+            "workload": self.workload.to_dict(),
+            "elapsed_s": self.elapsed,
+            "total_requests": total,
+            "throughput": total / self.elapsed if self.elapsed else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "operations": operations,
+            "rate_limiters": self.limiters,
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Serialize the report as JSON, optionally writing it to path."""
+        data = json.dumps(self.to_dict(), indent=2, sort_keys=True)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(data + "\n")
+        return data
+
+    def format_table(self) -> str:
+        """Human-readable summary."""
+        data = self.to_dict()
+        lines = [
+            f"Elapsed: {data['elapsed_s']:.2f}s  Requests: {data['total_requests']}  "
+            f"Throughput: {data['throughput']:.1f} req/s  Errors: {data['error_rate']:.2%}",
+            f"{'operation':<10}{'count':>8}{'req/s':>9}{'err%':>8}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}{'p999':>9}  (ms)",
+        ]
+        for name, op in data["operations"].items():
+            lat = op["latency_ms"]
+            lines.append(
+                f"{name:<10}{op['count']:>8}{op['throughput']:>9.1f}{op['error_rate']:>8.2%}"
+                f"{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}{lat['p999']:>9.1f}"
+            )
+        for name, limiter in data["rate_limiters"].items():
+            lines.append(
+                f"rate limiter {name}: waited {limiter['wait_s']:.3f}s, "
+                f"{limiter['rejections']} rejections"
+            )
+        return "\n".join(lines)
+
+
+class LoadTestHarness:
+    """
+    Run a Workload against an MVolaClient.
+
+    All payers share the same client, so its rate limiters, token cache
+    and connection pools are exercised exactly as in production.
+
+    Args:
+        client: MVolaClient under test
+        workload: Workload description
+    """
+
+    def __init__(self, client, workload: Workload):
+        self._client = client
+        self._workload = workload
+
+    def _limiters(self) -> Dict[str, Any]:
+        limiters = {}
+        for owner in (getattr(self._client, "_auth", None),
+                      getattr(self._client, "_transaction", None)):
+            limiter = getattr(owner, "_rate_limiter", None)
+            if limiter is not None:
+                limiters[limiter.name] = limiter
+        return limiters
+
+    def _timed(self, stats: Dict[str, _OperationStats], name: str, fn: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except MVolaError as e:
+            errors = stats[name].errors
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            return None
+        finally:
+            stats[name].latencies.append(time.perf_counter() - start)
+
+    def _payer(self, stats: Dict[str, _OperationStats], stop_at: float) -> None:
+        wl = self._workload
+        client = self._client
+        done = 0
+        while True:
+            if wl.payments_per_payer is not None:
+                if done >= wl.payments_per_payer:
+                    return
+            elif time.monotonic() >= stop_at:
+                return
+            done += 1
+
+            result = self._timed(
+                stats, "initiate", client.initiate_payment,
+                amount=wl.amount,
+                debit_msisdn=wl.debit_msisdn,
+                credit_msisdn=wl.credit_msisdn,
+                description="Load test payment",
+            )
+            if not result:
+                continue
+            server_id = result.server_correlation_id
+            if not server_id:
+                continue
+
+            for _ in range(wl.polls_per_payment):
+                if wl.poll_interval:
+                    time.sleep(wl.poll_interval)
+                status = self._timed(stats, "status", client.get_transaction_status, server_id)
+                if not status:
+                    continue
+                if status.status == "pending":
+                    continue
+                if wl.fetch_details and status.transaction_id:
+                    self._timed(
+                        stats, "details", client.get_transaction_details, status.transaction_id
+                    )
+                break
+
+    def run(self) -> LoadTestReport:
+        """Run the workload and return its report."""
+        limiters = self._limiters()
+        before = {name: (lim.total_wait_time, lim.rejections) for name, lim in limiters.items()}
+
+        per_payer = [
+            {name: _OperationStats() for name in OPERATIONS}
+            for _ in range(self._workload.payers)
+        ]
+        start = time.monotonic()
+        stop_at = start + self._workload.duration
+        threads = [
+            threading.Thread(target=self._payer, args=(stats, stop_at), name=f"payer-{i}")
+            for i, stats in enumerate(per_payer)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        # Merge per-thread samples (no locking on the hot path)
+        merged = {name: _OperationStats() for name in OPERATIONS}
+        for stats in per_payer:
+            for name, op in stats.items():
+                merged[name].latencies.extend(op.latencies)
+                for error, count in op.errors.items():
+                    merged[name].errors[error] = merged[name].errors.get(error, 0) + count
+
+        limiter_stats = {
+            name: {
+                "wait_s": lim.total_wait_time - before[name][0],
+                "rejections": lim.rejections - before[name][1],
+            }
+            for name, lim in limiters.items()
+        }
+        return LoadTestReport(self._workload, elapsed, merged, limiter_stats)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: python -m mvola_api.loadtest"""
+    from .client import MVolaClient
+    from .emulator import MVolaEmulator, attach_emulator, lognormal_latency
+    from .rate_limiter import TokenBucketRateLimiter
+
+    parser = argparse.ArgumentParser(description="MVola client load test")
+    parser.add_argument("--payers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--payments-per-payer", type=int, default=None)
+    parser.add_argument("--polls", type=int, default=3)
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    parser.add_argument("--no-details", action="store_true")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="Transaction rate limit (req/s); default is the library default")
+    parser.add_argument("--burst", type=int, default=None,
+                        help="Transaction rate limiter burst size")
+    parser.add_argument("--emulator-url", default=None,
+                        help="Use an already running emulator instead of an in-process one")
+    parser.add_argument("--latency-median", type=float, default=0.02)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--completion-delay", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    workload = Workload(
+        payers=args.payers,
+        duration=args.duration,
+        payments_per_payer=args.payments_per_payer,
+        polls_per_payment=args.polls,
+        poll_interval=args.poll_interval,
+        fetch_details=not args.no_details,
+    )
+
+    rate_limiter = None
+    if args.rate_limit or args.burst:
+        rate_limiter = TokenBucketRateLimiter(
+            max_tokens=args.burst or max(1, int(args.rate_limit or 1)),
+            refill_rate=args.rate_limit or float(args.burst),
+            name="transaction",
+        )
+
+    emulator = None
+    emulator_url = args.emulator_url
+    if not emulator_url:
+        emulator = MVolaEmulator(
+            latency=lognormal_latency(args.latency_median, args.latency_sigma)
+            if args.latency_median > 0 else None,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            completion_delay=args.completion_delay,
+            seed=args.seed,
+        ).start()
+        emulator_url = emulator.base_url
+
+    try:
+        client = MVolaClient(
+            consumer_key="loadtest_key",
+            consumer_secret="loadtest_secret",
+            partner_name="Load Test",
+            sandbox=True,
+            rate_limiter=rate_limiter,
+        )
+        attach_emulator(client, emulator_url)
+        report = LoadTestHarness(client, workload).run()
+    finally:
+        if emulator:
+            emulator.stop()
+
+    print(report.format_table())
+    if args.output:
+        report.to_json(args.output)
+
+
+if __name__ == "__main__":
+    main()
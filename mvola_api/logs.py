@@ -0,0 +1,244 @@
+"""
+Structured, non-blocking logging for the MVola client.
+
+Log calls in the library emit structured events (an event name plus
+key/value fields) through log_event(). Nothing is built when the level
+is disabled, and masking of MSISDNs and headers is deferred with Lazy
+wrappers until a handler actually formats the record.
+
+start_background_logging() moves handler I/O off the payment path: the
+"mvola_api" logger then only enqueues records (never blocking; records
+are dropped and counted when the queue is full) and a QueueListener
+thread formats and writes them.
+
+Usage:
+    background = start_background_logging(
+        logging.FileHandler("mvola.log"), formatter=JSONFormatter()
+    )
+    ...
+    background.stop()  # flushes pending records
+"""
+
+import datetime
+import json
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+from . import forking
+
+LOGGER_NAME = "mvola_api"
+
+# LogRecord attributes carrying structured events
+EVENT_ATTR = "mvola_event"
+FIELDS_ATTR = "mvola_fields"
+
+
+class Lazy:
+    """
+    Value computed only when formatted (e.g. a masked MSISDN).
+
+    Args:
+        func: Function producing the value
+        args: Arguments passed to func
+    """
+
+    __slots__ = ("_func", "_args")
+
+    def __init__(self, func: Callable[..., Any], *args: Any):
+        self._func = func
+        self._args = args
+
+    def __str__(self) -> str:
+        return str(self._func(*self._args))
+
+    __repr__ = __str__
+
+
+class EventMessage:
+    """Log message rendering an event and its fields as `event key=value ...`."""
+
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        if not self.fields:
+            return self.event
+        pairs = " ".join(f"{key}={value}" for key, value in self.fields.items())
+        return f"{self.event} {pairs}"
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields: Any) -> None:
+    """
+    Log a structured event if the level is enabled.
+
+    Field values should be immutable or Lazy: with background logging
+    they are formatted later, on the listener thread.
+
+    Args:
+        logger: Logger to emit on
+        level: Logging level (e.g. logging.INFO)
+        event: Event name (e.g. "payment.initiated")
+        fields: Event fields
+    """
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            EventMessage(event, fields),
+            extra={EVENT_ATTR: event, FIELDS_ATTR: fields},
+            stacklevel=2,
+        )
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, structured fields included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        event = getattr(record, EVENT_ATTR, None)
+        if event is not None:
+            data["event"] = event
+            for key, value in getattr(record, FIELDS_ATTR, {}).items():
+                data.setdefault(key, value)
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and leaves formatting to the listener.
+
+    The stock QueueHandler formats each record on the calling thread;
+    here the record is enqueued as-is and dropped when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _FlushingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of failing."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class BackgroundLogging:
+    """Handle on an active background logging pipeline (see start_background_logging)."""
+
+    def __init__(self, logger: logging.Logger, handler: _DeferredQueueHandler,
+                 listener: QueueListener, propagate: bool):
+        self._logger = logger
+        self._handler = handler
+        self._listener = listener
+        self._propagate = propagate
+        self._lock = threading.Lock()
+        self._stopped = False
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # The listener thread is not copied into the child: restart it on a
+        # new queue (the inherited one may be locked or hold parent records)
+        self._lock = threading.Lock()
+        if self._stopped:
+            return
+        log_queue: queue.Queue = queue.Queue(maxsize=self._handler.queue.maxsize)
+        self._handler.queue = log_queue
+        self._handler.dropped = 0
+        self._listener.queue = log_queue
+        self._listener._thread = None
+        self._listener.start()
+
+    @property
+    def dropped(self) -> int:
+        """Records dropped because the queue was full."""
+        return self._handler.dropped
+
+    def stop(self) -> None:
+        """Flush pending records, stop the listener and restore the logger."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        self._logger.removeHandler(self._handler)
+        self._logger.propagate = self._propagate
+        self._listener.stop()
+
+    def __enter__(self) -> "BackgroundLogging":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def start_background_logging(
+    *handlers: logging.Handler,
+    logger_name: str = LOGGER_NAME,
+    level: Optional[int] = None,
+    formatter: Optional[logging.Formatter] = None,
+    queue_size: int = 10000,
+) -> BackgroundLogging:
+    """
+    Route a logger through a queue to handlers running on a background thread.
+
+    The logger stops propagating to ancestor handlers while the pipeline
+    is active, so no I/O happens on the calling thread.
+
+    Args:
+        handlers: Handlers doing the actual I/O (file, syslog, stream...)
+        logger_name: Logger to route (default: "mvola_api")
+        level: Optional level to set on the logger
+        formatter: Optional formatter applied to all handlers (e.g. JSONFormatter())
+        queue_size: Maximum number of pending records
+
+    Returns:
+        BackgroundLogging handle; call stop() to flush and detach
+
+    Raises:
+        ValueError: If no handler is given or queue_size is not positive
+    """
+    if not handlers:
+        raise ValueError("At least one handler is required")
+    if queue_size <= 0:
+        raise ValueError("queue_size must be positive")
+
+    logger = logging.getLogger(logger_name)
+    if formatter is not None:
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = _DeferredQueueHandler(log_queue)
+    listener = _FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    background = BackgroundLogging(logger, queue_handler, listener, logger.propagate)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    if level is not None:
+        logger.setLevel(level)
+    return background
@@ -0,0 +1,308 @@
+"""
+Many merchant credentials served from one process.
+
+A payment platform acting for hundreds of sub-merchants needs one set of
+credentials (consumer key/secret, partner name and MSISDN) per merchant.
+Building an MVolaClient per request repeats the client setup and throws
+away the cached token; keeping one MVolaClient per merchant alive keeps
+idle sockets and rate limiters for every one of them.
+
+MVolaClientManager keeps instead:
+- one compact record per tenant (credentials, the last token and, once
+  the tenant was used, its rate limiter), so thousands of registered
+  tenants cost a few hundred bytes each
+- live MVolaClient objects for the most recently used tenants only;
+  beyond max_active, or after idle_timeout seconds without a call, the
+  least recently used client is evicted and its token saved in the
+  tenant record, so rebuilding it does not request a new token, and the
+  rebuilt client reuses the tenant's rate limiter, so evicting a client
+  does not refill its bucket (circuit breakers live on the shared HTTP
+  client and survive eviction as well)
+- one SecureHTTPClient (connection pool) shared by all tenants: the
+  gateway host is the same for every merchant, so connections opened
+  for one tenant are reused for the next
+
+Usage:
+    manager = MVolaClientManager(sandbox=True, max_active=200)
+    manager.register("shop-42", consumer_key, consumer_secret,
+                     partner_name="Shop 42", partner_msisdn="0343500004")
+    manager.initiate_payment("shop-42", amount=1000, ...)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from . import forking
+from .client import MVolaClient
+from .constants import PRODUCTION_URL, SANDBOX_URL, TEST_MSISDN_2
+from .deadline import Deadline
+from .exceptions import MVolaValidationError
+from .http_client import SecureHTTPClient
+from .rate_limiter import TokenBucketRateLimiter
+from .results import PaymentInitiated, TransactionDetails, TransactionStatus
+
+
+class UnknownTenantError(MVolaValidationError):
+    """Raised when a call names a tenant that is not registered."""
+
+    def __init__(self, message, tenant: Optional[str] = None):
+        super().__init__(message=message)
+        self.tenant = tenant
+
+
+class _Tenant:
+    """Credentials, last token and rate limiter of one tenant (kept for every registered tenant)."""
+
+    __slots__ = (
+        "consumer_key", "consumer_secret", "partner_name", "partner_msisdn",
+        "token", "token_expiry", "rate_limiter", "last_used",
+    )
+
+    def __init__(self, consumer_key: str, consumer_secret: str, partner_name: str,
+                 partner_msisdn: Optional[str]):
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.partner_name = partner_name
+        self.partner_msisdn = partner_msisdn
+        self.token: Optional[Dict[str, Any]] = None
+        self.token_expiry = 0.0
+        # Built with the tenant's first client, then reused by the next ones
+        self.rate_limiter: Optional[TokenBucketRateLimiter] = None
+        self.last_used = 0.0
+
+
+class MVolaClientManager:
+    """
+    Routes calls to per-tenant MVolaClients sharing one connection pool.
+
+    Args:
+        sandbox: Use the sandbox environment for all tenants
+        max_active: Most tenant clients kept alive at once; the least
+            recently used one is evicted beyond it
+        idle_timeout: Seconds without a call after which a tenant client
+            is evicted (None: evict only beyond max_active)
+        http_client: HTTP client shared by all tenants; configure circuit
+            breakers, hedging, bulkhead and so on on it (default: a
+            SecureHTTPClient owned and closed by the manager)
+        rate_limiter: Transaction rate limiter shared by all tenants
+            (default: one per tenant client, as with MVolaClient)
+        collect_timings: Attach per-phase timings to transaction results
+        keep_error_responses: Keep raw responses on raised errors (see
+            MVolaClient)
+
+    Raises:
+        ValueError: If max_active or idle_timeout is out of range
+    """
+
+    def __init__(
+        self,
+        sandbox: bool = True,
+        max_active: int = 100,
+        idle_timeout: Optional[float] = None,
+        http_client: Optional[SecureHTTPClient] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        collect_timings: bool = False,
+        keep_error_responses: bool = False,
+    ):
+        if max_active < 1:
+            raise ValueError("max_active must be at least 1")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        self._sandbox = sandbox
+        self._max_active = max_active
+        self._idle_timeout = idle_timeout
+        self._owns_http_client = http_client is None
+        self._http_client = http_client or SecureHTTPClient()
+        self._rate_limiter = rate_limiter
+        self._collect_timings = collect_timings
+        self._keep_error_responses = keep_error_responses
+
+        self._tenants: Dict[str, _Tenant] = {}
+        # Live clients, least recently used first
+        self._clients: "OrderedDict[str, MVolaClient]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Cumulative statistics
+        self._evictions = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return SANDBOX_URL if self._sandbox else PRODUCTION_URL
+
+    @property
+    def active(self) -> int:
+        """Tenant clients currently alive."""
+        return len(self._clients)
+
+    @property
+    def evictions(self) -> int:
+        """Tenant clients evicted since creation."""
+        return self._evictions
+
+    def __len__(self) -> int:
+        """Number of registered tenants."""
+        return len(self._tenants)
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._tenants
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._tenants))
+
+    def register(
+        self,
+        tenant: str,
+        consumer_key: str,
+        consumer_secret: str,
+        partner_name: str,
+        partner_msisdn: Optional[str] = None,
+    ) -> None:
+        """
+        Add or replace the credentials of a tenant.
+
+        Replacing credentials drops the tenant's live client and token;
+        its rate limiter is kept.
+
+        Args:
+            tenant: Key calls are routed by (e.g. the sub-merchant id)
+            consumer_key: Consumer key of the tenant
+            consumer_secret: Consumer secret of the tenant
+            partner_name: Partner name of the tenant
+            partner_msisdn: Partner MSISDN of the tenant; required in
+                production (sandbox default: TEST_MSISDN_2). Tenant clients
+                never fall back to MVOLA_PARTNER_MSISDN, which would pay
+                one merchant's payments under another's MSISDN
+
+        Raises:
+            MVolaValidationError: If a credential is missing
+        """
+        if not tenant or not consumer_key or not consumer_secret or not partner_name:
+            raise MVolaValidationError(
+                message="tenant, consumer_key, consumer_secret and partner_name are required"
+            )
+        if not partner_msisdn:
+            if not self._sandbox:
+                raise MVolaValidationError(
+                    message=f"partner_msisdn is required for tenant '{tenant}' in production"
+                )
+            partner_msisdn = TEST_MSISDN_2
+        record = _Tenant(consumer_key, consumer_secret, partner_name, partner_msisdn)
+        with self._lock:
+            previous = self._tenants.get(tenant)
+            if previous is not None:
+                record.rate_limiter = previous.rate_limiter
+            self._tenants[tenant] = record
+            self._clients.pop(tenant, None)
+
+    def unregister(self, tenant: str) -> None:
+        """Forget a tenant, its live client and its token."""
+        with self._lock:
+            self._tenants.pop(tenant, None)
+            self._clients.pop(tenant, None)
+
+    def _evict(self, tenant: str) -> None:
+        """Drop a live client, keeping its token in the tenant record (lock held)."""
+        client = self._clients.pop(tenant)
+        record = self._tenants.get(tenant)
+        exported = client.export_token()
+        if record is not None and exported is not None:
+            record.token, record.token_expiry = exported
+        self._evictions += 1
+
+    def _build(self, record: _Tenant) -> MVolaClient:
+        client = MVolaClient(
+            consumer_key=record.consumer_key,
+            consumer_secret=record.consumer_secret,
+            partner_name=record.partner_name,
+            partner_msisdn=record.partner_msisdn,
+            sandbox=self._sandbox,
+            rate_limiter=self._rate_limiter or record.rate_limiter,
+            collect_timings=self._collect_timings,
+            keep_error_responses=self._keep_error_responses,
+            http_client=self._http_client,
+        )
+        if record.token is not None:
+            client.import_token(record.token, record.token_expiry)
+            record.token = None
+        if self._rate_limiter is None:
+            record.rate_limiter = client.rate_limiter
+        return client
+
+    def client(self, tenant: str) -> MVolaClient:
+        """
+        Live client of a tenant, built on first use.
+
+        Raises:
+            UnknownTenantError: If the tenant is not registered
+        """
+        now = time.monotonic()
+        with self._lock:
+            record = self._tenants.get(tenant)
+            if record is None:
+                raise UnknownTenantError(message=f"Unknown tenant: '{tenant}'", tenant=tenant)
+            if self._idle_timeout is not None:
+                for idle in list(self._clients):
+                    if now - self._tenants[idle].last_used < self._idle_timeout:
+                        break
+                    self._evict(idle)
+            record.last_used = now
+
+            client = self._clients.get(tenant)
+            if client is not None:
+                self._clients.move_to_end(tenant)
+                return client
+            client = self._clients[tenant] = self._build(record)
+            while len(self._clients) > self._max_active:
+                self._evict(next(iter(self._clients)))
+            return client
+
+    # --- Calls routed by tenant (see MVolaClient) ---
+
+    def generate_token(
+        self, tenant: str, force_refresh: bool = False, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        return self.client(tenant).generate_token(force_refresh, deadline)
+
+    def get_access_token(self, tenant: str, deadline: Optional[Deadline] = None) -> str:
+        return self.client(tenant).get_access_token(deadline)
+
+    def initiate_merchant_payment(self, tenant: str, *args: Any, **kwargs: Any) -> PaymentInitiated:
+        return self.client(tenant).initiate_merchant_payment(*args, **kwargs)
+
+    def initiate_payment(self, tenant: str, *args: Any, **kwargs: Any) -> PaymentInitiated:
+        return self.client(tenant).initiate_payment(*args, **kwargs)
+
+    def get_transaction_status(self, tenant: str, *args: Any, **kwargs: Any) -> TransactionStatus:
+        return self.client(tenant).get_transaction_status(*args, **kwargs)
+
+    def get_transaction_details(self, tenant: str, *args: Any, **kwargs: Any) -> TransactionDetails:
+        return self.client(tenant).get_transaction_details(*args, **kwargs)
+
+    def close(self) -> None:
+        """Close all live clients and the shared HTTP client if owned."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+        if self._owns_http_client:
+            self._http_client.close()
+
+    def __enter__(self) -> "MVolaClientManager":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"MVolaClientManager(sandbox={self._sandbox}, tenants={len(self._tenants)}, "
+            f"active={len(self._clients)})"
+        )
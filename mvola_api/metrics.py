@@ -0,0 +1,726 @@
+"""
+In-process metrics for MVola API calls, exported in Prometheus text format.
+
+MetricsRegistry holds counters, gauges and log-linear (HDR-style)
+histograms. Counters and histograms are sharded per thread: recording a
+sample touches only the calling thread's shard, without any lock, and
+shards are summed at collection time. The shard of a thread that ends is
+folded into a base shard, so thread-per-request servers do not
+accumulate shards.
+
+MVolaMetrics wires a registry to the timing instrumentation and records:
+- mvola_requests_total / mvola_request_duration_seconds per operation
+  (token, merchantpay, status, details) and HTTP status
+- mvola_operation_duration_seconds and mvola_errors_total per operation
+  and exception class (MVolaAuthError, MVolaConnectionError, ...)
+- mvola_rate_limit_wait_seconds, mvola_token_refreshes_total,
+  mvola_connections_opened_total
+- mvola_retries_total per operation
+- rate limiter, connection pool, circuit breaker, hedging, retry
+  budget, bulkhead and adaptive concurrency metrics for tracked clients
+
+Usage:
+    metrics = MVolaMetrics().install()
+    metrics.track_client(client)
+    print(metrics.registry.to_prometheus())
+
+    with MetricsServer(metrics.registry, port=9464):
+        ...  # scrape http://127.0.0.1:9464/metrics
+"""
+
+import bisect
+import math
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import instrumentation
+
+# Default latency buckets exported to Prometheus (seconds)
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Sub-buckets per power of two: bucket width at most ~3% of the values it holds
+_SUB_BUCKETS = 32
+_ZERO_BUCKET = -(2 ** 31)
+
+_frexp = math.frexp
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _bucket_index(value: float) -> int:
+    """Index of the log-linear bucket holding a (non-negative) value."""
+    if value <= 0:
+        return _ZERO_BUCKET
+    mantissa, exponent = math.frexp(value)
+    return exponent * _SUB_BUCKETS + int((mantissa - 0.5) * 2 * _SUB_BUCKETS)
+
+
+def _bucket_upper_bound(index: int) -> float:
+    """Upper bound of a log-linear bucket."""
+    if index == _ZERO_BUCKET:
+        return 0.0
+    exponent, sub = divmod(index, _SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub + 1) / (2 * _SUB_BUCKETS), exponent)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _ShardOwner:
+    """Kept in the owning thread's local storage: released when the thread ends."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded:
+    """Per-thread shards of a metric child; only the owning thread writes to its shard."""
+
+    def __init__(self, factory: Callable[[], list]):
+        self._factory = factory
+        self._local = threading.local()
+        # The first shard is the base, holding the counts of ended threads
+        self._base = factory()
+        self._shards: List[list] = [self._base]
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> list:
+        shard = self._factory()
+        owner = _ShardOwner()
+        with self._lock:
+            self._shards.append(shard)
+        weakref.finalize(owner, self._retire, shard)
+        self._local.shard = shard
+        self._local.owner = owner
+        return shard
+
+    def _retire(self, shard: list) -> None:
+        """Fold the shard of an ended thread into the base shard."""
+        with self._lock:
+            self._merge(self._base, shard)
+            # By identity: shards holding equal counts compare equal
+            self._shards = [s for s in self._shards if s is not shard]
+
+    def _merge(self, base: list, shard: list) -> None:
+        raise NotImplementedError
+
+    def shards(self) -> List[list]:
+        with self._lock:
+            return list(self._shards)
+
+
+class _CounterChild(_Sharded):
+
+    def __init__(self):
+        super().__init__(lambda: [0.0])
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter (amount must be non-negative)."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += amount
+
+    def _merge(self, base: list, shard: list) -> None:
+        base[0] += shard[0]
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from a monotonic source (e.g. limiter stats) at collection time."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        # Under the lock: a shard being folded into the base is counted once
+        with self._lock:
+            return sum(shard[0] for shard in self._shards)
+
+
+class _GaugeChild:
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value with function at collection time."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._value
+
+
+class _HistogramChild(_Sharded):
+
+    def __init__(self):
+        # [count, sum, {bucket index: count}]
+        super().__init__(lambda: [0, 0.0, {}])
+
+    def observe(self, value: float) -> None:
+        """Record one sample (e.g. a duration in seconds)."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += 1
+        shard[1] += value
+        buckets = shard[2]
+        # Inlined _bucket_index: this runs on every request
+        if value > 0:
+            mantissa, exponent = _frexp(value)
+            index = exponent * _SUB_BUCKETS + int((mantissa - 0.5) * (2 * _SUB_BUCKETS))
+        else:
+            index = _ZERO_BUCKET
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def _merge(self, base: list, shard: list) -> None:
+        base[0] += shard[0]
+        base[1] += shard[1]
+        buckets = base[2]
+        for index, n in shard[2].items():
+            buckets[index] = buckets.get(index, 0) + n
+
+    def snapshot(self) -> Tuple[int, float, Dict[int, int]]:
+        """Merged (count, sum, {bucket index: count}) over all shards."""
+        count, total, merged = 0, 0.0, {}
+        with self._lock:
+            for shard in self._shards:
+                count += shard[0]
+                total += shard[1]
+                for index, n in shard[2].copy().items():
+                    merged[index] = merged.get(index, 0) + n
+        return count, total, merged
+
+    @property
+    def count(self) -> int:
+        return self.snapshot()[0]
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile (0 <= q <= 1) from the buckets.
+
+        Returns the upper bound of the bucket holding the quantile (within
+        ~3% of the true value), or 0.0 without samples.
+        """
+        count, _, buckets = self.snapshot()
+        if not count:
+            return 0.0
+        rank = max(1, math.ceil(q * count))
+        seen = 0
+        for index in sorted(buckets):
+            seen += buckets[index]
+            if seen >= rank:
+                return _bucket_upper_bound(index)
+        return _bucket_upper_bound(max(buckets))
+
+
+class _Metric:
+    """Labelled metric family; children are created on first use and cached."""
+
+    kind = ""
+    _child_class: Callable[[], Any] = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        # Children by the label values as passed, which may not be str
+        self._by_values: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        """
+        Child for a combination of label values (positional, in labelnames order).
+
+        Raises:
+            ValueError: If the number of values does not match labelnames
+        """
+        try:
+            return self._by_values[values]
+        except KeyError:
+            pass
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {len(values)} values"
+            )
+        with self._lock:
+            key = tuple(str(v) for v in values)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._child_class()
+            self._by_values[values] = child
+            return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self.labels()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+    _child_class = _CounterChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for labels, child in self.children():
+            yield self.name + "_total", labels, child.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at collection time."""
+
+    kind = "gauge"
+    _child_class = _GaugeChild
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        for labels, child in self.children():
+            yield self.name, labels, child.value
+
+
+class Histogram(_Metric):
+    """
+    Log-linear latency histogram.
+
+    Samples are counted in fine log-linear buckets (at most ~3% wide) and exported
+    as cumulative Prometheus buckets at the `buckets` boundaries.
+    """
+
+    kind = "histogram"
+    _child_class = _HistogramChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        bounds = self.buckets + (math.inf,)
+        for labels, child in self.children():
+            count, total, fine = child.snapshot()
+            cumulative = [0] * len(bounds)
+            for index, n in fine.items():
+                cumulative[bisect.bisect_left(bounds, _bucket_upper_bound(index))] += n
+            running = 0
+            for bound, n in zip(bounds, cumulative):
+                running += n
+                yield self.name + "_bucket", dict(labels, le=_format_value(bound)), running
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in Prometheus text format.
+
+    Metrics are created once by name; asking again for an existing name
+    returns the registered metric.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callable refreshing gauges right before each collection."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for collector in collectors:
+            collector()
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MVolaMetrics:
+    """
+    Standard MVola API metrics fed by the timing instrumentation.
+
+    Args:
+        registry: Registry to record into (default: a new MetricsRegistry)
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter(
+            "mvola_requests", "HTTP requests by operation and status", ("operation", "status")
+        )
+        self.request_duration = r.histogram(
+            "mvola_request_duration_seconds", "HTTP request latency, retries included",
+            ("operation",),
+        )
+        self.operation_duration = r.histogram(
+            "mvola_operation_duration_seconds", "Client call latency", ("operation",)
+        )
+        self.errors = r.counter(
+            "mvola_errors", "Failed client calls by exception class", ("operation", "exception")
+        )
+        self.rate_limit_wait = r.histogram(
+            "mvola_rate_limit_wait_seconds", "Time spent waiting on the rate limiter",
+            ("operation",),
+        )
+        self.token_refreshes = r.counter(
+            "mvola_token_refreshes", "Access tokens obtained from the token endpoint"
+        )
+        self.connections_opened = r.counter(
+            "mvola_connections_opened", "New HTTP connections by operation", ("operation",)
+        )
+        self.limiter_wait = r.counter(
+            "mvola_rate_limiter_wait_seconds",
+            "Cumulative time callers waited on a rate limiter", ("limiter",),
+        )
+        self.limiter_rejections = r.counter(
+            "mvola_rate_limiter_rejections", "Rate limiter rejections", ("limiter",)
+        )
+        self.limiter_available = r.gauge(
+            "mvola_rate_limiter_available_tokens", "Tokens available in a rate limiter",
+            ("limiter",),
+        )
+        self.pool_connections = r.gauge(
+            "mvola_pool_connections",
+            "HTTP pool connections by state (idle, opened since start)", ("host", "state"),
+        )
+        self.breaker_state = r.gauge(
+            "mvola_circuit_breaker_state",
+            "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("endpoint",),
+        )
+        self.breaker_rejections = r.counter(
+            "mvola_circuit_breaker_rejections", "Calls rejected by an open circuit breaker",
+            ("endpoint",),
+        )
+        self.breaker_opened = r.counter(
+            "mvola_circuit_breaker_opened", "Times a circuit breaker opened", ("endpoint",),
+        )
+        self.hedged = r.counter("mvola_hedged_requests", "Hedged GET attempts sent")
+        self.hedge_wins = r.counter(
+            "mvola_hedge_wins", "Hedged GET attempts that answered before the original"
+        )
+        self.retries = r.counter(
+            "mvola_retries", "Retried HTTP attempts by operation", ("operation",)
+        )
+        self.retry_budget_exhausted = r.counter(
+            "mvola_retry_budget_exhausted", "Retries refused because the retry budget was empty"
+        )
+        self.bulkhead_active = r.gauge(
+            "mvola_bulkhead_active_calls", "Calls holding a bulkhead slot", ("bulkhead",)
+        )
+        self.bulkhead_rejections = r.counter(
+            "mvola_bulkhead_rejections", "Calls rejected by a full bulkhead", ("bulkhead",)
+        )
+        self.bulkhead_wait = r.counter(
+            "mvola_bulkhead_wait_seconds", "Cumulative time calls waited for a bulkhead slot",
+            ("bulkhead",),
+        )
+        self.concurrency_limit = r.gauge(
+            "mvola_concurrency_limit", "Adaptive concurrency limit", ("limiter",)
+        )
+        self.concurrency_in_flight = r.gauge(
+            "mvola_concurrency_in_flight", "Calls admitted by an adaptive concurrency limiter",
+            ("limiter",),
+        )
+        self.load_shed = r.counter(
+            "mvola_load_shed", "Calls shed by an adaptive concurrency limiter", ("limiter",)
+        )
+        # Weak: tracking a client must not keep its connections alive
+        self._http_clients: "weakref.WeakSet" = weakref.WeakSet()
+        self._breaker_groups: List[Any] = []
+        self._lock = threading.Lock()
+        r.add_collector(self._collect_pools)
+        r.add_collector(self._collect_breakers)
+
+    def install(self) -> "MVolaMetrics":
+        """Start recording timings from the instrumentation module."""
+        instrumentation.add_listener(self.record)
+        return self
+
+    def uninstall(self) -> None:
+        """Stop recording timings."""
+        instrumentation.remove_listener(self.record)
+
+    def record(self, timing) -> None:
+        """Record a RequestTiming or OperationTiming."""
+        if timing.kind == "request":
+            status = str(timing.status_code) if timing.status_code is not None else "error"
+            self.requests.labels(timing.endpoint, status).inc()
+            self.request_duration.labels(timing.endpoint).observe(timing.total)
+            if timing.attempts > 1:
+                self.retries.labels(timing.endpoint).inc(timing.attempts - 1)
+            if timing.new_connections:
+                self.connections_opened.labels(timing.endpoint).inc(timing.new_connections)
+            if timing.endpoint == "token" and timing.status_code == 200:
+                self.token_refreshes.inc()
+        else:
+            self.operation_duration.labels(timing.operation).observe(timing.total)
+            self.rate_limit_wait.labels(timing.operation).observe(timing.rate_limit_wait)
+            if timing.error is not None:
+                self.errors.labels(timing.operation, timing.error).inc()
+
+    def track_rate_limiter(self, limiter) -> None:
+        """Export the cumulative wait, rejections and available tokens of a limiter."""
+        self.limiter_wait.labels(limiter.name).set_function(lambda: limiter.total_wait_time)
+        self.limiter_rejections.labels(limiter.name).set_function(lambda: limiter.rejections)
+        self.limiter_available.labels(limiter.name).set_function(
+            lambda: limiter.available_tokens
+        )
+
+    def track_http_client(self, http_client) -> None:
+        """Export the pool, hedging, retry budget and bulkhead usage of a SecureHTTPClient."""
+        with self._lock:
+            self._http_clients.add(http_client)
+
+    def track_circuit_breakers(self, breakers) -> None:
+        """Export the state, rejections and openings of a CircuitBreakers group."""
+        with self._lock:
+            if all(g is not breakers for g in self._breaker_groups):
+                self._breaker_groups.append(breakers)
+
+    def track_client(self, client) -> None:
+        """
+        Track the rate limiters, HTTP clients and circuit breakers of an
+        MVolaClient (or auth/transaction).
+        """
+        from .transport import http_clients_of
+
+        for http_client in http_clients_of(client):
+            self.track_http_client(http_client)
+            if http_client.circuit_breakers is not None:
+                self.track_circuit_breakers(http_client.circuit_breakers)
+        owners = (client, getattr(client, "_auth", None), getattr(client, "_transaction", None))
+        for owner in owners:
+            limiter = getattr(owner, "_rate_limiter", None)
+            if limiter is not None:
+                self.track_rate_limiter(limiter)
+
+    def _collect_pools(self) -> None:
+        with self._lock:
+            http_clients = list(self._http_clients)
+        totals: Dict[Tuple[str, str], int] = {}
+        for http_client in http_clients:
+            for host, idle, opened in http_client.pool_stats():
+                totals[(host, "idle")] = totals.get((host, "idle"), 0) + idle
+                totals[(host, "opened")] = totals.get((host, "opened"), 0) + opened
+        for (host, state), value in totals.items():
+            self.pool_connections.labels(host, state).set(value)
+
+        hedgers = {id(c.hedging): c.hedging for c in http_clients if c.hedging is not None}
+        hedged = sum(h.hedged for h in hedgers.values())
+        wins = sum(h.hedge_wins for h in hedgers.values())
+        self.hedged.set_function(lambda: hedged)
+        self.hedge_wins.set_function(lambda: wins)
+
+        budgets = {
+            id(c.retry_policy.budget): c.retry_policy.budget
+            for c in http_clients if c.retry_policy.budget is not None
+        }
+        exhausted = sum(b.exhausted for b in budgets.values())
+        self.retry_budget_exhausted.set_function(lambda: exhausted)
+
+        bulkheads = {id(c.bulkhead): c.bulkhead for c in http_clients if c.bulkhead is not None}
+        for bulkhead in bulkheads.values():
+            self.bulkhead_active.labels(bulkhead.name).set_function(lambda b=bulkhead: b.active)
+            self.bulkhead_rejections.labels(bulkhead.name).set_function(
+                lambda b=bulkhead: b.rejections
+            )
+            self.bulkhead_wait.labels(bulkhead.name).set_function(
+                lambda b=bulkhead: b.total_wait_time
+            )
+
+        limiters = {
+            id(c.concurrency_limiter): c.concurrency_limiter
+            for c in http_clients if c.concurrency_limiter is not None
+        }
+        for limiter in limiters.values():
+            self.concurrency_limit.labels(limiter.name).set_function(lambda lim=limiter: lim.limit)
+            self.concurrency_in_flight.labels(limiter.name).set_function(
+                lambda lim=limiter: lim.in_flight
+            )
+            self.load_shed.labels(limiter.name).set_function(lambda lim=limiter: lim.shed)
+
+    def _collect_breakers(self) -> None:
+        from .circuit_breaker import STATE_VALUES
+
+        with self._lock:
+            groups = list(self._breaker_groups)
+        states: Dict[str, int] = {}
+        rejections: Dict[str, int] = {}
+        opened: Dict[str, int] = {}
+        for group in groups:
+            for name, breaker in group:
+                states[name] = max(states.get(name, 0), STATE_VALUES[breaker.state])
+                rejections[name] = rejections.get(name, 0) + breaker.rejections
+                opened[name] = opened.get(name, 0) + breaker.opened
+        for name, value in states.items():
+            self.breaker_state.labels(name).set(value)
+            self.breaker_rejections.labels(name).set_function(
+                lambda value=rejections[name]: value
+            )
+            self.breaker_opened.labels(name).set_function(lambda value=opened[name]: value)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 - http.server API
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.server.registry.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """
+    Minimal HTTP endpoint serving a registry at /metrics.
+
+    Binds to the loopback interface by default; pass host explicitly to
+    expose it to a scraper on another machine.
+
+    Args:
+        registry: Registry to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0):
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Metrics server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._server = ThreadingHTTPServer((self._host, self._port), _MetricsRequestHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self._registry
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="mvola-metrics",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -0,0 +1,597 @@
+"""
+Resumable bulk payouts from CSV or JSON Lines files.
+
+BulkPayout streams payout rows from a file, validates them in batches
+and submits them through an MVolaClient with bounded concurrency, its
+rate limiter pacing the calls. Every payout goes through a local
+journal (JSON Lines, flushed and fsynced per entry):
+
+    {"id": "p-1", "state": "submitting"}                # before the POST
+    {"id": "p-1", "state": "submitted", "server_correlation_id": "..."}
+
+so a run interrupted by a crash or Ctrl-C can be started again with the
+same journal without paying anyone twice:
+- submitted and rejected (4xx) payouts are final and skipped
+- invalid and not_sent payouts (validation failure, rate limit, open
+  circuit, token failure, 401/403/429: the payment was not sent or
+  not processed) are tried again
+- unknown payouts (5xx, timeout, or "submitting" without an outcome,
+  i.e. the process died mid-request) may have been paid: they are
+  skipped and reported, and only resubmitted with retry_unknown=True
+  once checked (e.g. with the reconciliation engine)
+
+Each row is sent with the row id as requestingOrganisationTransactionReference
+and a correlation ID derived from it, so MVola records can be matched
+to the file. Outcomes are also appended to a results file as they come.
+
+Row fields (CSV header or JSON keys): id, amount, credit_msisdn, and
+optionally debit_msisdn and description (defaults given to BulkPayout).
+
+With processes > 1, the payments are made by worker processes (see
+sharding.py), each with its own MVolaClient built by client_factory,
+all drawing from one rate limit with the settings of the client's. Rows
+are sharded by payer (debit MSISDN), so the payouts of one payer are
+sent one at a time, in file order; shard_by="id" spreads a file paid
+from a single MSISDN over all the workers instead. The parent reads and
+validates the rows, and journals their outcomes as they stream back
+(one fsync per group of rows). Each worker journals `submitting` itself,
+appending to the same file just before sending a row, so that when a
+worker dies only the row it was sending becomes unknown; the rows it
+had not sent yet come back not_sent.
+
+Command line: mvola payout (see cli.py)
+"""
+
+import csv
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .bulkhead import BulkheadFullError
+from .circuit_breaker import CircuitOpenError
+from .concurrency import LoadShedError
+from .exceptions import (
+    MVolaAuthError,
+    MVolaError,
+    MVolaTransactionError,
+    MVolaValidationError,
+)
+from .rate_limiter import RateLimitError, TokenBucketRateLimiter
+from .sharding import ShardedPool, ShardError, start_manager
+
+SUBMITTING = "submitting"
+SUBMITTED = "submitted"
+REJECTED = "rejected"
+INVALID = "invalid"
+NOT_SENT = "not_sent"
+UNKNOWN = "unknown"
+
+# States after which a payout is never sent again
+FINAL_STATES = frozenset([SUBMITTED, REJECTED])
+
+# Payment responses meaning the payment was not processed (token
+# refused, throttled): the payout is tried again on the next run
+NOT_PROCESSED_CODES = frozenset([401, 403, 429])
+
+# Rate-limited attempts at a payout before leaving it not_sent for the
+# next run, and seconds waited between two of them
+MAX_RATE_LIMITED_ATTEMPTS = 10
+RATE_LIMIT_BACKOFF = 1.0
+
+# Keys rows can be sharded by (see BulkPayout)
+SHARD_KEYS = ("debit_msisdn", "id")
+
+# Namespace of the correlation IDs derived from payout ids
+_CORRELATION_NAMESPACE = uuid.UUID("8f3b6a52-4c1e-4d6b-9a57-2f0c1e9d7b31")
+
+
+class PayoutRow:
+    """
+    One payout of an input file.
+
+    Args:
+        id: Unique payout id (idempotency key of the journal)
+        amount: Amount in Ariary
+        credit_msisdn: Beneficiary MSISDN
+        debit_msisdn: Paying MSISDN (default: BulkPayout's)
+        description: Payment description (default: BulkPayout's)
+        line: Line or record number in the input file
+    """
+
+    __slots__ = ("id", "amount", "credit_msisdn", "debit_msisdn", "description", "line")
+
+    def __init__(self, id: str, amount: Any, credit_msisdn: str,
+                 debit_msisdn: Optional[str] = None, description: Optional[str] = None,
+                 line: int = 0):
+        self.id = str(id or "").strip()
+        self.amount = str(amount or "").strip()
+        self.credit_msisdn = str(credit_msisdn or "").strip()
+        self.debit_msisdn = debit_msisdn or None
+        self.description = description or None
+        self.line = line
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any], line: int = 0) -> "PayoutRow":
+        return cls(
+            row.get("id"),
+            row.get("amount"),
+            row.get("credit_msisdn"),
+            debit_msisdn=row.get("debit_msisdn"),
+            description=row.get("description"),
+            line=line,
+        )
+
+
+def read_payouts(path: str, file_format: Optional[str] = None) -> Iterator[PayoutRow]:
+    """
+    Stream payout rows from a CSV (with header) or JSON Lines file.
+
+    Args:
+        path: Input file
+        file_format: "csv" or "jsonl" (default: from the file extension)
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8") as fh:
+            # Line 1 is the header
+            for line, row in enumerate(csv.DictReader(fh), start=2):
+                yield PayoutRow.from_dict(row, line)
+    elif file_format == "jsonl":
+        with open(path, encoding="utf-8") as fh:
+            for line, text in enumerate(fh, start=1):
+                if text.strip():
+                    yield PayoutRow.from_dict(json.loads(text), line)
+    else:
+        raise ValueError(f"Unknown payout file format: {file_format!r}")
+
+
+class PayoutJournal:
+    """
+    Append-only journal of payout states, durable across crashes.
+
+    Several processes may append to one journal (each entry is written
+    with a single write); refresh() reads the entries of the others.
+
+    Args:
+        path: Journal file (created if missing, replayed if present)
+        fsync: Sync each entry to disk before returning
+        replay: Load the states of an existing file (False for a journal
+            only appended to, as in payout worker processes)
+    """
+
+    def __init__(self, path: str, fsync: bool = True, replay: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._states: Dict[str, str] = {}
+        # Bytes of the file replayed so far
+        self._replayed = 0
+        self._fh = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        if replay:
+            self.refresh()
+            if os.path.getsize(path) > self._replayed:
+                # Torn last line of a crashed run: end it, so that the
+                # entries appended now stay whole
+                self._fh.write("\n")
+                self._fh.flush()
+
+    def refresh(self) -> None:
+        """Replay the entries appended since the last replay, e.g. by other processes."""
+        with self._lock:
+            with open(self.path, "rb") as fh:
+                fh.seek(self._replayed)
+                data = fh.read()
+            # A line still being written is replayed next time
+            end = data.rfind(b"\n") + 1
+            for text in data[:end].splitlines():
+                try:
+                    entry = json.loads(text)
+                except ValueError:
+                    # Torn line of a crashed run
+                    continue
+                self._states[entry["id"]] = entry["state"]
+            self._replayed += end
+
+    def state(self, payout_id: str) -> Optional[str]:
+        """Last recorded state of a payout (None if never journaled)."""
+        return self._states.get(payout_id)
+
+    def record(self, payout_id: str, state: str, **fields: Any) -> None:
+        """Append a state change and make it durable."""
+        self.record_many([(payout_id, state, fields)])
+
+    def record_many(self, entries: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Append (id, state, fields) state changes with a single fsync."""
+        entries = list(entries)
+        if not entries:
+            return
+        text = "".join(
+            json.dumps(dict(id=payout_id, state=state, **fields)) + "\n"
+            for payout_id, state, fields in entries
+        )
+        with self._lock:
+            self._fh.write(text)
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            for payout_id, state, _ in entries:
+                self._states[payout_id] = state
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _send(client: Any, row: PayoutRow, debit_msisdn: str, description: str,
+          stopping: Any) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """Pay one row; returns its state, journal fields and a reason to stop the run."""
+    for attempt in range(MAX_RATE_LIMITED_ATTEMPTS):
+        if stopping.is_set() or (attempt and stopping.wait(RATE_LIMIT_BACKOFF)):
+            return NOT_SENT, {"error": "run stopped before sending"}, None
+        try:
+            result = client.initiate_payment(
+                amount=row.amount,
+                debit_msisdn=row.debit_msisdn or debit_msisdn,
+                credit_msisdn=row.credit_msisdn,
+                description=row.description or description,
+                correlation_id=str(uuid.uuid5(_CORRELATION_NAMESPACE, row.id)),
+                requesting_organisation_transaction_reference=row.id,
+            )
+        except RateLimitError:
+            # Raised before sending: wait for the limiter again
+            continue
+        except MVolaValidationError as e:
+            return INVALID, {"error": e.message}, None
+        except (CircuitOpenError, MVolaAuthError) as e:
+            # Nothing was sent; the gateway or credentials are failing
+            return NOT_SENT, {"error": str(e)}, f"{type(e).__name__}: {e}"
+        except MVolaTransactionError as e:
+            if e.code in NOT_PROCESSED_CODES:
+                return NOT_SENT, {"error": str(e)}, None
+            if e.code is not None and 400 <= e.code < 500:
+                return REJECTED, {"error": str(e)}, None
+            return UNKNOWN, {"error": str(e)}, None
+        except (BulkheadFullError, LoadShedError) as e:
+            # Rejected locally before sending
+            return NOT_SENT, {"error": str(e)}, None
+        except MVolaError as e:
+            return UNKNOWN, {"error": str(e)}, None
+        except Exception as e:
+            return UNKNOWN, {"error": f"{type(e).__name__}: {e}"}, None
+        try:
+            server_correlation_id = result.server_correlation_id
+        except MVolaError:
+            # Accepted, but the body cannot be decoded: paid all the same
+            server_correlation_id = None
+        return SUBMITTED, {"server_correlation_id": server_correlation_id}, None
+    return NOT_SENT, {"error": f"rate limited {MAX_RATE_LIMITED_ATTEMPTS} times"}, None
+
+
+class _ShardWorker:
+    """Pays the rows of a shard in a worker process (see ShardedPool)."""
+
+    def __init__(self, stopping: Any, client_factory: Callable[..., Any],
+                 limiter: Tuple[Any, ...], debit_msisdn: str, description: str,
+                 journal_path: str, fsync: bool):
+        max_tokens, refill_rate, name, state, lock = limiter
+        self._client = client_factory(rate_limiter=TokenBucketRateLimiter(
+            max_tokens, refill_rate, name, state=state, lock=lock
+        ))
+        self._journal = PayoutJournal(journal_path, fsync=fsync, replay=False)
+        self._stopping = stopping
+        self._debit_msisdn = debit_msisdn
+        self._description = description
+
+    def __call__(self, row: PayoutRow) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        if self._stopping.is_set():
+            return NOT_SENT, {"error": "run stopped before sending"}, None
+        # Journaled here, so that a dead worker leaves only this row unknown
+        self._journal.record(row.id, SUBMITTING)
+        return _send(self._client, row, self._debit_msisdn, self._description, self._stopping)
+
+    def close(self) -> None:
+        self._client.close()
+        self._journal.close()
+
+
+class BulkPayout:
+    """
+    Submits a stream of payouts through an MVolaClient.
+
+    The client's transaction rate limiter sets the pace (rate-limited
+    calls are retried, as nothing was sent); `concurrency` bounds the
+    calls in flight.
+
+    Args:
+        client: MVolaClient used for the payments
+        journal: Journal of the run (reuse it to resume)
+        results_path: JSON Lines file outcomes are appended to (optional)
+        concurrency: Payments in flight at once
+        batch_size: Rows read and validated together
+        debit_msisdn: Paying MSISDN of rows that do not set one
+            (default: the client's partner MSISDN)
+        description: Description of rows that do not set one
+        retry_unknown: Resubmit payouts whose outcome is unknown
+            (only after checking they were not paid)
+        processes: Worker processes making the payments, each with
+            `concurrency` payments in flight (1: threads of this process)
+        client_factory: Picklable callable building the client of a
+            worker process, called with rate_limiter= the shared limiter
+            (default: MVolaClient with the client's sandbox, partner name
+            and MSISDN, and credentials from the environment)
+        shard_by: Row field the rows are sharded by: "debit_msisdn"
+            (payouts of one payer are sent one at a time, in order) or "id"
+        mp_context: multiprocessing context of the workers (default: the
+            platform's default start method)
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        journal: PayoutJournal,
+        results_path: Optional[str] = None,
+        concurrency: int = 4,
+        batch_size: int = 500,
+        debit_msisdn: Optional[str] = None,
+        description: str = "Payout",
+        retry_unknown: bool = False,
+        processes: int = 1,
+        client_factory: Optional[Callable[..., Any]] = None,
+        shard_by: str = "debit_msisdn",
+        mp_context: Any = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"shard_by must be one of {SHARD_KEYS}")
+        self._client = client
+        self._journal = journal
+        self._results_path = results_path
+        self._concurrency = concurrency
+        self._batch_size = batch_size
+        self._debit_msisdn = debit_msisdn or client.partner_msisdn
+        self._description = description
+        self._retry_unknown = retry_unknown
+        self._processes = processes
+        self._client_factory = client_factory or functools.partial(
+            type(client),
+            sandbox=client.sandbox,
+            partner_name=client.partner_name,
+            partner_msisdn=client.partner_msisdn,
+        )
+        self._shard_by = shard_by
+        self._mp_context = mp_context
+
+        self._pool: Optional[ShardedPool] = None
+        self._results = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.stop_reason: Optional[str] = None
+        self.summary: Dict[str, int] = {}
+
+    def stop(self, reason: str = "stopped") -> None:
+        """Submit no further payouts; those in flight still complete."""
+        if not self._stopping.is_set():
+            self.stop_reason = reason
+            self._stopping.set()
+            pool = self._pool
+            if pool is not None:
+                pool.stop()
+
+    # --- Outcomes ---
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.summary[outcome] = self.summary.get(outcome, 0) + 1
+
+    def _outcome(self, row: PayoutRow, state: str, journal: bool = True, **fields: Any) -> None:
+        if journal:
+            self._journal.record(row.id, state, **fields)
+        self._report(row, state, fields)
+
+    def _report(self, row: PayoutRow, state: str, fields: Dict[str, Any]) -> None:
+        if self._results is not None:
+            line = json.dumps(dict(id=row.id, line=row.line, state=state, **fields)) + "\n"
+            with self._lock:
+                self._results.write(line)
+                self._results.flush()
+        self._count(state)
+
+    # --- Submission ---
+
+    def _validate(self, row: PayoutRow) -> Optional[str]:
+        if not row.id:
+            return "missing id"
+        try:
+            self._client.validate_payment(
+                row.amount,
+                row.debit_msisdn or self._debit_msisdn,
+                row.credit_msisdn,
+                row.description or self._description,
+            )
+        except MVolaValidationError as e:
+            return e.message
+        return None
+
+    def _submit(self, row: PayoutRow) -> None:
+        self._journal.record(row.id, SUBMITTING)
+        state, fields, stop_reason = _send(
+            self._client, row, self._debit_msisdn, self._description, self._stopping
+        )
+        self._outcome(row, state, **fields)
+        if stop_reason:
+            self.stop(stop_reason)
+
+    def _pending(self, rows: List[PayoutRow], seen: set) -> Iterator[PayoutRow]:
+        """Rows of a batch that should be submitted now."""
+        for row in rows:
+            if row.id and row.id in seen:
+                self._outcome(row, INVALID, journal=False, error="duplicate id in file")
+                continue
+            seen.add(row.id)
+            state = self._journal.state(row.id)
+            if state in FINAL_STATES:
+                self._count(f"skipped_{state}")
+                continue
+            if state in (SUBMITTING, UNKNOWN) and not self._retry_unknown:
+                self._outcome(row, UNKNOWN, journal=state != UNKNOWN,
+                              error="outcome of an earlier attempt is unknown")
+                continue
+            error = self._validate(row)
+            if error:
+                self._outcome(row, INVALID, error=error)
+                continue
+            yield row
+
+    def run(self, rows: Iterable[PayoutRow]) -> Dict[str, int]:
+        """
+        Submit the payouts and return the count of each outcome.
+
+        Stops early (see stop_reason) on stop(), KeyboardInterrupt, an
+        open circuit or a token failure; payouts in flight are always
+        completed and journaled first. Counts of rows skipped as already
+        done are reported as skipped_submitted / skipped_rejected.
+        """
+        self.summary = {}
+        if self._results_path:
+            self._results = open(self._results_path, "a", encoding="utf-8")
+        seen: set = set()
+        try:
+            if self._processes > 1:
+                self._run_sharded(iter(rows), seen)
+            else:
+                self._run_threads(iter(rows), seen)
+        finally:
+            if self._results is not None:
+                self._results.close()
+                self._results = None
+        return dict(self.summary)
+
+    def _batches(self, rows: Iterator[PayoutRow]) -> Iterator[List[PayoutRow]]:
+        while not self._stopping.is_set():
+            batch = [row for _, row in zip(range(self._batch_size), rows)]
+            if not batch:
+                return
+            yield batch
+
+    def _run_threads(self, rows: Iterator[PayoutRow], seen: set) -> None:
+        with ThreadPoolExecutor(self._concurrency, thread_name_prefix="mvola-payout") as executor:
+            in_flight: deque = deque()
+            try:
+                for batch in self._batches(rows):
+                    for row in self._pending(batch, seen):
+                        if self._stopping.is_set():
+                            break
+                        in_flight.append(executor.submit(self._submit, row))
+                        while len(in_flight) >= 2 * self._concurrency:
+                            in_flight.popleft().result()
+                while in_flight:
+                    in_flight.popleft().result()
+            except KeyboardInterrupt:
+                self.stop("interrupted")
+                for future in in_flight:
+                    future.cancel()
+                # Cancelled payouts were never journaled: the next run sends them
+
+    # --- Process pool ---
+
+    def _shard_key(self, row: PayoutRow) -> str:
+        if self._shard_by == "id":
+            return row.id
+        return row.debit_msisdn or self._debit_msisdn
+
+    def _run_sharded(self, rows: Iterator[PayoutRow], seen: set) -> None:
+        context = self._mp_context or multiprocessing.get_context()
+        limiter = self._client.rate_limiter
+        manager = start_manager(context)
+        try:
+            shared_limiter = (limiter.max_tokens, limiter.refill_rate, limiter.name,
+                              manager.dict(), manager.Lock())
+            self._pool = ShardedPool(
+                _ShardWorker,
+                (self._client_factory, shared_limiter, self._debit_msisdn, self._description,
+                 self._journal.path, self._journal.fsync),
+                processes=self._processes,
+                threads=self._concurrency,
+                mp_context=context,
+            )
+            if self._stopping.is_set():
+                self._pool.stop()
+            with self._pool as pool:
+                in_flight: Dict[str, PayoutRow] = {}
+                window = 2 * self._concurrency * self._processes
+                try:
+                    for batch in self._batches(rows):
+                        pending = deque(self._pending(batch, seen))
+                        while pending and not self._stopping.is_set():
+                            room = window - len(in_flight)
+                            if room <= 0:
+                                self._collect(pool, in_flight)
+                                continue
+                            for _ in range(min(room, len(pending))):
+                                row = pending.popleft()
+                                pool.submit(self._shard_key(row), row)
+                                in_flight[row.id] = row
+                except KeyboardInterrupt:
+                    self.stop("interrupted")
+                # Rows handed to the workers are always settled; those not
+                # sent yet come back as not_sent once stopping
+                while in_flight:
+                    try:
+                        self._collect(pool, in_flight)
+                    except KeyboardInterrupt:
+                        self.stop("interrupted")
+        finally:
+            self._pool = None
+            manager.shutdown()
+
+    def _collect(self, pool: ShardedPool, in_flight: Dict[str, PayoutRow]) -> None:
+        """Journal and report the outcomes sent back by the workers."""
+        try:
+            completed = pool.results()
+        except ShardError as e:
+            if e.item is not None:
+                lost = [e.item]
+            else:
+                lost = [row for row in in_flight.values()
+                        if pool.shard_of(self._shard_key(row)) == e.shard]
+                self.stop(f"payout worker {e.shard} died")
+            # Rows the worker journaled as submitting may have been sent
+            self._journal.refresh()
+            for row in lost:
+                in_flight.pop(row.id, None)
+                if self._journal.state(row.id) == SUBMITTING:
+                    self._outcome(row, UNKNOWN, error=str(e))
+                else:
+                    self._outcome(row, NOT_SENT, error=str(e))
+            return
+
+        # Rows already settled as lost (dead worker) are not counted twice;
+        # having been journaled submitting by the worker, they are unknown
+        completed = [(row, outcome) for row, outcome in completed if row.id in in_flight]
+        self._journal.record_many(
+            (row.id, state, fields) for row, (state, fields, _) in completed
+        )
+        for row, (state, fields, stop_reason) in completed:
+            in_flight.pop(row.id, None)
+            self._report(row, state, fields)
+            if stop_reason:
+                self.stop(stop_reason)
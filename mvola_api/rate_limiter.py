@@ -3,10 +3,18 @@ Thread-safe rate limiter for MVola API calls.
 
 Implements a token bucket algorithm to prevent API abuse
 and protect against runaway transaction loops.
+
+The bucket can live in a mapping shared between processes, e.g. with
+multiprocessing.Manager().dict() and Manager().Lock(), so that worker
+processes draw from one rate limit (see sharding.py).
 """
 
 import threading
 import time
+from typing import Any, MutableMapping, Optional, Tuple
+
+from . import forking
+from .deadline import Deadline, DeadlineExceededError
 from .exceptions import MVolaError
 
 
@@ -26,9 +34,21 @@ class TokenBucketRateLimiter:
         max_tokens: Maximum number of tokens (requests) in the bucket
         refill_rate: Tokens added per second
         name: Name of this limiter (for error messages)
+        state: Mapping holding the bucket under the limiter name (default:
+            private to the limiter; pass a multiprocessing.Manager().dict()
+            to share it between processes)
+        lock: Lock guarding the state (pass a Manager().Lock() with a
+            shared state)
     """
 
-    def __init__(self, max_tokens: int = 10, refill_rate: float = 1.0, name: str = "api"):
+    def __init__(
+        self,
+        max_tokens: int = 10,
+        refill_rate: float = 1.0,
+        name: str = "api",
+        state: Optional[MutableMapping[str, Tuple[float, float]]] = None,
+        lock: Any = None,
+    ):
         if max_tokens <= 0:
             raise ValueError("max_tokens must be positive")
         if refill_rate <= 0:
@@ -38,18 +58,53 @@ class TokenBucketRateLimiter:
         self._refill_rate = refill_rate
         self._tokens = float(max_tokens)
         self._last_refill = time.monotonic()
-        self._lock = threading.Lock()
+        self._state = state
+        self._shared_lock = lock is not None
+        self._lock = lock or threading.Lock()
         self._name = name
 
+        # Cumulative statistics (for load tests and metrics)
+        self._total_wait = 0.0
+        self._rejections = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        """Start a forked child with a fresh lock and a full bucket."""
+        self._total_wait = 0.0
+        self._rejections = 0
+        if self._state is not None:
+            # The bucket is shared with the parent: keep it
+            if not self._shared_lock:
+                self._lock = threading.Lock()
+            return
+        self._lock = threading.Lock()
+        self._tokens = float(self._max_tokens)
+        self._last_refill = time.monotonic()
+
     def _refill(self) -> None:
         """Refill tokens based on elapsed time."""
+        if self._state is not None:
+            # Shared buckets are (tokens, wall-clock time of the last
+            # refill), meaningful across processes
+            now = time.time()
+            tokens, last_refill = self._state.get(self._name, (float(self._max_tokens), now))
+            elapsed = max(0.0, now - last_refill)
+            self._tokens = min(self._max_tokens, tokens + elapsed * self._refill_rate)
+            self._last_refill = now
+            return
         now = time.monotonic()
         elapsed = now - self._last_refill
         tokens_to_add = elapsed * self._refill_rate
         self._tokens = min(self._max_tokens, self._tokens + tokens_to_add)
         self._last_refill = now
 
-    def acquire(self, tokens: int = 1, blocking: bool = True, timeout: float = 30.0) -> bool:
+    def acquire(
+        self,
+        tokens: int = 1,
+        blocking: bool = True,
+        timeout: float = 30.0,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
         """
         Acquire tokens from the bucket.
 
@@ -57,6 +112,7 @@ class TokenBucketRateLimiter:
             tokens: Number of tokens to acquire
             blocking: If True, wait until tokens are available
             timeout: Maximum time to wait (seconds) if blocking
+            deadline: Call deadline; the wait never extends past it
 
         Returns:
             True if tokens were acquired
@@ -64,20 +120,42 @@ class TokenBucketRateLimiter:
         Raises:
             RateLimitError: If non-blocking and no tokens available,
                            or if timeout exceeded
+            DeadlineExceededError: If the deadline passed while waiting
         """
         if tokens <= 0:
             raise ValueError("tokens must be positive")
 
-        deadline = time.monotonic() + timeout if blocking else 0
+        bounded_by_deadline = deadline is not None and deadline.remaining() < timeout
+        if bounded_by_deadline:
+            timeout = deadline.remaining()
+        wait_until = time.monotonic() + timeout if blocking else 0
+        wait_start = None
 
         while True:
             with self._lock:
                 self._refill()
                 if self._tokens >= tokens:
                     self._tokens -= tokens
+                    if self._state is not None:
+                        self._state[self._name] = (self._tokens, self._last_refill)
+                    if wait_start is not None:
+                        self._total_wait += time.monotonic() - wait_start
                     return True
-
-            if not blocking or time.monotonic() >= deadline:
+                shortfall = tokens - self._tokens
+
+            now = time.monotonic()
+            if wait_start is None:
+                wait_start = now
+
+            # Fail fast when the missing tokens cannot be refilled in time
+            if not blocking or now + shortfall / self._refill_rate > wait_until:
+                with self._lock:
+                    self._rejections += 1
+                    self._total_wait += now - wait_start
+                if blocking and bounded_by_deadline:
+                    raise DeadlineExceededError(
+                        message=f"Deadline exceeded waiting for the {self._name} rate limiter"
+                    )
                 raise RateLimitError(
                     message=(
                         f"Rate limit exceeded for {self._name}. "
@@ -86,8 +164,8 @@ class TokenBucketRateLimiter:
                     )
                 )
 
-            # Wait a small interval before retrying
-            time.sleep(min(0.1, timeout / 10))
+            # Sleep until the missing tokens are refilled
+            time.sleep(shortfall / self._refill_rate)
 
     @property
     def available_tokens(self) -> float:
@@ -96,6 +174,31 @@ class TokenBucketRateLimiter:
             self._refill()
             return self._tokens
 
+    @property
+    def name(self) -> str:
+        """Name of this limiter."""
+        return self._name
+
+    @property
+    def max_tokens(self) -> int:
+        """Bucket size (burst)."""
+        return self._max_tokens
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens added per second."""
+        return self._refill_rate
+
+    @property
+    def total_wait_time(self) -> float:
+        """Cumulative time (seconds) callers spent waiting for tokens."""
+        return self._total_wait
+
+    @property
+    def rejections(self) -> int:
+        """Number of acquire() calls that raised RateLimitError."""
+        return self._rejections
+
     def __repr__(self) -> str:
         return (
             f"TokenBucketRateLimiter(name='{self._name}', "
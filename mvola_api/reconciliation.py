@@ -0,0 +1,543 @@
+"""
+Reconciliation of a local ledger against MVola.
+
+Compares our own transaction records with what MVola reports and emits
+the differences as a stream of Discrepancy objects:
+- missing: in the ledger, unknown to MVola
+- mismatched: known to both, but amount, currency, status, parties or
+  fees differ
+- orphaned: reported by MVola (statement), absent from the ledger
+- error: the details lookup failed (circuit open, 5xx, ...); the entry
+  should be checked again later
+
+MVola's side comes from get_transaction_details, fetched with bounded
+concurrency (results stay in ledger order) and an LRU cache of final
+details, and/or from a statement: a stream of MVola records, e.g. a
+JSONL export of details bodies. A statement is joined to the ledger by
+sort-merge, so both must be sorted by transaction_id (see
+sort_records for an external sort of unsorted files); memory then stays
+bounded whatever the number of rows. Orphans can only be detected with
+a statement, as the API cannot list transactions. Ledger entries absent
+from the statement are looked up through the API when a client is given
+(statements may lag) and reported missing only if MVola does not know
+them.
+
+Progress can be checkpointed to a JSON file and a run resumed from it.
+A checkpoint only counts entries whose discrepancy the caller has
+consumed (asked for the next one), so after a crash the last entry is
+emitted again rather than lost.
+
+Usage:
+    reconciler = Reconciler(client, concurrency=8, checkpoint_path="2026-10-19.ckpt")
+    ledger = read_csv("ledger-2026-10-19.csv")
+    for discrepancy in reconciler.run(ledger):
+        report.write(json.dumps(discrepancy.to_dict()) + "\\n")
+    print(reconciler.summary)
+"""
+
+import csv
+import heapq
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .exceptions import MVolaError
+
+MISSING = "missing"
+MISMATCHED = "mismatched"
+ORPHANED = "orphaned"
+ERROR = "error"
+
+# Fields compared between a ledger record and MVola's record
+COMPARED_FIELDS = ("amount", "currency", "status", "debit_msisdn", "credit_msisdn", "fees")
+
+# Statuses that can no longer change (only these are cached)
+FINAL_STATUSES = frozenset(["completed", "failed"])
+
+
+def _decimal(value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value).strip())
+    except InvalidOperation:
+        return str(value)
+
+
+def _party_msisdn(parties: Any) -> Optional[str]:
+    for party in parties or ():
+        if isinstance(party, dict) and party.get("key") == "msisdn":
+            return party.get("value")
+    return None
+
+
+class LedgerRecord:
+    """
+    One transaction, from our ledger or from MVola.
+
+    Fields left as None are not compared. Amounts and fees are Decimals.
+
+    Args:
+        transaction_id: MVola transaction reference (objectReference)
+        amount: Transaction amount
+        currency: Currency code
+        status: completed, failed or pending
+        debit_msisdn: Payer MSISDN
+        credit_msisdn: Merchant MSISDN
+        fees: Total fees
+        reference: Our own reference, reported with discrepancies
+    """
+
+    __slots__ = ("transaction_id", "amount", "currency", "status", "debit_msisdn",
+                 "credit_msisdn", "fees", "reference")
+
+    def __init__(
+        self,
+        transaction_id: str,
+        amount: Any = None,
+        currency: Optional[str] = None,
+        status: Optional[str] = None,
+        debit_msisdn: Optional[str] = None,
+        credit_msisdn: Optional[str] = None,
+        fees: Any = None,
+        reference: Optional[str] = None,
+    ):
+        if not transaction_id:
+            raise ValueError("transaction_id is required")
+        self.transaction_id = str(transaction_id)
+        self.amount = _decimal(amount)
+        self.currency = currency or None
+        self.status = status.lower() if status else None
+        self.debit_msisdn = debit_msisdn or None
+        self.credit_msisdn = credit_msisdn or None
+        self.fees = _decimal(fees)
+        self.reference = reference or None
+
+    @classmethod
+    def from_details(cls, body: Mapping[str, Any]) -> "LedgerRecord":
+        """Record of an MVola transaction details body."""
+        fees = body.get("fees")
+        total_fees = None
+        if fees:
+            amounts = [_decimal(fee.get("feeAmount")) for fee in fees if isinstance(fee, dict)]
+            if all(isinstance(amount, Decimal) for amount in amounts):
+                total_fees = sum(amounts, Decimal(0))
+        return cls(
+            body.get("transactionReference") or body.get("objectReference"),
+            amount=body.get("amount"),
+            currency=body.get("currency"),
+            status=body.get("transactionStatus") or body.get("status"),
+            debit_msisdn=_party_msisdn(body.get("debitParty")),
+            credit_msisdn=_party_msisdn(body.get("creditParty")),
+            fees=total_fees,
+        )
+
+    @classmethod
+    def from_dict(cls, row: Mapping[str, Any]) -> "LedgerRecord":
+        """Record of a flat row (field names as above) or of a details body."""
+        if "transactionReference" in row:
+            return cls.from_details(row)
+        return cls(**{name: row.get(name) for name in cls.__slots__})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            name: str(value) if isinstance(value, Decimal) else value
+            for name in self.__slots__
+            for value in (getattr(self, name),)
+        }
+
+    def compare(self, other: "LedgerRecord") -> List[Tuple[str, Any, Any]]:
+        """Fields set on both records whose values differ: (name, ours, theirs)."""
+        differences = []
+        for name in COMPARED_FIELDS:
+            ours, theirs = getattr(self, name), getattr(other, name)
+            if ours is not None and theirs is not None and ours != theirs:
+                differences.append((name, ours, theirs))
+        return differences
+
+    def __repr__(self) -> str:
+        return f"LedgerRecord(transaction_id={self.transaction_id!r}, amount={self.amount})"
+
+
+class Discrepancy:
+    """
+    A difference between the ledger and MVola.
+
+    Attributes:
+        kind: MISSING, MISMATCHED, ORPHANED or ERROR
+        transaction_id: Transaction concerned
+        ledger: Our record (None for orphans)
+        mvola: MVola's record (None for missing entries and errors)
+        fields: Differing fields as (name, ledger value, MVola value)
+        error: Error message of a failed lookup
+    """
+
+    __slots__ = ("kind", "transaction_id", "ledger", "mvola", "fields", "error")
+
+    def __init__(self, kind: str, transaction_id: str, ledger: Optional[LedgerRecord] = None,
+                 mvola: Optional[LedgerRecord] = None,
+                 fields: Tuple[Tuple[str, Any, Any], ...] = (), error: Optional[str] = None):
+        self.kind = kind
+        self.transaction_id = transaction_id
+        self.ledger = ledger
+        self.mvola = mvola
+        self.fields = fields
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"kind": self.kind, "transaction_id": self.transaction_id}
+        if self.ledger is not None and self.ledger.reference:
+            data["reference"] = self.ledger.reference
+        if self.fields:
+            data["fields"] = {
+                name: {"ledger": str(ours), "mvola": str(theirs)}
+                for name, ours, theirs in self.fields
+            }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+    def __repr__(self) -> str:
+        return f"Discrepancy(kind={self.kind!r}, transaction_id={self.transaction_id!r})"
+
+
+# --- Record sources ---
+
+
+def read_csv(path: str, columns: Optional[Mapping[str, str]] = None,
+             delimiter: str = ",") -> Iterator[LedgerRecord]:
+    """
+    Stream ledger records from a CSV file with a header row.
+
+    Args:
+        path: CSV file
+        columns: LedgerRecord field -> CSV column, for columns named
+            differently (default: the field names)
+        delimiter: Field delimiter
+    """
+    columns = dict(columns or {})
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh, delimiter=delimiter):
+            yield LedgerRecord(**{
+                name: row.get(columns.get(name, name)) for name in LedgerRecord.__slots__
+            })
+
+
+def read_jsonl(path: str) -> Iterator[LedgerRecord]:
+    """Stream records from a JSON Lines file (flat rows or MVola details bodies)."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield LedgerRecord.from_dict(json.loads(line))
+
+
+def _records(source: Iterable[Any]) -> Iterator[LedgerRecord]:
+    for item in source:
+        yield item if isinstance(item, LedgerRecord) else LedgerRecord.from_dict(item)
+
+
+def sort_records(records: Iterable[Any], chunk_size: int = 100_000,
+                 tmpdir: Optional[str] = None) -> Iterator[LedgerRecord]:
+    """
+    Sort records by transaction_id with bounded memory (external merge sort).
+
+    Runs of chunk_size records are sorted in memory and spilled to
+    temporary files, which are then merged lazily.
+
+    Args:
+        records: Records (or dicts) in any order
+        chunk_size: Records held in memory at once
+        tmpdir: Directory for the temporary run files
+    """
+    runs = []
+    try:
+        chunk: List[LedgerRecord] = []
+        for record in _records(records):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                runs.append(_spill(chunk, tmpdir))
+                chunk = []
+        if not runs:
+            yield from sorted(chunk, key=lambda r: r.transaction_id)
+            return
+        if chunk:
+            runs.append(_spill(chunk, tmpdir))
+        streams = [read_jsonl(path) for path in runs]
+        yield from heapq.merge(*streams, key=lambda r: r.transaction_id)
+    finally:
+        for path in runs:
+            os.unlink(path)
+
+
+def _spill(chunk: List[LedgerRecord], tmpdir: Optional[str]) -> str:
+    chunk.sort(key=lambda r: r.transaction_id)
+    fd, path = tempfile.mkstemp(prefix="mvola-recon-", suffix=".jsonl", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        for record in chunk:
+            fh.write(json.dumps(record.to_dict()) + "\n")
+    return path
+
+
+def _ordered(records: Iterable[LedgerRecord], side: str) -> Iterator[LedgerRecord]:
+    previous = None
+    for record in records:
+        if previous is not None and record.transaction_id < previous:
+            raise ValueError(
+                f"{side} is not sorted by transaction_id "
+                f"({record.transaction_id!r} after {previous!r}); see sort_records"
+            )
+        previous = record.transaction_id
+        yield record
+
+
+# --- Engine ---
+
+
+class Reconciler:
+    """
+    Streams the differences between a ledger and MVola.
+
+    Args:
+        client: MVolaClient used to fetch transaction details (None:
+            compare against a statement only)
+        concurrency: Details lookups in flight at once
+        cache_size: Final (completed/failed) details kept in an LRU cache
+        checkpoint_path: JSON file progress is saved to and resumed from
+            (default: no checkpoints)
+        checkpoint_every: Ledger entries between two checkpoint writes
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        concurrency: int = 8,
+        cache_size: int = 10_000,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 1000,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+        self._client = client
+        self._concurrency = concurrency
+        self._cache_size = cache_size
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_every = checkpoint_every
+
+        self._cache: "OrderedDict[str, Optional[LedgerRecord]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.summary: Dict[str, int] = {}
+
+    # --- Details lookups ---
+
+    def _lookup(self, transaction_id: str) -> Tuple[Optional[LedgerRecord], Optional[str]]:
+        """MVola's record (None if unknown to MVola) and an error message."""
+        with self._cache_lock:
+            if transaction_id in self._cache:
+                self._cache.move_to_end(transaction_id)
+                self.cache_hits += 1
+                return self._cache[transaction_id], None
+        try:
+            details = self._client.get_transaction_details(transaction_id)
+            record = LedgerRecord.from_details(details.response)
+        except MVolaError as e:
+            if e.code != 404:
+                return None, str(e)
+            record = None
+        except (ValueError, AttributeError) as e:
+            # A body without a transaction reference, or not an object
+            return None, f"Unexpected transaction details: {e}"
+        if self._cache_size and (record is None or record.status in FINAL_STATUSES):
+            with self._cache_lock:
+                self._cache[transaction_id] = record
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return record, None
+
+    def _resolved(self, pairs: Iterator[Tuple[Optional[LedgerRecord], Optional[LedgerRecord]]]):
+        """
+        Fill in MVola's record for ledger entries without one, keeping order.
+
+        Yields (ledger, mvola, error); at most `concurrency` lookups run
+        and twice as many pairs are buffered.
+        """
+        if self._client is None:
+            for ledger, mvola in pairs:
+                yield ledger, mvola, None
+            return
+
+        window: deque = deque()
+        with ThreadPoolExecutor(self._concurrency, thread_name_prefix="mvola-recon") as executor:
+            for ledger, mvola in pairs:
+                if ledger is not None and mvola is None:
+                    window.append((ledger, executor.submit(self._lookup, ledger.transaction_id)))
+                else:
+                    window.append((ledger, mvola))
+                while len(window) > 2 * self._concurrency:
+                    yield self._settle(window.popleft())
+            while window:
+                yield self._settle(window.popleft())
+
+    @staticmethod
+    def _settle(entry):
+        ledger, pending = entry
+        if isinstance(pending, Future):
+            return (ledger, *pending.result())
+        return ledger, pending, None
+
+    # --- Joins ---
+
+    @staticmethod
+    def _merged(ledger: Iterator[LedgerRecord], statement: Iterator[LedgerRecord]):
+        """Sort-merge join by transaction_id: (ledger, mvola) with either side None."""
+        left, right = next(ledger, None), next(statement, None)
+        right_matched = False
+        while left is not None or right is not None:
+            if right is None or (left is not None and left.transaction_id < right.transaction_id):
+                yield left, None
+                left = next(ledger, None)
+            elif left is None or right.transaction_id < left.transaction_id:
+                if not right_matched:
+                    yield None, right
+                right, right_matched = next(statement, None), False
+            else:
+                # Duplicate ledger entries all match the same MVola record
+                yield left, right
+                right_matched = True
+                left = next(ledger, None)
+
+    @staticmethod
+    def _after(pairs, last_id: str, count: int):
+        """Pairs past the first `count` ones of transaction last_id."""
+        for ledger, mvola in pairs:
+            if count and (ledger or mvola).transaction_id == last_id:
+                count -= 1
+                continue
+            yield ledger, mvola
+
+    # --- Checkpoints ---
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not self._checkpoint_path or not os.path.exists(self._checkpoint_path):
+            return None
+        with open(self._checkpoint_path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self._checkpoint_path))
+        fd, tmp = tempfile.mkstemp(prefix=".mvola-recon-", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, self._checkpoint_path)
+
+    # --- Run ---
+
+    def run(self, ledger: Iterable[Any], statement: Optional[Iterable[Any]] = None,
+            resume: bool = True) -> Iterator[Discrepancy]:
+        """
+        Stream the discrepancies between the ledger and MVola.
+
+        Counts per outcome (checked, matched, missing, mismatched,
+        orphaned, error) are kept in self.summary, including those of
+        the run resumed from a checkpoint.
+
+        Args:
+            ledger: Our records (LedgerRecords or dicts); sorted by
+                transaction_id when a statement is given
+            statement: MVola records sorted by transaction_id, for
+                orphan detection (default: lookups only)
+            resume: Continue from the checkpoint file if there is one
+                (a completed run then yields nothing)
+
+        Raises:
+            ValueError: If no client and no statement are given, or a
+                statement join finds unsorted input
+        """
+        if self._client is None and statement is None:
+            raise ValueError("a client or a statement is required")
+        return self._run(ledger, statement, resume)
+
+    def _run(self, ledger: Iterable[Any], statement: Optional[Iterable[Any]],
+             resume: bool) -> Iterator[Discrepancy]:
+        outcomes = ("checked", "matched", MISSING, MISMATCHED, ORPHANED, ERROR)
+        # last_id_count: entries of transaction last_id consumed, as ids
+        # repeat (duplicate ledger entries, or orphans of a matched id)
+        state = (self._load_checkpoint() if resume else None) or {
+            "position": 0, "last_id": None, "last_id_count": 0, "complete": False,
+            "summary": dict.fromkeys(outcomes, 0),
+        }
+        self.summary = state["summary"]
+        if state["complete"]:
+            return
+
+        records = _records(ledger)
+        if statement is None:
+            # Lookups only: ledger order, resume by position
+            for _ in zip(range(state["position"]), records):
+                pass
+            pairs = ((record, None) for record in records)
+        else:
+            last_id = state["last_id"]
+            left = _ordered(records, "ledger")
+            right = _ordered(_records(statement), "statement")
+            if last_id is not None:
+                left = (r for r in left if r.transaction_id >= last_id)
+                right = (r for r in right if r.transaction_id >= last_id)
+            pairs = self._merged(left, right)
+            if last_id is not None:
+                pairs = self._after(pairs, last_id, state["last_id_count"])
+
+        # State only covers entries whose discrepancy the caller consumed
+        done = dict(state, summary=dict(self.summary))
+        unsaved = 0
+        try:
+            for ledger_record, mvola_record, error in self._resolved(pairs):
+                discrepancy = self._classify(ledger_record, mvola_record, error)
+                if ledger_record is not None:
+                    state["position"] += 1
+                    self.summary["checked"] += 1
+                record = ledger_record or mvola_record
+                if record.transaction_id == state["last_id"]:
+                    state["last_id_count"] += 1
+                else:
+                    state["last_id"], state["last_id_count"] = record.transaction_id, 1
+                self.summary[discrepancy.kind if discrepancy else "matched"] += 1
+
+                if discrepancy is not None:
+                    yield discrepancy
+                done = dict(state, summary=dict(self.summary))
+                unsaved += 1
+                if self._checkpoint_path and unsaved >= self._checkpoint_every:
+                    self._save_checkpoint(done)
+                    unsaved = 0
+            done["complete"] = True
+        finally:
+            if self._checkpoint_path:
+                self._save_checkpoint(done)
+
+    @staticmethod
+    def _classify(ledger: Optional[LedgerRecord], mvola: Optional[LedgerRecord],
+                  error: Optional[str]) -> Optional[Discrepancy]:
+        if ledger is None:
+            return Discrepancy(ORPHANED, mvola.transaction_id, mvola=mvola)
+        if error is not None:
+            return Discrepancy(ERROR, ledger.transaction_id, ledger=ledger, error=error)
+        if mvola is None:
+            return Discrepancy(MISSING, ledger.transaction_id, ledger=ledger)
+        fields = ledger.compare(mvola)
+        if fields:
+            return Discrepancy(MISMATCHED, ledger.transaction_id, ledger=ledger, mvola=mvola,
+                               fields=tuple(fields))
+        return None
@@ -0,0 +1,225 @@
+"""
+Typed results of MVola transaction calls.
+
+MVolaTransaction (and MVolaClient) return slotted result objects instead
+of dicts:
+- the response body is kept as the bytes received and decoded only when
+  a field is first read, so bulk jobs holding many results keep one
+  bytes object per result instead of a tree of dicts and strings
+- typed properties (status, server_correlation_id, transaction_id, ...)
+  replace lookups into result["response"] and format_transaction_response
+- results remain read-only mappings with the keys of the former dicts
+  ("success", "status_code", "response", plus "correlation_id" and
+  "timings" where set), so result["response"]["status"], result.get()
+  and dict(result) keep working; to_dict() returns a plain dict, e.g.
+  for json.dumps
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+from .exceptions import MVolaTransactionError
+
+
+class _Undecoded:
+    """Marks a body not decoded yet (None is a valid JSON body)."""
+
+    __slots__ = ()
+
+    def __reduce__(self) -> str:
+        # Unpickled results still compare their body to the same marker
+        return "_UNDECODED"
+
+
+_UNDECODED = _Undecoded()
+
+
+class TransactionResult(Mapping):
+    """
+    Result of a successful transaction call, decoded on first access.
+
+    Args:
+        status_code: HTTP status code of the response
+        content: Raw response body, decoded on first access
+        body: Already decoded body (when no raw bytes are available)
+
+    Attributes:
+        status_code: HTTP status code of the response
+        timings: Per-phase timings when collect_timings is enabled
+            (see instrumentation.py), else None
+    """
+
+    __slots__ = ("status_code", "timings", "_content", "_body")
+
+    # Keys of the mapping view, besides "timings" when set
+    _KEYS = ("success", "status_code", "response")
+    # Typed fields shown by repr
+    _FIELDS = ()
+
+    success = True
+
+    def __init__(self, status_code: int, content: Optional[bytes] = None, body: Any = _UNDECODED):
+        self.status_code = status_code
+        self.timings: Optional[Dict[str, Any]] = None
+        self._content = content
+        self._body = body
+
+    @classmethod
+    def from_response(cls, response: Any, **kwargs: Any) -> "TransactionResult":
+        """Build a result from a requests.Response, keeping its raw body."""
+        # Response-like objects without a raw body are decoded with json()
+        content = getattr(response, "content", None)
+        if isinstance(content, bytes):
+            return cls(response.status_code, content=content, **kwargs)
+        return cls(response.status_code, body=response.json(), **kwargs)
+
+    @property
+    def content(self) -> Optional[bytes]:
+        """Raw response body (released once decoded, None after that)."""
+        return self._content
+
+    @property
+    def response(self) -> Any:
+        """
+        Decoded JSON body (decoded once, on first access).
+
+        Raises:
+            MVolaTransactionError: If the body is not valid JSON
+        """
+        body = self._body
+        if body is _UNDECODED:
+            try:
+                body = json.loads(self._content)
+            except (TypeError, ValueError) as e:
+                raise MVolaTransactionError(
+                    message="Invalid JSON in response body", code=self.status_code
+                ) from e
+            self._body = body
+            self._content = None
+        return body
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the body has been decoded."""
+        return self._body is not _UNDECODED
+
+    def _field(self, name: str) -> Any:
+        body = self.response
+        return body.get(name) if isinstance(body, dict) else None
+
+    # --- Mapping view (compatibility with the former result dicts) ---
+
+    def _keys(self) -> List[str]:
+        keys = list(self._KEYS)
+        if self.timings is not None:
+            keys.append("timings")
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict with the keys of the mapping view."""
+        return {key: getattr(self, key) for key in self._keys()}
+
+    def __repr__(self) -> str:
+        if not self.decoded:
+            size = len(self._content or b"")
+            return f"{type(self).__name__}(status_code={self.status_code}, undecoded={size} bytes)"
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"{type(self).__name__}(status_code={self.status_code}, {fields})"
+
+
+class PaymentInitiated(TransactionResult):
+    """
+    Result of initiate_merchant_payment / initiate_payment.
+
+    Args:
+        correlation_id: Correlation ID sent with the request
+    """
+
+    __slots__ = ("correlation_id",)
+
+    _KEYS = TransactionResult._KEYS + ("correlation_id",)
+    _FIELDS = ("status", "server_correlation_id", "notification_method")
+
+    def __init__(self, status_code: int, content: Optional[bytes] = None, body: Any = _UNDECODED,
+                 correlation_id: Optional[str] = None):
+        super().__init__(status_code, content, body)
+        self.correlation_id = correlation_id
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._field("status")
+
+    @property
+    def server_correlation_id(self) -> Optional[str]:
+        """ID to poll get_transaction_status with."""
+        return self._field("serverCorrelationId")
+
+    @property
+    def notification_method(self) -> Optional[str]:
+        return self._field("notificationMethod")
+
+
+class TransactionStatus(TransactionResult):
+    """Result of get_transaction_status."""
+
+    __slots__ = ()
+
+    _FIELDS = ("status", "server_correlation_id", "transaction_id")
+
+    @property
+    def status(self) -> Optional[str]:
+        """pending, completed or failed."""
+        return self._field("status")
+
+    @property
+    def server_correlation_id(self) -> Optional[str]:
+        return self._field("serverCorrelationId")
+
+    @property
+    def transaction_id(self) -> Optional[str]:
+        """Object reference of a completed transaction (for get_transaction_details)."""
+        return self._field("objectReference")
+
+    @property
+    def notification_method(self) -> Optional[str]:
+        return self._field("notificationMethod")
+
+
+class TransactionDetails(TransactionResult):
+    """Result of get_transaction_details."""
+
+    __slots__ = ()
+
+    _FIELDS = ("transaction_id", "status", "amount", "currency")
+
+    @property
+    def transaction_id(self) -> Optional[str]:
+        return self._field("transactionReference")
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._field("transactionStatus")
+
+    @property
+    def amount(self) -> Optional[str]:
+        return self._field("amount")
+
+    @property
+    def currency(self) -> Optional[str]:
+        return self._field("currency")
+
+    @property
+    def create_date(self) -> Optional[str]:
+        return self._field("createDate")
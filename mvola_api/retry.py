@@ -0,0 +1,196 @@
+"""
+Retry policy for idempotent MVola API requests.
+
+SecureHTTPClient retries GETs on connection errors, timeouts and
+RETRY_STATUS_CODES. RetryPolicy decides how long to wait and whether a
+retry is allowed at all:
+- full-jitter exponential backoff: the wait before retry n is drawn
+  uniformly from [0, min(backoff_max, backoff_factor * 2^(n-1))], so
+  workers hit by the same outage do not retry in lockstep
+- Retry-After (seconds or HTTP date) is honored on 413, 429 and 503
+- an optional RetryBudget caps retries to a fraction of live traffic,
+  so retries cannot multiply the load on a struggling gateway
+
+POST is never retried (see SecureHTTPClient.RETRY_METHODS).
+
+Usage:
+    policy = RetryPolicy(max_retries=3, backoff_factor=0.5, budget=RetryBudget(ratio=0.1))
+    http_client = SecureHTTPClient(retry_policy=policy)
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from . import forking
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of requests.
+
+    Every request deposits `ratio` tokens and every retry withdraws one.
+    A floor of `min_retries_per_second` keeps low-traffic clients able
+    to retry at all.
+
+    Args:
+        ratio: Retries allowed per request (0.2 = retries add at most 20%)
+        min_retries_per_second: Retries always allowed regardless of traffic
+        max_balance: Largest burst of retries
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0,
+                 max_balance: float = 10.0):
+        if ratio < 0 or min_retries_per_second < 0:
+            raise ValueError("ratio and min_retries_per_second must not be negative")
+        if max_balance < 1:
+            raise ValueError("max_balance must be at least 1")
+        self._ratio = ratio
+        self._min_per_second = min_retries_per_second
+        self._max_balance = max_balance
+        self._balance = float(max_balance)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Cumulative statistics (for metrics)
+        self._exhausted = 0
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        self._lock = threading.Lock()
+        self._exhausted = 0
+
+    @property
+    def balance(self) -> float:
+        """Retries currently available."""
+        with self._lock:
+            self._refill()
+            return self._balance
+
+    @property
+    def exhausted(self) -> int:
+        """Retries refused because the budget was empty."""
+        return self._exhausted
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._balance = min(
+            self._max_balance, self._balance + (now - self._last_refill) * self._min_per_second
+        )
+        self._last_refill = now
+
+    def deposit(self) -> None:
+        """Account for one request."""
+        with self._lock:
+            self._balance = min(self._max_balance, self._balance + self._ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry from the budget; False when it is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._balance >= 1:
+                self._balance -= 1
+                return True
+            self._exhausted += 1
+            return False
+
+
+class RetryPolicy:
+    """
+    Backoff and budget for retries of idempotent requests.
+
+    Args:
+        max_retries: Maximum number of retries per request
+        backoff_factor: Base of the exponential backoff in seconds
+        backoff_max: Upper bound for a single wait, Retry-After included
+        jitter: Draw each wait uniformly below the exponential bound
+            (full jitter); False waits exactly the bound
+        budget: Retry budget shared by all requests using this policy
+            (default: unlimited)
+        seed: Seed for the jitter (deterministic runs)
+    """
+
+    # Only retry on these status codes (server errors, rate limiting)
+    RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+    # Status codes whose Retry-After header is honored
+    RETRY_AFTER_STATUS_CODES = frozenset([413, 429, 503])
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 120.0,
+        jitter: bool = True,
+        budget: Optional[RetryBudget] = None,
+        seed: Optional[int] = None,
+    ):
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.budget = budget
+        self._seed = seed
+        self._rng = random.Random(seed)
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # Forked workers would otherwise draw the same jitter sequence and
+        # retry in lockstep
+        if self._seed is None:
+            self._rng.seed()
+
+    def backoff(self, retry_number: int) -> float:
+        """Wait before retry number retry_number (1 for the first retry)."""
+        bound = min(self.backoff_max, self.backoff_factor * (2 ** (retry_number - 1)))
+        if not self.jitter:
+            return bound
+        return self._rng.uniform(0, bound)
+
+    def retry_after(self, response: requests.Response) -> Optional[float]:
+        """
+        Wait requested by the server through Retry-After, capped by backoff_max.
+
+        Returns:
+            Seconds to wait, or None if absent, invalid or not applicable
+        """
+        if response.status_code not in self.RETRY_AFTER_STATUS_CODES:
+            return None
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                date = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if date is None:
+                return None
+            seconds = date.timestamp() - time.time()
+        return min(self.backoff_max, max(0.0, seconds))
+
+    def on_request(self) -> None:
+        """Account for a new request in the budget."""
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def allow_retry(self) -> bool:
+        """Take a retry from the budget (always True without a budget)."""
+        return self.budget is None or self.budget.withdraw()
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(max_retries={self.max_retries}, "
+            f"backoff_factor={self.backoff_factor}, jitter={self.jitter})"
+        )
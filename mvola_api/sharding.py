@@ -0,0 +1,354 @@
+"""
+Process-pool sharding for CPU-heavy bulk operations.
+
+In large batches, the Python work around each call (validation, JSON
+encoding and decoding, header building, logging) saturates one core
+before the network or the gateway does. A ShardedPool spreads the items
+of a bulk operation over worker processes:
+
+- each item is routed to a shard by a consistent hash of its key (jump
+  consistent hash, stable across runs and processes), and within the
+  worker to one of its threads by the same key, so that items sharing a
+  key (e.g. one payer) are handled one at a time, in submission order
+- each worker runs `setup` once to build its own state (typically a
+  pooled MVolaClient) and the handler applied to its items
+- results stream back to the parent, in completion order, as they come
+
+A shared rate limit is obtained by building the workers' rate limiters
+on the dict() and Lock() of a manager (see start_manager() and
+rate_limiter.py).
+
+Usage:
+    def setup(stopping, url):
+        client = MVolaClient(...)
+        return lambda item: client.get_transaction_status(item).status
+
+    with ShardedPool(setup, (url,), processes=4, threads=4) as pool:
+        for key, item in work:
+            pool.submit(key, item)
+        done = 0
+        while done < len(work):
+            for item, result in pool.results():
+                done += 1
+
+Workers ignore SIGINT: on Ctrl-C the parent decides what to do, e.g.
+call stop() and drain the results of the items already submitted.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import traceback
+import zlib
+from collections import deque
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .exceptions import MVolaError
+
+logger = logging.getLogger("mvola_api")
+
+# Seconds between checks of the workers' health while waiting for results
+_POLL_INTERVAL = 0.2
+
+_DONE = object()
+
+
+class ShardError(MVolaError):
+    """
+    Raised when a handler fails on an item or a worker process dies.
+
+    Attributes:
+        shard: Shard (worker) concerned
+        item: Item the handler failed on (None when the worker died)
+    """
+
+    def __init__(self, message, shard: Optional[int] = None, item: Any = None):
+        super().__init__(message=message)
+        self.shard = shard
+        self.item = item
+
+
+def shard_for(key: str, shards: int) -> int:
+    """
+    Shard of a key, by jump consistent hash (Lamping and Veach, 2014).
+
+    The result does not depend on the process or PYTHONHASHSEED, and
+    growing from n to n + 1 shards moves only 1/(n + 1) of the keys.
+
+    Args:
+        key: Routing key (e.g. an MSISDN)
+        shards: Number of shards
+
+    Returns:
+        Shard index in [0, shards)
+    """
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    k = int.from_bytes(digest, "big")
+    bucket, jump = -1, 0
+    while jump < shards:
+        bucket = jump
+        k = (k * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * (float(1 << 31) / float((k >> 33) + 1)))
+    return bucket
+
+
+def _ignore_sigint() -> None:
+    # The parent handles Ctrl-C and tells the workers through `stopping`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def start_manager(mp_context: Any = None) -> SyncManager:
+    """
+    Start a multiprocessing manager for state shared by the workers.
+
+    Its dict() and Lock() back shared rate limiters and circuit breakers
+    (see rate_limiter.py and circuit_breaker.py). Like the workers, the
+    manager process ignores SIGINT, so that the shared state outlives a
+    Ctrl-C while the items in flight complete. Call shutdown() when done.
+
+    Args:
+        mp_context: multiprocessing context (default: the platform's
+            default start method)
+    """
+    manager = SyncManager(ctx=mp_context or multiprocessing.get_context())
+    manager.start(_ignore_sigint)
+    return manager
+
+
+def _lane_for(key: str, lanes: int) -> int:
+    # Independent of shard_for, which would map a worker's keys to few lanes
+    return zlib.crc32(key.encode("utf-8")) % lanes
+
+
+def _worker_main(shard: int, inbox, outbox, stopping, setup: Callable,
+                 setup_args: Sequence[Any], threads: int) -> None:
+    _ignore_sigint()
+    handler = setup(stopping, *setup_args)
+
+    def lane(items: queue.Queue) -> None:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            try:
+                outbox.put((shard, item, handler(item), None))
+            except Exception:
+                outbox.put((shard, item, None, traceback.format_exc()))
+
+    lanes = [queue.Queue() for _ in range(threads)]
+    workers = [
+        threading.Thread(target=lane, args=(items,), name=f"mvola-shard-{shard}-{n}", daemon=True)
+        for n, items in enumerate(lanes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        while True:
+            message = inbox.get()
+            if message is None:
+                break
+            key, item = message
+            lanes[_lane_for(key, threads)].put(item)
+    finally:
+        for items in lanes:
+            items.put(_DONE)
+        for worker in workers:
+            worker.join()
+        close = getattr(handler, "close", None)
+        if close is not None:
+            close()
+        # Let the queue feeder thread flush the last results
+        outbox.close()
+        outbox.join_thread()
+
+
+class ShardedPool:
+    """
+    Worker processes, each owning the items of a shard of the keys.
+
+    Args:
+        setup: Picklable callable run once in each worker as
+            setup(stopping, *setup_args), where `stopping` is the pool's
+            stop event; returns the handler called with each item (its
+            close() method, if any, is called when the worker ends)
+        setup_args: Picklable arguments of setup
+        processes: Worker processes (shards)
+        threads: Threads per worker; items of one key always go to the
+            same thread
+        mp_context: multiprocessing context (default: the platform's
+            default start method)
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+
+    def __init__(
+        self,
+        setup: Callable[..., Callable[[Any], Any]],
+        setup_args: Sequence[Any] = (),
+        processes: int = 2,
+        threads: int = 1,
+        mp_context: Any = None,
+    ):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        if threads < 1:
+            raise ValueError("threads must be at least 1")
+        context = mp_context or multiprocessing.get_context()
+        self._inboxes = [context.Queue() for _ in range(processes)]
+        self._outbox = context.Queue()
+        self._stopping = context.Event()
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    shard, inbox, self._outbox, self._stopping, setup, tuple(setup_args), threads
+                ),
+                name=f"mvola-shard-{shard}",
+                daemon=True,
+            )
+            for shard, inbox in enumerate(self._inboxes)
+        ]
+        self._backlog: deque = deque()
+        self._dead: set = set()
+        self._started = False
+        self._closed = False
+
+    @property
+    def processes(self) -> int:
+        """Number of worker processes (shards)."""
+        return len(self._processes)
+
+    @property
+    def stopping(self) -> bool:
+        """Whether stop() was called."""
+        return self._stopping.is_set()
+
+    def start(self) -> "ShardedPool":
+        """Start the worker processes."""
+        if not self._started:
+            self._started = True
+            for process in self._processes:
+                process.start()
+        return self
+
+    def shard_of(self, key: str) -> int:
+        """Shard the items of a key go to."""
+        return shard_for(key, len(self._processes))
+
+    def submit(self, key: str, item: Any) -> int:
+        """
+        Queue an item for the worker owning its key.
+
+        Args:
+            key: Routing key
+            item: Picklable item passed to the handler
+
+        Returns:
+            Shard the item was sent to
+        """
+        shard = self.shard_of(key)
+        self._inboxes[shard].put((key, item))
+        return shard
+
+    def stop(self) -> None:
+        """Set the stop event seen by the handlers (see setup)."""
+        self._stopping.set()
+
+    def results(self, timeout: Optional[float] = None) -> List[Tuple[Any, Any]]:
+        """
+        Wait for at least one result and return all those available.
+
+        Args:
+            timeout: Seconds to wait (None: until a result comes)
+
+        Returns:
+            (item, result) pairs, in completion order; empty on timeout
+
+        Raises:
+            ShardError: If the handler raised on an item, or a worker
+                died (raised once per dead worker, after its last results)
+        """
+        if not self._backlog:
+            waited = 0.0
+            while True:
+                try:
+                    self._backlog.append(self._outbox.get(timeout=_POLL_INTERVAL))
+                    break
+                except queue.Empty:
+                    self._check_workers()
+                    waited += _POLL_INTERVAL
+                    if timeout is not None and waited >= timeout:
+                        return []
+            self._drain()
+
+        results = []
+        while self._backlog:
+            shard, item, result, error = self._backlog.popleft()
+            if error is not None:
+                if results:
+                    # Deliver the results before it first
+                    self._backlog.appendleft((shard, item, result, error))
+                    break
+                raise ShardError(f"Shard {shard} failed on an item:\n{error}",
+                                 shard=shard, item=item)
+            results.append((item, result))
+        return results
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._backlog.append(self._outbox.get_nowait())
+            except queue.Empty:
+                return
+
+    def _check_workers(self) -> None:
+        for shard, process in enumerate(self._processes):
+            if shard not in self._dead and process.exitcode not in (None, 0):
+                self._dead.add(shard)
+                raise ShardError(
+                    f"Shard {shard} worker died (exit code {process.exitcode})", shard=shard
+                )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Let the workers finish the items submitted, then end them.
+
+        Results not collected with results() by then are dropped.
+
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._started:
+            for inbox in self._inboxes:
+                inbox.put(None)
+            for process in self._processes:
+                waited = 0.0
+                while process.is_alive() and (timeout is None or waited < timeout):
+                    # A worker only exits once its results left the queue
+                    self._drain()
+                    process.join(_POLL_INTERVAL)
+                    waited += _POLL_INTERVAL
+                if process.is_alive():
+                    logger.warning("Terminating shard worker %s", process.name)
+                    process.terminate()
+                    process.join()
+        self._backlog.clear()
+        for inbox in self._inboxes:
+            inbox.close()
+        self._outbox.close()
+
+    def __enter__(self) -> "ShardedPool":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,330 @@
+"""
+Optional tracing spans around MVola API calls.
+
+When a tracer is configured with set_tracer(), each layer of a call
+opens a span, nested through contextvars:
+    MVolaClient.initiate_payment
+      MVolaTransaction.initiate_merchant_payment
+        MVolaAuth.get_access_token
+        HTTP POST
+
+Spans carry the X-CorrelationID as `mvola.correlation_id`, the HTTP
+method, URL, status code and retry count, and the exception on failure.
+Without a tracer every hook is a single global check.
+
+Two tracers are provided:
+- Tracer: built-in, with a sampling rate and a pluggable exporter
+  (InMemorySpanExporter for tests)
+- OpenTelemetryTracer: delegates to opentelemetry-api when installed
+  (pip install mvola-api-lib[tracing]); sampling and export are then
+  configured on the OpenTelemetry TracerProvider
+
+Usage:
+    exporter = InMemorySpanExporter()
+    set_tracer(Tracer(exporter, sample_rate=0.1))
+"""
+
+import contextvars
+import functools
+import logging
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger("mvola_api")
+
+# W3C trace context: version-traceid-spanid-flags
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_tracer = None
+_current_span: contextvars.ContextVar = contextvars.ContextVar("mvola_span", default=None)
+
+# Marks a context whose root span was not sampled: descendants are skipped too
+_UNSAMPLED = object()
+
+
+class Span:
+    """A timed unit of work (compatible in spirit with OpenTelemetry spans)."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_time", "end_time", "status", "error",
+    )
+
+    def __init__(self, name: str, trace_id: str, span_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.status = "OK"
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.error = type(exc).__name__
+        self.attributes["exception.type"] = self.error
+        self.attributes["exception.message"] = str(exc)[:200]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "attributes": dict(self.attributes),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return f"Span(name='{self.name}', trace_id='{self.trace_id}', status='{self.status}')"
+
+
+class SpanExporter(ABC):
+    """Receives every finished, sampled span."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Handle one finished span."""
+
+    def shutdown(self) -> None:
+        """Flush and release exporter resources."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in memory (for tests)."""
+
+    def __init__(self):
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class LoggingSpanExporter(SpanExporter):
+    """Logs finished spans at DEBUG level on the mvola_api logger."""
+
+    def export(self, span: Span) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("span %s %.1fms %s", span.name, span.duration * 1000, span.to_dict())
+
+
+class _SpanScope:
+    """Context manager making a span current for the duration of a block."""
+
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span):
+        self._tracer = tracer
+        self._span = span
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_span.set(self._span)
+        return self._span if self._span is not _UNSAMPLED else None
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if self._span is not _UNSAMPLED:
+            if exc is not None:
+                self._span.record_exception(exc)
+            self._tracer._finish(self._span)
+        return False
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class Tracer:
+    """
+    Built-in tracer.
+
+    Args:
+        exporter: Destination of finished spans (default: InMemorySpanExporter)
+        sample_rate: Fraction of traces recorded (0 to 1). The decision is
+            taken at the root span and inherited by all its descendants,
+            so traces are always complete.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.exporter = exporter or InMemorySpanExporter()
+        self.sample_rate = sample_rate
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Union[Span, str, None] = None) -> Any:
+        """
+        Open a span as a context manager; it becomes the current span.
+
+        Args:
+            name: Span name
+            attributes: Initial attributes
+            parent: Parent span or W3C traceparent string (default: the
+                current span of this context)
+
+        Returns:
+            Context manager yielding the Span, or None when not sampled
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if parent is _UNSAMPLED:
+            return _SpanScope(self, _UNSAMPLED)
+
+        if isinstance(parent, str):
+            match = _TRACEPARENT_RE.match(parent.strip().lower())
+            if match is None:
+                raise ValueError(f"Invalid traceparent: {parent!r}")
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return _SpanScope(self, _UNSAMPLED)
+        elif parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            if self.sample_rate < 1 and random.random() >= self.sample_rate:
+                return _SpanScope(self, _UNSAMPLED)
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+
+        span = Span(name, trace_id, f"{random.getrandbits(64):016x}", parent_id, attributes)
+        return _SpanScope(self, span)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        span = _current_span.get()
+        if span is not None and span is not _UNSAMPLED:
+            span.set_attribute(key, value)
+
+    def _finish(self, span: Span) -> None:
+        span.end_time = time.time()
+        try:
+            self.exporter.export(span)
+        except Exception:
+            logger.exception("Span exporter %r failed", self.exporter)
+
+
+class OpenTelemetryTracer:
+    """
+    Tracer delegating to OpenTelemetry (requires opentelemetry-api).
+
+    Args:
+        tracer: OpenTelemetry tracer (default: trace.get_tracer("mvola_api"))
+
+    Raises:
+        ImportError: If opentelemetry-api is not installed
+    """
+
+    def __init__(self, tracer: Any = None):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetryTracer requires opentelemetry-api: "
+                "pip install mvola-api-lib[tracing]"
+            ) from e
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("mvola_api")
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Any = None) -> Any:
+        context = None
+        if parent is not None:
+            context = self._trace.set_span_in_context(parent)
+        return self._tracer.start_as_current_span(
+            name, context=context, attributes=attributes,
+            record_exception=True, set_status_on_exception=True,
+        )
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._trace.get_current_span().set_attribute(key, value)
+
+
+def set_tracer(tracer) -> None:
+    """Install a tracer for all MVola clients (None disables tracing)."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    """Installed tracer, or None when tracing is disabled."""
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    """Current built-in span of this context, if any and sampled."""
+    span = _current_span.get()
+    return None if span is _UNSAMPLED else span
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Any:
+    """Open a span with the installed tracer (no-op context manager when disabled)."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SCOPE
+    return tracer.start_span(name, attributes)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the current span (no-op when tracing is disabled)."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.set_attribute(key, value)
+
+
+def traced(name: str) -> Callable:
+    """Decorator running a function inside a span named `name`."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.start_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -7,15 +7,16 @@ amount safety checks, and hardened HTTP communication.
 
 import datetime
 import uuid
-from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
 
+from .bulkhead import PAYMENT, QUERY, BulkheadFullError, Bulkheads
+from .circuit_breaker import CircuitBreakers, CircuitOpenError
+from .concurrency import AdaptiveConcurrencyLimiter, LoadShedError
 from .constants import (
     API_VERSION,
     DEFAULT_CURRENCY,
     DEFAULT_LANGUAGE,
-    DEFAULT_TIMEOUT,
     MAX_TRANSACTION_AMOUNT,
     MERCHANT_PAY_ENDPOINT,
     MIN_TRANSACTION_AMOUNT,
@@ -24,9 +25,15 @@ from .constants import (
     TRANSACTION_DETAILS_ENDPOINT,
     TRANSACTION_STATUS_ENDPOINT,
 )
-from .exceptions import MVolaTransactionError, MVolaValidationError
+from .deadline import Deadline, DeadlineExceededError
+from .exceptions import MVolaTransactionError, MVolaValidationError, detach_response
+from .hedging import RequestHedger
 from .http_client import SecureHTTPClient
+from .instrumentation import instrumented, timed
 from .rate_limiter import TokenBucketRateLimiter
+from .results import PaymentInitiated, TransactionDetails, TransactionStatus
+from .retry import RetryPolicy
+from .tracing import set_attribute, traced
 from .utils import get_mvola_headers, sanitize_id, validate_description, validate_msisdn
 
 
@@ -39,7 +46,23 @@ class MVolaTransaction:
     with TLS enforcement and response size limits.
     """
 
-    def __init__(self, auth, base_url: str, partner_name: str, partner_msisdn: str = None):
+    def __init__(
+        self,
+        auth,
+        base_url: str,
+        partner_name: str,
+        partner_msisdn: str = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        collect_timings: bool = False,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        hedging: Optional[RequestHedger] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        bulkheads: Optional[Bulkheads] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        session_pool: Optional[int] = None,
+        http_client: Optional[SecureHTTPClient] = None,
+        keep_error_responses: bool = False,
+    ):
         """
         Initialize the transaction module.
 
@@ -48,33 +71,109 @@ class MVolaTransaction:
             base_url: Base URL for the API
             partner_name: Name of your application
             partner_msisdn: Partner MSISDN used for UserAccountIdentifier
+            rate_limiter: Rate limiter for API calls (default: 30 burst, 2/s)
+            collect_timings: Attach per-phase timings to result dicts
+                under "timings" (see instrumentation.py)
+            circuit_breakers: Circuit breakers for the merchantpay, status
+                and details endpoints (default: none)
+            hedging: Hedger for status and details GETs (default: none)
+            retry_policy: Backoff and retry budget for status and details
+                GETs (default: see SecureHTTPClient)
+            bulkheads: Separate HTTP clients, connection pools and
+                concurrency limits for payments and for status/details
+                queries (default: one shared client)
+            concurrency_limiter: Adaptive limit on outbound calls in flight
+                (default: none)
+            session_pool: Number of pooled sessions per HTTP client, for
+                heavily threaded callers (default: one shared session)
+            http_client: HTTP client shared with other modules or tenants
+                (see MVolaClientManager), used for payments and queries;
+                the HTTP options above must then be set on it instead. It
+                is not closed by this module (default: clients of its own)
+            keep_error_responses: Keep the raw response on
+                MVolaTransactionError (e.response) in addition to its
+                snapshot (default: only the snapshot, see exceptions.py)
         """
         self._auth = auth
         self._base_url = base_url
         self._partner_name = partner_name
         self._partner_msisdn = partner_msisdn
-
-        # Each transaction module gets its own HTTP client and rate limiter
-        self._http_client = SecureHTTPClient()
-        self._rate_limiter = TokenBucketRateLimiter(
+        self._collect_timings = collect_timings
+        self._keep_error_responses = keep_error_responses
+
+        # Each transaction module gets its own HTTP client and rate limiter.
+        # With bulkheads, queries get a second client so they cannot take
+        # the connections payments need.
+        self._owns_http_client = http_client is None
+        if http_client is not None:
+            self._http_client = http_client
+            self._query_http_client = http_client
+        elif bulkheads is None:
+            self._http_client = SecureHTTPClient(
+                circuit_breakers=circuit_breakers,
+                hedging=hedging,
+                retry_policy=retry_policy,
+                concurrency_limiter=concurrency_limiter,
+                session_pool=session_pool,
+            )
+            self._query_http_client = self._http_client
+        else:
+            self._http_client = SecureHTTPClient(
+                circuit_breakers=circuit_breakers,
+                bulkhead=bulkheads.get(PAYMENT),
+                concurrency_limiter=concurrency_limiter,
+                session_pool=session_pool,
+            )
+            self._query_http_client = SecureHTTPClient(
+                circuit_breakers=circuit_breakers,
+                hedging=hedging,
+                retry_policy=retry_policy,
+                bulkhead=bulkheads.get(QUERY),
+                concurrency_limiter=concurrency_limiter,
+                session_pool=session_pool,
+            )
+        self._rate_limiter = rate_limiter or TokenBucketRateLimiter(
             max_tokens=RATE_LIMIT_MAX_REQUESTS,
             refill_rate=RATE_LIMIT_REFILL_RATE,
             name="transaction",
         )
 
-    def __del__(self) -> None:
-        """Clean up HTTP client resources."""
-        try:
-            if hasattr(self, "_http_client") and self._http_client:
-                self._http_client.close()
-        except Exception:
-            pass
+    def close(self) -> None:
+        """Release the HTTP clients (unless they were passed in)."""
+        if not self._owns_http_client:
+            return
+        self._http_client.close()
+        if self._query_http_client is not self._http_client:
+            self._query_http_client.close()
+
+    def __enter__(self) -> "MVolaTransaction":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def rate_limiter(self) -> TokenBucketRateLimiter:
+        """Rate limiter paced by the transaction calls."""
+        return self._rate_limiter
 
     @property
     def is_sandbox(self) -> bool:
         """Check if we're in sandbox mode based on the base URL."""
         return "devapi" in self._base_url
 
+    def _access_token(self, deadline: Optional[Deadline]) -> str:
+        """
+        Get the access token, timed as the "token_fetch" phase.
+
+        The deadline is only passed when set, so that auth objects written
+        before deadlines existed (get_access_token(force_refresh=False))
+        keep working.
+        """
+        if deadline is None:
+            return timed("token_fetch", self._auth.get_access_token)
+        return timed("token_fetch", self._auth.get_access_token, deadline=deadline)
+
     def _generate_correlation_id(self) -> str:
         """
         Generate a unique correlation ID.
@@ -127,6 +226,9 @@ class MVolaTransaction:
         Raises:
             MVolaValidationError: If validation fails
         """
+        # Imported on first use: only payment validation needs it
+        from decimal import Decimal, InvalidOperation
+
         errors = []
 
         # Check amount using Decimal for precision (not float!)
@@ -170,6 +272,26 @@ class MVolaTransaction:
         if errors:
             raise MVolaValidationError(message="; ".join(errors))
 
+    def validate_payment(
+        self, amount: str, debit_msisdn: str, credit_msisdn: str, description: str
+    ) -> None:
+        """
+        Check payment parameters without sending anything.
+
+        Applies the checks of initiate_merchant_payment, e.g. to validate
+        a batch of payments up front.
+
+        Args:
+            amount: Transaction amount
+            debit_msisdn: MSISDN of the payer
+            credit_msisdn: MSISDN of the merchant
+            description: Transaction description
+
+        Raises:
+            MVolaValidationError: If a parameter is invalid
+        """
+        self._validate_transaction_params(amount, debit_msisdn, credit_msisdn, description)
+
     def _get_headers(
         self,
         correlation_id: Optional[str] = None,
@@ -179,6 +301,7 @@ class MVolaTransaction:
         geo_location_a: Optional[str] = None,
         cell_id_b: Optional[str] = None,
         geo_location_b: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, str]:
         """
         Get standard headers for API requests.
@@ -191,11 +314,12 @@ class MVolaTransaction:
             geo_location_a: Geo Location A
             cell_id_b: Cell ID B
             geo_location_b: Geo Location B
+            deadline: Deadline bounding the token fetch
 
         Returns:
             Headers dict for API request
         """
-        access_token = self._auth.get_access_token()
+        access_token = self._access_token(deadline)
 
         if not correlation_id:
             correlation_id = self._generate_correlation_id()
@@ -231,6 +355,40 @@ class MVolaTransaction:
 
         return headers
 
+    def _build_payment_payload(
+        self,
+        amount,
+        debit_msisdn: str,
+        credit_msisdn: str,
+        description: str,
+        currency: str,
+        foreign_currency: str,
+        foreign_amount,
+        requesting_organisation_transaction_reference: str,
+        original_transaction_reference: str,
+    ) -> Dict[str, Any]:
+        """
+        Build the JSON body of a merchant payment request.
+
+        Returns:
+            Request payload dict
+        """
+        return {
+            "amount": str(amount),
+            "currency": currency,
+            "descriptionText": description,
+            "requestDate": self._get_current_datetime(),
+            "requestingOrganisationTransactionReference": requesting_organisation_transaction_reference,
+            "originalTransactionReference": original_transaction_reference or "MVOLA_123",
+            "debitParty": [{"key": "msisdn", "value": debit_msisdn}],
+            "creditParty": [{"key": "msisdn", "value": credit_msisdn}],
+            "metadata": [
+                {"key": "partnerName", "value": credit_msisdn},
+                {"key": "fc", "value": foreign_currency or "USD"},
+                {"key": "amountFc", "value": str(foreign_amount or "1")},
+            ],
+        }
+
     def _handle_error_response(self, e, default_message: str) -> None:
         """
         Extract error details from a failed API response and raise appropriate exception.
@@ -244,32 +402,20 @@ class MVolaTransaction:
         """
         error_message = default_message
 
-        if hasattr(e, "response") and e.response is not None:
-            try:
-                error_data = e.response.json()
-                # Extract error detail but limit length to prevent log flooding
-                if "fault" in error_data:
-                    detail = str(error_data["fault"].get("message", ""))[:200]
-                    error_message = f"{error_message}: {detail}"
-                elif "errorDescription" in error_data:
-                    detail = str(error_data["errorDescription"])[:200]
-                    error_message = f"{error_message}: {detail}"
-                elif "ErrorDescription" in error_data:
-                    detail = str(error_data["ErrorDescription"])[:200]
-                    error_message = f"{error_message}: {detail}"
-            except (ValueError, KeyError):
-                pass
+        # Extract error detail from a compact snapshot of the response
+        snapshot, response = detach_response(e, self._keep_error_responses)
+        if snapshot is not None and snapshot.error_description:
+            error_message = f"{error_message}: {snapshot.error_description}"
 
         raise MVolaTransactionError(
             message=error_message,
-            code=(
-                e.response.status_code
-                if hasattr(e, "response") and e.response
-                else None
-            ),
-            response=e.response if hasattr(e, "response") else None,
+            code=snapshot.status_code if snapshot is not None else None,
+            response=response,
+            snapshot=snapshot,
         ) from e
 
+    @traced("MVolaTransaction.initiate_merchant_payment")
+    @instrumented("merchantpay")
     def initiate_merchant_payment(
         self,
         amount,
@@ -288,6 +434,7 @@ class MVolaTransaction:
         geo_location_a=None,
         cell_id_b=None,
         geo_location_b=None,
+        deadline=None,
     ):
         """
         Initiate a merchant payment transaction.
@@ -309,17 +456,21 @@ class MVolaTransaction:
             geo_location_a: Geo Location A
             cell_id_b: Cell ID B
             geo_location_b: Geo Location B
+            deadline: Deadline for the whole call (rate limiter wait, token
+                fetch and request); see deadline.py
 
         Returns:
-            Transaction response dict
+            PaymentInitiated result (also readable as the former dict:
+            result["response"], result["correlation_id"], ...)
 
         Raises:
             MVolaTransactionError: If transaction initiation fails
             MVolaValidationError: If parameters are invalid
             RateLimitError: If rate limit is exceeded
+            DeadlineExceededError: If the deadline passes
         """
         # Rate limit check
-        self._rate_limiter.acquire()
+        timed("rate_limit_wait", self._rate_limiter.acquire, deadline=deadline)
 
         # Validate parameters
         self._validate_transaction_params(
@@ -329,13 +480,14 @@ class MVolaTransaction:
         # Create correlation ID if not provided
         if not correlation_id:
             correlation_id = self._generate_correlation_id()
+        set_attribute("mvola.correlation_id", correlation_id)
 
         # Generate transaction reference if not provided
         if not requesting_organisation_transaction_reference:
             requesting_organisation_transaction_reference = f"ref{str(uuid.uuid4())[:8]}"
 
         # Get access token
-        access_token = self._auth.get_access_token()
+        access_token = self._access_token(deadline)
 
         # Build headers with strict callback URL validation
         headers = get_mvola_headers(
@@ -359,45 +511,39 @@ class MVolaTransaction:
             headers["GeoLocationB"] = str(geo_location_b)[:100]
 
         # Build request body
-        request_date = self._get_current_datetime()
-
-        payload = {
-            "amount": str(amount),
-            "currency": currency,
-            "descriptionText": description,
-            "requestDate": request_date,
-            "requestingOrganisationTransactionReference": requesting_organisation_transaction_reference,
-            "originalTransactionReference": original_transaction_reference or "MVOLA_123",
-            "debitParty": [{"key": "msisdn", "value": debit_msisdn}],
-            "creditParty": [{"key": "msisdn", "value": credit_msisdn}],
-            "metadata": [
-                {"key": "partnerName", "value": credit_msisdn},
-                {"key": "fc", "value": foreign_currency or "USD"},
-                {"key": "amountFc", "value": str(foreign_amount or "1")},
-            ],
-        }
+        payload = self._build_payment_payload(
+            amount,
+            debit_msisdn,
+            credit_msisdn,
+            description,
+            currency,
+            foreign_currency,
+            foreign_amount,
+            requesting_organisation_transaction_reference,
+            original_transaction_reference,
+        )
 
         # Send request via secure HTTP client (POST is NEVER retried)
         url = urljoin(self._base_url, MERCHANT_PAY_ENDPOINT)
 
         try:
             response = self._http_client.post(
-                url, headers=headers, json=payload, timeout=DEFAULT_TIMEOUT
+                url, headers=headers, json=payload, deadline=deadline
             )
             response.raise_for_status()
 
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "response": response.json(),
-                "correlation_id": correlation_id,
-            }
+            return PaymentInitiated.from_response(response, correlation_id=correlation_id)
 
+        except (CircuitOpenError, BulkheadFullError, LoadShedError, DeadlineExceededError):
+            raise
         except Exception as e:
+            response = None  # See detach_response
             self._handle_error_response(e, "Failed to initiate transaction")
 
+    @traced("MVolaTransaction.get_transaction_status")
+    @instrumented("status")
     def get_transaction_status(
-        self, server_correlation_id, correlation_id=None, user_language="MG"
+        self, server_correlation_id, correlation_id=None, user_language="MG", deadline=None
     ):
         """
         Get the status of a transaction.
@@ -406,15 +552,17 @@ class MVolaTransaction:
             server_correlation_id: Server correlation ID from initiate_transaction
             correlation_id: Custom correlation ID for request
             user_language: User language (FR or MG)
+            deadline: Deadline for the whole call, retries included
 
         Returns:
-            Transaction status response dict
+            TransactionStatus result (also readable as the former dict)
 
         Raises:
             MVolaTransactionError: If status request fails
+            DeadlineExceededError: If the deadline passes
         """
         # Rate limit check
-        self._rate_limiter.acquire()
+        timed("rate_limit_wait", self._rate_limiter.acquire, deadline=deadline)
 
         # Sanitize the server correlation ID to prevent path traversal
         server_correlation_id = sanitize_id(server_correlation_id, "server_correlation_id")
@@ -422,10 +570,11 @@ class MVolaTransaction:
         # Create correlation ID if not provided
         if not correlation_id:
             correlation_id = self._generate_correlation_id()
+        set_attribute("mvola.correlation_id", correlation_id)
 
         # Set up headers
         headers = self._get_headers(
-            correlation_id=correlation_id, user_language=user_language
+            correlation_id=correlation_id, user_language=user_language, deadline=deadline
         )
 
         # Send request (GET — will be retried automatically on transient failures)
@@ -434,20 +583,21 @@ class MVolaTransaction:
         )
 
         try:
-            response = self._http_client.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+            response = self._query_http_client.get(url, headers=headers, deadline=deadline)
             response.raise_for_status()
 
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "response": response.json(),
-            }
+            return TransactionStatus.from_response(response)
 
+        except (CircuitOpenError, BulkheadFullError, LoadShedError, DeadlineExceededError):
+            raise
         except Exception as e:
+            response = None  # See detach_response
             self._handle_error_response(e, "Failed to get transaction status")
 
+    @traced("MVolaTransaction.get_transaction_details")
+    @instrumented("details")
     def get_transaction_details(
-        self, transaction_id, correlation_id=None, user_language="MG"
+        self, transaction_id, correlation_id=None, user_language="MG", deadline=None
     ):
         """
         Get details of a transaction.
@@ -456,15 +606,17 @@ class MVolaTransaction:
             transaction_id: Transaction ID
             correlation_id: Custom correlation ID for request
             user_language: User language (FR or MG)
+            deadline: Deadline for the whole call, retries included
 
         Returns:
-            Transaction details response dict
+            TransactionDetails result (also readable as the former dict)
 
         Raises:
             MVolaTransactionError: If details request fails
+            DeadlineExceededError: If the deadline passes
         """
         # Rate limit check
-        self._rate_limiter.acquire()
+        timed("rate_limit_wait", self._rate_limiter.acquire, deadline=deadline)
 
         # Sanitize the transaction ID to prevent path traversal
         transaction_id = sanitize_id(transaction_id, "transaction_id")
@@ -472,24 +624,24 @@ class MVolaTransaction:
         # Create correlation ID if not provided
         if not correlation_id:
             correlation_id = self._generate_correlation_id()
+        set_attribute("mvola.correlation_id", correlation_id)
 
         # Set up headers
         headers = self._get_headers(
-            correlation_id=correlation_id, user_language=user_language
+            correlation_id=correlation_id, user_language=user_language, deadline=deadline
         )
 
         # Send request (GET — will be retried automatically on transient failures)
         url = urljoin(self._base_url, f"{TRANSACTION_DETAILS_ENDPOINT}{transaction_id}")
 
         try:
-            response = self._http_client.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+            response = self._query_http_client.get(url, headers=headers, deadline=deadline)
             response.raise_for_status()
 
-            return {
-                "success": True,
-                "status_code": response.status_code,
-                "response": response.json(),
-            }
+            return TransactionDetails.from_response(response)
 
+        except (CircuitOpenError, BulkheadFullError, LoadShedError, DeadlineExceededError):
+            raise
         except Exception as e:
+            response = None  # See detach_response
             self._handle_error_response(e, "Failed to get transaction details")
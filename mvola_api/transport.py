@@ -0,0 +1,474 @@
+"""
+Pluggable transports for SecureHTTPClient.
+
+A transport performs the actual HTTP exchange underneath SecureHTTPClient,
+which keeps ownership of hardening (timeouts, size limits, error mapping).
+Provided transports:
+- RequestsTransport: default, a hardened requests.Session
+- SessionPoolTransport: a checkout/return pool of hardened sessions,
+  for heavily threaded callers
+- RecordingTransport: captures request/response pairs and their timing
+  into a Cassette, with secrets masked
+- ReplayTransport: serves a Cassette back offline with the recorded
+  (or scaled) latency, for deterministic performance regression tests
+"""
+
+import http.client
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from . import forking, instrumentation
+from .utils import endpoint_family, mask_headers, mask_msisdn, mask_token
+
+# JSON body fields whose values are masked when recorded
+SENSITIVE_BODY_FIELDS = frozenset(["access_token", "refresh_token", "id_token"])
+
+# Request body key/value lists naming the parties of a payment
+PARTY_BODY_FIELDS = ("debitParty", "creditParty", "metadata")
+
+# Keys of those lists whose values are masked when recorded
+# (metadata partnerName holds the partner MSISDN)
+SENSITIVE_PARTY_KEYS = {
+    "msisdn": mask_msisdn,
+    "partnerName": mask_msisdn,
+    "amountFc": lambda value: "****",
+}
+
+# requests exceptions a recorded failure can be replayed as
+_REPLAYABLE_ERRORS = {
+    "SSLError": requests.exceptions.SSLError,
+    "ConnectTimeout": requests.exceptions.ConnectTimeout,
+    "ReadTimeout": requests.exceptions.ReadTimeout,
+    "Timeout": requests.exceptions.Timeout,
+    "ConnectionError": requests.exceptions.ConnectionError,
+}
+
+
+class Transport(ABC):
+    """
+    Interface of the layer SecureHTTPClient sends requests through.
+
+    Implementations must return a requests.Response (with its body already
+    available) or raise a requests.exceptions.RequestException.
+    """
+
+    @abstractmethod
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """Send a request and return its response."""
+
+    def close(self) -> None:
+        """Release transport resources."""
+
+
+class RequestsTransport(Transport):
+    """
+    Default transport backed by a hardened requests.Session.
+
+    Args:
+        session: Session configured by SecureHTTPClient
+    """
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # Give every adapter an empty pool manager: the inherited one holds
+        # sockets shared with the parent (same as HTTPAdapter.__setstate__)
+        for adapter in list(self.session.adapters.values()):
+            if isinstance(adapter, HTTPAdapter):
+                adapter.proxy_manager = {}
+                adapter.init_poolmanager(
+                    adapter._pool_connections, adapter._pool_maxsize, block=adapter._pool_block
+                )
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        timing = instrumentation.active_request()
+        if timing is None:
+            return self._send(method, url, headers, data, json, timeout)
+
+        start = time.perf_counter()
+        setup = timing.setup
+        response = self._send(method, url, headers, data, json, timeout)
+        timing.record_exchange(
+            time.perf_counter() - start,
+            response.elapsed.total_seconds(),
+            timing.setup - setup,
+        )
+        return response
+
+    def _send(self, method, url, headers, data, json, timeout):
+        return self.session.request(
+            method,
+            url,
+            headers=headers,
+            data=data,
+            json=json,
+            timeout=timeout,
+            verify=True,  # ALWAYS verify TLS certificates
+            allow_redirects=False,  # Don't follow redirects for security
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class SessionPoolTransport(Transport):
+    """
+    Transport spreading concurrent requests over a pool of sessions.
+
+    requests.Session is not documented as thread-safe, and with many
+    threads sharing one session they contend on its connection pool and
+    cookie jar. Each request here checks a session out of a LIFO pool
+    (recently used sessions keep their connections warm) and returns it
+    afterwards, so no two threads use the same session at once. Sessions
+    are created on demand, up to size; with one connection per session
+    and host, size also bounds the number of connections.
+
+    Args:
+        session_factory: Creates a hardened session (same configuration for all)
+        size: Maximum number of sessions
+        checkout_timeout: Seconds to wait for a free session when the
+            request has no connect timeout
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], requests.Session],
+        size: int = 8,
+        checkout_timeout: float = 30.0,
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._factory = session_factory
+        self._size = size
+        self._checkout_timeout = checkout_timeout
+        self._transports: List[RequestsTransport] = []
+        self._idle: List[RequestsTransport] = []
+        self._mounts: List[Tuple[str, Any]] = []
+        self._condition = threading.Condition()
+        forking.register(self)
+
+    def _after_fork_in_child(self) -> None:
+        # Sessions checked out by parent threads are never returned in the
+        # child; the sessions' connections are reset by their transports
+        self._condition = threading.Condition()
+        self._idle = list(self._transports)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def sessions(self) -> List[requests.Session]:
+        """Sessions created so far."""
+        with self._condition:
+            return [transport.session for transport in self._transports]
+
+    def _new_transport(self) -> RequestsTransport:
+        session = self._factory()
+        for prefix, adapter in self._mounts:
+            session.mount(prefix, adapter() if callable(adapter) else adapter)
+        transport = RequestsTransport(session)
+        self._transports.append(transport)
+        return transport
+
+    def _checkout(self, wait: float) -> RequestsTransport:
+        with self._condition:
+            if not self._idle and len(self._transports) < self._size:
+                return self._new_transport()
+            if not self._condition.wait_for(lambda: self._idle, timeout=wait):
+                raise requests.exceptions.ConnectTimeout(
+                    f"No free session in the pool after {wait:g}s ({self._size} sessions busy)"
+                )
+            return self._idle.pop()
+
+    def _checkin(self, transport: RequestsTransport) -> None:
+        with self._condition:
+            self._idle.append(transport)
+            self._condition.notify()
+
+    def mount(self, prefix: str, adapter: Any) -> None:
+        """
+        Mount an adapter on every session, current and future.
+
+        Args:
+            prefix: URL prefix
+            adapter: HTTPAdapter shared by all sessions, or a callable
+                returning a new adapter for each session
+        """
+        with self._condition:
+            self._mounts.append((prefix, adapter))
+            for transport in self._transports:
+                transport.session.mount(prefix, adapter() if callable(adapter) else adapter)
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        wait = timeout[0] if isinstance(timeout, tuple) else timeout or self._checkout_timeout
+        transport = self._checkout(wait)
+        try:
+            return transport.send(
+                method, url, headers=headers, data=data, json=json, timeout=timeout
+            )
+        finally:
+            self._checkin(transport)
+
+    def close(self) -> None:
+        with self._condition:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+
+
+def _mask_body(text: str) -> str:
+    """Mask token values in a JSON body; non-JSON bodies are kept as-is."""
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text
+    if not isinstance(body, dict) or not SENSITIVE_BODY_FIELDS.intersection(body):
+        return text
+    for key in SENSITIVE_BODY_FIELDS.intersection(body):
+        body[key] = mask_token(str(body[key]))
+    return json.dumps(body)
+
+
+def _mask_request_body(body: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy a request body with party MSISDNs and amounts masked."""
+    if not isinstance(body, dict):
+        return body
+    masked = dict(body)
+    if "amount" in masked:
+        masked["amount"] = "****"
+    for field in PARTY_BODY_FIELDS:
+        if not isinstance(masked.get(field), list):
+            continue
+        masked[field] = [
+            dict(pair, value=SENSITIVE_PARTY_KEYS[pair["key"]](str(pair.get("value"))))
+            if isinstance(pair, dict) and pair.get("key") in SENSITIVE_PARTY_KEYS
+            else pair
+            for pair in masked[field]
+        ]
+    return masked
+
+
+class Cassette:
+    """
+    Thread-safe, append-only list of recorded exchanges (JSON Lines on disk).
+
+    Each entry holds the method, URL, masked request headers, request
+    body, elapsed time and either the response (status, masked headers,
+    body) or the name of the raised requests exception.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Dict[str, Any]]] = None):
+        self._entries: List[Dict[str, Any]] = list(entries or [])
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._entries)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, path: str) -> None:
+        """Write all entries to path as JSON Lines."""
+        with open(path, "w", encoding="utf-8") as fh:
+            for entry in self.entries:
+                fh.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Read a cassette written by save()."""
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.loads(line) for line in fh if line.strip())
+
+
+class RecordingTransport(Transport):
+    """
+    Transport that records every exchange of an inner transport.
+
+    Secrets are masked before they reach the cassette: sensitive headers
+    with the same rules as SecureHTTPClient logging, party MSISDNs and
+    amounts in request bodies, and token fields in JSON response bodies.
+
+    Args:
+        inner: Transport performing the real requests
+        cassette: Cassette to record into (shared between transports if needed)
+    """
+
+    def __init__(self, inner: Transport, cassette: Optional[Cassette] = None):
+        self.inner = inner
+        self.cassette = cassette if cassette is not None else Cassette()
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        entry: Dict[str, Any] = {
+            "method": method,
+            "url": url,
+            "request_headers": mask_headers(headers or {}),
+            "request_body": _mask_request_body(json if json is not None else data),
+        }
+        start = time.perf_counter()
+        try:
+            response = self.inner.send(
+                method, url, headers=headers, data=data, json=json, timeout=timeout
+            )
+        except requests.exceptions.RequestException as e:
+            entry["elapsed"] = time.perf_counter() - start
+            entry["error"] = type(e).__name__
+            self.cassette.append(entry)
+            raise
+        # Accessing .text downloads the body, so the timing includes it
+        body = response.text
+        entry["elapsed"] = time.perf_counter() - start
+        entry["status"] = response.status_code
+        entry["response_headers"] = mask_headers(dict(response.headers))
+        entry["body"] = _mask_body(body)
+        self.cassette.append(entry)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving recorded exchanges back without any network access.
+
+    Requests are matched on method and URL in recording order; when no
+    exact match is left, any recording of the same method and endpoint
+    family is used (so IDs may differ between recording and replay).
+
+    Args:
+        cassette: Recorded exchanges
+        latency_scale: Multiplier applied to recorded latency (0 disables sleeping)
+        cycle: Reuse recordings once exhausted (for long load tests)
+    """
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 1.0, cycle: bool = False):
+        if latency_scale < 0:
+            raise ValueError("latency_scale must not be negative")
+        self._latency_scale = latency_scale
+        self._cycle = cycle
+        self._lock = threading.Lock()
+        self._entries = cassette.entries
+        self._used = set()
+        self._exact: Dict[Tuple[str, str], Deque[int]] = {}
+        self._family: Dict[Tuple[str, str], Deque[int]] = {}
+        for index, entry in enumerate(self._entries):
+            method = entry["method"].upper()
+            self._exact.setdefault((method, entry["url"]), deque()).append(index)
+            self._family.setdefault(
+                (method, endpoint_family(entry["url"])), deque()
+            ).append(index)
+
+    def _next_entry(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for queue in (self._exact.get((method, url)),
+                          self._family.get((method, endpoint_family(url)))):
+                while queue:
+                    index = queue.popleft()
+                    if self._cycle:
+                        queue.append(index)
+                        return self._entries[index]
+                    if index not in self._used:
+                        self._used.add(index)
+                        return self._entries[index]
+        return None
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        method = method.upper()
+        entry = self._next_entry(method, url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {method} {url}"
+            )
+
+        delay = entry.get("elapsed", 0.0) * self._latency_scale
+        if delay:
+            time.sleep(delay)
+
+        if "error" in entry:
+            raise _REPLAYABLE_ERRORS.get(entry["error"], requests.exceptions.ConnectionError)(
+                f"Replayed {entry['error']} for {method} {url}"
+            )
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = http.client.responses.get(entry["status"], "")
+        response.headers = CaseInsensitiveDict(entry.get("response_headers", {}))
+        response._content = entry.get("body", "").encode("utf-8")
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        response.url = url
+        response.request = requests.Request(method, url, headers=headers).prepare()
+        return response
+
+
+def http_clients_of(target: Any) -> List[Any]:
+    """
+    Collect the SecureHTTPClient instances used by a client object.
+
+    Args:
+        target: MVolaClient, MVolaAuth, MVolaTransaction or SecureHTTPClient
+
+    Returns:
+        List of SecureHTTPClient instances
+    """
+    from .http_client import SecureHTTPClient
+
+    if isinstance(target, SecureHTTPClient):
+        return [target]
+    clients = []
+    for attr in ("_auth", "_transaction"):
+        if getattr(target, attr, None) is not None:
+            clients.extend(http_clients_of(getattr(target, attr)))
+    for attr in ("_http_client", "_query_http_client"):
+        if isinstance(getattr(target, attr, None), SecureHTTPClient):
+            clients.append(getattr(target, attr))
+    # The auth module is reachable from both the client and its transaction module
+    unique = {id(c): c for c in clients}
+    return list(unique.values())
+
+
+def wrap_transport(target: Any, factory: Callable[[Transport], Transport]) -> List[Transport]:
+    """
+    Replace the transport of every HTTP client of target.
+
+    Usage:
+        cassette = Cassette()
+        wrap_transport(client, lambda inner: RecordingTransport(inner, cassette))
+
+    Args:
+        target: MVolaClient, MVolaAuth, MVolaTransaction or SecureHTTPClient
+        factory: Called with each current transport, returns its replacement
+
+    Returns:
+        The installed transports
+    """
+    installed = []
+    for http_client in http_clients_of(target):
+        http_client.transport = factory(http_client.transport)
+        installed.append(http_client.transport)
+    return installed
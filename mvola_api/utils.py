@@ -7,13 +7,20 @@ credential masking, and request formatting.
 
 import base64
 import datetime
-import ipaddress
 import re
 import uuid
 from typing import Dict, Optional, Tuple
 from urllib.parse import urlparse
 
-from .constants import MAX_DESCRIPTION_LENGTH
+from .constants import (
+    MAX_DESCRIPTION_LENGTH,
+    MERCHANT_PAY_ENDPOINT,
+    TOKEN_ENDPOINT,
+    TRANSACTION_STATUS_ENDPOINT,
+)
+
+# Header names whose values must never be logged or recorded in clear
+SENSITIVE_HEADERS = frozenset(["authorization", "x-api-key", "cookie", "set-cookie"])
 
 
 def encode_credentials(consumer_key: str, consumer_secret: str) -> str:
@@ -129,6 +136,9 @@ def _is_private_ip(hostname: str) -> bool:
     Returns:
         True if the hostname points to a private/internal address
     """
+    # Imported on first use: only callback URL validation needs it
+    import ipaddress
+
     # Check literal IP addresses
     try:
         addr = ipaddress.ip_address(hostname)
@@ -251,6 +261,52 @@ def mask_token(token: str) -> str:
     return token[:4] + "..." + token[-3:]
 
 
+def mask_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Create a copy of headers with sensitive values masked.
+
+    Args:
+        headers: Request or response headers
+
+    Returns:
+        Headers dict safe for logging or recording
+    """
+    masked = {}
+    for key, value in headers.items():
+        if key.lower() in SENSITIVE_HEADERS:
+            if value.lower().startswith("bearer "):
+                masked[key] = f"Bearer {mask_token(value[7:])}"
+            elif value.lower().startswith("basic "):
+                masked[key] = "Basic ****"
+            else:
+                masked[key] = "****"
+        else:
+            masked[key] = value
+    return masked
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Classify an MVola API URL by endpoint family.
+
+    Args:
+        url: Full URL or path
+
+    Returns:
+        One of "token", "merchantpay", "status", "details" or "other"
+    """
+    path = urlparse(url).path
+    if path == TOKEN_ENDPOINT:
+        return "token"
+    if path.startswith(TRANSACTION_STATUS_ENDPOINT):
+        return "status"
+    if path == MERCHANT_PAY_ENDPOINT:
+        return "merchantpay"
+    if path.startswith(MERCHANT_PAY_ENDPOINT):
+        return "details"
+    return "other"
+
+
 def get_mvola_headers(
     access_token: str,
     correlation_id: str,
@@ -357,12 +413,20 @@ def format_transaction_response(response_data: dict) -> dict:
     """
     Format transaction response data into a more user-friendly format.
 
+    Result objects (see results.py) already expose these fields as typed
+    properties (result.status, result.server_correlation_id, ...).
+
     Args:
-        response_data: Raw response data
+        response_data: Raw response data, or a result object whose
+            decoded body is used
 
     Returns:
         Formatted response data
     """
+    from .results import TransactionResult
+
+    if isinstance(response_data, TransactionResult):
+        response_data = response_data.response
     if not isinstance(response_data, dict):
         return {"success": False, "error": "Invalid response data"}
 
@@ -46,6 +46,7 @@ setuptools.setup(
         "dev": [
             "pytest>=6.0.0",
             "pytest-cov>=2.10.0",
+            "pytest-benchmark>=4.0.0",
             "black>=21.5b2",
             "flake8>=3.9.0",
             "isort>=5.9.0",
@@ -59,6 +60,12 @@ setuptools.setup(
             "mkdocstrings-python>=0.5.0",
             "mike>=1.1.2",
         ],
+        "tracing": [
+            "opentelemetry-api>=1.0.0",
+        ],
+    },
+    entry_points={
+        "console_scripts": ["mvola=mvola_api.cli:main"],
     },
     project_urls={
         "Documentation": "https://Niainarisoa01.github.io/Mvola_API_Lib/",
@@ -0,0 +1 @@
+# Microbenchmarks for MVola API hot paths
@@ -0,0 +1,22 @@
+"""
+Benchmark configuration.
+
+Benchmarks need pytest-benchmark and only run when explicitly requested
+with --benchmark-only (see the bench* targets in the Makefile), so the
+regular test suite stays fast.
+"""
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmark_only", default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark-only (make bench)")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+"""
+Microbenchmarks for the per-call overhead of the library's hot paths.
+
+Run and compare against a saved baseline with:
+    make bench-save      # record a baseline
+    make bench-compare   # fail on regressions against the last baseline
+"""
+import threading
+import time
+
+import pytest
+
+from mvola_api import MVolaAuth, MVolaTransaction
+from mvola_api.constants import SANDBOX_URL, TOKEN_ENDPOINT, TRANSACTION_STATUS_ENDPOINT
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.metrics import MetricsRegistry
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+from mvola_api.utils import get_mvola_headers, validate_callback_url
+
+TOKEN = "eyJhbGciOiJSUzI1NiIsInR5cCI6IkpXVCJ9.benchmark.token"
+CORRELATION_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+class _StubAuth:
+    def get_access_token(self, force_refresh=False, deadline=None):
+        return TOKEN
+
+
+class _StubResponse:
+    status_code = 202
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"status": "pending", "serverCorrelationId": CORRELATION_ID}
+
+
+class _StubHTTPClient:
+    def post(self, url, headers=None, data=None, json=None, timeout=None, deadline=None):
+        return _StubResponse()
+
+
+def _unlimited():
+    return TokenBucketRateLimiter(max_tokens=10**9, refill_rate=10**9, name="bench")
+
+
+@pytest.fixture
+def transaction():
+    txn = MVolaTransaction(_StubAuth(), SANDBOX_URL, "Bench Partner", "0343500004")
+    txn._rate_limiter = _unlimited()
+    txn._http_client = _StubHTTPClient()
+    return txn
+
+
+@pytest.fixture(scope="module")
+def emulator():
+    with MVolaEmulator() as emu:
+        yield emu
+
+
+def test_get_mvola_headers(benchmark):
+    headers = benchmark(
+        get_mvola_headers,
+        access_token=TOKEN,
+        correlation_id=CORRELATION_ID,
+        partner_msisdn="0343500004",
+        partner_name="Bench Partner",
+    )
+    assert headers["Authorization"] == f"Bearer {TOKEN}"
+
+
+def test_get_mvola_headers_with_callback(benchmark):
+    headers = benchmark(
+        get_mvola_headers,
+        access_token=TOKEN,
+        correlation_id=CORRELATION_ID,
+        callback_url="https://merchant.example.com/mvola/callback",
+        partner_msisdn="0343500004",
+        partner_name="Bench Partner",
+    )
+    assert "X-Callback-URL" in headers
+
+
+def test_validate_callback_url(benchmark):
+    url = "https://merchant.example.com:8443/mvola/callback"
+    assert benchmark(validate_callback_url, url) == url
+
+
+def test_validate_transaction_params(benchmark, transaction):
+    benchmark(
+        transaction._validate_transaction_params,
+        "15000",
+        "0343500003",
+        "0343500004",
+        "Paiement facture 2026-10",
+    )
+
+
+def test_rate_limiter_acquire_uncontended(benchmark):
+    limiter = _unlimited()
+    assert benchmark(limiter.acquire)
+
+
+@pytest.mark.parametrize("threads", [4, 16])
+def test_rate_limiter_acquire_contended(benchmark, threads):
+    """Total time for `threads` threads each acquiring 500 tokens."""
+    limiter = _unlimited()
+    per_thread = 500
+
+    def contend():
+        barrier = threading.Barrier(threads)
+
+        def worker():
+            barrier.wait()
+            for _ in range(per_thread):
+                limiter.acquire()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+    benchmark.pedantic(contend, rounds=10, iterations=1)
+
+
+def test_get_access_token_cache_hit(benchmark):
+    auth = MVolaAuth("bench_key", "bench_secret", SANDBOX_URL)
+    auth._token = {"access_token": TOKEN, "expires_in": 3600}
+    auth._token_expiry = time.time() + 3600
+    assert benchmark(auth.get_access_token) == TOKEN
+
+
+def test_build_payment_payload(benchmark, transaction):
+    payload = benchmark(
+        transaction._build_payment_payload,
+        "15000",
+        "0343500003",
+        "0343500004",
+        "Paiement facture",
+        "Ar",
+        "USD",
+        "1",
+        "ref1234",
+        "MVOLA_123",
+    )
+    assert payload["amount"] == "15000"
+
+
+def test_initiate_merchant_payment_overhead(benchmark, transaction):
+    """Full client-side path of a payment with the network stubbed out."""
+    result = benchmark(
+        transaction.initiate_merchant_payment,
+        amount="15000",
+        debit_msisdn="0343500003",
+        credit_msisdn="0343500004",
+        description="Paiement facture",
+        correlation_id=CORRELATION_ID,
+        requesting_organisation_transaction_reference="ref1234",
+    )
+    assert result["success"]
+
+
+def test_http_post_round_trip(benchmark, emulator):
+    http_client = SecureHTTPClient()
+    emulator.attach(http_client)
+    headers = {"Authorization": "Basic YmVuY2g6YmVuY2g="}
+    data = {"grant_type": "client_credentials"}
+    url = SANDBOX_URL + TOKEN_ENDPOINT
+
+    response = benchmark(http_client.post, url, headers=headers, data=data)
+    assert response.status_code == 200
+    http_client.close()
+
+
+def test_http_get_round_trip(benchmark, emulator):
+    http_client = SecureHTTPClient()
+    emulator.attach(http_client)
+    token = http_client.post(
+        SANDBOX_URL + TOKEN_ENDPOINT, headers={"Authorization": "Basic YmVuY2g6YmVuY2g="}
+    ).json()["access_token"]
+    url = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "unknown-id"
+
+    response = benchmark(http_client.get, url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+    http_client.close()
+
+
+def test_metrics_counter_inc(benchmark):
+    child = MetricsRegistry().counter("bench", "Bench", ("operation",)).labels("status")
+    benchmark(child.inc)
+    assert child.value > 0
+
+
+def test_metrics_histogram_observe(benchmark):
+    child = MetricsRegistry().histogram("bench_seconds", "Bench", ("operation",)).labels("status")
+    benchmark(child.observe, 0.123)
+    assert child.count > 0
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Contention benchmark: one shared session versus a session pool.
+
+Each round, `threads` threads send REQUESTS_PER_ROUND token requests in
+total through one SecureHTTPClient against the local emulator. Compare
+the rounds' mean time (lower is higher throughput) between the "shared"
+and "pool" modes as the thread count grows:
+    pytest tests/benchmarks/test_session_contention.py --benchmark-only \
+        --benchmark-group-by=param:threads
+"""
+import threading
+
+import pytest
+
+from mvola_api.constants import SANDBOX_URL, TOKEN_ENDPOINT
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.http_client import SecureHTTPClient
+
+TOKEN_URL = SANDBOX_URL + TOKEN_ENDPOINT
+BASIC_AUTH = {"Authorization": "Basic YmVuY2g6YmVuY2g="}
+REQUESTS_PER_ROUND = 512
+
+
+@pytest.fixture(scope="module")
+def emulator():
+    with MVolaEmulator() as emu:
+        yield emu
+
+
+@pytest.mark.parametrize("mode", ["shared", "pool"])
+@pytest.mark.parametrize("threads", [1, 8, 32, 64, 128])
+def test_concurrent_round_trips(benchmark, emulator, threads, mode):
+    if mode == "pool":
+        http_client = SecureHTTPClient(max_retries=0, session_pool=min(threads, 32))
+    else:
+        http_client = SecureHTTPClient(max_retries=0, pool_maxsize=min(threads, 32))
+    emulator.attach(http_client)
+    per_thread = REQUESTS_PER_ROUND // threads
+    failures = []
+
+    def round_trip():
+        barrier = threading.Barrier(threads)
+
+        def worker():
+            barrier.wait()
+            for _ in range(per_thread):
+                response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+                if response.status_code != 200:
+                    failures.append(response.status_code)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+    benchmark.extra_info["requests"] = per_thread * threads
+    benchmark.pedantic(round_trip, rounds=3, iterations=1, warmup_rounds=1)
+    http_client.close()
+    assert not failures
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmarks: importing the package and constructing a client.
+
+Serverless workers and CLI tools pay both on every start. Targets (the
+tests fail above them):
+- `import mvola_api`: IMPORT_TARGET (was ~130-170 ms, as it imported
+  requests, urllib3 and python-dotenv eagerly; now ~1 ms)
+- MVolaClient(...): CONSTRUCTION_TARGET per client once the modules
+  are loaded (was ~0.3 ms with two sessions and a .env lookup per
+  construction; now ~0.07 ms)
+
+    pytest tests/benchmarks/test_startup.py --benchmark-only
+"""
+import json
+import os
+import subprocess
+import sys
+
+from mvola_api import MVolaClient
+
+IMPORT_TARGET = 0.010
+CONSTRUCTION_TARGET = 0.0002
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Run in a fresh interpreter: times measured around the imports themselves,
+# excluding interpreter startup
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import mvola_api
+imported = time.perf_counter()
+eager = sorted({"requests", "urllib3", "dotenv"}.intersection(sys.modules))
+from mvola_api import MVolaClient
+full = time.perf_counter()
+print(json.dumps({"import": imported - start, "import_client": full - start, "eager": eager}))
+"""
+
+
+def _fresh_import():
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SCRIPT],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_time(benchmark):
+    samples = []
+
+    def run():
+        samples.append(_fresh_import())
+
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+    import_time = sorted(s["import"] for s in samples)[len(samples) // 2]
+    benchmark.extra_info["import_mvola_api"] = import_time
+    client_times = sorted(s["import_client"] for s in samples)
+    benchmark.extra_info["import_client"] = client_times[len(samples) // 2]
+    assert samples[0]["eager"] == []
+    assert import_time < IMPORT_TARGET
+
+
+def test_client_construction(benchmark):
+    def construct():
+        return MVolaClient(
+            consumer_key="bench_key",
+            consumer_secret="bench_secret",
+            partner_name="Bench Partner",
+            sandbox=True,
+        )
+
+    construct()  # loads .env once
+    benchmark(construct)
+    assert benchmark.stats.stats.mean < CONSTRUCTION_TARGET
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Tests for bulkheads isolating payment, auth and query traffic.
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.bulkhead import Bulkhead, BulkheadFullError, Bulkheads
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.deadline import Deadline, DeadlineExceededError
+from mvola_api.emulator import MVolaEmulator, fixed_latency
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.metrics import MVolaMetrics
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+from mvola_api.transport import http_clients_of
+
+
+def _make_client(bulkheads):
+    return MVolaClient(
+        consumer_key="bulkhead_key",
+        consumer_secret="bulkhead_secret",
+        partner_name="Bulkhead Test",
+        sandbox=True,
+        rate_limiter=TokenBucketRateLimiter(max_tokens=1000, refill_rate=1000.0),
+        bulkheads=bulkheads,
+    )
+
+
+class TestBulkhead(unittest.TestCase):
+
+    def test_full_bulkhead_rejects(self):
+        bulkhead = Bulkhead("query", max_concurrent=2, max_wait=0)
+        bulkhead.acquire()
+        bulkhead.acquire()
+        with self.assertRaises(BulkheadFullError) as ctx:
+            bulkhead.acquire()
+        self.assertIsInstance(ctx.exception, MVolaConnectionError)
+        self.assertEqual(ctx.exception.bulkhead, "query")
+        self.assertEqual((bulkhead.active, bulkhead.rejections), (2, 1))
+        bulkhead.release()
+        bulkhead.acquire()
+        self.assertEqual(bulkhead.active, 2)
+
+    def test_waits_for_a_released_slot(self):
+        bulkhead = Bulkhead("payment", max_concurrent=1, max_wait=1.0)
+        bulkhead.acquire()
+        threading.Timer(0.05, bulkhead.release).start()
+        start = time.perf_counter()
+        with bulkhead.slot():
+            self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+        self.assertEqual(bulkhead.active, 0)
+        self.assertGreater(bulkhead.total_wait_time, 0.04)
+
+    def test_wait_is_bounded_by_deadline(self):
+        bulkhead = Bulkhead("query", max_concurrent=1, max_wait=5.0)
+        bulkhead.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceededError):
+            bulkhead.acquire(deadline=Deadline(0.05))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            Bulkhead("query", max_concurrent=0)
+        with self.assertRaises(ValueError):
+            Bulkheads(max_wait=-1)
+
+
+class TestBulkheadIsolation(unittest.TestCase):
+
+    def test_query_flood_does_not_delay_payments(self):
+        bulkheads = Bulkheads(auth=1, payment=2, query=2, max_wait=0.05)
+        with MVolaEmulator(latency={"details": fixed_latency(0.3)}, completion_delay=0) as emulator:
+            client = _make_client(bulkheads)
+            emulator.attach(client)
+            client.generate_token()
+
+            errors = []
+
+            def query():
+                try:
+                    client.get_transaction_details("slow-report")
+                except Exception as e:
+                    errors.append(type(e))
+
+            flood = [threading.Thread(target=query) for _ in range(8)]
+            for thread in flood:
+                thread.start()
+            time.sleep(0.05)
+
+            start = time.perf_counter()
+            result = client.initiate_payment(
+                amount=1000,
+                debit_msisdn=TEST_MSISDN_1,
+                credit_msisdn=TEST_MSISDN_2,
+                description="Checkout",
+            )
+            payment_latency = time.perf_counter() - start
+            for thread in flood:
+                thread.join()
+
+        self.assertEqual(result["status_code"], 202)
+        self.assertLess(payment_latency, 0.2)
+        # Only two queries fit; the others were shed instead of queueing
+        self.assertEqual(errors.count(BulkheadFullError), 6)
+        self.assertEqual(bulkheads.get("query").rejections, 6)
+        self.assertEqual(bulkheads.get("payment").rejections, 0)
+
+    def test_compartments_have_their_own_pools(self):
+        client = _make_client(Bulkheads(payment=3, query=5))
+        http_clients = http_clients_of(client)
+        self.assertEqual(len(http_clients), 3)
+        transaction = client._transaction
+        self.assertIsNot(
+            transaction._http_client.transport.session,
+            transaction._query_http_client.transport.session,
+        )
+        self.assertEqual(transaction._query_http_client._pool_maxsize, 5)
+
+        metrics = MVolaMetrics()
+        metrics.track_client(client)
+        text = metrics.registry.to_prometheus()
+        self.assertIn('mvola_bulkhead_active_calls{bulkhead="query"} 0', text)
+        self.assertIn('mvola_bulkhead_rejections_total{bulkhead="payment"} 0', text)
+
+    def test_without_bulkheads_one_client_is_shared(self):
+        client = _make_client(None)
+        transaction = client._transaction
+        self.assertIs(transaction._http_client, transaction._query_http_client)
+        self.assertIsNone(transaction._http_client.bulkhead)
+
+
+if __name__ == "__main__":
+    unittest.main()
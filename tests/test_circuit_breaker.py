@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Tests for per-endpoint circuit breakers.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+)
+from mvola_api.constants import (
+    MERCHANT_PAY_ENDPOINT,
+    SANDBOX_URL,
+    TRANSACTION_STATUS_ENDPOINT,
+)
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaConnectionError, MVolaTransactionError
+from mvola_api.faults import FaultInjectionTransport, FaultRule, HTTPStatus, Latency
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.metrics import MVolaMetrics
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+PAY_URL = SANDBOX_URL + MERCHANT_PAY_ENDPOINT
+
+
+class _ServerTransport(Transport):
+    """Healthy server answering 200; counts what it received."""
+
+    def __init__(self):
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        with self._lock:
+            self.received += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _client(rules, **settings):
+    server = _ServerTransport()
+    breakers = CircuitBreakers(**settings)
+    http_client = SecureHTTPClient(
+        max_retries=0,
+        transport=FaultInjectionTransport(server, rules),
+        circuit_breakers=breakers,
+    )
+    return http_client, breakers, server
+
+
+def _trip_shared(state, lock):
+    breaker = CircuitBreaker("status", minimum_calls=2, state=state, lock=lock)
+    breaker.record(True, 0.01)
+    breaker.record(True, 0.01)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_on_error_rate_and_fails_fast(self):
+        http_client, breakers, server = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status")], minimum_calls=4
+        )
+        for _ in range(4):
+            self.assertEqual(http_client.get(STATUS_URL).status_code, 503)
+        self.assertEqual(breakers.get("status").state, OPEN)
+
+        start = time.perf_counter()
+        with self.assertRaises(CircuitOpenError) as ctx:
+            http_client.get(STATUS_URL)
+        self.assertLess(time.perf_counter() - start, 0.01)
+        self.assertIsInstance(ctx.exception, MVolaConnectionError)
+        self.assertEqual(ctx.exception.endpoint, "status")
+        self.assertEqual(http_client.transport.injected["HTTP503"], 4)
+
+        # Other endpoint families are unaffected
+        self.assertEqual(http_client.post(PAY_URL).status_code, 200)
+        self.assertEqual(server.received, 1)
+
+    def test_error_rate_below_threshold_stays_closed(self):
+        http_client, breakers, _ = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status", calls=range(1, 4))],
+            minimum_calls=4,
+        )
+        for _ in range(10):
+            http_client.get(STATUS_URL)
+        self.assertEqual(breakers.get("status").state, CLOSED)
+
+    def test_opens_on_slow_calls(self):
+        http_client, breakers, _ = _client(
+            [FaultRule(Latency(0.02), endpoint="status")],
+            minimum_calls=3, slow_call_duration=0.01,
+        )
+        for _ in range(3):
+            http_client.get(STATUS_URL)
+        with self.assertRaises(CircuitOpenError):
+            http_client.get(STATUS_URL)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        breaker = CircuitBreaker("status", minimum_calls=2, open_duration=0.05)
+        breaker.record(True, 0.01)
+        breaker.record(True, 0.01)
+        self.assertEqual(breaker.state, OPEN)
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        # A single probe goes through; concurrent calls are still rejected
+        self.assertTrue(breaker.acquire())
+        with self.assertRaises(CircuitOpenError):
+            breaker.acquire()
+        breaker.record(True, 0.01, probe=True)
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.acquire())
+        breaker.record(False, 0.01, probe=True)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertFalse(breaker.acquire())
+        self.assertEqual((breaker.opened, breaker.rejections), (2, 1))
+
+    def test_state_shared_across_processes(self):
+        manager = multiprocessing.Manager()
+        try:
+            state, lock = manager.dict(), manager.Lock()
+            process = multiprocessing.Process(target=_trip_shared, args=(state, lock))
+            process.start()
+            process.join(10)
+            breaker = CircuitBreaker("status", state=state, lock=lock)
+            self.assertEqual(breaker.state, OPEN)
+            with self.assertRaises(CircuitOpenError):
+                breaker.acquire()
+        finally:
+            manager.shutdown()
+
+    def test_metrics_export_state(self):
+        http_client, breakers, _ = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status")], minimum_calls=2
+        )
+        metrics = MVolaMetrics()
+        metrics.track_client(http_client)
+        for _ in range(2):
+            http_client.get(STATUS_URL)
+        with self.assertRaises(CircuitOpenError):
+            http_client.get(STATUS_URL)
+        text = metrics.registry.to_prometheus()
+        self.assertIn('mvola_circuit_breaker_state{endpoint="status"} 2', text)
+        self.assertIn('mvola_circuit_breaker_rejections_total{endpoint="status"} 1', text)
+        self.assertIn('mvola_circuit_breaker_opened_total{endpoint="status"} 1', text)
+
+    def test_client_calls_fail_fast(self):
+        breakers = CircuitBreakers(minimum_calls=2)
+        with MVolaEmulator(completion_delay=0.0) as emulator:
+            client = MVolaClient(
+                consumer_key="breaker_key",
+                consumer_secret="breaker_secret",
+                partner_name="Breaker Test",
+                sandbox=True,
+                circuit_breakers=breakers,
+            )
+            emulator.attach(client)
+            for _ in range(2):
+                with self.assertRaises(MVolaTransactionError):
+                    client.get_transaction_status("unknown-id")
+            breaker = breakers.get("status")
+            breaker.record(True, 0.01)
+            breaker.record(True, 0.01)
+            with self.assertRaises(CircuitOpenError):
+                client.get_transaction_status("unknown-id")
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            CircuitBreakers(failure_rate_threshold=0)
+        with self.assertRaises(ValueError):
+            CircuitBreaker(open_duration=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Tests for the adaptive concurrency limiter and load shedding.
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.concurrency import AdaptiveConcurrencyLimiter, LoadShedError
+from mvola_api.constants import SANDBOX_URL, TRANSACTION_STATUS_ENDPOINT
+from mvola_api.deadline import Deadline
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.metrics import MVolaMetrics
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+
+
+class _QueueingServer(Transport):
+    """
+    Server processing `capacity` requests at once; the rest queue up in
+    arrival order. Requests still queued at the read timeout time out.
+    """
+
+    def __init__(self, capacity=4, service_time=0.01):
+        self.service_time = service_time
+        self._free_at = [0.0] * capacity
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        with self._lock:
+            now = time.monotonic()
+            worker = min(range(len(self._free_at)), key=self._free_at.__getitem__)
+            done = max(now, self._free_at[worker]) + self.service_time
+            self._free_at[worker] = done
+        read_timeout = timeout[1] if timeout else None
+        if read_timeout is not None and done - now > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout("Read timed out")
+        time.sleep(done - now)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _hold(limiter, count):
+    for _ in range(count):
+        limiter.acquire()
+
+
+class TestLimitAdjustment(unittest.TestCase):
+
+    def test_limit_grows_while_latency_is_stable(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=50)
+        _hold(limiter, 10)
+        for _ in range(50):
+            limiter.sample(0.01)
+        # Up to twice what is actually used, no further
+        self.assertGreaterEqual(limiter.limit, 15)
+        self.assertLessEqual(limiter.limit, 21)
+
+    def test_idle_limiter_does_not_grow(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+        for _ in range(50):
+            limiter.sample(0.01)
+        self.assertEqual(limiter.limit, 10)
+
+    def test_limit_shrinks_when_latency_rises(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=40)
+        _hold(limiter, 40)
+        for _ in range(20):
+            limiter.sample(0.01)
+        grown = limiter.limit
+        for _ in range(20):
+            limiter.sample(0.05)
+        self.assertLess(limiter.limit, grown / 2)
+
+    def test_drops_shrink_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=20, min_limit=5, backoff_ratio=0.5)
+        limiter.sample(0.01, dropped=True)
+        self.assertEqual(limiter.limit, 10)
+        for _ in range(5):
+            limiter.sample(0.01, dropped=True)
+        self.assertEqual(limiter.limit, 5)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(initial_limit=0)
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(min_limit=10, initial_limit=5)
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrencyLimiter(tolerance=0.5)
+
+
+class TestLoadShedding(unittest.TestCase):
+
+    def test_call_that_cannot_make_its_deadline_is_shed_at_once(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=5.0)
+        limiter.sample(0.1)
+        limiter.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(LoadShedError) as ctx:
+            limiter.acquire(deadline=Deadline(0.15))
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertIsInstance(ctx.exception, MVolaConnectionError)
+        self.assertEqual(ctx.exception.limit, 1)
+        self.assertEqual(limiter.shed, 1)
+
+    def test_queued_call_is_admitted_when_a_slot_frees(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=1.0)
+        limiter.acquire()
+        threading.Timer(0.05, limiter.release).start()
+        with limiter.slot(deadline=Deadline(1.0)):
+            self.assertEqual(limiter.in_flight, 1)
+        self.assertEqual((limiter.in_flight, limiter.shed), (0, 0))
+
+    def test_queue_wait_is_bounded(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=0.05)
+        limiter.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(LoadShedError):
+            limiter.acquire()
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+class TestOverload(unittest.TestCase):
+
+    def test_limit_converges_and_latency_stays_bounded(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=32, max_wait=0.1)
+        http_client = SecureHTTPClient(
+            max_retries=0, transport=_QueueingServer(capacity=4), concurrency_limiter=limiter
+        )
+        latencies = []
+        shed = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                start = time.perf_counter()
+                try:
+                    http_client.get(STATUS_URL, deadline=Deadline(0.2))
+                except LoadShedError:
+                    with lock:
+                        shed.append(1)
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=worker) for _ in range(24)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The server handles 4 at a time: queueing upstream drives the
+        # limit down from 32 instead of letting 24 calls pile up there
+        self.assertLess(limiter.limit, 16)
+        self.assertGreater(len(latencies), 100)
+        self.assertLess(max(latencies), 0.2)
+        self.assertEqual(limiter.in_flight, 0)
+
+        metrics = MVolaMetrics()
+        metrics.track_http_client(http_client)
+        text = metrics.registry.to_prometheus()
+        self.assertIn(f'mvola_concurrency_limit{{limiter="gateway"}} {limiter.limit}', text)
+        self.assertIn(f'mvola_load_shed_total{{limiter="gateway"}} {len(shed)}', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Tests for connect/read timeouts and end-to-end deadlines.
+"""
+import os
+import sys
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import (
+    MERCHANT_PAY_ENDPOINT,
+    SANDBOX_URL,
+    TEST_MSISDN_1,
+    TRANSACTION_STATUS_ENDPOINT,
+)
+from mvola_api.deadline import Deadline, DeadlineExceededError
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.faults import (
+    FaultInjectionTransport,
+    FaultRule,
+    HalfOpen,
+    HTTPStatus,
+    SlowConnect,
+)
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.rate_limiter import RateLimitError, TokenBucketRateLimiter
+from mvola_api.transaction import MVolaTransaction
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+PAY_URL = SANDBOX_URL + MERCHANT_PAY_ENDPOINT
+
+
+class _ServerTransport(Transport):
+    """Healthy server answering 200; records the timeouts it was given."""
+
+    def __init__(self):
+        self.timeouts = []
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        self.timeouts.append(timeout)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _client(rules, **kwargs):
+    server = _ServerTransport()
+    faults = FaultInjectionTransport(server, rules)
+    return SecureHTTPClient(transport=faults, **kwargs), faults, server
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_remaining_and_check(self):
+        deadline = Deadline(0.05)
+        self.assertLessEqual(deadline.remaining(), 0.05)
+        self.assertGreater(deadline.check("step"), 0)
+        time.sleep(0.06)
+        self.assertTrue(deadline.expired)
+        self.assertEqual(deadline.remaining(), 0.0)
+        with self.assertRaises(DeadlineExceededError) as ctx:
+            deadline.check("step")
+        self.assertIsInstance(ctx.exception, MVolaConnectionError)
+        with self.assertRaises(ValueError):
+            Deadline(-1)
+
+    def test_timeouts_are_split_and_capped(self):
+        http_client, _, server = _client([], timeout=30, connect_timeout=5)
+        http_client.get(STATUS_URL)
+        http_client.get(STATUS_URL, deadline=Deadline(2))
+        http_client.get(STATUS_URL, timeout=1)
+        self.assertEqual(server.timeouts[0], (5, 30))
+        connect, read = server.timeouts[1]
+        self.assertLessEqual((connect, read), (2, 2))
+        self.assertGreater(connect, 1.9)
+        self.assertEqual(server.timeouts[2], (1, 1))
+
+    def test_slow_handshake_hits_connect_timeout(self):
+        http_client, _, _ = _client([FaultRule(SlowConnect(1.0))], timeout=5, connect_timeout=0.05)
+        start = time.perf_counter()
+        with self.assertRaises(MVolaConnectionError) as ctx:
+            http_client.post(PAY_URL, json={})
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn("connect 0.05s", str(ctx.exception))
+
+
+class TestDeadlineBoundsRetries(unittest.TestCase):
+
+    def test_hanging_get_stops_at_deadline(self):
+        # Without a deadline: 4 attempts x 1 s plus backoff
+        http_client, faults, _ = _client(
+            [FaultRule(HalfOpen(), endpoint="status")], timeout=1, max_retries=3,
+            backoff_factor=0.01,
+        )
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceededError):
+            http_client.get(STATUS_URL, deadline=Deadline(0.2))
+        elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 0.35)
+
+    def test_retry_that_cannot_fit_is_not_attempted(self):
+        http_client, faults, _ = _client(
+            [FaultRule(HTTPStatus(503, retry_after=1), endpoint="status", calls=[1])],
+        )
+        start = time.perf_counter()
+        response = http_client.get(STATUS_URL, deadline=Deadline(0.3))
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(faults.injected, {"HTTP503": 1})
+
+
+class TestDeadlineBoundsWaits(unittest.TestCase):
+
+    def test_rate_limiter_fails_fast_when_tokens_cannot_arrive_in_time(self):
+        limiter = TokenBucketRateLimiter(max_tokens=1, refill_rate=1.0)
+        limiter.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceededError):
+            limiter.acquire(deadline=Deadline(0.2))
+        with self.assertRaises(RateLimitError):
+            limiter.acquire(timeout=0.2)
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_rate_limiter_waits_for_refill_within_deadline(self):
+        limiter = TokenBucketRateLimiter(max_tokens=1, refill_rate=20.0)
+        limiter.acquire()
+        start = time.perf_counter()
+        self.assertTrue(limiter.acquire(deadline=Deadline(0.5)))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_client_call_never_exceeds_budget(self):
+        limiter = TokenBucketRateLimiter(max_tokens=1, refill_rate=0.5)
+        with MVolaEmulator(completion_delay=0.0) as emulator:
+            client = MVolaClient(
+                consumer_key="deadline_key",
+                consumer_secret="deadline_secret",
+                partner_name="Deadline Test",
+                sandbox=True,
+                rate_limiter=limiter,
+            )
+            emulator.attach(client)
+            client.generate_token()
+            limiter.acquire()
+
+            start = time.perf_counter()
+            with self.assertRaises(DeadlineExceededError):
+                client.get_transaction_status("abc-123", deadline=Deadline(0.2))
+            self.assertLess(time.perf_counter() - start, 0.25)
+
+    def test_token_refresh_wait_is_bounded(self):
+        with MVolaEmulator(completion_delay=0.0) as emulator:
+            client = MVolaClient(
+                consumer_key="deadline_key",
+                consumer_secret="deadline_secret",
+                partner_name="Deadline Test",
+                sandbox=True,
+            )
+            emulator.attach(client)
+            lock = client._auth._token_lock
+            lock.acquire()
+            try:
+                start = time.perf_counter()
+                with self.assertRaises(DeadlineExceededError):
+                    client.generate_token(deadline=Deadline(0.1))
+                self.assertLess(time.perf_counter() - start, 0.2)
+            finally:
+                lock.release()
+            self.assertTrue(client.generate_token(deadline=Deadline(5))["access_token"])
+
+    def test_auth_objects_without_deadline_support_still_work(self):
+        class LegacyAuth:
+            def get_access_token(self, force_refresh=False):
+                return "legacy-token"
+
+        transaction = MVolaTransaction(LegacyAuth(), SANDBOX_URL, "Deadline Test", TEST_MSISDN_1)
+        self.addCleanup(transaction.close)
+        headers = transaction._get_headers()
+        self.assertEqual(headers["Authorization"], "Bearer legacy-token")
+
+
+if __name__ == "__main__":
+    unittest.main()
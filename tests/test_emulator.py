@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Tests for the local MVola API emulator.
+
+Runs the full client flow (token, initiation, status, details) against
+an in-process emulator without any network access.
+"""
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import SANDBOX_URL, TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import (
+    MVolaEmulator,
+    attach_emulator,
+    fixed_latency,
+    lognormal_latency,
+    uniform_latency,
+)
+from mvola_api.exceptions import MVolaAuthError, MVolaTransactionError
+
+
+def _make_client(sandbox=True):
+    return MVolaClient(
+        consumer_key="emulator_key",
+        consumer_secret="emulator_secret",
+        partner_name="Emulator Test",
+        sandbox=sandbox,
+    )
+
+
+def _pay(client):
+    return client.initiate_payment(
+        amount=1000,
+        debit_msisdn=TEST_MSISDN_1,
+        credit_msisdn=TEST_MSISDN_2,
+        description="Emulator payment",
+    )
+
+
+class TestEmulatorFlow(unittest.TestCase):
+    """Full payment flow against the emulator."""
+
+    def setUp(self):
+        self.emulator = MVolaEmulator(completion_delay=0.05, seed=1).start()
+        self.client = _make_client()
+        self.emulator.attach(self.client)
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_client_keeps_sandbox_base_url(self):
+        """Attaching must not change the whitelisted base URL."""
+        self.assertEqual(self.client.base_url, SANDBOX_URL)
+
+    def test_payment_lifecycle(self):
+        result = _pay(self.client)
+        self.assertEqual(result["status_code"], 202)
+        self.assertEqual(result["response"]["status"], "pending")
+
+        server_id = result["response"]["serverCorrelationId"]
+        status = self.client.get_transaction_status(server_id)
+        self.assertEqual(status["response"]["status"], "pending")
+
+        time.sleep(0.1)
+        status = self.client.get_transaction_status(server_id)
+        self.assertEqual(status["response"]["status"], "completed")
+
+        details = self.client.get_transaction_details(status["response"]["objectReference"])
+        self.assertEqual(details["response"]["amount"], "1000")
+        self.assertEqual(details["response"]["transactionStatus"], "completed")
+
+        self.assertEqual(self.emulator.request_counts["token"], 1)
+        self.assertEqual(self.emulator.request_counts["status"], 2)
+
+    def test_unknown_transaction_status(self):
+        with self.assertRaises(MVolaTransactionError) as ctx:
+            self.client.get_transaction_status("unknown-id")
+        self.assertEqual(ctx.exception.code, 404)
+
+
+class TestEmulatorFaults(unittest.TestCase):
+    """Error injection, failure rate and callbacks."""
+
+    def test_throttled_payment_is_not_retried(self):
+        with MVolaEmulator(throttle_rate={"merchantpay": 1.0}) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            with self.assertRaises(MVolaTransactionError) as ctx:
+                _pay(client)
+            self.assertEqual(ctx.exception.code, 429)
+            self.assertEqual(emulator.request_counts["merchantpay"], 1)
+
+    def test_server_errors_on_status_are_retried(self):
+        with MVolaEmulator(error_rate={"status": 1.0}) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            client._transaction._http_client.backoff_factor = 0
+            with self.assertRaises(MVolaTransactionError) as ctx:
+                client.get_transaction_status("abc-123")
+            self.assertEqual(ctx.exception.code, 500)
+            # One initial attempt plus three retries
+            self.assertEqual(emulator.request_counts["status"], 4)
+
+    def test_rejected_credentials(self):
+        with MVolaEmulator(credentials=("other_key", "other_secret")) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            with self.assertRaises(MVolaAuthError):
+                client.generate_token()
+
+    def test_failed_transactions_and_callbacks(self):
+        received = []
+        with MVolaEmulator(
+            completion_delay=0.01, failure_rate=1.0, callback_handler=received.append
+        ) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            result = _pay(client)
+            time.sleep(0.1)
+            status = client.get_transaction_status(result["response"]["serverCorrelationId"])
+            # Fired callback timers are released, not kept until stop()
+            self.assertEqual(emulator._timers, {})
+        self.assertEqual(status["response"]["status"], "failed")
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]["transactionStatus"], "failed")
+
+    def test_latency_models(self):
+        import random
+
+        rng = random.Random(0)
+        self.assertEqual(fixed_latency(0.2)(rng), 0.2)
+        self.assertTrue(0.1 <= uniform_latency(0.1, 0.3)(rng) <= 0.3)
+        self.assertGreater(lognormal_latency(0.05)(rng), 0)
+        with self.assertRaises(ValueError):
+            uniform_latency(0.3, 0.1)
+
+
+class TestEmulatorIsolation(unittest.TestCase):
+    """The emulator must never weaken production safety."""
+
+    def test_refuses_production_clients(self):
+        with MVolaEmulator() as emulator:
+            with self.assertRaises(ValueError):
+                emulator.attach(_make_client(sandbox=False))
+
+    def test_refuses_non_loopback_targets(self):
+        with self.assertRaises(ValueError):
+            attach_emulator(_make_client(), "http://evil.example.com:8000")
+
+    def test_refuses_non_loopback_bind(self):
+        with self.assertRaises(ValueError):
+            MVolaEmulator(host="0.0.0.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Tests for the compact error snapshots carried by MVola exceptions.
+"""
+import gc
+import os
+import sys
+import unittest
+import weakref
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import (
+    MAX_SNAPSHOT_FIELD,
+    ErrorSnapshot,
+    MVolaAuthError,
+    MVolaError,
+    MVolaTransactionError,
+)
+
+
+def _make_client(**kwargs):
+    return MVolaClient(
+        consumer_key="snapshot_key",
+        consumer_secret="snapshot_secret",
+        partner_name="Snapshot Test",
+        sandbox=True,
+        **kwargs,
+    )
+
+
+def _response(status_code, body, headers=None, url="https://api.mvola.mg/path?secret=1"):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "Reason"
+    response.url = url
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+class _ResponseTracker:
+    """Weak references to every response received through requests."""
+
+    def __init__(self):
+        self.refs = []
+        self._send = requests.Session.send
+
+    def __enter__(self):
+        tracker = self
+
+        def send(session, *args, **kwargs):
+            response = tracker._send(session, *args, **kwargs)
+            tracker.refs.append(weakref.ref(response))
+            return response
+
+        requests.Session.send = send
+        return self
+
+    def __exit__(self, *args):
+        requests.Session.send = self._send
+
+    def alive(self):
+        return sum(ref() is not None for ref in self.refs)
+
+
+class TestErrorSnapshot(unittest.TestCase):
+
+    def test_fields_from_fault_body(self):
+        response = _response(
+            401,
+            b'{"fault": {"code": 900901, "message": "Invalid Credentials"}}',
+            {"Content-Type": "application/json", "Set-Cookie": "a=b", "retry-after": "3"},
+        )
+        snapshot = ErrorSnapshot.from_response(response)
+        self.assertEqual(snapshot.status_code, 401)
+        self.assertEqual(snapshot.url, "https://api.mvola.mg/path")
+        self.assertEqual(snapshot.error_code, "900901")
+        self.assertEqual(snapshot.error_description, "Invalid Credentials")
+        self.assertEqual(snapshot.header("retry-after"), "3")
+        self.assertIsNone(snapshot.header("Set-Cookie"))
+
+    def test_fields_are_truncated_and_immutable(self):
+        body = '{"ErrorCode": "4001", "ErrorDescription": "%s"}' % ("x" * 5000)
+        response = _response(400, body.encode())
+        snapshot = ErrorSnapshot.from_response(response)
+        self.assertEqual(snapshot.error_code, "4001")
+        self.assertEqual(len(snapshot.error_description), MAX_SNAPSHOT_FIELD)
+        with self.assertRaises(AttributeError):
+            snapshot.status_code = 200
+
+    def test_non_json_body(self):
+        snapshot = ErrorSnapshot.from_response(_response(502, b"<html>Bad Gateway</html>"))
+        self.assertEqual(snapshot.status_code, 502)
+        self.assertIsNone(snapshot.error_code)
+        self.assertIsNone(snapshot.error_description)
+
+    def test_error_built_with_a_response_keeps_it(self):
+        response = _response(500, b"{}")
+        error = MVolaError("failed", code=500, response=response)
+        self.assertIs(error.response, response)
+        self.assertEqual(error.snapshot.status_code, 500)
+        self.assertIsNone(MVolaError("failed").snapshot)
+
+
+class TestRaisedErrors(unittest.TestCase):
+
+    def setUp(self):
+        gc.disable()
+
+    def tearDown(self):
+        gc.enable()
+
+    def test_transaction_error_does_not_retain_the_response(self):
+        with MVolaEmulator() as emulator, _ResponseTracker() as tracker:
+            client = _make_client()
+            emulator.attach(client)
+            with self.assertRaises(MVolaTransactionError) as ctx:
+                client.get_transaction_status("unknown-id")
+            error = ctx.exception
+
+            self.assertEqual(error.code, 404)
+            self.assertEqual(error.snapshot.status_code, 404)
+            self.assertIn(error.snapshot.error_description, error.message)
+            self.assertIsNone(error.response)
+            self.assertIsNone(error.__cause__.response)
+            self.assertEqual(tracker.alive(), 0)
+            client.close()
+
+    def test_auth_error_does_not_retain_the_response(self):
+        with MVolaEmulator(credentials=("other", "other")) as emulator, \
+                _ResponseTracker() as tracker:
+            client = _make_client()
+            emulator.attach(client)
+            with self.assertRaises(MVolaAuthError) as ctx:
+                client.get_access_token()
+            self.assertEqual(ctx.exception.snapshot.status_code, 401)
+            self.assertIsNone(ctx.exception.response)
+            self.assertEqual(tracker.alive(), 0)
+            client.close()
+
+    def test_raw_response_is_kept_on_request(self):
+        with MVolaEmulator() as emulator:
+            client = _make_client(keep_error_responses=True)
+            emulator.attach(client)
+            with self.assertRaises(MVolaTransactionError) as ctx:
+                client.get_transaction_details("unknown-id")
+            self.assertEqual(ctx.exception.response.status_code, 404)
+            self.assertEqual(ctx.exception.snapshot.status_code, 404)
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
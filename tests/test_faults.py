@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""
+Resilience tests with injected network faults.
+
+Measures how GET retries, POST no-retry, 429 Retry-After handling and
+timeouts shape latency and throughput, so backoff_factor and max_retries
+can be tuned from evidence.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.constants import (
+    MERCHANT_PAY_ENDPOINT,
+    SANDBOX_URL,
+    TRANSACTION_STATUS_ENDPOINT,
+)
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.faults import (
+    ConnectionReset,
+    Fault,
+    FaultInjectionTransport,
+    FaultRule,
+    HalfOpen,
+    HTTPStatus,
+    Latency,
+    PartialBody,
+    SlowConnect,
+)
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.loadtest import percentile
+from mvola_api.retry import RetryPolicy
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+PAY_URL = SANDBOX_URL + MERCHANT_PAY_ENDPOINT
+
+
+class _ServerTransport(Transport):
+    """Healthy server answering 200 after a fixed delay; counts what it received."""
+
+    def __init__(self, delay=0.001):
+        self.delay = delay
+        self.received = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.received.append((method, url))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _client(rules, max_retries=3, backoff_factor=0.01, timeout=1, seed=7):
+    server = _ServerTransport()
+    faults = FaultInjectionTransport(server, rules, seed=seed)
+    # No jitter: backoff is exactly backoff_factor * 2^(n-1) before retry n
+    http_client = SecureHTTPClient(
+        timeout=timeout,
+        transport=faults,
+        retry_policy=RetryPolicy(
+            max_retries=max_retries, backoff_factor=backoff_factor, jitter=False
+        ),
+    )
+    return http_client, faults, server
+
+
+class TestRetryBehavior(unittest.TestCase):
+
+    def test_get_recovers_from_503_burst(self):
+        http_client, faults, server = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status", calls=range(1, 3))]
+        )
+        start = time.perf_counter()
+        response = http_client.get(STATUS_URL)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(faults.injected, {"HTTP503": 2})
+        self.assertEqual(len(server.received), 1)
+        # Backoff schedule: 0.01 before the first retry, 0.02 before the second
+        self.assertGreaterEqual(elapsed, 0.03)
+
+    def test_get_gives_up_after_max_retries(self):
+        http_client, faults, server = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status")], max_retries=2
+        )
+        response = http_client.get(STATUS_URL)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(faults.calls, 3)
+        self.assertEqual(server.received, [])
+
+    def test_429_retry_after_is_honored(self):
+        http_client, faults, _ = _client(
+            [FaultRule(HTTPStatus(429, retry_after=0.1), endpoint="status", calls=[1])]
+        )
+        start = time.perf_counter()
+        self.assertEqual(http_client.get(STATUS_URL).status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+    def test_post_reset_after_send_is_not_retried(self):
+        """A payment that reached the server must never be sent twice."""
+        http_client, faults, server = _client(
+            [FaultRule(ConnectionReset(after_send=True), method="POST")]
+        )
+        with self.assertRaises(MVolaConnectionError):
+            http_client.post(PAY_URL, json={"amount": "1000"})
+        self.assertEqual(server.received, [("POST", PAY_URL)])
+
+    def test_post_429_is_not_retried(self):
+        http_client, faults, _ = _client([FaultRule(HTTPStatus(429), endpoint="merchantpay")])
+        self.assertEqual(http_client.post(PAY_URL, json={}).status_code, 429)
+        self.assertEqual(faults.calls, 1)
+
+    def test_partial_body_maps_to_connection_error(self):
+        http_client, _, server = _client([FaultRule(PartialBody(), method="POST")])
+        with self.assertRaises(MVolaConnectionError):
+            http_client.post(PAY_URL, json={})
+        self.assertEqual(len(server.received), 1)
+
+
+class TestTimeoutBehavior(unittest.TestCase):
+
+    def test_half_open_latency_is_bounded(self):
+        """Worst case for a GET is (max_retries + 1) * timeout plus backoff."""
+        http_client, faults, _ = _client(
+            [FaultRule(HalfOpen(), endpoint="status")],
+            max_retries=2, backoff_factor=0.01, timeout=0.05,
+        )
+        start = time.perf_counter()
+        with self.assertRaises(MVolaConnectionError):
+            http_client.get(STATUS_URL)
+        elapsed = time.perf_counter() - start
+
+        bound = 3 * 0.05 + (0.01 + 0.02)
+        self.assertGreaterEqual(elapsed, 3 * 0.05)
+        self.assertLess(elapsed, bound + 0.1)
+        self.assertEqual(faults.injected, {"HalfOpen": 3})
+
+    def test_slow_handshake_times_out(self):
+        http_client, _, server = _client(
+            [FaultRule(SlowConnect(1.0))], max_retries=0, timeout=0.05
+        )
+        with self.assertRaises(MVolaConnectionError) as ctx:
+            http_client.post(PAY_URL, json={})
+        self.assertIn("timed out", str(ctx.exception))
+        self.assertEqual(server.received, [])
+
+    def test_slow_server_below_timeout_succeeds(self):
+        http_client, _, _ = _client([FaultRule(Latency(0.05))], timeout=1)
+        start = time.perf_counter()
+        self.assertEqual(http_client.get(STATUS_URL).status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+
+class TestTailLatency(unittest.TestCase):
+
+    def _run(self, probability, requests_count=200):
+        http_client, faults, _ = _client(
+            [FaultRule(HTTPStatus(503), endpoint="status", probability=probability)],
+            backoff_factor=0.02,
+            seed=1234,
+        )
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            t0 = time.perf_counter()
+            response = http_client.get(STATUS_URL)
+            latencies.append(time.perf_counter() - t0)
+            self.assertEqual(response.status_code, 200)
+        elapsed = time.perf_counter() - start
+        return sorted(latencies), requests_count / elapsed, faults
+
+    def test_probabilistic_faults_raise_tail_not_median(self):
+        healthy, healthy_rps, _ = self._run(0.0)
+        faulty, faulty_rps, faults = self._run(0.1)
+
+        # ~10% of attempts fail; retries absorb them at a latency cost.
+        # Each retried request pays at least one backoff (0.02 s): the
+        # tail moves while the median does not.
+        self.assertTrue(5 <= faults.injected["HTTP503"] <= 40)
+        self.assertLess(percentile(faulty, 50), percentile(healthy, 99) * 5)
+        self.assertGreaterEqual(percentile(faulty, 99), 0.02)
+        self.assertLess(percentile(healthy, 99), 0.02)
+        self.assertLess(faulty_rps, healthy_rps)
+        summary = {
+            "healthy": {"p50": percentile(healthy, 50), "p99": percentile(healthy, 99)},
+            "faulty": {"p50": percentile(faulty, 50), "p99": percentile(faulty, 99)},
+        }
+        self.assertTrue(json.dumps(summary))
+
+
+class TestFaultRules(unittest.TestCase):
+
+    def test_rules_filter_by_method_and_endpoint(self):
+        rule = FaultRule(HalfOpen(), endpoint="status", method="get")
+        self.assertTrue(rule.matches("GET", "status"))
+        self.assertFalse(rule.matches("POST", "status"))
+        self.assertFalse(rule.matches("GET", "details"))
+
+    def test_invalid_probability(self):
+        with self.assertRaises(ValueError):
+            FaultRule(HalfOpen(), probability=1.5)
+
+    def test_fault_without_inject_cannot_be_constructed(self):
+        class _NoInject(Fault):
+            pass
+
+        with self.assertRaises(TypeError):
+            _NoInject()
+
+
+if __name__ == "__main__":
+    unittest.main()
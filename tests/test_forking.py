@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""
+Tests for the fork safety of clients created before the process forks.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.auth import MVolaAuth
+from mvola_api.bulkhead import Bulkhead
+from mvola_api.circuit_breaker import CircuitBreakers
+from mvola_api.concurrency import AdaptiveConcurrencyLimiter
+from mvola_api.constants import SANDBOX_URL, TEST_MSISDN_1, TEST_MSISDN_2, TOKEN_ENDPOINT
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.logs import log_event, start_background_logging
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+from mvola_api.retry import RetryPolicy
+
+TOKEN_URL = SANDBOX_URL + TOKEN_ENDPOINT
+BASIC_AUTH = {"Authorization": "Basic Zm9yazpmb3Jr"}
+
+
+def _run_in_child(func):
+    """
+    Call func() in a forked child.
+
+    Returns:
+        (True, JSON-decoded return value) or (False, the child's traceback)
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        code = 0
+        try:
+            output = json.dumps(func())
+        except BaseException:
+            output = traceback.format_exc()
+            code = 1
+        os.write(write_fd, output.encode())
+        os.close(write_fd)
+        os._exit(code)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        output = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    if os.WEXITSTATUS(status) != 0:
+        return False, output or f"child exited with status {status}"
+    return True, json.loads(output)
+
+
+def _held_by_another_thread(lock):
+    """Acquire lock on a thread that keeps it (and does not exist after fork)."""
+    acquired = threading.Event()
+
+    def hold():
+        lock.acquire()
+        acquired.set()
+
+    threading.Thread(target=hold, daemon=True).start()
+    acquired.wait()
+
+
+def _auth(**kwargs):
+    return MVolaAuth("fork_key", "fork_secret", SANDBOX_URL, **kwargs)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+class TestForkedChild(unittest.TestCase):
+
+    def assertChildPasses(self, check):
+        ok, output = _run_in_child(check)
+        if not ok:
+            self.fail(output)
+        return output
+
+    def test_locks_held_at_fork_are_replaced(self):
+        auth = _auth()
+        limiter = TokenBucketRateLimiter(max_tokens=5, refill_rate=1.0)
+        breakers = CircuitBreakers()
+        breaker = breakers.get("merchantpay")
+        _held_by_another_thread(auth._token_lock)
+        _held_by_another_thread(limiter._lock)
+        _held_by_another_thread(breakers._lock)
+
+        def check():
+            # Timeouts keep a regression from hanging the test
+            for lock in (auth._token_lock, limiter._lock, breakers._lock):
+                assert lock.acquire(timeout=1)
+                lock.release()
+            limiter.acquire()
+            assert breaker._lock is breakers._lock
+            breaker.acquire()
+
+        self.assertChildPasses(check)
+
+    def test_valid_token_is_kept_unless_disabled(self):
+        kept = _auth()
+        dropped = _auth(keep_token_after_fork=False)
+        expired = _auth()
+        for auth in (kept, dropped, expired):
+            auth._token = {"access_token": "cached"}
+            auth._token_expiry = time.time() + 3600
+        expired._token_expiry = time.time() + 30
+
+        def check():
+            assert kept.is_token_valid()
+            assert dropped._token is None
+            assert expired._token is None
+
+        self.assertChildPasses(check)
+        # The parent is unaffected
+        self.assertTrue(dropped.is_token_valid())
+
+    def test_slots_held_by_parent_threads_are_freed(self):
+        bulkhead = Bulkhead("payment", max_concurrent=2, max_wait=0)
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_wait=0)
+        for _ in range(2):
+            bulkhead.acquire()
+            limiter.acquire()
+
+        def check():
+            assert (bulkhead.active, limiter.in_flight) == (0, 0)
+            with bulkhead.slot(), limiter.slot():
+                pass
+            assert limiter.limit == 2
+
+        self.assertChildPasses(check)
+
+    def test_child_opens_its_own_connections(self):
+        with MVolaEmulator() as emulator:
+            http_client = SecureHTTPClient()
+            emulator.attach(http_client)
+            response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(sum(idle for _, idle, _ in http_client.pool_stats()), 1)
+
+            def check():
+                # No inherited connection is reused...
+                assert http_client.pool_stats() == []
+                response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+                assert response.status_code == 200
+                # ...one of the child's own is opened instead
+                assert [opened for _, _, opened in http_client.pool_stats()] == [1]
+
+            self.assertChildPasses(check)
+            # The parent's pooled connection still works
+            response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([opened for _, _, opened in http_client.pool_stats()], [1])
+            http_client.close()
+
+    def test_session_pool_sessions_checked_out_at_fork_are_returned(self):
+        with MVolaEmulator() as emulator:
+            http_client = SecureHTTPClient(session_pool=1, connect_timeout=0.2)
+            emulator.attach(http_client)
+            http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            held = http_client._session_pool._checkout(1.0)
+
+            def check():
+                response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+                assert response.status_code == 200
+
+            self.assertChildPasses(check)
+            http_client._session_pool._checkin(held)
+            http_client.close()
+
+    def test_preloaded_client_works_in_worker(self):
+        with MVolaEmulator() as emulator:
+            client = MVolaClient(
+                consumer_key="fork_key",
+                consumer_secret="fork_secret",
+                partner_name="Fork Test",
+                sandbox=True,
+            )
+            emulator.attach(client)
+            token = client.get_access_token()
+            payment = client.initiate_payment(
+                amount=1000,
+                debit_msisdn=TEST_MSISDN_1,
+                credit_msisdn=TEST_MSISDN_2,
+                description="Preloaded payment",
+            )
+            server_id = payment["response"]["serverCorrelationId"]
+
+            def check():
+                # Warm start: the parent's token is reused without a request
+                assert client.get_access_token() == token
+                status = client.get_transaction_status(server_id)
+                return status["response"]["status"]
+
+            self.assertEqual(self.assertChildPasses(check), "pending")
+
+    def test_unseeded_jitter_differs_between_processes(self):
+        unseeded = RetryPolicy()
+        seeded = RetryPolicy(seed=7)
+
+        def draws():
+            return [[policy.backoff(5) for _ in range(5)] for policy in (unseeded, seeded)]
+
+        child = self.assertChildPasses(draws)
+        parent = draws()
+        # Workers must not retry in lockstep; a seeded policy stays deterministic
+        self.assertNotEqual(child[0], parent[0])
+        self.assertEqual(child[1], parent[1])
+
+    def test_background_logging_keeps_running_in_child(self):
+        class _Handler(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.lines = []
+
+            def emit(self, record):
+                self.lines.append(self.format(record))
+
+        handler = _Handler()
+        background = start_background_logging(
+            handler, logger_name="mvola_api.tests.fork", level=logging.INFO
+        )
+        logger = logging.getLogger("mvola_api.tests.fork")
+
+        def check():
+            log_event(logger, logging.INFO, "worker.started")
+            background.stop()
+            return handler.lines
+
+        try:
+            self.assertEqual(self.assertChildPasses(check), ["worker.started"])
+        finally:
+            background.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Tests for hedged GET requests.
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.constants import MERCHANT_PAY_ENDPOINT, SANDBOX_URL, TRANSACTION_STATUS_ENDPOINT
+from mvola_api.faults import FaultInjectionTransport, FaultRule, Latency
+from mvola_api.hedging import RequestHedger
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.loadtest import percentile
+from mvola_api.metrics import MVolaMetrics
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+PAY_URL = SANDBOX_URL + MERCHANT_PAY_ENDPOINT
+
+
+class _ServerTransport(Transport):
+    """Server answering 200 after a fixed delay; counts requests per method."""
+
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.received = {}
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.received[method] = self.received.get(method, 0) + 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _latencies(http_client, url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        http_client.get(url)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+class TestHedging(unittest.TestCase):
+
+    def _client(self, hedging, seed=99):
+        server = _ServerTransport()
+        # 5% of attempts stall for 100 ms
+        faults = FaultInjectionTransport(
+            server, [FaultRule(Latency(0.1), endpoint="status", probability=0.05)], seed=seed
+        )
+        return SecureHTTPClient(max_retries=0, transport=faults, hedging=hedging), server
+
+    def test_hedging_cuts_tail_latency(self):
+        plain, _ = self._client(None)
+        baseline = _latencies(plain, STATUS_URL, 200)
+
+        hedger = RequestHedger(percentile=90, budget=0.2)
+        hedged_client, server = self._client(hedger)
+        hedged = _latencies(hedged_client, STATUS_URL, 200)
+        hedger.shutdown()
+
+        self.assertGreater(percentile(baseline, 99), 0.08)
+        self.assertLess(percentile(hedged, 99), 0.05)
+        self.assertGreater(hedger.hedge_wins, 0)
+        # Extra load stays within the budget
+        self.assertLessEqual(hedger.hedged, 0.2 * 200)
+        self.assertLessEqual(server.received["GET"], 200 + hedger.hedged)
+
+    def test_budget_caps_hedges(self):
+        hedger = RequestHedger(percentile=50, budget=0.05, min_samples=5, min_delay=0.001)
+        server = _ServerTransport(delay=0.005)
+        http_client = SecureHTTPClient(max_retries=0, transport=server, hedging=hedger)
+        _latencies(http_client, STATUS_URL, 100)
+        hedger.shutdown()
+        # Half the attempts are slower than p50, but only ~5% may be hedged
+        self.assertLessEqual(hedger.hedged, 5)
+
+    def test_original_attempts_do_not_queue_behind_the_hedge_pool(self):
+        hedger = RequestHedger(min_samples=1, window=1, min_delay=0.5, budget=1, max_workers=1)
+        server = _ServerTransport(delay=0.1)
+        http_client = SecureHTTPClient(max_retries=0, transport=server, hedging=hedger)
+        http_client.get(STATUS_URL)
+
+        # 8 GETs at once with one hedge thread: all sent together, none hedged
+        callers = [threading.Thread(target=http_client.get, args=(STATUS_URL,)) for _ in range(8)]
+        start = time.perf_counter()
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        hedger.shutdown()
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(hedger.hedged, 0)
+
+    def test_post_is_never_hedged(self):
+        hedger = RequestHedger(min_samples=1, window=1, min_delay=0.0001, budget=1)
+        server = _ServerTransport(delay=0.01)
+        http_client = SecureHTTPClient(transport=server, hedging=hedger)
+        for _ in range(20):
+            http_client.post(PAY_URL, json={})
+        self.assertEqual(server.received["POST"], 20)
+        self.assertEqual(hedger.hedged, 0)
+
+    def test_metrics_export_hedges(self):
+        hedger = RequestHedger(percentile=50, budget=1, min_samples=5, min_delay=0.0001)
+        server = _ServerTransport(delay=0.002)
+        http_client = SecureHTTPClient(max_retries=0, transport=server, hedging=hedger)
+        metrics = MVolaMetrics()
+        metrics.track_http_client(http_client)
+        _latencies(http_client, STATUS_URL, 30)
+        hedger.shutdown()
+        text = metrics.registry.to_prometheus()
+        self.assertIn(f"mvola_hedged_requests_total {hedger.hedged}", text)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            RequestHedger(percentile=100)
+        with self.assertRaises(ValueError):
+            RequestHedger(budget=0)
+        with self.assertRaises(ValueError):
+            RequestHedger(max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Tests for per-phase timing instrumentation.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api import instrumentation
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator, fixed_latency
+from mvola_api.exceptions import MVolaTransactionError
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+
+
+def _make_client(**kwargs):
+    return MVolaClient(
+        consumer_key="timing_key",
+        consumer_secret="timing_secret",
+        partner_name="Timing Test",
+        sandbox=True,
+        **kwargs,
+    )
+
+
+def _pay(client):
+    return client.initiate_payment(
+        amount=1000,
+        debit_msisdn=TEST_MSISDN_1,
+        credit_msisdn=TEST_MSISDN_2,
+        description="Timed payment",
+    )
+
+
+class TestCollectedTimings(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = MVolaEmulator(completion_delay=0.0, latency=fixed_latency(0.01)).start()
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_phases_attached_to_results(self):
+        client = _make_client(collect_timings=True)
+        self.emulator.attach(client)
+
+        result = _pay(client)
+        timings = result["timings"]
+        self.assertEqual(timings["operation"], "merchantpay")
+        self.assertIsNone(timings["error"])
+        self.assertGreater(timings["token_fetch"], 0)
+
+        token, payment = timings["requests"]
+        self.assertEqual((token["endpoint"], token["method"]), ("token", "POST"))
+        self.assertEqual((payment["endpoint"], payment["status_code"]), ("merchantpay", 202))
+        self.assertEqual(token["new_connections"], 1)
+        self.assertGreater(token["connect"], 0)
+        self.assertGreaterEqual(payment["ttfb"], 0.01)
+        for phase in ("dns", "connect", "tls", "ttfb", "download"):
+            self.assertLessEqual(payment[phase], payment["total"])
+        self.assertLessEqual(
+            sum(r["total"] for r in timings["requests"]) + timings["rate_limit_wait"],
+            timings["total"],
+        )
+
+        # Keep-alive: the status call reuses the pooled connection
+        status = client.get_transaction_status(result["response"]["serverCorrelationId"])
+        (request,) = status["timings"]["requests"]
+        self.assertEqual(request["new_connections"], 0)
+        self.assertEqual(request["connect"], 0)
+        # Cached token: no token request
+        self.assertLess(status["timings"]["token_fetch"], 0.005)
+
+    def test_rate_limiter_wait(self):
+        client = _make_client(
+            collect_timings=True,
+            rate_limiter=TokenBucketRateLimiter(max_tokens=1, refill_rate=20, name="transaction"),
+        )
+        self.emulator.attach(client)
+        self.assertLess(_pay(client)["timings"]["rate_limit_wait"], 0.005)
+        # The bucket is empty: the second payment waits ~50 ms for a token
+        result = _pay(client)
+        self.assertGreater(result["timings"]["rate_limit_wait"], 0.01)
+
+    def test_disabled_by_default(self):
+        client = _make_client()
+        self.emulator.attach(client)
+        self.assertNotIn("timings", _pay(client))
+        self.assertIsNone(instrumentation.begin_request("GET", "https://example.com"))
+
+
+class TestListeners(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        instrumentation.add_listener(self.events.append)
+
+    def tearDown(self):
+        instrumentation.remove_listener(self.events.append)
+
+    def test_listener_receives_request_and_operation_timings(self):
+        with MVolaEmulator(error_rate={"status": 1.0}) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            client._transaction._http_client.backoff_factor = 0.01
+            with self.assertRaises(MVolaTransactionError):
+                client.get_transaction_status("abc-123")
+
+        kinds = [(event.kind, event.endpoint if event.kind == "request" else event.operation)
+                 for event in self.events]
+        self.assertEqual(kinds, [
+            ("request", "token"), ("operation", "token"),
+            ("request", "status"), ("operation", "status"),
+        ])
+        token, token_operation, status, operation = self.events
+        self.assertEqual(token_operation.requests, [token])
+        self.assertEqual((status.status_code, status.attempts), (500, 4))
+        self.assertGreater(status.backoff, 0)
+        self.assertEqual(operation.error, "MVolaTransactionError")
+        self.assertEqual(operation.requests, [token, status])
+
+    def test_failing_listener_is_ignored(self):
+        def broken(timing):
+            raise RuntimeError("listener bug")
+
+        instrumentation.add_listener(broken)
+        try:
+            with MVolaEmulator() as emulator:
+                client = _make_client()
+                emulator.attach(client)
+                self.assertTrue(client.generate_token()["access_token"])
+        finally:
+            instrumentation.remove_listener(broken)
+        self.assertEqual([event.kind for event in self.events], ["request", "operation"])
+
+    def test_remove_listener(self):
+        instrumentation.remove_listener(self.events.append)
+        self.assertFalse(instrumentation.has_listeners())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Tests for lazy imports, the one-time .env load and lazily created sessions.
+"""
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mvola_api
+from mvola_api import client as client_module
+from mvola_api.constants import SANDBOX_URL, TOKEN_ENDPOINT
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.http_client import SecureHTTPClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN_URL = SANDBOX_URL + TOKEN_ENDPOINT
+
+
+def _make_client():
+    return mvola_api.MVolaClient(
+        consumer_key="lazy_key",
+        consumer_secret="lazy_secret",
+        partner_name="Lazy Test",
+        sandbox=True,
+    )
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def _modules_after(self, code):
+        script = f"import sys\n{code}\nprint(' '.join(sorted(sys.modules)))"
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        return set(output.split())
+
+    def test_import_does_not_load_http_stack(self):
+        modules = self._modules_after("import mvola_api\nfrom mvola_api import MVolaError")
+        self.assertIn("mvola_api.exceptions", modules)
+        for name in ("requests", "urllib3", "dotenv", "mvola_api.http_client"):
+            self.assertNotIn(name, modules)
+
+    def test_public_names_resolve(self):
+        from mvola_api.client import MVolaClient
+        from mvola_api.exceptions import MVolaError
+
+        self.assertIs(mvola_api.MVolaClient, MVolaClient)
+        self.assertIs(mvola_api.MVolaError, MVolaError)
+        self.assertEqual(mvola_api.SANDBOX_URL, SANDBOX_URL)
+        self.assertIsInstance(mvola_api.__version__, str)
+        for name in mvola_api.__all__:
+            self.assertIn(name, dir(mvola_api))
+            getattr(mvola_api, name)
+
+    def test_unknown_name_raises_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            mvola_api.NoSuchThing
+        self.assertFalse(hasattr(mvola_api, "NoSuchThing"))
+
+
+class TestDotenvLoadedOnce(unittest.TestCase):
+
+    def test_constructions_share_one_load(self):
+        with patch.object(client_module, "_dotenv_loaded", False), \
+                patch("dotenv.load_dotenv") as load_dotenv:
+            _make_client()
+            _make_client()
+        load_dotenv.assert_called_once_with(override=False)
+
+
+class TestLazySessions(unittest.TestCase):
+
+    def test_construction_creates_no_session(self):
+        client = _make_client()
+        self.assertIsNone(client._auth._http_client._session)
+        self.assertIsNone(client._transaction._http_client._session)
+        self.assertEqual(client._transaction._http_client.pool_stats(), [])
+
+    def test_mounts_apply_to_the_session_created_later(self):
+        with MVolaEmulator() as emulator:
+            http_client = SecureHTTPClient()
+            emulator.attach(http_client)
+            self.assertIsNone(http_client._session)
+            response = http_client.post(
+                TOKEN_URL, headers={"Authorization": "Basic bGF6eTpsYXp5"}, data={}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(http_client._session)
+            http_client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Tests for explicit client lifecycle: close(), context managers and
+finalization of unreachable clients.
+"""
+import gc
+import os
+import sys
+import unittest
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import SANDBOX_URL, TOKEN_ENDPOINT
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.http_client import SecureHTTPClient, _idle_sessions
+
+TOKEN_URL = SANDBOX_URL + TOKEN_ENDPOINT
+BASIC_AUTH = {"Authorization": "Basic bGlmZTpjeWNsZQ=="}
+
+
+def _make_client(**kwargs):
+    return MVolaClient(
+        consumer_key="lifecycle_key",
+        consumer_secret="lifecycle_secret",
+        partner_name="Lifecycle Test",
+        sandbox=True,
+        **kwargs,
+    )
+
+
+def _open_descriptors():
+    return len(os.listdir("/proc/self/fd"))
+
+
+class TestFinalization(unittest.TestCase):
+
+    def setUp(self):
+        _idle_sessions.clear()
+        gc.disable()
+
+    def tearDown(self):
+        gc.enable()
+        _idle_sessions.clear()
+
+    def test_unreachable_client_is_released_without_garbage_collection(self):
+        for kwargs in ({}, {"session_pool": 2}):
+            http_client = SecureHTTPClient(**kwargs)
+            http_client.transport
+            ref = weakref.ref(http_client)
+            finalizer = http_client._finalizer
+            del http_client
+            self.assertIsNone(ref())
+            self.assertFalse(finalizer.alive)
+
+    def test_released_session_is_reused_by_the_next_client(self):
+        first = SecureHTTPClient()
+        session = first.transport.session
+        del first
+
+        second = SecureHTTPClient()
+        self.assertIs(second.transport.session, session)
+        second.close()
+        # A different pool size gets a session of its own
+        self.assertIsNot(SecureHTTPClient(pool_maxsize=3).transport.session, session)
+
+    def test_closed_client_takes_another_session(self):
+        http_client = SecureHTTPClient()
+        session = http_client.transport.session
+        http_client.close()
+        other = SecureHTTPClient()
+        self.assertIs(other.transport.session, session)
+        self.assertIsNot(http_client.transport.session, session)
+
+    def test_session_with_mounted_adapters_is_closed(self):
+        with MVolaEmulator() as emulator:
+            http_client = SecureHTTPClient()
+            emulator.attach(http_client)
+            http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            http_client.close()
+        self.assertIsNone(_idle_sessions.take(http_client._pool_maxsize))
+        self.assertEqual(http_client.pool_stats(), [])
+
+
+class TestContextManagers(unittest.TestCase):
+
+    def test_client_close_clears_credentials_and_token(self):
+        with MVolaEmulator() as emulator:
+            with _make_client() as client:
+                emulator.attach(client)
+                client.get_access_token()
+                http_client = client._transaction._http_client
+        self.assertIsNone(client._consumer_secret)
+        self.assertIsNone(client._auth._token)
+        self.assertEqual(http_client.pool_stats(), [])
+
+    def test_shared_http_client_is_left_open(self):
+        with MVolaEmulator() as emulator:
+            shared = SecureHTTPClient()
+            emulator.attach(shared)
+            with _make_client(http_client=shared) as client:
+                client.get_access_token()
+            response = shared.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            self.assertEqual(response.status_code, 200)
+            shared.close()
+
+
+@unittest.skipUnless(os.path.isdir("/proc/self/fd"), "requires /proc/self/fd")
+class TestChurn(unittest.TestCase):
+
+    def test_per_request_clients_do_not_accumulate_sockets(self):
+        with MVolaEmulator() as emulator:
+            gc.disable()
+            try:
+                for closing in (False, True):
+                    before = _open_descriptors()
+                    for _ in range(100):
+                        client = _make_client()
+                        emulator.attach(client)
+                        client.get_access_token()
+                        if closing:
+                            client.close()
+                        del client
+                    # Emulator handler threads may still be closing a few
+                    self.assertLess(_open_descriptors() - before, 10)
+            finally:
+                gc.enable()
+
+
+if __name__ == "__main__":
+    unittest.main()
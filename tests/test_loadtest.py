@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Tests for the load-test harness.
+"""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.loadtest import LoadTestHarness, Workload, percentile
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 99.9), 100)
+        self.assertEqual(percentile(values, 0), 1)
+
+    def test_empty(self):
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+class TestLoadTestHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = MVolaEmulator(completion_delay=0.0, error_rate={"details": 1.0}).start()
+        self.client = MVolaClient(
+            consumer_key="loadtest_key",
+            consumer_secret="loadtest_secret",
+            partner_name="Load Test",
+            sandbox=True,
+            rate_limiter=TokenBucketRateLimiter(max_tokens=2, refill_rate=200, name="transaction"),
+        )
+        self.emulator.attach(self.client)
+        self.client._transaction._http_client.max_retries = 0
+
+    def tearDown(self):
+        self.emulator.stop()
+
+    def test_fixed_workload_report(self):
+        workload = Workload(payers=4, payments_per_payer=3, polls_per_payment=1, poll_interval=0)
+        report = LoadTestHarness(self.client, workload).run()
+        data = report.to_dict()
+
+        self.assertEqual(data["operations"]["initiate"]["count"], 12)
+        self.assertEqual(data["operations"]["status"]["count"], 12)
+        self.assertEqual(data["operations"]["initiate"]["error_rate"], 0.0)
+
+        # Details are failed by the emulator and classified by exception type
+        details = data["operations"]["details"]
+        self.assertEqual(details["errors"], 12)
+        self.assertEqual(details["errors_by_type"], {"MVolaTransactionError": 12})
+
+        self.assertEqual(set(details["latency_ms"]), {"p50", "p95", "p99", "p999", "mean", "max"})
+        self.assertGreater(data["throughput"], 0)
+
+        # The small burst forces payers to wait on the transaction limiter
+        self.assertGreater(data["rate_limiters"]["transaction"]["wait_s"], 0)
+
+        # Machine-readable export round-trips
+        self.assertEqual(json.loads(report.to_json())["total_requests"], 36)
+        self.assertIn("initiate", report.format_table())
+
+    def test_rejects_invalid_workload(self):
+        with self.assertRaises(ValueError):
+            Workload(payers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
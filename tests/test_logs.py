@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Tests for structured, background logging.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.logs import JSONFormatter, Lazy, log_event, start_background_logging
+
+
+class _ListHandler(logging.Handler):
+    """Collects formatted records, optionally slowly (like a remote syslog)."""
+
+    def __init__(self, delay=0.0, gate=None):
+        super().__init__()
+        self.delay = delay
+        self.gate = gate
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(self.delay)
+        self.threads.add(threading.get_ident())
+        self.lines.append(self.format(record))
+
+
+class TestLogEvent(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("mvola_api.tests.logs")
+        self.handler = _ListHandler()
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_disabled_level_does_not_evaluate_fields(self):
+        calls = []
+        self.logger.setLevel(logging.INFO)
+        log_event(self.logger, logging.DEBUG, "ignored", value=Lazy(calls.append, 1))
+        self.assertEqual(calls, [])
+        self.assertEqual(self.handler.lines, [])
+
+    def test_event_rendering(self):
+        self.logger.setLevel(logging.DEBUG)
+        log_event(self.logger, logging.INFO, "payment.initiated", correlation_id="abc")
+        self.assertEqual(self.handler.lines, ["payment.initiated correlation_id=abc"])
+
+        self.handler.setFormatter(JSONFormatter())
+        log_event(self.logger, logging.INFO, "status.received", status="completed")
+        data = json.loads(self.handler.lines[-1])
+        self.assertEqual((data["event"], data["status"], data["level"]),
+                         ("status.received", "completed", "INFO"))
+
+
+class TestBackgroundLogging(unittest.TestCase):
+
+    def test_slow_handler_stays_off_the_calling_thread(self):
+        handler = _ListHandler(delay=0.01)
+        with start_background_logging(handler, logger_name="mvola_api.tests.bg",
+                                      level=logging.INFO):
+            logger = logging.getLogger("mvola_api.tests.bg")
+            start = time.perf_counter()
+            for i in range(50):
+                log_event(logger, logging.INFO, "tick", i=i)
+            elapsed = time.perf_counter() - start
+        # 50 records at 10 ms each would take 0.5 s synchronously
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(len(handler.lines), 50)
+        self.assertNotIn(threading.get_ident(), handler.threads)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        handler = _ListHandler(gate=gate)
+        background = start_background_logging(
+            handler, logger_name="mvola_api.tests.drop", level=logging.INFO, queue_size=2
+        )
+        logger = logging.getLogger("mvola_api.tests.drop")
+        for i in range(10):
+            log_event(logger, logging.INFO, "tick", i=i)
+        self.assertGreater(background.dropped, 0)
+        gate.set()
+        background.stop()
+        self.assertEqual(len(handler.lines) + background.dropped, 10)
+        self.assertTrue(logger.propagate)
+
+    def test_client_events_are_structured_and_masked(self):
+        handler = _ListHandler()
+        with start_background_logging(handler, level=logging.INFO, formatter=JSONFormatter()):
+            with MVolaEmulator(completion_delay=0.0) as emulator:
+                client = MVolaClient(
+                    consumer_key="logs_key",
+                    consumer_secret="logs_secret",
+                    partner_name="Logs Test",
+                    sandbox=True,
+                )
+                emulator.attach(client)
+                client.initiate_payment(
+                    amount=1000,
+                    debit_msisdn=TEST_MSISDN_1,
+                    credit_msisdn=TEST_MSISDN_2,
+                    description="Logged payment",
+                )
+        logging.getLogger("mvola_api").setLevel(logging.NOTSET)
+
+        events = [json.loads(line) for line in handler.lines]
+        payment = next(e for e in events if e["event"] == "payment.initiated")
+        self.assertEqual(payment["debit"], TEST_MSISDN_1[:3] + "****" + TEST_MSISDN_1[-2:])
+        self.assertNotIn(TEST_MSISDN_1, "\n".join(handler.lines))
+        self.assertNotIn("payment.initiating", [e["event"] for e in events])
+
+    def test_requires_a_handler(self):
+        with self.assertRaises(ValueError):
+            start_background_logging()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Tests for the multi-tenant client manager.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaAuthError, MVolaValidationError
+from mvola_api.manager import MVolaClientManager, UnknownTenantError
+from mvola_api.rate_limiter import RateLimitError
+from mvola_api.transport import http_clients_of
+
+
+def _register(manager, count, prefix="shop"):
+    for i in range(count):
+        manager.register(
+            f"{prefix}-{i}", f"key_{i}", f"secret_{i}", partner_name=f"Shop {i}"
+        )
+
+
+def _pay(manager, tenant):
+    return manager.initiate_payment(
+        tenant,
+        amount=1000,
+        debit_msisdn=TEST_MSISDN_1,
+        credit_msisdn=TEST_MSISDN_2,
+        description="Tenant payment",
+    )
+
+
+class TestRouting(unittest.TestCase):
+
+    def test_calls_use_the_tenant_credentials(self):
+        with MVolaEmulator(credentials=("key_0", "secret_0")) as emulator:
+            manager = MVolaClientManager(sandbox=True)
+            _register(manager, 2)
+            emulator.attach(manager)
+
+            self.assertEqual(_pay(manager, "shop-0")["status_code"], 202)
+            with self.assertRaises(MVolaAuthError):
+                manager.get_access_token("shop-1")
+            manager.close()
+
+    def test_unknown_tenant(self):
+        manager = MVolaClientManager()
+        with self.assertRaises(UnknownTenantError) as ctx:
+            manager.client("nobody")
+        self.assertIsInstance(ctx.exception, MVolaValidationError)
+        self.assertEqual(ctx.exception.tenant, "nobody")
+
+    def test_missing_credentials(self):
+        with self.assertRaises(MVolaValidationError):
+            MVolaClientManager().register("shop", "key", "", partner_name="Shop")
+
+    def test_partner_msisdn_never_comes_from_the_environment(self):
+        with patch.dict(os.environ, {"MVOLA_PARTNER_MSISDN": TEST_MSISDN_1}):
+            sandbox = MVolaClientManager(sandbox=True)
+            _register(sandbox, 1)
+            self.assertEqual(sandbox.client("shop-0").partner_msisdn, TEST_MSISDN_2)
+            sandbox.close()
+
+            production = MVolaClientManager(sandbox=False)
+            with self.assertRaises(MVolaValidationError):
+                production.register("shop", "key", "secret", partner_name="Shop")
+            production.register("shop", "key", "secret", partner_name="Shop",
+                                partner_msisdn="0341234567")
+            self.assertEqual(production.client("shop").partner_msisdn, "0341234567")
+            production.close()
+
+    def test_tenants_share_one_connection_pool(self):
+        with MVolaEmulator() as emulator:
+            manager = MVolaClientManager(sandbox=True)
+            _register(manager, 20)
+            emulator.attach(manager)
+            for tenant in manager:
+                _pay(manager, tenant)
+
+            for tenant in manager:
+                self.assertEqual(http_clients_of(manager.client(tenant)), [manager._http_client])
+            opened = sum(opened for _, _, opened in manager._http_client.pool_stats())
+            self.assertEqual(opened, 1)
+            manager.close()
+
+
+class TestEviction(unittest.TestCase):
+
+    def test_least_recently_used_client_is_evicted(self):
+        manager = MVolaClientManager(max_active=2)
+        _register(manager, 3)
+        first = manager.client("shop-0")
+        manager.client("shop-1")
+        manager.client("shop-0")
+        manager.client("shop-2")
+
+        self.assertEqual((manager.active, manager.evictions), (2, 1))
+        self.assertIs(manager.client("shop-0"), first)
+        self.assertEqual(manager.evictions, 1)
+        manager.client("shop-1")
+        self.assertEqual(manager.evictions, 2)
+
+    def test_idle_clients_are_evicted(self):
+        manager = MVolaClientManager(idle_timeout=0.05)
+        _register(manager, 2)
+        manager.client("shop-0")
+        time.sleep(0.1)
+        manager.client("shop-1")
+        self.assertEqual((manager.active, manager.evictions), (1, 1))
+
+    def test_token_survives_eviction(self):
+        with MVolaEmulator() as emulator:
+            manager = MVolaClientManager(sandbox=True, max_active=1)
+            _register(manager, 2)
+            emulator.attach(manager)
+            token = manager.get_access_token("shop-0")
+            manager.get_access_token("shop-1")
+            self.assertEqual(manager.evictions, 1)
+            gc.collect()
+
+            # Rebuilt from the tenant record: same token, no token request,
+            # and the shared HTTP client was not closed with the old client
+            self.assertEqual(manager.get_access_token("shop-0"), token)
+            self.assertEqual(len(emulator._tokens), 2)
+            self.assertEqual(_pay(manager, "shop-0")["status_code"], 202)
+            manager.close()
+
+    def test_rate_limit_survives_eviction(self):
+        manager = MVolaClientManager(max_active=1)
+        _register(manager, 2)
+        limiter = manager.client("shop-0").rate_limiter
+        limiter.acquire(limiter.max_tokens, blocking=False)
+
+        # Churning through other tenants does not refill shop-0's bucket
+        manager.client("shop-1")
+        rebuilt = manager.client("shop-0")
+        self.assertEqual(manager.evictions, 2)
+        self.assertIs(rebuilt.rate_limiter, limiter)
+        with self.assertRaises(RateLimitError):
+            limiter.acquire(blocking=False)
+        self.assertIsNot(manager.client("shop-1").rate_limiter, limiter)
+
+    def test_register_replaces_credentials_and_client(self):
+        manager = MVolaClientManager()
+        _register(manager, 1)
+        old = manager.client("shop-0")
+        manager.register("shop-0", "new_key", "new_secret", partner_name="Renamed")
+        client = manager.client("shop-0")
+        self.assertIsNot(client, old)
+        self.assertEqual(client.partner_name, "Renamed")
+        manager.unregister("shop-0")
+        self.assertNotIn("shop-0", manager)
+        self.assertEqual(manager.active, 0)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            MVolaClientManager(max_active=0)
+        with self.assertRaises(ValueError):
+            MVolaClientManager(idle_timeout=0)
+
+
+class TestMemory(unittest.TestCase):
+
+    def test_thousands_of_tenants_stay_bounded(self):
+        manager = MVolaClientManager(max_active=50)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        _register(manager, 5000)
+        per_tenant = (tracemalloc.get_traced_memory()[0] - before) / 5000
+        tracemalloc.stop()
+
+        for i in range(500):
+            manager.client(f"shop-{i}")
+        self.assertEqual(len(manager), 5000)
+        self.assertEqual(manager.active, 50)
+        # Registered tenants cost their credentials only; live clients are capped
+        self.assertLess(per_tenant, 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Tests for the metrics registry and its Prometheus exposition.
+"""
+import gc
+import os
+import sys
+import threading
+import unittest
+import urllib.request
+import weakref
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaTransactionError
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.metrics import MetricsRegistry, MetricsServer, MVolaMetrics
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_shards_are_summed(self):
+        counter = self.registry.counter("hits", "Hits", ("operation",))
+        child = counter.labels("status")
+
+        def work():
+            for _ in range(10000):
+                child.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(child.value, 80000)
+
+    def test_shards_of_ended_threads_are_folded(self):
+        counter = self.registry.counter("requests", "Requests").labels()
+        histogram = self.registry.histogram("seconds", "Seconds").labels()
+
+        def work():
+            counter.inc()
+            histogram.observe(0.5)
+
+        for _ in range(50):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        gc.collect()
+        self.assertEqual(len(counter.shards()), 1)
+        self.assertEqual(len(histogram.shards()), 1)
+        self.assertEqual(counter.value, 50)
+        self.assertEqual(histogram.snapshot()[:2], (50, 25.0))
+
+    def test_non_str_label_values_share_one_series(self):
+        counter = self.registry.counter("responses", "Responses", ("status",))
+        counter.labels(200).inc()
+        counter.labels("200").inc()
+        counter.labels(200).inc()
+        self.assertIs(counter.labels(200), counter.labels("200"))
+        self.assertEqual([(labels, child.value) for labels, child in counter.children()],
+                         [({"status": "200"}, 3)])
+
+    def test_histogram_quantiles(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency")
+        for i in range(1, 1001):
+            histogram.observe(i / 1000)
+        child = histogram.labels()
+        self.assertEqual(child.count, 1000)
+        for q, expected in ((0.5, 0.5), (0.99, 0.99), (0.999, 0.999)):
+            self.assertAlmostEqual(child.quantile(q), expected, delta=expected * 0.04)
+
+    def test_prometheus_text(self):
+        self.registry.counter("requests", "Requests", ("status",)).labels("200").inc(3)
+        self.registry.gauge("in_flight", "In flight").set(2)
+        histogram = self.registry.histogram("duration_seconds", "Duration", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE requests counter", text)
+        self.assertIn('requests_total{status="200"} 3', text)
+        self.assertIn("in_flight 2", text)
+        self.assertIn('duration_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('duration_seconds_bucket{le="1"} 2', text)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("duration_seconds_count 3", text)
+        self.assertIn("duration_seconds_sum 5.55", text)
+
+    def test_label_and_type_errors(self):
+        counter = self.registry.counter("errors", "Errors", ("operation", "exception"))
+        with self.assertRaises(ValueError):
+            counter.labels("status")
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            self.registry.gauge("errors", "Errors")
+        self.assertIs(
+            self.registry.counter("errors", "Errors", ("operation", "exception")), counter
+        )
+
+
+class TestMVolaMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MVolaMetrics().install()
+
+    def tearDown(self):
+        self.metrics.uninstall()
+
+    def test_tracked_http_clients_are_held_weakly(self):
+        http_client = SecureHTTPClient()
+        self.metrics.track_http_client(http_client)
+        self.assertEqual(len(self.metrics._http_clients), 1)
+        reference = weakref.ref(http_client)
+        del http_client
+        gc.collect()
+        self.assertIsNone(reference())
+        self.metrics.registry.to_prometheus()
+
+    def test_client_calls_are_recorded(self):
+        with MVolaEmulator(completion_delay=0.0, error_rate={"details": 1.0}) as emulator:
+            client = MVolaClient(
+                consumer_key="metrics_key",
+                consumer_secret="metrics_secret",
+                partner_name="Metrics Test",
+                sandbox=True,
+            )
+            emulator.attach(client)
+            client._transaction._http_client.max_retries = 0
+            self.metrics.track_client(client)
+
+            result = client.initiate_payment(
+                amount=1000,
+                debit_msisdn=TEST_MSISDN_1,
+                credit_msisdn=TEST_MSISDN_2,
+                description="Metrics payment",
+            )
+            client.get_transaction_status(result["response"]["serverCorrelationId"])
+            with self.assertRaises(MVolaTransactionError):
+                client.get_transaction_details("txn-1")
+
+            with MetricsServer(self.metrics.registry) as server:
+                with urllib.request.urlopen(server.url) as response:
+                    self.assertIn("text/plain", response.headers["Content-Type"])
+                    text = response.read().decode()
+
+        self.assertIn('mvola_requests_total{operation="merchantpay",status="202"} 1', text)
+        self.assertIn('mvola_requests_total{operation="details",status="500"} 1', text)
+        self.assertIn(
+            'mvola_errors_total{operation="details",exception="MVolaTransactionError"} 1', text
+        )
+        self.assertIn("mvola_token_refreshes_total 1", text)
+        self.assertIn('mvola_operation_duration_seconds_count{operation="status"} 1', text)
+        self.assertIn('mvola_rate_limiter_rejections_total{limiter="transaction"} 0', text)
+        self.assertIn('mvola_rate_limiter_available_tokens{limiter="auth"}', text)
+        self.assertIn('state="opened"', text)
+        self.assertEqual(
+            self.metrics.request_duration.labels("status").count, 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
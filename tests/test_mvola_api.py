@@ -6,6 +6,7 @@ import os
 import unittest
 from unittest.mock import patch, MagicMock
 import json
+import time
 from datetime import datetime
 import requests
 
@@ -75,6 +76,19 @@ class TestMVolaAuth(unittest.TestCase):
         with self.assertRaises(MVolaAuthError):
             self.auth.generate_token(force_refresh=True)
 
+    @patch('mvola_api.http_client.SecureHTTPClient.post')
+    def test_cached_token_skips_rate_limiter(self, mock_post):
+        """Cache hits must not consume auth rate limit tokens"""
+        self.auth._token = {"access_token": "cached_token", "expires_in": 3600}
+        self.auth._token_expiry = time.time() + 3600
+        self.auth._rate_limiter = MagicMock()
+
+        for _ in range(100):
+            self.assertEqual(self.auth.get_access_token(), "cached_token")
+
+        self.auth._rate_limiter.acquire.assert_not_called()
+        mock_post.assert_not_called()
+
 
 class TestMVolaTransaction(unittest.TestCase):
     """Test the transaction module"""
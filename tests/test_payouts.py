@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+"""
+Tests for resumable bulk payouts and the `mvola payout` command.
+"""
+import contextlib
+import functools
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.cli import EXIT_INTERRUPTED, main
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator, attach_emulator, fixed_latency
+from mvola_api.payouts import (
+    INVALID,
+    MAX_RATE_LIMITED_ATTEMPTS,
+    NOT_SENT,
+    SUBMITTED,
+    SUBMITTING,
+    UNKNOWN,
+    BulkPayout,
+    PayoutJournal,
+    PayoutRow,
+    _send,
+    read_payouts,
+)
+from mvola_api.rate_limiter import RateLimitError, TokenBucketRateLimiter
+from mvola_api.results import PaymentInitiated
+from mvola_api.sharding import ShardError
+
+ENVIRONMENT = {
+    "MVOLA_CONSUMER_KEY": "payout_key",
+    "MVOLA_CONSUMER_SECRET": "payout_secret",
+    "MVOLA_PARTNER_NAME": "Payout Test",
+    "MVOLA_PARTNER_MSISDN": TEST_MSISDN_1,
+    "MVOLA_SANDBOX": "true",
+}
+
+
+def _write_csv(path, count, extra=()):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("id,amount,credit_msisdn,description\n")
+        for i in range(count):
+            fh.write(f"p-{i},{100 + i},{TEST_MSISDN_2},Payout {i}\n")
+        for line in extra:
+            fh.write(line + "\n")
+
+
+def _emulated_client(emulator_url, rate_limiter):
+    """Client factory of the payout worker processes."""
+    client = MVolaClient(
+        consumer_key="payout_key",
+        consumer_secret="payout_secret",
+        partner_name="Payout Test",
+        partner_msisdn=TEST_MSISDN_1,
+        sandbox=True,
+        rate_limiter=rate_limiter,
+    )
+    attach_emulator(client, emulator_url)
+    return client
+
+
+def _dying_client(emulator_url, dies_on, rate_limiter):
+    """Client factory of a worker dying as it sends payout `dies_on` (None: at setup)."""
+    if dies_on is None:
+        os._exit(3)
+    client = _emulated_client(emulator_url, rate_limiter)
+    send = client.initiate_payment
+
+    def initiate_payment(**kwargs):
+        if kwargs["requesting_organisation_transaction_reference"] == dies_on:
+            os._exit(3)
+        return send(**kwargs)
+
+    client.initiate_payment = initiate_payment
+    return client
+
+
+def _journal_entries(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+class _Interrupting:
+    """Rows that raise KeyboardInterrupt after `after` rows, like Ctrl-C."""
+
+    def __init__(self, rows, after):
+        self._rows = iter(rows)
+        self._left = after
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._left == 0:
+            raise KeyboardInterrupt
+        self._left -= 1
+        return next(self._rows)
+
+
+class TestBulkPayout(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input = os.path.join(self.tmpdir, "payouts.csv")
+        self.journal_path = os.path.join(self.tmpdir, "payouts.journal")
+        self.results = os.path.join(self.tmpdir, "results.jsonl")
+        self.emulator = MVolaEmulator(completion_delay=0).start()
+        self.client = MVolaClient(
+            consumer_key="payout_key",
+            consumer_secret="payout_secret",
+            partner_name="Payout Test",
+            partner_msisdn=TEST_MSISDN_1,
+            sandbox=True,
+            rate_limiter=TokenBucketRateLimiter(max_tokens=5, refill_rate=500),
+        )
+        self.emulator.attach(self.client)
+
+    def tearDown(self):
+        self.client.close()
+        self.emulator.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def _run(self, rows=None, **kwargs):
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        payout = BulkPayout(self.client, journal, results_path=self.results,
+                            concurrency=3, batch_size=4, **kwargs)
+        try:
+            return payout.run(read_payouts(self.input) if rows is None else rows), payout
+        finally:
+            journal.close()
+
+    def test_submits_validates_and_never_repeats(self):
+        _write_csv(self.input, 10, extra=[
+            "p-bad,100,12345,Bad msisdn",
+            f"p-1,100,{TEST_MSISDN_2},Duplicate",
+        ])
+        summary, _ = self._run()
+        self.assertEqual(summary, {SUBMITTED: 10, INVALID: 2})
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 10)
+
+        entries = _journal_entries(self.journal_path)
+        submitted = [e for e in entries if e["state"] == SUBMITTED]
+        self.assertEqual(len(submitted), 10)
+        self.assertTrue(all(e["server_correlation_id"] for e in submitted))
+        with open(self.results, encoding="utf-8") as fh:
+            self.assertEqual(sum(1 for _ in fh), 12)
+
+        # A second run pays nobody again
+        summary, _ = self._run()
+        self.assertEqual(summary["skipped_submitted"], 10)
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 10)
+
+    def test_interrupted_run_resumes_without_double_payment(self):
+        _write_csv(self.input, 12)
+        summary, payout = self._run(_Interrupting(read_payouts(self.input), after=6))
+        self.assertEqual(payout.stop_reason, "interrupted")
+        self.assertLessEqual(summary.get(SUBMITTED, 0), 6)
+
+        summary, payout = self._run()
+        self.assertIsNone(payout.stop_reason)
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 12)
+        self.assertEqual(summary.get(SUBMITTED, 0) + summary.get("skipped_submitted", 0), 12)
+
+    def test_payment_in_flight_at_a_crash_is_not_resent(self):
+        _write_csv(self.input, 3)
+        journal = PayoutJournal(self.journal_path)
+        journal.record("p-1", SUBMITTING)
+        journal.close()
+
+        summary, _ = self._run()
+        self.assertEqual(summary, {SUBMITTED: 2, UNKNOWN: 1})
+        summary, _ = self._run()
+        self.assertEqual(summary, {"skipped_submitted": 2, UNKNOWN: 1})
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 2)
+
+        # Once checked by hand, it can be sent
+        summary, _ = self._run(retry_unknown=True)
+        self.assertEqual(summary, {"skipped_submitted": 2, SUBMITTED: 1})
+
+    def test_server_errors_are_unknown_and_throttling_is_retried(self):
+        _write_csv(self.input, 2)
+        with patch.object(self.emulator, "_error_rate", {"merchantpay": 1.0, "token": 0.0}):
+            summary, _ = self._run()
+        self.assertEqual(summary, {UNKNOWN: 2})
+
+        self.input = os.path.join(self.tmpdir, "second.csv")
+        _write_csv(self.input, 0, extra=[f"q-1,100,{TEST_MSISDN_2},Throttled"])
+        with patch.object(self.emulator, "_throttle_rate", {"merchantpay": 1.0, "token": 0.0}):
+            summary, _ = self._run()
+        self.assertEqual(summary, {NOT_SENT: 1})
+        summary, _ = self._run()
+        self.assertEqual(summary, {SUBMITTED: 1})
+
+
+class TestShardedBulkPayout(TestBulkPayout):
+    """The same scenarios with the payments made by worker processes."""
+
+    def _run(self, rows=None, **kwargs):
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        payout = BulkPayout(
+            self.client, journal, results_path=self.results, concurrency=2, batch_size=4,
+            processes=3, client_factory=functools.partial(_emulated_client, self.emulator.base_url),
+            **kwargs
+        )
+        try:
+            return payout.run(read_payouts(self.input) if rows is None else rows), payout
+        finally:
+            journal.close()
+
+    def test_payers_are_spread_over_workers_with_grouped_outcomes(self):
+        payers = [f"03412345{n:02d}" for n in range(6)]
+        with open(self.input, "w", encoding="utf-8") as fh:
+            fh.write("id,amount,credit_msisdn,debit_msisdn\n")
+            for i in range(30):
+                fh.write(f"s-{i},{100 + i},{TEST_MSISDN_2},{payers[i % 6]}\n")
+
+        with patch("mvola_api.payouts.os.fsync") as fsync:
+            journal = PayoutJournal(self.journal_path)
+            payout = BulkPayout(
+                self.client, journal, concurrency=2, batch_size=10, processes=3,
+                client_factory=functools.partial(_emulated_client, self.emulator.base_url),
+            )
+            summary = payout.run(read_payouts(self.input))
+            journal.close()
+        self.assertEqual(summary, {SUBMITTED: 30})
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 30)
+        # Outcomes are journaled in groups (workers sync their submitting entries)
+        self.assertLess(fsync.call_count, 30)
+
+    def test_stop_settles_rows_handed_to_workers(self):
+        _write_csv(self.input, 20)
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        payout = BulkPayout(
+            self.client, journal, concurrency=1, batch_size=20, processes=2, shard_by="id",
+            client_factory=functools.partial(_emulated_client, self.emulator.base_url),
+        )
+
+        def rows():
+            for row in read_payouts(self.input):
+                yield row
+            payout.stop("operator")
+
+        # stop() once every row was read: the rows not sent yet come back not_sent
+        slow = dict(self.emulator._latency, merchantpay=fixed_latency(0.05))
+        with patch.object(self.emulator, "_latency", slow):
+            summary = payout.run(rows())
+        journal.close()
+        self.assertEqual(payout.stop_reason, "operator")
+        self.assertEqual(sum(summary.values()), 20)
+        self.assertEqual(set(summary), {SUBMITTED, NOT_SENT})
+
+        summary, _ = self._run()
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 20)
+        self.assertNotIn(UNKNOWN, summary)
+
+    def _run_dying(self, dies_on):
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        payout = BulkPayout(
+            self.client, journal, concurrency=1, batch_size=20, processes=2, shard_by="id",
+            client_factory=functools.partial(_dying_client, self.emulator.base_url, dies_on),
+        )
+        try:
+            return payout.run(read_payouts(self.input)), payout
+        finally:
+            journal.close()
+
+    def test_worker_dying_at_setup_leaves_no_unknown_payout(self):
+        _write_csv(self.input, 10)
+        summary, payout = self._run_dying(None)
+        self.assertIn("died", payout.stop_reason)
+        # The rows handed to the workers before the run stopped
+        self.assertEqual(set(summary), {NOT_SENT})
+
+        summary, _ = self._run()
+        self.assertEqual(summary, {SUBMITTED: 10})
+
+    def test_worker_dying_mid_send_leaves_only_that_payout_unknown(self):
+        _write_csv(self.input, 20)
+        # First row of its shard: the shard's other rows were never sent
+        dies_on = "p-0"
+        summary, payout = self._run_dying(dies_on)
+        self.assertIn("died", payout.stop_reason)
+        self.assertEqual(summary[UNKNOWN], 1)
+        unknown = [e["id"] for e in _journal_entries(self.journal_path) if e["state"] == UNKNOWN]
+        self.assertEqual(unknown, [dies_on])
+
+        summary, _ = self._run()
+        self.assertEqual(summary[UNKNOWN], 1)
+        self.assertEqual(self.emulator.request_counts["merchantpay"], 19)
+
+    def test_journal_reads_entries_of_other_processes(self):
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        self.addCleanup(journal.close)
+        with open(self.journal_path, "a", encoding="utf-8") as other:
+            other.write('{"id": "p-1", "state": "submitting"}\n{"id": "p-2", "st')
+        journal.refresh()
+        self.assertEqual((journal.state("p-1"), journal.state("p-2")), (SUBMITTING, None))
+
+    def test_bad_settings(self):
+        journal = PayoutJournal(self.journal_path, fsync=False)
+        self.addCleanup(journal.close)
+        with self.assertRaises(ValueError):
+            BulkPayout(self.client, journal, processes=0)
+        with self.assertRaises(ValueError):
+            BulkPayout(self.client, journal, shard_by="amount")
+
+
+def _limited():
+    raise RateLimitError(message="limited")
+
+
+class TestSend(unittest.TestCase):
+
+    def test_accepted_payment_with_an_undecodable_body_is_submitted(self):
+        client = MagicMock()
+        client.initiate_payment.return_value = PaymentInitiated(202, b"<html>accepted</html>")
+        row = PayoutRow("p-1", 1000, TEST_MSISDN_2)
+        state, fields, stop_reason = _send(client, row, TEST_MSISDN_1, "Payout", threading.Event())
+        self.assertEqual((state, fields, stop_reason),
+                         (SUBMITTED, {"server_correlation_id": None}, None))
+
+    def test_rate_limited_payout_gives_up_or_stops(self):
+        client = MagicMock()
+        client.initiate_payment.side_effect = RateLimitError(message="limited")
+        row = PayoutRow("p-1", 1000, TEST_MSISDN_2)
+        with patch("mvola_api.payouts.RATE_LIMIT_BACKOFF", 0):
+            state, _, _ = _send(client, row, TEST_MSISDN_1, "Payout", threading.Event())
+        self.assertEqual(state, NOT_SENT)
+        self.assertEqual(client.initiate_payment.call_count, MAX_RATE_LIMITED_ATTEMPTS)
+
+        # A stop (SIGTERM, Ctrl-C) ends the backoff at once
+        stopping = threading.Event()
+        client.initiate_payment.side_effect = lambda **kwargs: stopping.set() or _limited()
+        state, fields, _ = _send(client, row, TEST_MSISDN_1, "Payout", stopping)
+        self.assertEqual((state, fields["error"]), (NOT_SENT, "run stopped before sending"))
+
+    def test_results_of_rows_settled_as_lost_are_dropped(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        journal = PayoutJournal(os.path.join(tmpdir, "payouts.journal"), fsync=False)
+        self.addCleanup(journal.close)
+        payout = BulkPayout(MagicMock(partner_msisdn=TEST_MSISDN_1), journal, processes=2)
+        rows = [PayoutRow(f"p-{n}", 1000, TEST_MSISDN_2) for n in range(2)]
+        in_flight = {row.id: row for row in rows}
+        journal.record("p-0", SUBMITTING)
+
+        # The worker died with a result of p-0 still in the outbox
+        pool = MagicMock()
+        pool.shard_of.return_value = 0
+        pool.results.side_effect = [
+            ShardError("Shard 0 worker died", shard=0),
+            [(rows[0], (SUBMITTED, {"server_correlation_id": "s"}, None))],
+        ]
+        payout._collect(pool, in_flight)
+        payout._collect(pool, in_flight)
+        self.assertEqual(payout.summary, {UNKNOWN: 1, NOT_SENT: 1})
+        self.assertEqual(in_flight, {})
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_payout_command_against_the_emulator(self):
+        path = os.path.join(self.tmpdir, "payouts.jsonl")
+        with open(path, "w", encoding="utf-8") as fh:
+            for i in range(5):
+                fh.write(json.dumps({"id": f"j-{i}", "amount": 500, "credit_msisdn": TEST_MSISDN_2})
+                         + "\n")
+
+        output = io.StringIO()
+        with patch.dict(os.environ, ENVIRONMENT), contextlib.redirect_stdout(output):
+            status = main(["payout", path, "--emulator", "--rate", "100", "--no-fsync"])
+        self.assertEqual(status, 0)
+        self.assertIn(SUBMITTED, output.getvalue())
+        self.assertTrue(os.path.exists(path + ".journal"))
+        self.assertTrue(os.path.exists(path + ".results.jsonl"))
+        self.assertEqual(EXIT_INTERRUPTED, 130)
+
+    def test_invalid_rows_set_the_exit_status(self):
+        path = os.path.join(self.tmpdir, "payouts.csv")
+        _write_csv(path, 1, extra=["p-x,-5,0340000000,Negative"])
+        with patch.dict(os.environ, ENVIRONMENT), contextlib.redirect_stdout(io.StringIO()):
+            status = main(["payout", path, "--emulator", "--no-fsync"])
+        self.assertEqual(status, 1)
+
+    def test_payout_command_with_worker_processes(self):
+        path = os.path.join(self.tmpdir, "payouts.csv")
+        _write_csv(path, 12)
+        output = io.StringIO()
+        with patch.dict(os.environ, ENVIRONMENT), contextlib.redirect_stdout(output):
+            status = main(["payout", path, "--emulator", "--rate", "100", "--no-fsync",
+                           "--processes", "2", "--shard-by", "id"])
+        self.assertEqual(status, 0)
+        self.assertIn("12", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Tests for the reconciliation engine.
+"""
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.reconciliation import (
+    ERROR,
+    MISMATCHED,
+    MISSING,
+    ORPHANED,
+    LedgerRecord,
+    Reconciler,
+    read_csv,
+    read_jsonl,
+    sort_records,
+)
+from mvola_api.results import TransactionDetails
+
+
+def _make_client():
+    return MVolaClient(
+        consumer_key="recon_key",
+        consumer_secret="recon_secret",
+        partner_name="Recon Test",
+        sandbox=True,
+    )
+
+
+def _completed_payments(client, count):
+    """Make `count` payments and return their transaction ids."""
+    ids = []
+    for i in range(count):
+        payment = client.initiate_payment(
+            amount=1000 + i,
+            debit_msisdn=TEST_MSISDN_1,
+            credit_msisdn=TEST_MSISDN_2,
+            description=f"Recon {i}",
+        )
+        ids.append(client.get_transaction_status(payment.server_correlation_id).transaction_id)
+    return ids
+
+
+class _NoReferenceClient:
+    """Client whose details bodies lack the transaction reference."""
+
+    def get_transaction_details(self, transaction_id):
+        return TransactionDetails(200, b'{"transactionStatus": "completed"}')
+
+
+def _ledger(ids):
+    return [
+        LedgerRecord(tid, amount=1000 + i, currency="Ar", status="completed",
+                     debit_msisdn=TEST_MSISDN_1, credit_msisdn=TEST_MSISDN_2,
+                     reference=f"order-{i}")
+        for i, tid in enumerate(ids)
+    ]
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_details_body_and_comparison(self):
+        mvola = LedgerRecord.from_details({
+            "transactionReference": "T1",
+            "amount": "1000.00",
+            "currency": "Ar",
+            "transactionStatus": "Completed",
+            "debitParty": [{"key": "msisdn", "value": TEST_MSISDN_1}],
+            "creditParty": [{"key": "msisdn", "value": TEST_MSISDN_2}],
+            "fees": [{"feeAmount": "10"}, {"feeAmount": "5"}],
+        })
+        self.assertEqual((mvola.amount, mvola.status, mvola.fees),
+                         (Decimal("1000"), "completed", Decimal("15")))
+        ours = LedgerRecord("T1", amount="1000", status="completed", fees="20")
+        self.assertEqual(ours.compare(mvola), [("fees", Decimal("20"), Decimal("15"))])
+        # Fields missing on either side are not compared
+        self.assertEqual(LedgerRecord("T1").compare(mvola), [])
+
+    def test_external_sort_with_small_chunks(self):
+        records = [{"transaction_id": f"T{n:04d}", "amount": n} for n in (7, 3, 9, 1, 5, 2, 8)]
+        tmpdir = tempfile.mkdtemp()
+        try:
+            ordered = list(sort_records(records, chunk_size=2, tmpdir=tmpdir))
+            self.assertEqual([r.transaction_id for r in ordered],
+                             ["T0001", "T0002", "T0003", "T0005", "T0007", "T0008", "T0009"])
+            self.assertEqual(ordered[0].amount, Decimal("1"))
+            self.assertEqual(os.listdir(tmpdir), [])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestReconciler(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = MVolaEmulator(completion_delay=0).start()
+        self.client = _make_client()
+        self.emulator.attach(self.client)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.client.close()
+        self.emulator.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookups_report_missing_and_mismatched_in_ledger_order(self):
+        ids = _completed_payments(self.client, 4)
+        ledger = _ledger(ids)
+        ledger[1].amount = Decimal("999")
+        ledger.insert(2, LedgerRecord("unknown-txn", amount=10, reference="ghost"))
+
+        reconciler = Reconciler(self.client, concurrency=2)
+        found = list(reconciler.run(ledger))
+
+        self.assertEqual([(d.kind, d.transaction_id) for d in found],
+                         [(MISMATCHED, ids[1]), (MISSING, "unknown-txn")])
+        self.assertEqual(found[0].to_dict()["fields"],
+                         {"amount": {"ledger": "999", "mvola": "1001"}})
+        self.assertEqual(found[1].to_dict()["reference"], "ghost")
+        self.assertEqual(reconciler.summary["checked"], 5)
+        self.assertEqual(reconciler.summary["matched"], 3)
+
+        # Final details are cached: a second pass makes no details call
+        calls = self.emulator.request_counts["details"]
+        list(reconciler.run(ledger))
+        self.assertEqual(self.emulator.request_counts["details"], calls)
+        self.assertEqual(reconciler.cache_hits, 5)
+
+    def test_statement_join_finds_orphans(self):
+        ids = _completed_payments(self.client, 4)
+        statement_path = os.path.join(self.tmpdir, "statement.jsonl")
+        with open(statement_path, "w", encoding="utf-8") as fh:
+            for tid in sorted(ids):
+                body = self.client.get_transaction_details(tid).response
+                fh.write(json.dumps(body) + "\n")
+
+        # Our ledger lacks the first payment and names its columns differently
+        ledger_path = os.path.join(self.tmpdir, "ledger.csv")
+        with open(ledger_path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["txn", "amount", "currency", "status"])
+            for i, tid in sorted(enumerate(ids), key=lambda item: item[1]):
+                if i:
+                    writer.writerow([tid, 1000 + i, "Ar", "completed"])
+
+        found = list(Reconciler().run(
+            read_csv(ledger_path, columns={"transaction_id": "txn"}),
+            statement=read_jsonl(statement_path),
+        ))
+        self.assertEqual([(d.kind, d.transaction_id) for d in found], [(ORPHANED, ids[0])])
+
+    def test_unsorted_statement_is_rejected(self):
+        statement = [LedgerRecord("B"), LedgerRecord("A")]
+        with self.assertRaises(ValueError):
+            list(Reconciler().run([LedgerRecord("A")], statement=statement))
+        with self.assertRaises(ValueError):
+            Reconciler().run([])
+
+    def test_lookup_failures_are_reported_as_errors(self):
+        with MVolaEmulator(error_rate=1.0) as failing:
+            client = _make_client()
+            failing.attach(client)
+            found = list(Reconciler(client).run([LedgerRecord("T1")]))
+            client.close()
+        self.assertEqual([d.kind for d in found], [ERROR])
+
+    def test_unexpected_details_bodies_are_reported_as_errors(self):
+        reconciler = Reconciler(_NoReferenceClient())
+        found = list(reconciler.run([LedgerRecord("T1"), LedgerRecord("T2")]))
+        self.assertEqual([(d.kind, d.transaction_id) for d in found],
+                         [(ERROR, "T1"), (ERROR, "T2")])
+        self.assertIn("transaction_id is required", found[0].error)
+
+    def test_resume_from_checkpoint(self):
+        ledger = [LedgerRecord(f"unknown-{n}") for n in range(10)]
+        checkpoint = os.path.join(self.tmpdir, "run.ckpt")
+
+        first = Reconciler(self.client, checkpoint_path=checkpoint, checkpoint_every=2)
+        seen = []
+        for discrepancy in first.run(ledger):
+            seen.append(discrepancy.transaction_id)
+            if len(seen) == 4:
+                break
+        with open(checkpoint, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh)["position"], 3)
+
+        # The last emitted entry was not acknowledged: it is emitted again
+        second = Reconciler(self.client, checkpoint_path=checkpoint)
+        rest = [d.transaction_id for d in second.run(ledger)]
+        self.assertEqual(rest, [f"unknown-{n}" for n in range(3, 10)])
+        self.assertEqual(second.summary[MISSING], 10)
+        self.assertEqual(list(second.run(ledger)), [])
+
+    def test_resume_within_duplicate_transaction_ids(self):
+        ledger = [LedgerRecord(tid, amount=2) for tid in ("A", "B", "B", "B", "C")]
+        statement = [LedgerRecord(tid, amount=1) for tid in ("A", "B", "C")]
+        checkpoint = os.path.join(self.tmpdir, "run.ckpt")
+
+        run = Reconciler(checkpoint_path=checkpoint).run(ledger, statement=statement)
+        self.assertEqual([next(run).transaction_id for _ in range(3)], ["A", "B", "B"])
+        run.close()
+
+        # Resumed after the first B: the other two are not skipped
+        second = Reconciler(checkpoint_path=checkpoint)
+        rest = [d.transaction_id for d in second.run(ledger, statement=statement)]
+        self.assertEqual(rest, ["B", "B", "C"])
+        self.assertEqual(second.summary[MISMATCHED], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Tests for the typed, lazily decoded transaction results.
+"""
+import io
+import json
+import logging
+import os
+import pickle
+import sys
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaTransactionError
+from mvola_api.results import PaymentInitiated, TransactionDetails, TransactionStatus
+from mvola_api.utils import format_transaction_response
+
+PAYMENT_BODY = json.dumps({
+    "status": "pending",
+    "serverCorrelationId": "c4e0e8b2-6f7a-4bde-9d3c-1a2b3c4d5e6f",
+    "notificationMethod": "polling",
+}).encode()
+
+
+def _make_client(**kwargs):
+    return MVolaClient(
+        consumer_key="results_key",
+        consumer_secret="results_secret",
+        partner_name="Results Test",
+        sandbox=True,
+        **kwargs,
+    )
+
+
+class TestResultObjects(unittest.TestCase):
+
+    def test_body_is_decoded_on_first_access_only(self):
+        result = PaymentInitiated(202, PAYMENT_BODY, correlation_id="corr-1")
+        self.assertFalse(result.decoded)
+        self.assertEqual(result.correlation_id, "corr-1")
+        self.assertFalse(result.decoded)
+
+        self.assertEqual(result.server_correlation_id, "c4e0e8b2-6f7a-4bde-9d3c-1a2b3c4d5e6f")
+        self.assertTrue(result.decoded)
+        self.assertIs(result.response, result.response)
+        self.assertIsNone(result.content)
+
+    def test_mapping_view_matches_the_former_dict(self):
+        result = PaymentInitiated(202, PAYMENT_BODY, correlation_id="corr-1")
+        self.assertEqual(
+            result,
+            {
+                "success": True,
+                "status_code": 202,
+                "response": json.loads(PAYMENT_BODY),
+                "correlation_id": "corr-1",
+            },
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["response"]["status"], "pending")
+        self.assertIn("correlation_id", result)
+        self.assertNotIn("timings", result)
+        self.assertIsNone(result.get("timings"))
+        with self.assertRaises(KeyError):
+            result["status"]
+        self.assertEqual(json.loads(json.dumps(result.to_dict()))["status_code"], 202)
+
+    def test_typed_fields(self):
+        status = TransactionStatus(
+            200, b'{"status": "completed", "serverCorrelationId": "s", "objectReference": "ref"}'
+        )
+        self.assertEqual((status.status, status.transaction_id), ("completed", "ref"))
+        details = TransactionDetails(
+            200,
+            b'{"transactionReference": "ref", "transactionStatus": "completed", "amount": "1000"}',
+        )
+        self.assertEqual((details.transaction_id, details.status, details.amount),
+                         ("ref", "completed", "1000"))
+        self.assertIsNone(details.currency)
+        self.assertEqual(format_transaction_response(status)["transaction_id"], "ref")
+
+    def test_invalid_json_raises_on_access(self):
+        result = TransactionStatus(200, b"<html>")
+        with self.assertRaises(MVolaTransactionError):
+            result.status
+
+    def test_to_dict_round_trips_through_json(self):
+        results = [
+            PaymentInitiated(202, PAYMENT_BODY, correlation_id="corr-1"),
+            TransactionStatus(200, b'{"status": "completed", "objectReference": "ref"}'),
+            TransactionDetails(200, b'{"transactionReference": "ref", "amount": "1000"}'),
+        ]
+        for result in results:
+            with self.subTest(type(result).__name__):
+                self.assertEqual(json.loads(json.dumps(result.to_dict())), dict(result))
+
+    def test_slotted_and_picklable(self):
+        result = PaymentInitiated(202, PAYMENT_BODY, correlation_id="corr-1")
+        self.assertFalse(hasattr(result, "__dict__"))
+        copy = pickle.loads(pickle.dumps(result))
+        self.assertEqual(copy.status, "pending")
+        self.assertEqual(copy.correlation_id, "corr-1")
+
+    def test_held_results_use_less_memory_than_dicts(self):
+        def measure(build):
+            tracemalloc.start()
+            held = [build(i) for i in range(5000)]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del held
+            return size
+
+        as_dicts = measure(lambda i: {
+            "success": True,
+            "status_code": 202,
+            "response": json.loads(PAYMENT_BODY),
+            "correlation_id": str(i),
+        })
+        as_results = measure(
+            lambda i: PaymentInitiated(202, bytes(PAYMENT_BODY), correlation_id=str(i))
+        )
+        self.assertLess(as_results, as_dicts * 0.6)
+
+
+class TestClientResults(unittest.TestCase):
+
+    def test_calls_return_result_objects(self):
+        with MVolaEmulator(completion_delay=0) as emulator:
+            client = _make_client(collect_timings=True)
+            emulator.attach(client)
+            payment = client.initiate_payment(
+                amount=1000,
+                debit_msisdn=TEST_MSISDN_1,
+                credit_msisdn=TEST_MSISDN_2,
+                description="Result test",
+            )
+            self.assertIsInstance(payment, PaymentInitiated)
+            self.assertIn("rate_limit_wait", payment["timings"])
+            self.assertFalse(payment.decoded)
+
+            status = client.get_transaction_status(payment.server_correlation_id)
+            self.assertIsInstance(status, TransactionStatus)
+            self.assertEqual(status.status, "completed")
+
+            details = client.get_transaction_details(status.transaction_id)
+            self.assertIsInstance(details, TransactionDetails)
+            self.assertEqual(details.amount, "1000")
+            client.close()
+
+    def test_logging_an_undecodable_status_does_not_raise(self):
+        client = _make_client()
+        self.addCleanup(client.close)
+        undecodable = TransactionStatus(200, b"<html>ok</html>")
+        with patch.object(client._transaction, "get_transaction_status",
+                          return_value=undecodable), \
+                patch.object(logging, "raiseExceptions", True), \
+                self.assertLogs("mvola_api", logging.INFO) as logs, \
+                patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            self.assertIs(client.get_transaction_status("corr-1"), undecodable)
+            rendered = [record.getMessage() for record in logs.records]
+        self.assertTrue(any("<undecodable>" in message for message in rendered))
+        self.assertEqual(stderr.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Tests for the retry policy: full-jitter backoff, Retry-After and retry budget.
+"""
+import email.utils
+import os
+import sys
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.constants import MERCHANT_PAY_ENDPOINT, SANDBOX_URL, TRANSACTION_STATUS_ENDPOINT
+from mvola_api.faults import FaultInjectionTransport, FaultRule, HTTPStatus
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.metrics import MVolaMetrics
+from mvola_api.retry import RetryBudget, RetryPolicy
+from mvola_api.transport import Transport
+
+STATUS_URL = SANDBOX_URL + TRANSACTION_STATUS_ENDPOINT + "abc-123"
+PAY_URL = SANDBOX_URL + MERCHANT_PAY_ENDPOINT
+
+
+class _ServerTransport(Transport):
+    """Healthy server answering 200."""
+
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"status": "pending"}'
+        response._content_consumed = True
+        response.url = url
+        return response
+
+
+def _response(status_code, retry_after=None):
+    response = requests.Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_full_jitter_stays_below_exponential_bound(self):
+        policy = RetryPolicy(backoff_factor=0.5, backoff_max=3.0, seed=42)
+        for retry_number, bound in ((1, 0.5), (2, 1.0), (3, 2.0), (6, 3.0)):
+            delays = [policy.backoff(retry_number) for _ in range(200)]
+            self.assertTrue(all(0 <= d <= bound for d in delays))
+            # Spread over the whole interval, not clustered at the bound
+            self.assertLess(min(delays), bound * 0.1)
+            self.assertGreater(max(delays), bound * 0.9)
+
+    def test_without_jitter_backoff_is_exponential(self):
+        policy = RetryPolicy(backoff_factor=0.1, backoff_max=0.3, jitter=False)
+        self.assertEqual([policy.backoff(n) for n in (1, 2, 3)], [0.1, 0.2, 0.3])
+
+    def test_retry_after_seconds_and_http_date(self):
+        policy = RetryPolicy(backoff_max=60)
+        self.assertEqual(policy.retry_after(_response(429, "2")), 2.0)
+        self.assertEqual(policy.retry_after(_response(503, "600")), 60)
+        date = email.utils.formatdate(time.time() + 10, usegmt=True)
+        self.assertAlmostEqual(policy.retry_after(_response(503, date)), 10, delta=1.5)
+        past = email.utils.formatdate(time.time() - 10, usegmt=True)
+        self.assertEqual(policy.retry_after(_response(503, past)), 0.0)
+        self.assertIsNone(policy.retry_after(_response(503, "soon")))
+        self.assertIsNone(policy.retry_after(_response(500, "2")))
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_retries=-1)
+        with self.assertRaises(ValueError):
+            RetryBudget(ratio=-0.1)
+        with self.assertRaises(ValueError):
+            RetryBudget(max_balance=0.5)
+
+
+class TestRetryBudget(unittest.TestCase):
+
+    def test_budget_caps_retries_during_outage(self):
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0, max_balance=5)
+        faults = FaultInjectionTransport(
+            _ServerTransport(), [FaultRule(HTTPStatus(503), endpoint="status")]
+        )
+        http_client = SecureHTTPClient(
+            transport=faults,
+            retry_policy=RetryPolicy(max_retries=3, backoff_factor=0, budget=budget),
+        )
+        for _ in range(100):
+            self.assertEqual(http_client.get(STATUS_URL).status_code, 503)
+
+        # Without a budget: 100 * (1 + 3) attempts. With it: the initial
+        # balance plus 10% of the requests.
+        self.assertLessEqual(faults.calls, 100 + 5 + 10)
+        self.assertGreater(budget.exhausted, 80)
+
+    def test_budget_refills_over_time(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=50, max_balance=1)
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        time.sleep(0.05)
+        self.assertTrue(budget.withdraw())
+
+    def test_post_is_never_retried_nor_charged(self):
+        budget = RetryBudget()
+        faults = FaultInjectionTransport(
+            _ServerTransport(), [FaultRule(HTTPStatus(503), endpoint="merchantpay")]
+        )
+        http_client = SecureHTTPClient(transport=faults, retry_policy=RetryPolicy(budget=budget))
+        self.assertEqual(http_client.post(PAY_URL, json={}).status_code, 503)
+        self.assertEqual(faults.calls, 1)
+        self.assertEqual(budget.exhausted, 0)
+
+    def test_metrics_export_retries_and_exhaustion(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=0, max_balance=2)
+        faults = FaultInjectionTransport(
+            _ServerTransport(), [FaultRule(HTTPStatus(503), endpoint="status")]
+        )
+        http_client = SecureHTTPClient(
+            transport=faults,
+            retry_policy=RetryPolicy(max_retries=3, backoff_factor=0, budget=budget),
+        )
+        metrics = MVolaMetrics().install()
+        try:
+            metrics.track_http_client(http_client)
+            http_client.get(STATUS_URL)
+            http_client.get(STATUS_URL)
+        finally:
+            metrics.uninstall()
+        text = metrics.registry.to_prometheus()
+        self.assertIn('mvola_retries_total{operation="status"} 2', text)
+        self.assertIn("mvola_retry_budget_exhausted_total 2", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
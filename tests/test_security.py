@@ -312,6 +312,16 @@ class TestAmountValidation(unittest.TestCase):
                 "1000", "0340000001", "0340000001", "Test"
             )
 
+    def test_public_validation_of_the_client(self):
+        """validate_payment() applies the same checks without sending."""
+        client = MVolaClient(
+            consumer_key="key", consumer_secret="secret", partner_name="Test", sandbox=True
+        )
+        client.validate_payment(1000, "0340000001", "0340000002", "Test payment")
+        with self.assertRaises(MVolaValidationError):
+            client.validate_payment("100.50", "0340000001", "0340000002", "Test")
+        client.close()
+
 
 class TestMSISDNValidation(unittest.TestCase):
     """Test MSISDN validation for Madagascar numbers."""
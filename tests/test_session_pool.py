@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Tests for the pooled-session mode of SecureHTTPClient.
+"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import SANDBOX_URL, TOKEN_ENDPOINT
+from mvola_api.emulator import MVolaEmulator, fixed_latency
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.transport import SessionPoolTransport
+
+TOKEN_URL = SANDBOX_URL + TOKEN_ENDPOINT
+BASIC_AUTH = {"Authorization": "Basic cG9vbDpwb29s"}
+
+
+def _hammer(http_client, threads, requests_per_thread):
+    statuses = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(requests_per_thread):
+            response = http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            with lock:
+                statuses.append(response.status_code)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return statuses
+
+
+class TestSessionPool(unittest.TestCase):
+
+    def test_sessions_and_connections_are_bounded(self):
+        with MVolaEmulator(latency=fixed_latency(0.005)) as emulator:
+            http_client = SecureHTTPClient(session_pool=4)
+            emulator.attach(http_client)
+            statuses = _hammer(http_client, threads=16, requests_per_thread=5)
+
+            self.assertEqual(statuses, [200] * 80)
+            sessions = http_client._session_pool.sessions
+            self.assertEqual(len(sessions), 4)
+            # Each session has its own adapter: no pool shared between them
+            adapters = {id(s.get_adapter(SANDBOX_URL)) for s in sessions}
+            self.assertEqual(len(adapters), 4)
+            opened = sum(opened for _, _, opened in http_client.pool_stats())
+            self.assertLessEqual(opened, 4)
+            http_client.close()
+
+    def test_sequential_calls_reuse_one_session(self):
+        with MVolaEmulator() as emulator:
+            http_client = SecureHTTPClient(session_pool=8)
+            emulator.attach(http_client)
+            for _ in range(5):
+                http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            self.assertEqual(len(http_client._session_pool.sessions), 1)
+            http_client.close()
+
+    def test_checkout_wait_is_bounded_by_connect_timeout(self):
+        pool = SessionPoolTransport(lambda: SecureHTTPClient()._create_session(), size=1)
+        http_client = SecureHTTPClient(transport=pool, connect_timeout=0.05, max_retries=0)
+        held = pool._checkout(1.0)
+        try:
+            with self.assertRaises(MVolaConnectionError) as ctx:
+                http_client.post(TOKEN_URL, headers=BASIC_AUTH, data={})
+            self.assertIn("timed out", str(ctx.exception))
+        finally:
+            pool._checkin(held)
+
+    def test_client_forwards_session_pool(self):
+        client = MVolaClient(
+            consumer_key="pool_key",
+            consumer_secret="pool_secret",
+            partner_name="Pool Test",
+            sandbox=True,
+            session_pool=4,
+        )
+        self.assertEqual(client._transaction._http_client._session_pool.size, 4)
+        self.assertIsNone(client._transaction._http_client._session)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            SessionPoolTransport(lambda: None, size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Tests for process-pool sharding and shared rate limiters.
+"""
+import os
+import sys
+import time
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api.rate_limiter import TokenBucketRateLimiter
+from mvola_api.sharding import ShardedPool, ShardError, shard_for, start_manager
+
+
+def _record_setup(stopping, limiter_args=None):
+    """Handler returning (item, pid, when handled); fails on "boom", dies on "die"."""
+    limiter = TokenBucketRateLimiter(*limiter_args) if limiter_args else None
+
+    def handle(item):
+        if item == "boom":
+            raise RuntimeError("boom")
+        if item == "die":
+            os._exit(3)
+        if limiter is not None:
+            limiter.acquire()
+        time.sleep(0.002)
+        return os.getpid(), time.monotonic()
+
+    return handle
+
+
+class TestShardFor(unittest.TestCase):
+
+    def test_stable_balanced_and_consistent(self):
+        keys = [f"0343{n:06d}" for n in range(4000)]
+        four = [shard_for(key, 4) for key in keys]
+        self.assertEqual(four, [shard_for(key, 4) for key in keys])
+        self.assertTrue(all(800 < count < 1200 for count in Counter(four).values()))
+
+        # Growing to 5 shards only moves keys to the new shard
+        five = [shard_for(key, 5) for key in keys]
+        moved = [(a, b) for a, b in zip(four, five) if a != b]
+        self.assertTrue(all(b == 4 for _, b in moved))
+        self.assertLess(len(moved), 1000)
+        self.assertEqual(shard_for("any", 1), 0)
+        with self.assertRaises(ValueError):
+            shard_for("any", 0)
+
+
+class TestShardedPool(unittest.TestCase):
+
+    def _collect(self, pool, count):
+        results = []
+        while len(results) < count:
+            results.extend(pool.results(timeout=10))
+        return results
+
+    def test_items_of_a_key_stay_in_order_on_one_worker(self):
+        work = [(f"payer-{n % 7}", (f"payer-{n % 7}", n)) for n in range(140)]
+        with ShardedPool(_record_setup, processes=3, threads=2) as pool:
+            for key, item in work:
+                pool.submit(key, item)
+            results = self._collect(pool, len(work))
+
+        self.assertEqual(sorted(item for item, _ in results), sorted(item for _, item in work))
+        by_key = {}
+        for (key, n), (pid, when) in results:
+            by_key.setdefault(key, []).append((when, n, pid))
+        for handled in by_key.values():
+            self.assertEqual(len({pid for _, _, pid in handled}), 1)
+            self.assertEqual([n for _, n, _ in sorted(handled)], sorted(n for _, n, _ in handled))
+        self.assertEqual(len({pid for _, (pid, _) in results}), 3)
+
+    def test_handler_failures_and_dead_workers_are_reported(self):
+        pool = ShardedPool(_record_setup, processes=2).start()
+        try:
+            pool.submit("a", "boom")
+            with self.assertRaises(ShardError) as caught:
+                self._collect(pool, 1)
+            self.assertEqual(caught.exception.item, "boom")
+            self.assertIn("RuntimeError", str(caught.exception))
+
+            pool.submit("a", "die")
+            with self.assertRaises(ShardError) as caught:
+                self._collect(pool, 1)
+            self.assertIsNone(caught.exception.item)
+            self.assertEqual(caught.exception.shard, pool.shard_of("a"))
+        finally:
+            pool.close(timeout=5)
+
+    def test_workers_share_one_rate_limit(self):
+        manager = start_manager()
+        try:
+            # 10 tokens, then 50 per second, for all workers together
+            limiter_args = (10, 50.0, "shared", manager.dict(), manager.Lock())
+            start = time.monotonic()
+            with ShardedPool(_record_setup, (limiter_args,), processes=3, threads=2) as pool:
+                for n in range(40):
+                    pool.submit(f"key-{n}", n)
+                self._collect(pool, 40)
+            # 30 calls past the burst need 0.6s at 50/s (each worker alone would allow 150/s)
+            self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        finally:
+            manager.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
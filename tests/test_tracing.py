@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Tests for tracing spans around client operations.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api import tracing
+from mvola_api.constants import TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator
+from mvola_api.exceptions import MVolaTransactionError
+from mvola_api.tracing import InMemorySpanExporter, SpanExporter, Tracer
+
+try:
+    import opentelemetry  # noqa: F401
+
+    HAS_OPENTELEMETRY = True
+except ImportError:
+    HAS_OPENTELEMETRY = False
+
+
+def _make_client():
+    return MVolaClient(
+        consumer_key="tracing_key",
+        consumer_secret="tracing_secret",
+        partner_name="Tracing Test",
+        sandbox=True,
+    )
+
+
+def _pay(client, correlation_id=None):
+    return client.initiate_payment(
+        amount=1000,
+        debit_msisdn=TEST_MSISDN_1,
+        credit_msisdn=TEST_MSISDN_2,
+        description="Traced payment",
+        correlation_id=correlation_id,
+    )
+
+
+class TestClientSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        tracing.set_tracer(Tracer(self.exporter))
+        self.emulator = MVolaEmulator(completion_delay=0.0).start()
+        self.client = _make_client()
+        self.emulator.attach(self.client)
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+        self.emulator.stop()
+
+    def test_payment_span_tree(self):
+        _pay(self.client, correlation_id="corr-123")
+        spans = {span.name: span for span in self.exporter.spans}
+
+        root = spans["MVolaClient.initiate_payment"]
+        transaction = spans["MVolaTransaction.initiate_merchant_payment"]
+        auth = spans["MVolaAuth.get_access_token"]
+        http_spans = [s for s in self.exporter.spans if s.name == "HTTP POST"]
+
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(transaction.parent_id, root.span_id)
+        self.assertEqual(auth.parent_id, transaction.span_id)
+        self.assertEqual(len({s.trace_id for s in self.exporter.spans}), 1)
+
+        token_post, payment_post = http_spans
+        self.assertEqual(token_post.parent_id, auth.span_id)
+        self.assertEqual(payment_post.parent_id, transaction.span_id)
+        self.assertEqual(payment_post.attributes["http.response.status_code"], 202)
+        self.assertEqual(payment_post.attributes["mvola.correlation_id"], "corr-123")
+        self.assertEqual(transaction.attributes["mvola.correlation_id"], "corr-123")
+        self.assertIs(auth.attributes["mvola.token.cache_hit"], False)
+        self.assertNotIn("mvola.correlation_id", token_post.attributes)
+
+    def test_failed_call_marks_spans(self):
+        with self.assertRaises(MVolaTransactionError):
+            self.client.get_transaction_status("unknown-id")
+        spans = {span.name: span for span in self.exporter.spans}
+        self.assertEqual(spans["MVolaClient.get_transaction_status"].status, "ERROR")
+        self.assertEqual(
+            spans["MVolaTransaction.get_transaction_status"].error, "MVolaTransactionError"
+        )
+        self.assertEqual(spans["HTTP GET"].attributes["http.response.status_code"], 404)
+
+    def test_parent_context_from_traceparent(self):
+        tracer = tracing.get_tracer()
+        parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        with tracer.start_span("web.request", parent=parent) as span:
+            self.client.generate_token()
+        self.assertEqual(span.trace_id, "0af7651916cd43dd8448eb211c80319c")
+        self.assertEqual(span.parent_id, "b7ad6b7169203331")
+        client_span = next(s for s in self.exporter.spans if s.name == "MVolaClient.generate_token")
+        self.assertEqual(client_span.parent_id, span.span_id)
+
+
+class TestSampling(unittest.TestCase):
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+
+    def test_exporter_without_export_cannot_be_constructed(self):
+        class _NoExport(SpanExporter):
+            pass
+
+        with self.assertRaises(TypeError):
+            _NoExport()
+
+    def test_sampling_keeps_whole_traces(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter, sample_rate=0.25)
+        for _ in range(400):
+            with tracer.start_span("root"):
+                with tracer.start_span("child"):
+                    pass
+        roots = [s for s in exporter.spans if s.name == "root"]
+        children = [s for s in exporter.spans if s.name == "child"]
+        self.assertTrue(50 <= len(roots) <= 150)
+        self.assertEqual(len(roots), len(children))
+
+    def test_unsampled_traceparent(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter)
+        parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00"
+        with tracer.start_span("root", parent=parent) as span:
+            self.assertIsNone(span)
+        self.assertEqual(exporter.spans, [])
+        with self.assertRaises(ValueError):
+            tracer.start_span("root", parent="garbage")
+        with self.assertRaises(ValueError):
+            Tracer(sample_rate=2)
+
+    def test_disabled_tracing_is_a_noop(self):
+        self.assertIsNone(tracing.get_tracer())
+        with tracing.span("anything") as span:
+            tracing.set_attribute("key", "value")
+        self.assertIsNone(span)
+        self.assertIsNone(tracing.current_span())
+
+
+@unittest.skipUnless(HAS_OPENTELEMETRY, "opentelemetry-api not installed")
+class TestOpenTelemetryTracer(unittest.TestCase):
+
+    def test_spans_go_through_opentelemetry(self):
+        tracer = tracing.OpenTelemetryTracer()
+        with tracer.start_span("mvola.test", {"key": "value"}) as span:
+            tracer.set_attribute("other", 1)
+        self.assertIsNotNone(span)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Tests for pluggable transports: record against the emulator, replay offline.
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mvola_api import MVolaClient
+from mvola_api.constants import SANDBOX_URL, TEST_MSISDN_1, TEST_MSISDN_2
+from mvola_api.emulator import MVolaEmulator, fixed_latency
+from mvola_api.exceptions import MVolaConnectionError
+from mvola_api.http_client import SecureHTTPClient
+from mvola_api.transport import (
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    wrap_transport,
+)
+
+
+def _make_client():
+    return MVolaClient(
+        consumer_key="transport_key",
+        consumer_secret="transport_secret",
+        partner_name="Transport Test",
+        sandbox=True,
+    )
+
+
+def _flow(client):
+    result = client.initiate_payment(
+        amount=2500,
+        debit_msisdn=TEST_MSISDN_1,
+        credit_msisdn=TEST_MSISDN_2,
+        description="Replay payment",
+    )
+    return client.get_transaction_status(result["response"]["serverCorrelationId"])
+
+
+class _FailingTransport(Transport):
+    def send(self, method, url, headers=None, data=None, json=None, timeout=None):
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.cassette = Cassette()
+        with MVolaEmulator(completion_delay=0.0, latency=fixed_latency(0.02)) as emulator:
+            client = _make_client()
+            emulator.attach(client)
+            wrap_transport(client, lambda inner: RecordingTransport(inner, self.cassette))
+            self.recorded_status = _flow(client)
+
+    def test_records_all_exchanges(self):
+        methods = [(e["method"], e["status"]) for e in self.cassette.entries]
+        self.assertEqual(methods, [("POST", 200), ("POST", 202), ("GET", 200)])
+        for entry in self.cassette.entries:
+            self.assertGreaterEqual(entry["elapsed"], 0.02)
+
+    def test_secrets_are_masked(self):
+        token_entry, payment_entry, _ = self.cassette.entries
+        self.assertEqual(token_entry["request_headers"]["Authorization"], "Basic ****")
+        self.assertIn("...", token_entry["body"])
+        self.assertNotIn("transport_secret", str(self.cassette.entries))
+        auth = payment_entry["request_headers"]["Authorization"]
+        self.assertTrue(auth.startswith("Bearer ") and "..." in auth)
+
+    def test_payment_parties_are_masked(self):
+        body = self.cassette.entries[1]["request_body"]
+        self.assertEqual(body["amount"], "****")
+        self.assertEqual(body["debitParty"][0]["value"], "034****03")
+        self.assertEqual(body["creditParty"][0]["value"], "034****04")
+        self.assertNotIn(TEST_MSISDN_1, str(body))
+        self.assertNotIn(TEST_MSISDN_2, str(body))
+
+    def test_replay_offline_from_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cassette.jsonl")
+            self.cassette.save(path)
+            cassette = Cassette.load(path)
+
+        client = _make_client()
+        wrap_transport(client, lambda inner: ReplayTransport(cassette, latency_scale=0))
+        status = _flow(client)
+        self.assertEqual(status["response"], self.recorded_status["response"])
+
+    def test_replay_latency_scaling(self):
+        replay = ReplayTransport(self.cassette, latency_scale=2.0)
+        client = _make_client()
+        wrap_transport(client, lambda inner: replay)
+        start = time.perf_counter()
+        _flow(client)
+        # Three recorded exchanges of >= 20 ms each, doubled
+        self.assertGreaterEqual(time.perf_counter() - start, 0.12)
+
+    def test_unrecorded_request_fails(self):
+        http_client = SecureHTTPClient(backoff_factor=0, transport=ReplayTransport(Cassette()))
+        with self.assertRaises(MVolaConnectionError):
+            http_client.get(SANDBOX_URL + "/unknown")
+
+
+class TestReplayErrors(unittest.TestCase):
+
+    def test_recorded_timeouts_are_replayed(self):
+        cassette = Cassette()
+        recorder = SecureHTTPClient(
+            max_retries=0, transport=RecordingTransport(_FailingTransport(), cassette)
+        )
+        with self.assertRaises(MVolaConnectionError):
+            recorder.get(SANDBOX_URL + "/token")
+        self.assertEqual(cassette.entries[0]["error"], "ReadTimeout")
+
+        replayer = SecureHTTPClient(
+            max_retries=0, transport=ReplayTransport(cassette, latency_scale=0)
+        )
+        with self.assertRaises(MVolaConnectionError) as ctx:
+            replayer.get(SANDBOX_URL + "/token")
+        self.assertIn("timed out", str(ctx.exception))
+
+    def test_incomplete_transport_cannot_be_constructed(self):
+        class _NoSend(Transport):
+            pass
+
+        with self.assertRaises(TypeError):
+            _NoSend()
+
+    def test_cycle_reuses_recordings(self):
+        cassette = Cassette([{
+            "method": "GET", "url": SANDBOX_URL + "/token", "elapsed": 0,
+            "status": 200, "response_headers": {}, "body": "{}",
+        }])
+        http_client = SecureHTTPClient(transport=ReplayTransport(cassette, cycle=True))
+        for _ in range(3):
+            self.assertEqual(http_client.get(SANDBOX_URL + "/token").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()